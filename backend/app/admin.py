@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_security import auth_required, current_user
 from datetime import datetime, timedelta
+import hmac
 import logging
 
 from models.user import User, Role, db
@@ -15,7 +16,13 @@ from services.notification_service import NotificationService
 from services.holiday_service import HolidayService
 from services.email_service import EmailService
 from services.google_oauth_service import GoogleOAuthService
+from services.request_metrics import request_metrics
+from services.pool_metrics import pool_metrics
+from services.slow_query_log import slow_query_log
+from services.request_profiler import request_profiler
+from services.log_search import LOG_CATEGORIES, LogSearch, parse_timestamp
 from utils.decorators import admin_required
+from logging_config import logging_pipeline_stats
 
 logger = logging.getLogger(__name__)
 
@@ -399,7 +406,8 @@ def run_system_maintenance():
     """Ejecuta tareas de mantenimiento del sistema"""
     try:
         data = request.get_json() or {}
-        tasks = data.get('tasks', ['cleanup_notifications', 'process_notification_queue'])
+        tasks = data.get('tasks', ['cleanup_notifications', 'process_notification_queue',
+                                   'reconcile_notification_counters'])
         
         results = {
             'executed_tasks': [],
@@ -432,6 +440,19 @@ def run_system_maintenance():
             except Exception as e:
                 results['errors'].append(f'Error procesando cola: {e}')
         
+        # Reconciliar contadores de notificaciones no leídas
+        if 'reconcile_notification_counters' in tasks:
+            try:
+                counter_results = NotificationService.reconcile_notification_counters()
+                results['executed_tasks'].append({
+                    'task': 'reconcile_notification_counters',
+                    'result': f'{counter_results["corrected"]}/{counter_results["checked"]} contadores corregidos',
+                    'success': True,
+                    'details': counter_results
+                })
+            except Exception as e:
+                results['errors'].append(f'Error reconciliando contadores: {e}')
+        
         # Cargar festivos faltantes
         if 'load_missing_holidays' in tasks:
             try:
@@ -614,100 +635,59 @@ def get_backup_info():
 @auth_required()
 @admin_required()
 def get_system_logs():
-    """Obtiene logs del sistema"""
+    """
+    Busca en los logs estructurados del sistema (más recientes primero)
+    
+    Parámetros: category (app, errors, auth, email, database, external_api),
+    level (nivel mínimo o ALL), logger (prefijo), q (texto), since/until
+    (ISO 8601, UTC si no llevan zona), limit (máx. 200) y cursor (el
+    next_cursor de la página anterior).
+    """
     try:
-        from logging_config import get_logger
-        import os
-        
-        # Parámetros de consulta
-        level = request.args.get('level', 'INFO')
-        limit = min(request.args.get('limit', 50, type=int), 200)
-        category = request.args.get('category')
-        
-        # En un entorno real, esto leería los archivos de log estructurados
-        # Por ahora, devolvemos logs simulados basados en la actividad reciente
-        
-        logs = []
-        
-        # Logs de usuarios recientes
-        recent_users = User.query.filter(
-            User.created_at >= datetime.utcnow() - timedelta(days=7)
-        ).order_by(User.created_at.desc()).limit(10).all()
-        
-        for user in recent_users:
-            logs.append({
-                'timestamp': user.created_at.isoformat(),
-                'level': 'INFO',
-                'message': f'Nuevo usuario registrado: {user.email}',
-                'category': 'user_management',
-                'logger': 'team_time.user_actions',
-                'module': 'admin',
-                'function': 'get_system_logs'
-            })
-        
-        # Logs de empleados recientes
-        recent_employees = Employee.query.filter(
-            Employee.created_at >= datetime.utcnow() - timedelta(days=7)
-        ).order_by(Employee.created_at.desc()).limit(10).all()
-        
-        for employee in recent_employees:
-            logs.append({
-                'timestamp': employee.created_at.isoformat(),
-                'level': 'INFO',
-                'message': f'Nuevo empleado registrado: {employee.full_name}',
-                'category': 'employee_management',
-                'logger': 'team_time.user_actions',
-                'module': 'admin',
-                'function': 'get_system_logs'
-            })
-        
-        # Logs de autenticación reciente
-        auth_logs = [
-            {
-                'timestamp': (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                'level': 'INFO',
-                'message': 'Login exitoso',
-                'category': 'authentication',
-                'logger': 'team_time.auth',
-                'module': 'auth',
-                'function': 'login'
-            },
-            {
-                'timestamp': (datetime.utcnow() - timedelta(hours=4)).isoformat(),
-                'level': 'WARNING',
-                'message': 'Intento de login fallido',
-                'category': 'security',
-                'logger': 'team_time.security',
-                'module': 'auth',
-                'function': 'login'
-            }
-        ]
-        logs.extend(auth_logs)
-        
-        # Filtrar por nivel si se especifica
-        if level != 'ALL':
-            logs = [log for log in logs if log['level'] == level]
-        
-        # Filtrar por categoría si se especifica
-        if category:
-            logs = [log for log in logs if log['category'] == category]
+        from flask import current_app
         
-        # Ordenar logs por timestamp
-        logs.sort(key=lambda x: x['timestamp'], reverse=True)
+        category = request.args.get('category', 'app')
+        level = (request.args.get('level') or 'ALL').upper()
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        filters = {
+            'category': category,
+            'level': level,
+            'logger': request.args.get('logger') or None,
+            'q': request.args.get('q') or None,
+            'since': request.args.get('since'),
+            'until': request.args.get('until'),
+            'limit': limit
+        }
         
-        # Limitar resultados
-        logs = logs[:limit]
+        try:
+            since = parse_timestamp(filters['since']) if filters['since'] else None
+            until = parse_timestamp(filters['until']) if filters['until'] else None
+            log_search = LogSearch(current_app.config.get('LOG_DIR', 'logs'),
+                                   current_app.config.get('LOG_SEARCH_MAX_SCAN_BYTES', 64 * 1024 * 1024))
+            result = log_search.search(
+                category=category,
+                level=None if level == 'ALL' else level,
+                logger_name=filters['logger'],
+                text=filters['q'],
+                since=since,
+                until=until,
+                limit=limit,
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            # Incluye InvalidCursor y fechas, niveles o categorías no válidos
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         return jsonify({
             'success': True,
-            'logs': logs,
-            'filters': {
-                'level': level,
-                'category': category,
-                'limit': limit
-            },
-            'total_found': len(logs),
-            'note': 'Estos son logs simulados. En producción, se leerían archivos de log reales.'
+            'logs': result['logs'],
+            'filters': filters,
+            'categories': list(LOG_CATEGORIES),
+            'next_cursor': result['next_cursor'],
+            'scanned_bytes': result['scanned_bytes']
         })
         
     except Exception as e:
@@ -766,9 +746,9 @@ def get_system_metrics():
         import psutil
         from flask import current_app
         
-        # Métricas de sistema
+        # Métricas de sistema (CPU desde la llamada anterior: no bloquea la petición)
         system_metrics = {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            'cpu_percent': psutil.cpu_percent(interval=None),
             'memory': {
                 'total': psutil.virtual_memory().total,
                 'available': psutil.virtual_memory().available,
@@ -808,6 +788,9 @@ def get_system_metrics():
             ).count()
         }
         
+        # Tiempos de arranque del worker (create_app)
+        boot_metrics = current_app.extensions.get('boot_metrics')
+        
         # Métricas de configuración
         config_metrics = {
             'google_oauth_configured': current_app.config.get('google_oauth_configured', False),
@@ -824,6 +807,10 @@ def get_system_metrics():
                 'application': app_metrics,
                 'activity_24h': activity_metrics,
                 'configuration': config_metrics,
+                'requests': request_metrics.summary(limit=20),
+                'db_pool': pool_metrics.snapshot(),
+                'boot': boot_metrics.to_dict() if boot_metrics else None,
+                'logging': logging_pipeline_stats(),
                 'timestamp': datetime.utcnow().isoformat()
             }
         })
@@ -835,6 +822,167 @@ def get_system_metrics():
             'message': 'Error obteniendo métricas'
         }), 500
 
+@admin_bp.route('/metrics/requests', methods=['GET'])
+@auth_required()
+@admin_required()
+def get_request_metrics():
+    """Latencia, SQL, tamaño y estados por endpoint de este worker"""
+    try:
+        sort_by = request.args.get('sort', 'total_ms')
+        limit = request.args.get('limit', type=int)
+        
+        return jsonify({
+            'success': True,
+            'metrics': request_metrics.summary(sort_by=sort_by, limit=limit)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas por endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Error obteniendo métricas por endpoint'
+        }), 500
+
+@admin_bp.route('/metrics/requests/reset', methods=['POST'])
+@auth_required()
+@admin_required()
+def reset_request_metrics():
+    """Reinicia los agregados por endpoint y del pool de este worker"""
+    request_metrics.reset()
+    pool_metrics.reset()
+    logger.info(f"Métricas por endpoint reiniciadas por {current_user.email}")
+    return jsonify({
+        'success': True,
+        'message': 'Métricas reiniciadas'
+    })
+
+@admin_bp.route('/metrics/pool', methods=['GET'])
+@auth_required()
+@admin_required()
+def get_pool_metrics():
+    """Conexiones del pool en uso, máximo y tiempo saturado de este worker"""
+    return jsonify({
+        'success': True,
+        'pool': pool_metrics.snapshot()
+    })
+
+@admin_bp.route('/metrics/prometheus', methods=['GET'])
+def get_prometheus_metrics():
+    """
+    Métricas por endpoint en formato de texto de Prometheus.
+    
+    Acceso con sesión de admin o, para el scraper, con
+    ``Authorization: Bearer <METRICS_SCRAPE_TOKEN>``.
+    """
+    from flask import current_app, Response
+    
+    token = current_app.config.get('METRICS_SCRAPE_TOKEN')
+    authorized_by_token = bool(token) and hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    )
+    if not authorized_by_token and not (current_user.is_authenticated and current_user.is_admin()):
+        return jsonify({
+            'success': False,
+            'message': 'No autorizado'
+        }), 401
+    
+    boot_metrics = current_app.extensions.get('boot_metrics')
+    text = request_metrics.prometheus() + pool_metrics.prometheus()
+    if boot_metrics:
+        text += boot_metrics.prometheus()
+    return Response(text, mimetype='text/plain; version=0.0.4')
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@auth_required()
+@admin_required()
+def get_slow_queries():
+    """Top de consultas lentas por huella de este worker"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 200)
+        sort_by = request.args.get('sort', 'total_ms')
+        
+        return jsonify({
+            'success': True,
+            'threshold_ms': slow_query_log.threshold_ms,
+            'queries': slow_query_log.top(limit=limit, sort_by=sort_by)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo consultas lentas: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Error obteniendo consultas lentas'
+        }), 500
+
+@admin_bp.route('/slow-queries/<fingerprint>', methods=['GET'])
+@auth_required()
+@admin_required()
+def get_slow_query(fingerprint):
+    """Detalle de una consulta lenta con su último plan de ejecución"""
+    query = slow_query_log.get(fingerprint)
+    if not query:
+        return jsonify({
+            'success': False,
+            'message': 'Consulta no encontrada'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'query': query
+    })
+
+@admin_bp.route('/slow-queries/reset', methods=['POST'])
+@auth_required()
+@admin_required()
+def reset_slow_queries():
+    """Vacía el registro de consultas lentas de este worker"""
+    slow_query_log.reset()
+    logger.info(f"Registro de consultas lentas reiniciado por {current_user.email}")
+    return jsonify({
+        'success': True,
+        'message': 'Registro de consultas lentas reiniciado'
+    })
+
+@admin_bp.route('/profiles', methods=['GET'])
+@auth_required()
+@admin_required()
+def list_request_profiles():
+    """Perfiles de peticiones guardados en este worker (X-Profile / ?_profile=1)"""
+    return jsonify({
+        'success': True,
+        'profiles': request_profiler.list()
+    })
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@auth_required()
+@admin_required()
+def get_request_profile(profile_id):
+    """
+    Perfil completo: pilas muestreadas y línea temporal SQL.
+    
+    Con ``?format=folded`` devuelve las pilas en texto para flamegraph.pl o speedscope.
+    """
+    from flask import Response
+    
+    profile = request_profiler.get(profile_id)
+    if not profile:
+        return jsonify({
+            'success': False,
+            'message': 'Perfil no encontrado'
+        }), 404
+    
+    if request.args.get('format') == 'folded':
+        return Response(
+            profile['folded'] + '\n',
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.folded'}
+        )
+    
+    return jsonify({
+        'success': True,
+        'profile': profile
+    })
+
 @admin_bp.route('/test-smtp', methods=['POST'])
 @auth_required()
 @admin_required()
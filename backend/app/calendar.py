@@ -8,6 +8,7 @@ from models.employee import Employee
 from models.team import Team
 from models.user import db
 from services.calendar_service import CalendarService
+from services.query_budget import query_budget
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,7 @@ calendar_bp = Blueprint('calendar', __name__)
 
 @calendar_bp.route('/', methods=['GET'])
 @auth_required()
+@query_budget(18)
 def get_calendar():
     """Obtiene datos del calendario"""
     try:
@@ -94,7 +96,8 @@ def get_calendar():
             calendar_data = CalendarService.get_annual_calendar_data(
                 employee_id=employee_id,
                 team_id=team_id,
-                year=year
+                year=year,
+                compact=request.args.get('format') == 'compact'
             )
         else:
             # Vista mensual
@@ -120,6 +123,7 @@ def get_calendar():
 
 @calendar_bp.route('/annual', methods=['GET'])
 @auth_required()
+@query_budget(18)
 def get_annual_calendar():
     """Endpoint optimizado específico para vista anual del calendario"""
     try:
@@ -186,10 +190,12 @@ def get_annual_calendar():
                 }), 400
         
         # Usar método optimizado para vista anual
+        # ?format=compact: días y actividades en filas, empleados una sola vez
         calendar_data = CalendarService.get_annual_calendar_data(
             employee_id=employee_id,
             team_id=team_id,
-            year=year
+            year=year,
+            compact=request.args.get('format') == 'compact'
         )
         
         if 'error' in calendar_data:
@@ -2,324 +2,129 @@
 Dashboard Blueprint
 Endpoint centralizado para estadísticas del dashboard según rol de usuario
 """
-from flask import Blueprint, jsonify
+import logging
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_security import auth_required, current_user
-from sqlalchemy import func
-from models.base import db
-from models.user import User
-from models.employee import Employee
-from models.team import Team
-from models.notification import Notification
+
+from services.dashboard_service import WIDGETS, DashboardPrincipal, build_dashboard, stats_for
+from services.query_budget import query_budget
+
+logger = logging.getLogger(__name__)
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
+# Años admitidos en ?year= (fuera de rango, date() falla o el cálculo no tiene sentido)
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+
+def _requested_period():
+    """(año, mes, respuesta 400 o None) de los query params year y month"""
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        return year, month, (jsonify({
+            'success': False,
+            'message': f'Año debe estar entre {MIN_YEAR} y {MAX_YEAR}'
+        }), 400)
+    if not 1 <= month <= 12:
+        return year, month, (jsonify({
+            'success': False,
+            'message': 'Mes no válido'
+        }), 400)
+    return year, month, None
+
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @auth_required()
+@query_budget(10)
 def get_dashboard_stats():
     """
     Obtiene estadísticas del dashboard según el rol del usuario
-    
+
+    Query params:
+        year, month: Período de horas y eficiencia (por defecto el actual)
+
     Returns:
         - Admin: Estadísticas globales del sistema
-        - Manager: Estadísticas de su equipo
+        - Manager: Estadísticas de sus equipos
         - Employee: Estadísticas personales
     """
     try:
-        user = current_user
-        
-        # Verificar roles del usuario
-        user_roles = [role.name for role in user.roles]
-        is_admin = 'admin' in user_roles
-        is_manager = 'manager' in user_roles
-        
-        # Obtener el empleado asociado al usuario
-        employee = Employee.query.filter_by(user_id=user.id).first()
-        
-        # ADMIN: Estadísticas globales
-        if is_admin:
-            return jsonify(_get_admin_stats()), 200
-        
-        # MANAGER: Estadísticas del equipo
-        if is_manager and employee and employee.team_id:
-            return jsonify(_get_manager_stats(employee.team_id)), 200
-        
-        # EMPLOYEE: Estadísticas personales
-        if employee:
-            return jsonify(_get_employee_stats(employee.id)), 200
-        
-        # Usuario sin empleado (probablemente admin nuevo)
-        return jsonify({
-            'type': 'viewer',
-            'statistics': {
-                'message': 'Complete su perfil de empleado para ver estadísticas'
-            },
-            'recent_activity': [],
-            'alerts': []
-        }), 200
-        
+        year, month, error = _requested_period()
+        if error:
+            return error
+
+        return jsonify(stats_for(
+            DashboardPrincipal.resolve(current_user), year, month,
+            cache_ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 60)
+        )), 200
+
     except Exception as e:
-        print(f"Error obteniendo estadísticas del dashboard: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error obteniendo estadísticas del dashboard: {e}", exc_info=True)
         return jsonify({
-            'error': 'Error interno del servidor',
-            'message': str(e)
+            'error': 'Error interno del servidor'
         }), 500
 
 
-def _get_admin_stats():
-    """Estadísticas para administradores"""
-    try:
-        # Total de empleados
-        total_employees = Employee.query.count()
-        
-        # Total de equipos
-        total_teams = Team.query.count()
-        
-        # Aprobaciones pendientes (approved es boolean: False = pendiente, True = aprobado)
-        pending_approvals = Employee.query.filter(
-            Employee.active == True,
-            Employee.approved == False
-        ).count()
-        
-        # Eficiencia global (promedio de empleados aprobados con horas registradas)
-        # approved es boolean: True = aprobado
-        approved_employees = Employee.query.filter(
-            Employee.active == True,
-            Employee.approved == True
-        ).all()
-        
-        if approved_employees:
-            # Calcular eficiencia basada en horas teóricas vs reales
-            # Por ahora, si no hay datos de horas, retornar 0
-            global_efficiency = 0
-        else:
-            global_efficiency = 0
-        
-        # Actividad reciente (últimas notificaciones del sistema)
-        recent_notifications = Notification.query\
-            .order_by(Notification.created_at.desc())\
-            .limit(5)\
-            .all()
-        
-        recent_activity = [{
-            'type': notif.notification_type.value if notif.notification_type else 'unknown',
-            'message': notif.message,
-            'timestamp': notif.created_at.isoformat() if notif.created_at else None
-        } for notif in recent_notifications]
-        
-        # Rendimiento por equipos
-        teams = Team.query.all()
-        team_performance = []
-        
-        for team in teams:
-            team_employees = Employee.query.filter(
-                Employee.team_id == team.id,
-                Employee.active == True,
-                Employee.approved == True
-            ).count()
-            
-            team_performance.append({
-                'team_id': team.id,
-                'team_name': team.name,
-                'members_count': team_employees,
-                'efficiency': 0  # TODO: Calcular cuando tengamos datos de horas
-            })
-        
-        # Alertas
-        alerts = []
-        if pending_approvals > 0:
-            alerts.append({
-                'type': 'warning',
-                'message': f'Hay {pending_approvals} empleado(s) pendiente(s) de aprobación',
-                'action': 'review_employees'
-            })
-        
-        if total_teams == 0:
-            alerts.append({
-                'type': 'info',
-                'message': 'No hay equipos creados. Crea el primer equipo.',
-                'action': 'create_team'
-            })
-        
-        return {
-            'type': 'admin',
-            'statistics': {
-                'total_employees': total_employees,
-                'total_teams': total_teams,
-                'pending_approvals': pending_approvals,
-                'global_efficiency': global_efficiency
-            },
-            'recent_activity': recent_activity,
-            'team_performance': team_performance,
-            'alerts': alerts
-        }
-        
-    except Exception as e:
-        print(f"Error en _get_admin_stats: {e}")
-        raise
+@dashboard_bp.route('/overview', methods=['GET'])
+@auth_required()
+@query_budget(16)
+def get_dashboard_overview():
+    """
+    Todos los widgets del dashboard en una petición
 
+    Query params:
+        widgets: Lista separada por comas (por defecto todos: stats,
+                 team_performance, notifications, upcoming)
+        year, month: Período del rendimiento por equipo (por defecto el actual)
+        days_ahead: Días de próximas actividades (por defecto 10)
 
-def _get_manager_stats(team_id):
-    """Estadísticas para managers"""
+    Cada widget lleva su tiempo, sus consultas SQL y si vino de caché en
+    ``timings`` (también en la cabecera ``Server-Timing``); un widget que
+    falla queda a null con un mensaje genérico en ``errors`` (el detalle va
+    al log) sin tumbar el resto.
+    """
     try:
-        # Miembros del equipo (approved es boolean: True = aprobado)
-        team_members = Employee.query.filter(
-            Employee.team_id == team_id,
-            Employee.active == True,
-            Employee.approved == True
-        ).count()
-        
-        # Aprobaciones pendientes en el equipo (approved es boolean)
-        pending_approvals = Employee.query.filter(
-            Employee.team_id == team_id,
-            Employee.active == True,
-            Employee.approved == False
-        ).count()
-        
-        # Eficiencia del equipo
-        team_efficiency = 0  # TODO: Calcular cuando tengamos datos
-        
-        # Proyectos (placeholder)
-        projects = 0
-        
-        # Actividad reciente del equipo
-        team_employees = Employee.query.filter_by(team_id=team_id).all()
-        employee_ids = [emp.id for emp in team_employees]
-        
-        recent_notifications = Notification.query\
-            .filter(Notification.user_id.in_([emp.user_id for emp in team_employees]))\
-            .order_by(Notification.created_at.desc())\
-            .limit(5)\
-            .all()
-        
-        recent_activity = [{
-            'type': notif.notification_type.value if notif.notification_type else 'unknown',
-            'message': notif.message,
-            'timestamp': notif.created_at.isoformat() if notif.created_at else None
-        } for notif in recent_notifications]
-        
-        # Alertas
-        alerts = []
-        if pending_approvals > 0:
-            alerts.append({
-                'type': 'warning',
-                'message': f'Hay {pending_approvals} empleado(s) de tu equipo pendiente(s) de aprobación',
-                'action': 'review_team_employees'
-            })
-        
-        return {
-            'type': 'manager',
-            'statistics': {
-                'managed_teams': 1,  # Por ahora, un manager gestiona un equipo
-                'team_members': team_members,
-                'total_employees': team_members,
-                'pending_approvals': pending_approvals,
-                'team_efficiency': team_efficiency,
-                'average_efficiency': team_efficiency,  # Alias para compatibilidad
-                'projects': projects
-            },
-            'team_stats': {
-                'members': team_members,
-                'efficiency': team_efficiency
-            },
-            'recent_activity': recent_activity,
-            'alerts': alerts,
-            'pending_requests': []  # Asegurar que siempre existe como array
-        }
-        
-    except Exception as e:
-        print(f"Error en _get_manager_stats: {e}")
-        raise
+        requested = request.args.get('widgets')
+        widgets = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(WIDGETS)
+        unknown = [name for name in widgets if name not in WIDGETS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'message': f"Widgets desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(WIDGETS)}"
+            }), 400
 
+        year, month, error = _requested_period()
+        if error:
+            return error
 
-def _get_employee_stats(employee_id):
-    """Estadísticas para empleados"""
-    try:
-        employee = Employee.query.get(employee_id)
-        
-        if not employee:
-            raise ValueError(f"Empleado {employee_id} no encontrado")
-        
-        # Horas del mes (placeholder - TODO: implementar cuando tengamos registro de horas)
-        hours_this_month = 0
-        
-        # Eficiencia
-        efficiency = 0
-        
-        # Días de vacaciones restantes
-        vacation_days_left = employee.vacation_days or 22
-        
-        # Horas de libre disposición restantes
-        hld_hours_left = employee.hld_hours or 40
-        
-        # Resumen mensual
-        monthly_summary = {
-            'theoretical_hours': 160,  # Aproximado
-            'actual_hours': 0,
-            'efficiency': 0,
-            'days_worked': 0
-        }
-        
-        # Actividad reciente
-        recent_notifications = Notification.query\
-            .filter_by(user_id=employee.user_id)\
-            .order_by(Notification.created_at.desc())\
-            .limit(5)\
-            .all()
-        
-        recent_activity = [{
-            'type': notif.notification_type.value if notif.notification_type else 'unknown',
-            'message': notif.message,
-            'timestamp': notif.created_at.isoformat() if notif.created_at else None
-        } for notif in recent_notifications]
-        
-        # Alertas (approved es boolean: False = pendiente, True = aprobado)
-        alerts = []
-        if not employee.approved:
-            alerts.append({
-                'type': 'info',
-                'message': 'Tu perfil está pendiente de aprobación',
-                'action': 'wait_approval'
-            })
-        if not employee.active:
-            alerts.append({
-                'type': 'warning',
-                'message': 'Tu perfil está inactivo. Contacta con tu manager.',
-                'action': 'contact_manager'
-            })
-        
-        return {
-            'type': 'employee',
-            'statistics': {
-                'hours_this_month': hours_this_month,
-                'efficiency': efficiency,
-                'vacation_days_left': vacation_days_left,
-                'hld_hours_left': hld_hours_left
-            },
-            'monthly_summary': monthly_summary or {
-                'theoretical_hours': 0,
-                'actual_hours': 0,
-                'efficiency': 0,
-                'days_worked': 0,
-                'vacation_days': 0,
-                'hld_hours': 0
-            },
-            'annual_summary': {
-                'total_theoretical_hours': 0,
-                'total_actual_hours': 0,
-                'total_efficiency': 0,
-                'total_vacation_days': 0,
-                'remaining_vacation_days': vacation_days_left,
-                'total_hld_hours': 0,
-                'remaining_hld_hours': hld_hours_left
+        principal = DashboardPrincipal.resolve(current_user)
+        dashboard = build_dashboard(
+            principal, widgets, year=year, month=month,
+            cache_ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 60),
+            days_ahead=request.args.get('days_ahead', 10, type=int)
+        )
+
+        response = jsonify({
+            'success': True,
+            'user_role': principal.role,
+            'period': {
+                'year': year,
+                'month': month
             },
-            'recent_activity': recent_activity,
-            'alerts': alerts
-        }
-        
-    except Exception as e:
-        print(f"Error en _get_employee_stats: {e}")
-        raise
+            **dashboard
+        })
+        response.headers['Server-Timing'] = ', '.join(
+            f"{name};dur={timing['ms']}" for name, timing in dashboard['timings'].items()
+        )
+        return response
 
+    except Exception as e:
+        logger.error(f"Error generando el dashboard: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': 'Error generando el dashboard'
+        }), 500
@@ -5,9 +5,11 @@ import logging
 import secrets
 
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 
 from models.user import User, Role, db
-from models.employee import Employee
+from models.employee import Employee, EMPLOYEE_FIELDS
+from models.fieldsets import InvalidFields
 from models.employee_invitation import EmployeeInvitation
 from models.team import Team
 from models.team_membership import TeamMembership
@@ -15,7 +17,9 @@ from models.notification import Notification
 from services.notification_service import NotificationService
 from services.holiday_service import HolidayService
 from services.email_service import send_invitation_email
+from services.query_budget import query_budget
 from utils.decorators import admin_required, manager_or_admin_required
+from utils.pagination import InvalidCursor, paginate_by_cursor, requested_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -428,6 +432,7 @@ def update_my_employee_profile():
 
 @employees_bp.route('/', methods=['GET'])
 @auth_required()
+@query_budget(16)
 def list_employees():
     """Lista empleados (con filtros según permisos)"""
     try:
@@ -438,6 +443,8 @@ def list_employees():
         # Otros roles solo ven aprobados por defecto
         default_approved_only = 'false' if current_user.is_admin() else 'true'
         approved_only = request.args.get('approved_only', default_approved_only).lower() == 'true'
+        # Proyección opcional (?fields=id,full_name,team_name) para selectores
+        fields = EMPLOYEE_FIELDS.parse(request.args.get('fields'))
         
         # Construir query base
         query = Employee.query.filter(Employee.active == True)
@@ -479,13 +486,40 @@ def list_employees():
         if approved_only:
             query = query.filter(Employee.approved == True)
         
-        # Paginación
-        pagination = query.distinct().paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        if fields is not None:
+            # Solo las columnas y relaciones de los campos pedidos
+            query = query.options(*EMPLOYEE_FIELDS.options(fields))
+        else:
+            # Equipo, usuario y roles de toda la página en consultas agrupadas (sin N+1)
+            query = query.options(
+                selectinload(Employee.team),
+                selectinload(Employee.user).selectinload(User.roles)
+            )
+        
+        # Paginación: por cursor (orden por nombre) o clásica con OFFSET y COUNT
+        cursor = requested_cursor()
+        if cursor is not None:
+            pagination, pagination_info = paginate_by_cursor(
+                query.distinct(), [(Employee.full_name, False), (Employee.id, False)], cursor, per_page
+            )
+        else:
+            pagination = query.distinct().paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination_info = {
+                'page': page,
+                'per_page': per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev
+            }
         
         employees_data = []
         for employee in pagination.items:
+            if fields is not None:
+                employees_data.append(employee.to_dict(fields=fields))
+                continue
             emp_data = employee.to_dict()
             # Añadir información del equipo
             if employee.team:
@@ -499,15 +533,13 @@ def list_employees():
         return jsonify({
             'success': True,
             'employees': employees_data,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination_info
         })
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error listando empleados: {e}", exc_info=True)
         return jsonify({
@@ -705,6 +737,7 @@ def remove_employee_membership(employee_id, membership_id):
 
 @employees_bp.route('/<int:employee_id>', methods=['GET'])
 @auth_required()
+@query_budget(23)
 def get_employee(employee_id):
     """Obtiene un empleado específico"""
     try:
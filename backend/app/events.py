@@ -0,0 +1,102 @@
+from flask import Blueprint, Response, current_app, jsonify
+from flask_security import auth_required, current_user
+import logging
+
+from models.user import db
+from models.team_membership import TeamMembership
+from services.event_broker import (
+    get_broker, stream_events, user_channel, team_channel, CALENDAR_ALL_CHANNEL
+)
+
+logger = logging.getLogger(__name__)
+
+events_bp = Blueprint('events', __name__)
+
+
+def _channels_for_current_user():
+    """Canales a los que se suscribe el usuario actual (resuelto una sola vez por conexión)"""
+    channels = {user_channel(current_user.id)}
+
+    if current_user.is_admin():
+        channels.add(CALENDAR_ALL_CHANNEL)
+
+    employee = current_user.employee
+    if employee:
+        if employee.team_id:
+            channels.add(team_channel(employee.team_id))
+        team_ids = db.session.query(TeamMembership.team_id).filter(
+            TeamMembership.employee_id == employee.id,
+            TeamMembership.active == True
+        ).all()
+        channels.update(team_channel(team_id) for (team_id,) in team_ids)
+
+    return channels
+
+
+@events_bp.route('/stream', methods=['GET'])
+@auth_required()
+def stream():
+    """
+    Stream Server-Sent Events con notificaciones y cambios de calendario del usuario.
+
+    El generador no usa la base de datos: la sesión se libera antes de emitir,
+    así que un cliente conectado no retiene conexiones del pool. Los streams
+    se sirven desde el proceso ``events`` (workers gevent); en el proceso web
+    cada stream ocupa un hilo, por eso se limitan con EVENTS_MAX_STREAMS y,
+    por encima del límite, se responde 503 y el cliente pasa a polling.
+    """
+    broker = get_broker()
+    if broker.subscriber_count() >= current_app.config.get('EVENTS_MAX_STREAMS', 2):
+        db.session.remove()
+        response = jsonify({
+            'success': False,
+            'message': 'Canal de eventos completo, usa polling'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config.get('EVENTS_STREAM_MAX_SECONDS', 300))
+        return response
+
+    try:
+        channels = _channels_for_current_user()
+    except Exception as e:
+        logger.error(f"Error resolviendo canales de eventos: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Error iniciando canal de eventos'
+        }), 500
+    finally:
+        db.session.remove()
+
+    subscription = broker.subscribe(channels)
+
+    response = Response(
+        stream_events(
+            subscription,
+            broker,
+            heartbeat=current_app.config.get('EVENTS_STREAM_HEARTBEAT', 20),
+            max_duration=current_app.config.get('EVENTS_STREAM_MAX_SECONDS', 300)
+        ),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Evitar buffering en proxies (nginx/Render)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@events_bp.route('/status', methods=['GET'])
+@auth_required()
+def status():
+    """Estado del broker de eventos (solo admins)"""
+    if not current_user.is_admin():
+        return jsonify({
+            'success': False,
+            'message': 'Solo los administradores pueden consultar el broker de eventos'
+        }), 403
+
+    broker = get_broker()
+    return jsonify({
+        'success': True,
+        'broker': broker.name,
+        'local_subscribers': broker.subscriber_count()
+    })
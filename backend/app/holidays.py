@@ -3,10 +3,12 @@ from flask_security import auth_required, current_user
 from datetime import datetime, date
 import logging
 
-from models.holiday import Holiday
+from models.holiday import Holiday, HOLIDAY_FIELDS
+from models.fieldsets import InvalidFields
 from models.employee import Employee
 from models.user import db
 from services.holiday_service import HolidayService
+from utils.pagination import InvalidCursor, paginate_by_cursor, requested_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +24,13 @@ def list_holidays():
         country = request.args.get('country')
         region = request.args.get('region')
         year = request.args.get('year', type=int)
+        # Proyección opcional (?fields=id,name,date)
+        fields = HOLIDAY_FIELDS.parse(request.args.get('fields'))
         
         # Construir query
         query = Holiday.query.filter(Holiday.active == True)
+        if fields is not None:
+            query = query.options(*HOLIDAY_FIELDS.options(fields))
         
         # Filtros
         if country:
@@ -41,24 +47,31 @@ def list_holidays():
         # Ordenar por fecha
         query = query.order_by(Holiday.date.desc())
         
-        # Paginación
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        holidays_data = [holiday.to_dict() for holiday in pagination.items]
-        
-        return jsonify({
-            'success': True,
-            'holidays': holidays_data,
-            'pagination': {
+        # Paginación: por cursor (fecha, id) o clásica con OFFSET y COUNT
+        cursor = requested_cursor()
+        if cursor is not None:
+            pagination, pagination_info = paginate_by_cursor(
+                query, [(Holiday.date, True), (Holiday.id, True)], cursor, per_page
+            )
+        else:
+            pagination = query.paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination_info = {
                 'page': page,
                 'per_page': per_page,
                 'total': pagination.total,
                 'pages': pagination.pages,
                 'has_next': pagination.has_next,
                 'has_prev': pagination.has_prev
-            },
+            }
+        
+        holidays_data = [holiday.to_dict(fields=fields) for holiday in pagination.items]
+        
+        return jsonify({
+            'success': True,
+            'holidays': holidays_data,
+            'pagination': pagination_info,
             'filters': {
                 'country': country,
                 'region': region,
@@ -66,6 +79,11 @@ def list_holidays():
             }
         })
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error listando festivos: {e}")
         return jsonify({
@@ -462,6 +480,110 @@ def check_holiday_date():
             'message': 'Error verificando fecha'
         }), 500
 
+@holidays_bp.route('/check-dates', methods=['POST'])
+@auth_required()
+def check_holiday_dates():
+    """
+    Verifica festivos de muchos días en una llamada.
+
+    Cuerpo: ``items`` con pares (``employee_id`` o ``country``/``region``/``city``,
+    ``start_date``, ``end_date``). Atajo para una vista de equipo-mes:
+    ``employee_ids`` + ``start_date`` + ``end_date``. Sin empleado ni
+    ubicación se usa el empleado actual.
+    """
+    try:
+        data = request.get_json() or {}
+        raw_items = list(data.get('items') or [])
+        for employee_id in data.get('employee_ids') or []:
+            raw_items.append({
+                'employee_id': employee_id,
+                'start_date': data.get('start_date'),
+                'end_date': data.get('end_date')
+            })
+
+        if not raw_items:
+            return jsonify({
+                'success': False,
+                'message': 'Se requiere al menos un elemento (items o employee_ids)'
+            }), 400
+
+        # Empleados del lote en una sola consulta
+        employee_ids = {item['employee_id'] for item in raw_items if item.get('employee_id')}
+        employees = {
+            employee.id: employee
+            for employee in Employee.query.filter(Employee.id.in_(employee_ids)).all()
+        } if employee_ids else {}
+
+        managed_team_ids = None
+        if not current_user.is_admin() and current_user.is_manager():
+            managed_team_ids = {team.id for team in current_user.get_managed_teams()}
+        own_employee = current_user.employee
+
+        items = []
+        for raw in raw_items:
+            if not raw.get('start_date') or not raw.get('end_date'):
+                return jsonify({
+                    'success': False,
+                    'message': 'start_date y end_date son requeridos en cada elemento'
+                }), 400
+
+            item = {
+                'start_date': datetime.strptime(raw['start_date'], '%Y-%m-%d').date(),
+                'end_date': datetime.strptime(raw['end_date'], '%Y-%m-%d').date()
+            }
+
+            if raw.get('employee_id'):
+                employee = employees.get(raw['employee_id'])
+                if not employee:
+                    return jsonify({
+                        'success': False,
+                        'message': f"Empleado {raw['employee_id']} no encontrado"
+                    }), 404
+                allowed = (
+                    current_user.is_admin()
+                    or (own_employee is not None and own_employee.id == employee.id)
+                    or (managed_team_ids is not None and employee.team_id in managed_team_ids)
+                )
+                if not allowed:
+                    return jsonify({
+                        'success': False,
+                        'message': f"No autorizado para consultar el empleado {employee.id}"
+                    }), 403
+                item['employee'] = employee
+            elif raw.get('country'):
+                item['location'] = {
+                    'country': raw['country'],
+                    'region': raw.get('region'),
+                    'city': raw.get('city')
+                }
+            elif own_employee:
+                item['employee'] = own_employee
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': 'Empleado no encontrado'
+                }), 404
+            items.append(item)
+
+        results = HolidayService().check_holidays_batch(items)
+
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Petición inválida: {e}'
+        }), 400
+    except Exception as e:
+        logger.error(f"Error verificando fechas festivas por lotes: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Error verificando fechas'
+        }), 500
+
 @holidays_bp.route('/load-local', methods=['POST'])
 @auth_required()
 def load_local_holidays():
@@ -549,12 +671,21 @@ def refresh_all_holidays():
         
         data = request.get_json() or {}
         year = data.get('year', datetime.now().year)
-        clean_before_load = data.get('clean_before_load', True)  # Por defecto, limpiar antes de cargar
+        # 'diff' (por defecto) aplica solo cambios; 'reload' borra y recarga el año
+        mode = data.get('mode', 'diff')
+        if mode not in ('diff', 'reload'):
+            return jsonify({
+                'success': False,
+                'message': "Modo de recarga no válido (diff o reload)"
+            }), 400
+        clean_before_load = data.get('clean_before_load', True)  # Solo en modo reload
         
         from services.unified_holiday_service import UnifiedHolidayService
         unified_service = UnifiedHolidayService()
         
-        results = unified_service.refresh_all_holidays_for_year(year, clean_before_load=clean_before_load)
+        results = unified_service.refresh_all_holidays_for_year(
+            year, clean_before_load=clean_before_load, mode=mode
+        )
         
         # Obtener estadísticas después de la carga
         stats = unified_service.get_holiday_statistics(year)
@@ -578,16 +709,41 @@ def refresh_all_holidays():
 @holidays_bp.route('/statistics', methods=['GET'])
 @auth_required()
 def get_holiday_statistics():
-    """Obtiene estadísticas de festivos para un año"""
+    """
+    Obtiene estadísticas de festivos para un año.
+    Con ?years=2024,2025 devuelve además la comparativa entre años.
+    """
     try:
+        from services.holiday_statistics import HolidayStatistics
+        
+        years_param = request.args.get('years')
+        if years_param:
+            try:
+                years = sorted({int(value) for value in years_param.split(',') if value.strip()})
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Parámetro years no válido'
+                }), 400
+            if not years or len(years) > 10:
+                return jsonify({
+                    'success': False,
+                    'message': 'Indica entre 1 y 10 años'
+                }), 400
+            
+            comparison = HolidayStatistics.compare(years)
+            return jsonify({
+                'success': True,
+                'statistics': comparison['years'][str(years[-1])],
+                'years': comparison['years'],
+                'comparison': comparison['comparison']
+            })
+        
         year = request.args.get('year', type=int)
         if not year:
             year = datetime.now().year
         
-        from services.unified_holiday_service import UnifiedHolidayService
-        unified_service = UnifiedHolidayService()
-        
-        stats = unified_service.get_holiday_statistics(year)
+        stats = HolidayStatistics.for_year(year)
         
         return jsonify({
             'success': True,
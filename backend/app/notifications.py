@@ -6,6 +6,9 @@ import logging
 from models.notification import Notification
 from models.user import db
 from services.notification_service import NotificationService
+from services.event_broker import publish_event, user_channel
+from services.query_budget import query_budget
+from utils.pagination import InvalidCursor, paginate_by_cursor, requested_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,7 @@ notifications_bp = Blueprint('notifications', __name__)
 
 @notifications_bp.route('/', methods=['GET'])
 @auth_required()
+@query_budget(6)  # Como /summary: con unread_only lee el contador del usuario (o lo calcula si no tiene fila)
 def list_notifications():
     """Lista notificaciones del usuario actual"""
     try:
@@ -28,31 +32,50 @@ def list_notifications():
         
         # Ordenar por prioridad y fecha
         query = query.order_by(
-            Notification.priority.desc(),
+            Notification.priority_rank().desc(),
             Notification.created_at.desc()
         )
         
-        # Paginación
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        notifications_data = [notif.to_dict() for notif in pagination.items]
-        
-        return jsonify({
-            'success': True,
-            'notifications': notifications_data,
-            'pagination': {
+        # Paginación: por cursor (prioridad, fecha, id) o clásica con OFFSET y COUNT
+        cursor = requested_cursor()
+        if cursor is not None:
+            # Las no leídas ya están contadas en NotificationCounter (total exacto sin COUNT)
+            total = None
+            if unread_only:
+                counter = NotificationService.get_unread_counters(current_user.id)
+                total = counter.unread_total if counter else None
+            pagination, pagination_info = paginate_by_cursor(
+                query,
+                [(Notification.priority_rank(), True), (Notification.created_at, True), (Notification.id, True)],
+                cursor, per_page, total=total
+            )
+        else:
+            pagination = query.paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination_info = {
                 'page': page,
                 'per_page': per_page,
                 'total': pagination.total,
                 'pages': pagination.pages,
                 'has_next': pagination.has_next,
                 'has_prev': pagination.has_prev
-            },
+            }
+        
+        notifications_data = [notif.to_dict() for notif in pagination.items]
+        
+        return jsonify({
+            'success': True,
+            'notifications': notifications_data,
+            'pagination': pagination_info,
             'unread_only': unread_only
         })
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error listando notificaciones: {e}")
         return jsonify({
@@ -62,6 +85,7 @@ def list_notifications():
 
 @notifications_bp.route('/summary', methods=['GET'])
 @auth_required()
+@query_budget(6)
 def get_notifications_summary():
     """Obtiene resumen de notificaciones del usuario actual"""
     try:
@@ -79,6 +103,33 @@ def get_notifications_summary():
             'message': 'Error obteniendo resumen'
         }), 500
 
+@notifications_bp.route('/badge', methods=['GET'])
+@auth_required()
+@query_budget(2)
+def get_notifications_badge():
+    """Contadores de no leídas por prioridad (lectura de una fila)"""
+    try:
+        counter = NotificationService.get_unread_counters(current_user.id)
+        
+        return jsonify({
+            'success': True,
+            'badge': counter.to_dict() if counter else {
+                'user_id': current_user.id,
+                'unread_count': 0,
+                'priority_counts': {'urgent': 0, 'high': 0, 'medium': 0, 'low': 0},
+                'has_urgent': False,
+                'has_high': False,
+                'updated_at': None
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo contadores de notificaciones: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Error obteniendo contadores'
+        }), 500
+
 @notifications_bp.route('/mark-read', methods=['POST'])
 @auth_required()
 def mark_notifications_read():
@@ -123,26 +174,16 @@ def mark_notifications_read():
 def mark_all_notifications_read():
     """Marca todas las notificaciones no leídas como leídas"""
     try:
-        # Obtener todas las notificaciones no leídas del usuario
-        unread_notifications = Notification.query.filter(
-            Notification.user_id == current_user.id,
-            Notification.read == False
-        ).all()
-        
-        notification_ids = [notif.id for notif in unread_notifications]
+        # Un único UPDATE sobre las no leídas del usuario (sin cargar filas)
+        updated_count = NotificationService.mark_all_notifications_as_read(current_user.id)
         
-        if not notification_ids:
+        if not updated_count:
             return jsonify({
                 'success': True,
                 'message': 'No hay notificaciones sin leer',
                 'updated_count': 0
             })
         
-        # Marcar como leídas
-        updated_count = NotificationService.mark_notifications_as_read(
-            notification_ids, current_user.id
-        )
-        
         return jsonify({
             'success': True,
             'message': f'Todas las notificaciones marcadas como leídas ({updated_count})',
@@ -176,6 +217,10 @@ def get_notification(notification_id):
         if not notification.read:
             notification.read = True
             notification.read_at = datetime.utcnow()
+            publish_event(db.session, user_channel(current_user.id), 'notifications_read', {
+                'notification_ids': [notification.id],
+                'updated_count': 1
+            })
             db.session.commit()
         
         return jsonify({
@@ -214,6 +259,10 @@ def mark_single_notification_read(notification_id):
         
         notification.read = True
         notification.read_at = datetime.utcnow()
+        publish_event(db.session, user_channel(current_user.id), 'notifications_read', {
+            'notification_ids': [notification.id],
+            'updated_count': 1
+        })
         db.session.commit()
         
         return jsonify({
@@ -312,61 +361,42 @@ def broadcast_notification():
         
         target_type = data['target_type']  # 'all', 'employees', 'managers', 'team'
         
-        # Determinar usuarios objetivo
-        from models.user import User
-        target_users = []
-        
-        if target_type == 'all':
-            target_users = User.query.filter(User.active == True).all()
-        elif target_type == 'employees':
-            employee_role = Role.query.filter_by(name='employee').first()
-            if employee_role:
-                target_users = [user for user in User.query.filter(User.active == True).all() 
-                              if employee_role in user.roles]
-        elif target_type == 'managers':
-            manager_role = Role.query.filter_by(name='manager').first()
-            if manager_role:
-                target_users = [user for user in User.query.filter(User.active == True).all() 
-                              if manager_role in user.roles]
-        elif target_type == 'team':
-            team_id = data.get('team_id')
-            if not team_id:
-                return jsonify({
-                    'success': False,
-                    'message': 'team_id es requerido para target_type=team'
-                }), 400
-            
-            from models.employee import Employee
-            employees = Employee.query.filter(
-                Employee.team_id == team_id,
-                Employee.active == True
-            ).all()
-            target_users = [emp.user for emp in employees if emp.user and emp.user.active]
-        
-        if not target_users:
+        if target_type not in ('all', 'employees', 'managers', 'team'):
             return jsonify({
                 'success': False,
-                'message': 'No se encontraron usuarios objetivo'
+                'message': 'target_type debe ser all, employees, managers o team'
             }), 400
         
-        # Crear notificaciones
-        created_notifications = []
-        for user in target_users:
-            notification = NotificationService.create_system_notification(
-                user_id=user.id,
-                title=data['title'],
-                message=data['message'],
-                priority=data.get('priority', 'medium'),
-                send_email=data.get('send_email', False),
-                data=data.get('data', {})
-            )
-            if notification:
-                created_notifications.append(notification)
+        team_id = data.get('team_id')
+        if target_type == 'team' and not team_id:
+            return jsonify({
+                'success': False,
+                'message': 'team_id es requerido para target_type=team'
+            }), 400
+        
+        # Fan-out por conjuntos: una consulta de destinatarios e inserción por bloques
+        result = NotificationService.broadcast_system_notification(
+            target_type=target_type,
+            title=data['title'],
+            message=data['message'],
+            priority=data.get('priority', 'medium'),
+            send_email=data.get('send_email', False),
+            data=data.get('data', {}),
+            team_id=team_id,
+            created_by=current_user.id
+        )
+        
+        if not result['notifications_sent']:
+            return jsonify({
+                'success': False,
+                'message': 'No se encontraron usuarios objetivo'
+            }), 400
         
         return jsonify({
             'success': True,
-            'message': f'Notificación enviada a {len(created_notifications)} usuarios',
-            'notifications_sent': len(created_notifications),
+            'message': f'Notificación enviada a {result["notifications_sent"]} usuarios',
+            'notifications_sent': result['notifications_sent'],
+            'emails_queued': result['emails_queued'],
             'target_type': target_type
         })
         
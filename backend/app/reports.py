@@ -4,11 +4,6 @@ from datetime import datetime, date
 import logging
 import io
 import csv
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 
 from models.employee import Employee
 from models.team import Team
@@ -529,6 +524,13 @@ def _export_employee_csv(employee, year, month=None):
 
 def _export_employee_pdf(employee, year, month=None):
     """Exporta reporte de empleado a PDF"""
+    # reportlab solo se carga al exportar un PDF (no en el arranque del worker)
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -668,6 +670,13 @@ def _export_team_csv(team, year, month=None):
 
 def _export_team_pdf(team, year, month=None):
     """Exporta reporte de equipo a PDF"""
+    # reportlab solo se carga al exportar un PDF (no en el arranque del worker)
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -4,14 +4,17 @@ from datetime import datetime
 import logging
 
 from sqlalchemy import or_, and_
-from sqlalchemy.orm import load_only
+from sqlalchemy.orm import joinedload
 
 from models import db
-from models.team import Team
+from models.team import Team, TEAM_FIELDS
+from models.fieldsets import InvalidFields
 from models.employee import Employee
 from models.team_membership import TeamMembership
 from services.hours_calculator import HoursCalculator
+from services.query_budget import query_budget
 from utils.decorators import admin_required, manager_or_admin_required
+from utils.pagination import InvalidCursor, paginate_by_cursor, requested_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,7 @@ def _user_belongs_to_team(user, team_id):
 
 @teams_bp.route('/', methods=['GET'])
 @auth_required()
+@query_budget(15)
 def list_teams():
     """Lista todos los equipos"""
     try:
@@ -35,6 +39,8 @@ def list_teams():
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         include_employees = request.args.get('include_employees', 'false').lower() == 'true'
         active_only = request.args.get('active_only', 'true').lower() == 'true'
+        # Proyección opcional (?fields=id,name) para selectores
+        fields = TEAM_FIELDS.parse(request.args.get('fields'))
         
         # Construir query
         query = Team.query
@@ -64,17 +70,38 @@ def list_teams():
                 if allowed_ids:
                     query = query.filter(Team.id.in_(allowed_ids))
         
-        # Reducir columnas para evitar tocar campos no existentes en despliegues desincronizados
-        query = query.options(load_only(Team.id, Team.name, Team.description))
+        # Cargar de una vez lo que serializa to_dict (manager y membresías con sus
+        # empleados) para no lanzar consultas por cada equipo de la página
+        if fields is not None:
+            query = query.options(*TEAM_FIELDS.options(fields))
+        else:
+            query = query.options(joinedload(Team.manager), Team.members_load_option())
 
-        # Paginación
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Paginación: por cursor (orden por nombre) o clásica con OFFSET y COUNT
+        cursor = requested_cursor()
+        if cursor is not None:
+            pagination, pagination_info = paginate_by_cursor(
+                query, [(Team.name, False), (Team.id, False)], cursor, per_page
+            )
+        else:
+            pagination = query.paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination_info = {
+                'page': page,
+                'per_page': per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev
+            }
         
         teams_data = []
         for team in pagination.items:
             try:
+                if fields is not None:
+                    teams_data.append(team.to_dict(fields=fields))
+                    continue
                 if include_employees:
                     team_data = team.to_dict(include_employees=True)
                 else:
@@ -89,16 +116,14 @@ def list_teams():
         return jsonify({
             'success': True,
             'teams': teams_data,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination_info
         })
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error listando equipos: {e}")
         return jsonify({
@@ -172,10 +197,13 @@ def create_team():
 
 @teams_bp.route('/<int:team_id>', methods=['GET'])
 @auth_required()
+@query_budget(12)
 def get_team(team_id):
     """Obtiene un equipo específico"""
     try:
-        team = Team.query.get(team_id)
+        team = Team.query.options(
+            joinedload(Team.manager), Team.members_load_option()
+        ).filter(Team.id == team_id).first()
         if not team:
             return jsonify({
                 'success': False,
@@ -331,6 +359,7 @@ def get_team_summary(team_id):
 
 @teams_bp.route('/<int:team_id>/employees', methods=['GET'])
 @auth_required()
+@query_budget(13)
 def get_team_employees(team_id):
     """Obtiene empleados de un equipo específico"""
     try:
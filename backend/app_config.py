@@ -47,11 +47,13 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool por worker: el proceso web (gthread, 4 hilos) no necesita más de 5;
+    # el proceso de eventos (gevent) lo reduce, sus streams no retienen conexión
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 5,
-        'max_overflow': 10,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
         'pool_timeout': 30,
         'pool_reset_on_return': 'commit',
     }
@@ -132,9 +134,26 @@ class Config:
         'https://team-time-management-miguels-projects-dcbd8c7f.vercel.app'
     ]
     
+    # Eventos en tiempo real (SSE)
+    # auto: LISTEN/NOTIFY si hay conexión compatible, si no broker en memoria
+    EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'auto')
+    # Conexión directa o Session Pooler para LISTEN (el Transaction Pooler no lo soporta)
+    EVENTS_DATABASE_URL = os.environ.get('EVENTS_DATABASE_URL')
+    EVENTS_STREAM_HEARTBEAT = int(os.environ.get('EVENTS_STREAM_HEARTBEAT', 20))
+    EVENTS_STREAM_MAX_SECONDS = int(os.environ.get('EVENTS_STREAM_MAX_SECONDS', 300))
+    # Streams abiertos por worker. En el proceso web (hilos) cada stream ocupa un
+    # hilo, así que el límite es bajo y el resto de clientes usa polling; el
+    # proceso ``events`` del Procfile (gevent) lo sube
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS', 2))
+    
     # APIs externas
     NAGER_DATE_API_URL = 'https://date.nager.at/api/v3'
     
+    # Festivos nacionales/regionales: 'local' (paquete holidays) o 'nager' (API)
+    HOLIDAYS_PROVIDER = os.environ.get('HOLIDAYS_PROVIDER', 'local')
+    # Completar con Nager.Date los festivos nacionales que no genere el paquete local
+    HOLIDAYS_RECONCILE_WITH_API = os.environ.get('HOLIDAYS_RECONCILE_WITH_API', 'false').lower() == 'true'
+    
     # Configuración de paginación
     EMPLOYEES_PER_PAGE = 20
     HOLIDAYS_PER_PAGE = 50
@@ -145,6 +164,62 @@ class Config:
     
     # Configuración de logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    # Las peticiones solo encolan; un hilo por worker formatea y escribe
+    LOG_ASYNC = os.environ.get('LOG_ASYNC', 'true').lower() == 'true'
+    # Registros en cola como máximo (con la cola llena se descartan, no se espera)
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    # Fracción de registros INFO/DEBUG que se conservan (1 = todos)
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get('LOG_INFO_SAMPLE_RATE', 1.0))
+    # Loggers de auditoría que nunca se muestrean
+    LOG_SAMPLING_EXEMPT = ['team_time.auth', 'team_time.security', 'team_time.user_actions',
+                           'team_time.business', 'team_time.migrations']
+    # Bytes de log que recorre como máximo una búsqueda de /api/admin/logs (sigue con el cursor)
+    LOG_SEARCH_MAX_SCAN_BYTES = int(os.environ.get('LOG_SEARCH_MAX_SCAN_MB', 64)) * 1024 * 1024
+
+    # jsonify y request.get_json con orjson si está instalado (fechas en ISO 8601)
+    JSON_FAST_PROVIDER = os.environ.get('JSON_FAST_PROVIDER', 'true').lower() == 'true'
+
+    # Segundos que se reutiliza el rendimiento por equipo del dashboard (por usuario y rol;
+    # se invalida antes al confirmar cambios en actividades, equipos, empleados o festivos)
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 60))
+
+    # Segundos que se reutiliza el total de un listado en modo cursor (?cursor=)
+    PAGINATION_COUNT_TTL = int(os.environ.get('PAGINATION_COUNT_TTL', 60))
+
+    # Métricas por endpoint (latencia, SQL, tamaño de respuesta) en memoria del worker
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # Peticiones más lentas se registran con log_performance_metric
+    METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 1000))
+    # Endpoints excluidos (streams de larga duración)
+    METRICS_EXCLUDED_ENDPOINTS = ['events.stream']
+    # Token opcional para que Prometheus lea /api/admin/metrics/prometheus sin sesión
+    METRICS_SCRAPE_TOKEN = os.environ.get('METRICS_SCRAPE_TOKEN')
+
+    # Consultas lentas: umbral, tamaño del top y EXPLAIN muestreado en segundo plano
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_MAX_ENTRIES = int(os.environ.get('SLOW_QUERY_MAX_ENTRIES', 200))
+    # EXPLAIN sin ejecutar la sentencia: muestreo y una vez por hora y huella
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1))
+    SLOW_QUERY_EXPLAIN_INTERVAL = int(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 3600))
+    # EXPLAIN ANALYZE re-ejecuta el SELECT (solo de lectura, transacción READ ONLY): opt-in
+    SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', 'false').lower() == 'true'
+
+    # Perfilado bajo demanda (cabecera X-Profile o ?_profile=1, solo admins)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
+    PROFILING_MAX_STORED = int(os.environ.get('PROFILING_MAX_STORED', 20))
+    PROFILING_MAX_SECONDS = int(os.environ.get('PROFILING_MAX_SECONDS', 30))
+
+    # Presupuestos de consultas SQL por endpoint (@query_budget en las vistas)
+    # raise / warn / off; sin valor: raise en tests, warn en debug, off en el resto
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE')
+    QUERY_BUDGETS = {}  # endpoint -> máximo, sobrescribe lo declarado en la vista
+
+    # Ajustes de esquema de bases de datos antiguas: paso explícito con
+    # ``flask ensure-schema``; true para repetirlos en cada arranque de worker
+    SCHEMA_CHECKS_ON_BOOT = os.environ.get('SCHEMA_CHECKS_ON_BOOT', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo local (usando Supabase)"""
@@ -197,6 +272,30 @@ class TestingConfig(Config):
     # Email de prueba
     MAIL_SUPPRESS_SEND = True
 
+class BenchmarkConfig(Config):
+    """Configuración para la suite de benchmarks offline (scripts/benchmark_suite.py)"""
+    TESTING = True
+    DEBUG = False
+
+    # PostgreSQL local (BENCHMARK_DATABASE_URL) o SQLite en fichero por defecto
+    SQLALCHEMY_DATABASE_URI = os.environ.get('BENCHMARK_DATABASE_URL') or 'sqlite:///benchmark.db'
+    # Pool de producción por defecto; scripts/load_test.py lo varía por entorno
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **({'pool_pre_ping': True} if SQLALCHEMY_DATABASE_URI.startswith('postgresql') else {}),
+        'pool_size': int(os.environ.get('BENCHMARK_POOL_SIZE', Config.SQLALCHEMY_ENGINE_OPTIONS['pool_size'])),
+        'max_overflow': int(os.environ.get('BENCHMARK_MAX_OVERFLOW', Config.SQLALCHEMY_ENGINE_OPTIONS['max_overflow'])),
+        'pool_timeout': int(os.environ.get('BENCHMARK_POOL_TIMEOUT', Config.SQLALCHEMY_ENGINE_OPTIONS['pool_timeout'])),
+    }
+
+    # Sin dependencias externas ni ruido de instrumentación
+    EVENTS_BROKER = 'memory'
+    WTF_CSRF_ENABLED = False
+    SECURITY_CSRF_PROTECT_MECHANISMS = []
+    MAIL_SUPPRESS_SEND = True
+    SLOW_QUERY_LOG_ENABLED = False
+    QUERY_BUDGET_MODE = 'off'  # Los benchmarks miden consultas, no las limitan
+    LOG_LEVEL = 'WARNING'
+
 class ProductionConfig(Config):
     """Configuración para producción"""
     # Permitir override de DEBUG vía variable de entorno para modo debug temporal
@@ -233,6 +332,7 @@ config = {
     'development': DevelopmentConfig,
     'development-production-like': DevelopmentProductionLikeConfig,
     'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
 }
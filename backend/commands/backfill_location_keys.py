@@ -0,0 +1,92 @@
+"""
+Comando CLI para rellenar las claves canónicas de ubicación
+Uso: flask backfill-location-keys
+"""
+import click
+from flask.cli import with_appcontext
+
+from models.employee import Employee
+from models.employee_holiday import EmployeeHoliday
+from models.holiday import Holiday
+from models.location import LocationResolver
+from models.user import db
+
+
+def backfill_location_keys(batch_size=500, only_missing=True):
+    """
+    Recalcula country_code/country_id/region_id/city_id de empleados y festivos
+    a partir de su texto de ubicación, por lotes y con un único resolver, y
+    reconstruye la tabla materializada employee_holiday.
+
+    Returns:
+        Dict con filas actualizadas por tabla
+    """
+    # Único sitio (con la siembra) que da de alta regiones/ciudades en el catálogo
+    resolver = LocationResolver(db.session, create_missing=True)
+    results = {}
+
+    for model in (Employee, Holiday):
+        table = model.__table__
+        query = db.session.query(model.id, model.country, model.region, model.city,
+                                 model.country_code, model.country_id,
+                                 model.region_id, model.city_id)
+        if only_missing:
+            # Sin clave en alguna parte con texto (fuera del catálogo al escribirse)
+            query = query.filter(db.or_(
+                model.country_code.is_(None),
+                db.and_(model.region.isnot(None), model.region_id.is_(None)),
+                db.and_(model.city.isnot(None), model.city_id.is_(None))
+            ))
+
+        updated = 0
+        pending = []
+        for row in query.order_by(model.id).all():
+            keys = resolver.resolve(row.country, row.region, row.city)
+            if all(getattr(row, field) == keys[field] for field in LocationResolver.KEY_FIELDS):
+                continue
+            pending.append({'row_id': row.id, **keys})
+            if len(pending) >= batch_size:
+                updated += _apply_batch(table, pending)
+                pending = []
+        if pending:
+            updated += _apply_batch(table, pending)
+
+        db.session.commit()
+        results[table.name] = updated
+
+    # Los UPDATE masivos no disparan eventos de mapper: reconstrucción completa
+    results[EmployeeHoliday.__tablename__] = EmployeeHoliday.refresh(db.session)
+    db.session.commit()
+
+    return results
+
+
+def _apply_batch(table, rows):
+    """UPDATE ejecutado como executemany"""
+    db.session.execute(
+        table.update().where(table.c.id == db.bindparam('row_id')).values(
+            country_code=db.bindparam('country_code'),
+            country_id=db.bindparam('country_id'),
+            region_id=db.bindparam('region_id'),
+            city_id=db.bindparam('city_id')
+        ),
+        rows
+    )
+    return len(rows)
+
+
+@click.command('backfill-location-keys')
+@click.option('--all', 'recompute_all', is_flag=True, help='Recalcula también las filas que ya tienen claves')
+@click.option('--batch-size', default=500, type=int, help='Filas por lote')
+@with_appcontext
+def backfill_location_keys_command(recompute_all, batch_size):
+    """Rellena las claves canónicas de ubicación y reconstruye employee_holiday"""
+    results = backfill_location_keys(batch_size=batch_size, only_missing=not recompute_all)
+
+    for table_name, updated in results.items():
+        click.echo(f'{table_name}: {updated} filas actualizadas')
+
+
+def init_app(app):
+    """Registra el comando en la aplicación Flask"""
+    app.cli.add_command(backfill_location_keys_command)
@@ -0,0 +1,79 @@
+"""
+Comando CLI con los ajustes de esquema que antes se hacían en cada arranque
+Uso: flask ensure-schema
+
+Añade las columnas que bases de datos antiguas pueden no tener
+(``notification.data`` y ``team.manager_id``). Es idempotente: se ejecuta una
+vez por despliegue (o a mano) en lugar de inspeccionar el esquema en cada
+worker al arrancar. Con ``SCHEMA_CHECKS_ON_BOOT=true`` create_app lo sigue
+ejecutando al arrancar.
+"""
+import logging
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+
+from models.user import db
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_schema():
+    """
+    Crea las columnas que falten en tablas existentes.
+
+    Returns:
+        Lista con las columnas creadas ('tabla.columna')
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    dialect = engine.dialect.name
+    created = []
+
+    def missing(table, column):
+        # Sin la tabla no hay nada que ajustar: create_all la creará completa
+        return inspector.has_table(table) and column not in [col['name'] for col in inspector.get_columns(table)]
+
+    with engine.begin() as connection:
+        if missing('notification', 'data'):
+            # JSONB en PostgreSQL, JSON genérico en el resto
+            column_type = 'JSONB' if dialect == 'postgresql' else 'JSON'
+            connection.execute(text(f"ALTER TABLE notification ADD COLUMN data {column_type}"))
+            created.append('notification.data')
+
+        if missing('team', 'manager_id'):
+            connection.execute(text("ALTER TABLE team ADD COLUMN manager_id INTEGER"))
+            created.append('team.manager_id')
+
+    if 'team.manager_id' in created and dialect == 'postgresql':
+        # La FK es opcional: no bloquea si ya existe o hay datos inconsistentes
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "ALTER TABLE team ADD CONSTRAINT fk_team_manager_id "
+                    "FOREIGN KEY (manager_id) REFERENCES employee(id)"
+                ))
+        except Exception as e:
+            logger.warning(f"No se pudo crear fk_team_manager_id: {e}")
+
+    for column in created:
+        logger.info(f"Columna '{column}' creada")
+    return created
+
+
+@click.command('ensure-schema')
+@with_appcontext
+def ensure_schema_command():
+    """Crea las columnas que falten en bases de datos antiguas (idempotente)"""
+    created = ensure_schema()
+    if created:
+        for column in created:
+            click.echo(f'Columna creada: {column}')
+    else:
+        click.echo('Esquema al día: no hay columnas que crear')
+
+
+def init_app(app):
+    """Registra el comando en la aplicación Flask"""
+    app.cli.add_command(ensure_schema_command)
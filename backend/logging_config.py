@@ -3,21 +3,71 @@ Configuración de logging estructurado para Team Time Management
 Incluye rotación de logs, diferentes niveles y contexto estructurado
 """
 
+import atexit
+import copy
 import os
 import logging
 import logging.handlers
+import queue
+import random
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 import json
 from flask import request, g, has_request_context
 
+def _loaded_roles(user) -> Optional[list]:
+    """Nombres de roles del usuario solo si ya están cargados (sin consultas)"""
+    try:
+        from sqlalchemy import inspect as sa_inspect
+        if 'roles' in sa_inspect(user).unloaded:
+            return None
+    except Exception:
+        pass
+    try:
+        return [role.name for role in user.roles]
+    except Exception:
+        return None
+
+
+def capture_request_context() -> Optional[Dict[str, Any]]:
+    """
+    Contexto de la petición en curso para un registro de log.
+
+    Se captura en el hilo de la petición (el formateo ocurre después en el
+    hilo del pipeline, sin contexto de Flask). El usuario es el ya cargado por
+    Flask-Login; sus roles solo se incluyen si ya estaban en memoria.
+    """
+    if not has_request_context():
+        return None
+    context = {
+        'request': {
+            'method': request.method,
+            'url': request.url,
+            'remote_addr': request.remote_addr,
+            'user_agent': request.headers.get('User-Agent', ''),
+            'endpoint': request.endpoint
+        }
+    }
+    user = g.get('user') or g.get('_login_user')
+    if user is not None and getattr(user, 'is_authenticated', False):
+        context['user'] = {
+            'id': getattr(user, 'id', None),
+            'email': getattr(user, 'email', None)
+        }
+        roles = _loaded_roles(user)
+        if roles is not None:
+            context['user']['roles'] = roles
+    return context
+
+
 class StructuredFormatter(logging.Formatter):
     """Formateador personalizado para logs estructurados"""
     
     def format(self, record):
         # Crear estructura base del log
         log_entry = {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -26,23 +76,12 @@ class StructuredFormatter(logging.Formatter):
             'line': record.lineno
         }
         
-        # Añadir contexto de request si está disponible
-        if has_request_context():
-            log_entry['request'] = {
-                'method': request.method,
-                'url': request.url,
-                'remote_addr': request.remote_addr,
-                'user_agent': request.headers.get('User-Agent', ''),
-                'endpoint': request.endpoint
-            }
-            
-            # Añadir información del usuario si está disponible
-            if hasattr(g, 'user') and g.user:
-                log_entry['user'] = {
-                    'id': g.user.id,
-                    'email': g.user.email,
-                    'roles': [role.name for role in g.user.roles]
-                }
+        # Contexto de request capturado al encolar (o el actual si se formatea en la petición)
+        context = getattr(record, 'request_context', None)
+        if context is None and not getattr(record, 'queued', False):
+            context = capture_request_context()
+        if context:
+            log_entry.update(context)
         
         # Añadir campos adicionales del record
         if hasattr(record, 'extra_fields'):
@@ -56,7 +95,152 @@ class StructuredFormatter(logging.Formatter):
                 'traceback': self.formatException(record.exc_info)
             }
         
-        return json.dumps(log_entry, ensure_ascii=False)
+        return json.dumps(log_entry, ensure_ascii=False, default=str)
+
+
+class InfoSamplingFilter(logging.Filter):
+    """Conserva solo una fracción de los registros INFO/DEBUG (WARNING o más, siempre)"""
+    
+    def __init__(self, rate: float, exempt_loggers=(), stats: Optional['LogPipelineStats'] = None):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.exempt_loggers = tuple(exempt_loggers)
+        self.stats = stats
+    
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.rate >= 1.0:
+            return True
+        if self.exempt_loggers and record.name.startswith(self.exempt_loggers):
+            return True
+        if random.random() < self.rate:
+            return True
+        if self.stats is not None:
+            self.stats.sampled_out += 1
+        return False
+
+
+class LogPipelineStats:
+    """Contadores del pipeline (sumas sin lock: son orientativos)"""
+    
+    def __init__(self):
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.dropped_reported = 0
+
+
+class RoutingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Encola el registro sin formatear ni escribir: captura mensaje y contexto
+    de la petición y marca a qué grupo de handlers va (``route``). Si la cola
+    está llena el registro se descarta y se cuenta: el log nunca bloquea la
+    petición.
+    """
+    
+    def __init__(self, log_queue, route: str, stats: LogPipelineStats):
+        super().__init__(log_queue)
+        self.route = route
+        self.stats = stats
+    
+    def prepare(self, record):
+        record = copy.copy(record)
+        # Los argumentos pueden cambiar antes de que el listener formatee
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_context = capture_request_context()
+        record.log_route = self.route
+        record.queued = True
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.stats.enqueued += 1
+        except queue.Full:
+            self.stats.dropped += 1
+
+
+class RoutingQueueListener(logging.handlers.QueueListener):
+    """Hilo único que formatea y escribe cada registro en los handlers de su ruta"""
+    
+    # Como mucho un aviso de registros descartados por minuto
+    DROP_REPORT_INTERVAL = 60
+    
+    def __init__(self, log_queue, routes: Dict[str, list], stats: LogPipelineStats):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+        self.stats = stats
+        self._last_drop_report = 0.0
+    
+    def _dispatch(self, route: str, record):
+        for handler in self.routes.get(route, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def handle(self, record):
+        self._dispatch(record.log_route, record)
+        self._report_drops()
+    
+    def _report_drops(self):
+        dropped = self.stats.dropped - self.stats.dropped_reported
+        now = time.monotonic()
+        if not dropped or now - self._last_drop_report < self.DROP_REPORT_INTERVAL:
+            return
+        self._last_drop_report = now
+        self.stats.dropped_reported += dropped
+        self._dispatch('app', logging.makeLogRecord({
+            'name': 'logging_config', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': f'{dropped} registros de log descartados: cola de logging llena', 'queued': True
+        }))
+    
+    def enqueue_sentinel(self):
+        # La cola puede estar llena al parar: esperar a que haya hueco
+        self.queue.put(self._sentinel, timeout=5)
+
+
+class LogPipeline:
+    """Cola acotada + listener del proceso (un único hilo de escritura)"""
+    
+    def __init__(self, routes: Dict[str, list], maxsize: int):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.stats = LogPipelineStats()
+        self.listener = RoutingQueueListener(self.queue, routes, self.stats)
+    
+    def handler(self, route: str, sampling_filter: Optional[logging.Filter] = None) -> RoutingQueueHandler:
+        handler = RoutingQueueHandler(self.queue, route, self.stats)
+        if sampling_filter is not None:
+            handler.addFilter(sampling_filter)
+        return handler
+    
+    def start(self):
+        self.listener.start()
+    
+    def stop(self):
+        """Vacía la cola y cierra los ficheros"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handlers in self.listener.routes.values():
+            for handler in handlers:
+                handler.close()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'queue_size': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'enqueued': self.stats.enqueued,
+            'dropped': self.stats.dropped,
+            'sampled_out': self.stats.sampled_out
+        }
+
+
+# Pipeline activo del proceso (None con LOG_ASYNC desactivado)
+_pipeline: Optional[LogPipeline] = None
+
+
+def logging_pipeline_stats() -> Optional[Dict[str, Any]]:
+    """Estado de la cola de logging del proceso"""
+    return _pipeline.snapshot() if _pipeline is not None else None
+
 
 class ContextualLogger:
     """Logger contextual que añade información adicional automáticamente"""
@@ -92,8 +276,48 @@ class ContextualLogger:
         """Log crítico con contexto"""
         self._log_with_context(logging.CRITICAL, message, kwargs)
 
+# Marca de los handlers instalados aquí (se retiran al reconfigurar)
+_HANDLER_MARK = '_team_time_handler'
+
+
+def _rotating_handler(path: str, max_bytes: int, backup_count: int,
+                      formatter: logging.Formatter, level: int = logging.NOTSET):
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding='utf-8'
+    )
+    handler.setFormatter(formatter)
+    handler.setLevel(level)
+    return handler
+
+
+def _remove_own_handlers(logger: logging.Logger):
+    for handler in list(logger.handlers):
+        if getattr(handler, _HANDLER_MARK, False):
+            logger.removeHandler(handler)
+            if not isinstance(handler, logging.handlers.QueueHandler):
+                handler.close()
+
+
+def _attach(logger: logging.Logger, handler: logging.Handler):
+    setattr(handler, _HANDLER_MARK, True)
+    logger.addHandler(handler)
+
+
 def setup_logging(app):
-    """Configura el sistema de logging para la aplicación"""
+    """
+    Configura el sistema de logging para la aplicación.
+    
+    Con ``LOG_ASYNC`` (por defecto) los loggers solo tienen un QueueHandler:
+    la petición encola el registro (con su contexto ya capturado) y un único
+    hilo formatea en JSON y escribe en los ficheros rotados. La cola está
+    acotada (``LOG_QUEUE_SIZE``); si se llena, los registros se descartan y
+    se cuentan en lugar de bloquear. ``LOG_INFO_SAMPLE_RATE`` < 1 conserva
+    solo esa fracción de INFO/DEBUG (salvo ``LOG_SAMPLING_EXEMPT``).
+    """
+    global _pipeline
     
     # Obtener configuración
     log_level = app.config.get('LOG_LEVEL', 'INFO')
@@ -105,33 +329,22 @@ def setup_logging(app):
     # Configurar nivel de logging
     app.logger.setLevel(getattr(logging, log_level.upper()))
     
-    # Limpiar handlers existentes
+    # Limpiar handlers existentes (y el pipeline de una configuración anterior)
     app.logger.handlers.clear()
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
     
     # Configurar formateador estructurado
     structured_formatter = StructuredFormatter()
     
-    # Handler para archivo principal con rotación
-    main_log_file = os.path.join(log_dir, 'team_time_management.log')
-    file_handler = logging.handlers.RotatingFileHandler(
-        main_log_file,
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setFormatter(structured_formatter)
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Handler para errores separado
-    error_log_file = os.path.join(log_dir, 'errors.log')
-    error_handler = logging.handlers.RotatingFileHandler(
-        error_log_file,
-        maxBytes=5*1024*1024,  # 5MB
-        backupCount=3,
-        encoding='utf-8'
-    )
-    error_handler.setFormatter(structured_formatter)
-    error_handler.setLevel(logging.ERROR)
+    # Archivo principal con rotación y errores separados
+    app_handlers = [
+        _rotating_handler(os.path.join(log_dir, 'team_time_management.log'),
+                          10*1024*1024, 5, structured_formatter, logging.DEBUG),
+        _rotating_handler(os.path.join(log_dir, 'errors.log'),
+                          5*1024*1024, 3, structured_formatter, logging.ERROR)
+    ]
     
     # Handler para consola (solo en desarrollo)
     if app.config.get('DEBUG', False):
@@ -141,68 +354,74 @@ def setup_logging(app):
         )
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(logging.DEBUG)
-        app.logger.addHandler(console_handler)
+        app_handlers.insert(0, console_handler)
     
-    # Añadir handlers
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(error_handler)
+    specific = _specific_handlers(log_dir, structured_formatter)
     
-    # Configurar loggers específicos
-    configure_specific_loggers(log_dir, structured_formatter)
+    if app.config.get('LOG_ASYNC', True):
+        routes = {'app': app_handlers}
+        routes.update({name: [handler] for name, (_, handler) in specific.items()})
+        _pipeline = LogPipeline(routes, app.config.get('LOG_QUEUE_SIZE', 10000))
+        sampling = None
+        if app.config.get('LOG_INFO_SAMPLE_RATE', 1.0) < 1.0:
+            sampling = InfoSamplingFilter(app.config['LOG_INFO_SAMPLE_RATE'],
+                                          app.config.get('LOG_SAMPLING_EXEMPT', ()), _pipeline.stats)
+        
+        _attach(app.logger, _pipeline.handler('app', sampling))
+        for name, (level, _) in specific.items():
+            specific_logger = logging.getLogger(name)
+            _remove_own_handlers(specific_logger)
+            _attach(specific_logger, _pipeline.handler(name, sampling))
+            specific_logger.setLevel(level)
+        _pipeline.start()
+    else:
+        # Escritura síncrona en el hilo que registra (scripts y depuración)
+        for handler in app_handlers:
+            _attach(app.logger, handler)
+        for name, (level, handler) in specific.items():
+            specific_logger = logging.getLogger(name)
+            _remove_own_handlers(specific_logger)
+            _attach(specific_logger, handler)
+            specific_logger.setLevel(level)
     
     # Log de inicio
     app.logger.info("Sistema de logging inicializado")
 
+
+def _specific_handlers(log_dir: str, formatter: StructuredFormatter) -> Dict[str, tuple]:
+    """Logger -> (nivel, handler de fichero) de cada componente"""
+    return {
+        # Logger para autenticación
+        'team_time.auth': (logging.INFO, _rotating_handler(
+            os.path.join(log_dir, 'auth.log'), 5*1024*1024, 3, formatter)),
+        # Logger para emails
+        'team_time.email': (logging.INFO, _rotating_handler(
+            os.path.join(log_dir, 'email.log'), 5*1024*1024, 3, formatter)),
+        # Logger para base de datos
+        'team_time.database': (logging.WARNING, _rotating_handler(
+            os.path.join(log_dir, 'database.log'), 5*1024*1024, 3, formatter)),
+        # Logger para APIs externas
+        'team_time.external_api': (logging.INFO, _rotating_handler(
+            os.path.join(log_dir, 'external_api.log'), 5*1024*1024, 3, formatter)),
+    }
+
+
 def configure_specific_loggers(log_dir: str, formatter: StructuredFormatter):
-    """Configura loggers específicos para diferentes componentes"""
-    
-    # Logger para autenticación
-    auth_logger = logging.getLogger('team_time.auth')
-    auth_handler = logging.handlers.RotatingFileHandler(
-        os.path.join(log_dir, 'auth.log'),
-        maxBytes=5*1024*1024,
-        backupCount=3,
-        encoding='utf-8'
-    )
-    auth_handler.setFormatter(formatter)
-    auth_logger.addHandler(auth_handler)
-    auth_logger.setLevel(logging.INFO)
-    
-    # Logger para emails
-    email_logger = logging.getLogger('team_time.email')
-    email_handler = logging.handlers.RotatingFileHandler(
-        os.path.join(log_dir, 'email.log'),
-        maxBytes=5*1024*1024,
-        backupCount=3,
-        encoding='utf-8'
-    )
-    email_handler.setFormatter(formatter)
-    email_logger.addHandler(email_handler)
-    email_logger.setLevel(logging.INFO)
-    
-    # Logger para base de datos
-    db_logger = logging.getLogger('team_time.database')
-    db_handler = logging.handlers.RotatingFileHandler(
-        os.path.join(log_dir, 'database.log'),
-        maxBytes=5*1024*1024,
-        backupCount=3,
-        encoding='utf-8'
-    )
-    db_handler.setFormatter(formatter)
-    db_logger.addHandler(db_handler)
-    db_logger.setLevel(logging.WARNING)
-    
-    # Logger para APIs externas
-    api_logger = logging.getLogger('team_time.external_api')
-    api_handler = logging.handlers.RotatingFileHandler(
-        os.path.join(log_dir, 'external_api.log'),
-        maxBytes=5*1024*1024,
-        backupCount=3,
-        encoding='utf-8'
-    )
-    api_handler.setFormatter(formatter)
-    api_logger.addHandler(api_handler)
-    api_logger.setLevel(logging.INFO)
+    """Configura loggers específicos para diferentes componentes (escritura síncrona)"""
+    for name, (level, handler) in _specific_handlers(log_dir, formatter).items():
+        specific_logger = logging.getLogger(name)
+        _remove_own_handlers(specific_logger)
+        _attach(specific_logger, handler)
+        specific_logger.setLevel(level)
+
+
+def _stop_pipeline():
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+# Al salir el worker se vacía la cola pendiente
+atexit.register(_stop_pipeline)
 
 def get_logger(name: str) -> ContextualLogger:
     """Obtiene un logger contextual para un módulo específico"""
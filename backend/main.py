@@ -1,7 +1,20 @@
 import os
+import time
+
+# Inicio de las importaciones (métricas de arranque)
+_IMPORTS_STARTED = time.perf_counter()
+
+# Con workers gevent (proceso ``events`` del Procfile), psycopg2 debe ceder el control al hub de gevent
+try:
+    from gevent import monkey as _gevent_monkey
+    if _gevent_monkey.is_module_patched('socket'):
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+except ImportError:
+    pass
+
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_migrate import Migrate
 from flask_mail import Mail
 from flask_security import Security, SQLAlchemyUserDatastore
 from datetime import datetime
@@ -42,9 +55,14 @@ from app.locations import locations_bp
 from app.invitations import invitations_bp
 from app.forecast import forecast_bp
 from app.projects import projects_bp
+from app.events import events_bp
+
+_IMPORTS_FINISHED = time.perf_counter()
 
 def create_app(config_name=None):
     """Factory para crear la aplicación Flask"""
+    from services.boot_metrics import BootMetrics, log_boot_metrics
+    boot = BootMetrics(_IMPORTS_STARTED, _IMPORTS_FINISHED)
     
     # Crear aplicación
     app = Flask(__name__)
@@ -66,6 +84,7 @@ def create_app(config_name=None):
     
     # Configurar logging estructurado
     setup_logging(app)
+    boot.mark('config')
     
     # Inicializar extensiones
     db.init_app(app)
@@ -106,39 +125,23 @@ def create_app(config_name=None):
     user_datastore = SQLAlchemyUserDatastore(db, User, Role)
     security = Security(app, user_datastore)
     
-    # Configurar Flask-Migrate
-    migrate = Migrate(app, db)
-    
-    # Auto-migraciones mínimas y seguras (idempotentes)
-    with app.app_context():
-        try:
-            from sqlalchemy import inspect, text
-            engine = db.get_engine()
-            inspector = inspect(engine)
-            columns = [col['name'] for col in inspector.get_columns('notification')]
-            if 'data' not in columns:
-                # Crear columna 'data' para notificaciones (JSON/JSONB según dialecto)
-                dialect = engine.url.get_dialect().name
-                if dialect == 'postgresql':
-                    engine.execute(text("ALTER TABLE notification ADD COLUMN data JSONB"))
-                else:
-                    # Fallback genérico
-                    engine.execute(text("ALTER TABLE notification ADD COLUMN data JSON"))
-                get_logger('migrations').info("Columna 'notification.data' creada automáticamente")
-
-            # Verificar columna manager_id en team
-            team_columns = [col['name'] for col in inspector.get_columns('team')]
-            if 'manager_id' not in team_columns:
-                engine.execute(text("ALTER TABLE team ADD COLUMN manager_id INTEGER"))
-                # Intentar crear FK si existe tabla employee
-                try:
-                    engine.execute(text("ALTER TABLE team ADD CONSTRAINT fk_team_manager_id FOREIGN KEY (manager_id) REFERENCES employee(id)"))
-                except Exception as _:
-                    pass
-                get_logger('migrations').info("Columna 'team.manager_id' creada automáticamente")
-        except Exception as e:
-            # No bloquear el arranque si falla; se registrará para diagnóstico
-            get_logger('migrations').error(f"Auto-migración fallida: {e}")
+    # Flask-Migrate (y alembic) solo lo usa ``flask db``: los workers no lo cargan
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    boot.mark('extensions')
+    
+    # Ajustes de esquema de bases de datos antiguas: paso explícito
+    # (``flask ensure-schema``), no en cada worker salvo que se pida
+    if app.config.get('SCHEMA_CHECKS_ON_BOOT'):
+        from commands.ensure_schema import ensure_schema
+        with app.app_context():
+            try:
+                ensure_schema()
+            except Exception as e:
+                # No bloquear el arranque si falla; se registrará para diagnóstico
+                get_logger('migrations').error(f"Auto-migración fallida: {e}")
+        boot.mark('schema')
 
     # Inicializar servicios
     # Importar el singleton global y inicializarlo
@@ -148,6 +151,35 @@ def create_app(config_name=None):
     # Guardar email_service en app para acceso global
     app.email_service = email_service
     
+    # Broker de eventos en tiempo real (SSE): LISTEN/NOTIFY o en memoria
+    from services.event_broker import init_event_broker
+    init_event_broker(app)
+    
+    # Métricas por endpoint (latencia, SQL, tamaño y estado de respuesta)
+    from services.request_metrics import init_request_metrics
+    init_request_metrics(app)
+    
+    # Ocupación del pool de conexiones (saturación bajo carga)
+    from services.pool_metrics import init_pool_metrics
+    init_pool_metrics(app)
+    
+    # Consultas lentas con planes de ejecución muestreados
+    from services.slow_query_log import init_slow_query_log
+    init_slow_query_log(app)
+    
+    # Perfilado bajo demanda de peticiones (admins)
+    from services.request_profiler import init_request_profiler
+    init_request_profiler(app)
+    
+    # Presupuestos de consultas SQL por endpoint (falla en tests, avisa en debug)
+    from services.query_budget import init_query_budget
+    init_query_budget(app)
+    
+    # Serialización JSON con orjson (jsonify y request.get_json)
+    from utils.json_provider import init_json_provider
+    init_json_provider(app)
+    boot.mark('services')
+    
     # Registrar blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(auth_simple_bp, url_prefix='/api/auth-simple')
@@ -162,10 +194,12 @@ def create_app(config_name=None):
     app.register_blueprint(invitations_bp)
     app.register_blueprint(forecast_bp, url_prefix='/api/forecast')
     app.register_blueprint(projects_bp, url_prefix='/api/projects')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
     
     # Dashboard stats endpoint
     from app.dashboard import dashboard_bp
     app.register_blueprint(dashboard_bp)
+    boot.mark('blueprints')
 
     # Employee invitations ahora están en employees_bp
     
@@ -545,7 +579,7 @@ def create_app(config_name=None):
                         'available': memory.available,
                         'percent_used': memory.percent
                     },
-                    'cpu_percent': psutil.cpu_percent(interval=1)
+                    'cpu_percent': psutil.cpu_percent(interval=None)
                 }
             else:
                 health_info['diagnostics']['system_resources'] = 'not available (psutil not installed)'
@@ -722,6 +756,12 @@ def create_app(config_name=None):
     from commands.update_holidays import init_app as init_update_holidays_cmd
     init_update_holidays_cmd(app)
     
+    from commands.backfill_location_keys import init_app as init_backfill_location_keys_cmd
+    init_backfill_location_keys_cmd(app)
+    
+    from commands.ensure_schema import init_app as init_ensure_schema_cmd
+    init_ensure_schema_cmd(app)
+    
     @app.cli.command()
     def process_notifications():
         """Procesa la cola de notificaciones pendientes"""
@@ -736,6 +776,14 @@ def create_app(config_name=None):
             for error in results['errors'][:3]:
                 print(f"  - {error}")
     
+    @app.cli.command()
+    def reconcile_notification_counters():
+        """Recalcula los contadores de notificaciones no leídas (ejecutar periódicamente)"""
+        results = NotificationService.reconcile_notification_counters()
+        
+        print(f"Contadores revisados: {results['checked']}")
+        print(f"Contadores corregidos: {results['corrected']}")
+    
     # Contexto de aplicación
     @app.shell_context_processor
     def make_shell_context():
@@ -751,6 +799,12 @@ def create_app(config_name=None):
             'HolidayService': HolidayService,
             'NotificationService': NotificationService
         }
+    boot.mark('routes')
+    
+    # Tiempos de arranque (admin /metrics y Prometheus)
+    boot.finish()
+    app.extensions['boot_metrics'] = boot
+    log_boot_metrics(boot)
     
     return app
 
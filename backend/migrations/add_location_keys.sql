@@ -0,0 +1,29 @@
+-- Migración: Claves canónicas de ubicación en employee y holiday
+-- Fecha: 2026-10-19
+-- Descripción: Código ISO 3166-1 alfa-2 del país e ids de countries /
+-- autonomous_communities / cities junto al texto libre de ubicación, para que
+-- el cruce festivo-empleado sea una igualdad de enteros indexada en lugar de
+-- expandir variantes de nombre ('Spain'/'España') y comparar cadenas.
+-- Tras aplicar este script ejecutar `flask backfill-location-keys` para rellenar
+-- las filas existentes; a partir de ahí la aplicación las mantiene al escribir.
+
+ALTER TABLE employee ADD COLUMN IF NOT EXISTS country_code VARCHAR(2);
+ALTER TABLE employee ADD COLUMN IF NOT EXISTS country_id INTEGER REFERENCES countries(id);
+ALTER TABLE employee ADD COLUMN IF NOT EXISTS region_id INTEGER REFERENCES autonomous_communities(id);
+ALTER TABLE employee ADD COLUMN IF NOT EXISTS city_id INTEGER REFERENCES cities(id);
+
+ALTER TABLE holiday ADD COLUMN IF NOT EXISTS country_code VARCHAR(2);
+ALTER TABLE holiday ADD COLUMN IF NOT EXISTS country_id INTEGER REFERENCES countries(id);
+ALTER TABLE holiday ADD COLUMN IF NOT EXISTS region_id INTEGER REFERENCES autonomous_communities(id);
+ALTER TABLE holiday ADD COLUMN IF NOT EXISTS city_id INTEGER REFERENCES cities(id);
+
+CREATE INDEX IF NOT EXISTS idx_employee_location_keys ON employee(country_code, region_id, city_id);
+CREATE INDEX IF NOT EXISTS idx_holiday_country_code_date ON holiday(country_code, date);
+CREATE INDEX IF NOT EXISTS idx_holiday_region_id_date ON holiday(region_id, date);
+CREATE INDEX IF NOT EXISTS idx_holiday_city_id_date ON holiday(city_id, date);
+
+ANALYZE employee;
+ANALYZE holiday;
+
+COMMENT ON COLUMN employee.country_code IS 'ISO 3166-1 alfa-2 derivado de employee.country';
+COMMENT ON COLUMN holiday.country_code IS 'ISO 3166-1 alfa-2 derivado de holiday.country';
@@ -0,0 +1,80 @@
+-- Migración: Tabla materializada de festivos aplicables por empleado
+-- Fecha: 2026-10-19
+-- Descripción: employee_holiday guarda qué festivos activos aplican a cada
+-- empleado (nacionales del país, regionales de su región y locales de su
+-- ciudad) para que calendario y horas lean por employee_id + rango de fechas.
+-- Requiere add_location_keys.sql. La aplicación la refresca de forma
+-- incremental; `flask backfill-location-keys` la reconstruye por completo.
+
+CREATE TABLE IF NOT EXISTS employee_holiday (
+    employee_id INTEGER NOT NULL REFERENCES employee(id) ON DELETE CASCADE,
+    holiday_id INTEGER NOT NULL REFERENCES holiday(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    level VARCHAR(20) NOT NULL,
+    PRIMARY KEY (employee_id, holiday_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_employee_holiday_employee_date ON employee_holiday(employee_id, date);
+CREATE INDEX IF NOT EXISTS idx_employee_holiday_holiday ON employee_holiday(holiday_id);
+
+-- Carga inicial: mismo cruce que EmployeeHoliday._applicability_select
+-- (jerarquía de Holiday.location_filter). Cada parte de la ubicación se cruza
+-- por clave canónica o, si falta la clave en algún lado, por texto sin
+-- distinguir mayúsculas; el país va en dos ramas (UNION ALL) para que el caso
+-- con código de país siga siendo una igualdad indexada.
+INSERT INTO employee_holiday (employee_id, holiday_id, date, level)
+SELECT
+    e.id,
+    h.id,
+    h.date,
+    CASE
+        WHEN h.city IS NOT NULL THEN 'local'
+        WHEN h.region IS NOT NULL THEN 'regional'
+        ELSE 'national'
+    END
+FROM employee e
+JOIN holiday h ON h.country_code = e.country_code
+    AND (
+        (h.region IS NULL AND h.city IS NULL)
+        OR (h.city IS NULL AND h.region IS NOT NULL AND (
+            h.region_id = e.region_id
+            OR ((h.region_id IS NULL OR e.region_id IS NULL) AND lower(h.region) = lower(e.region))
+        ))
+        OR (h.city IS NOT NULL AND (
+            h.city_id = e.city_id
+            OR ((h.city_id IS NULL OR e.city_id IS NULL) AND lower(h.city) = lower(e.city))
+        ))
+    )
+WHERE h.active = true
+
+UNION ALL
+
+SELECT
+    e.id,
+    h.id,
+    h.date,
+    CASE
+        WHEN h.city IS NOT NULL THEN 'local'
+        WHEN h.region IS NOT NULL THEN 'regional'
+        ELSE 'national'
+    END
+FROM employee e
+JOIN holiday h ON (h.country_code IS NULL OR e.country_code IS NULL)
+    AND lower(h.country) = lower(e.country)
+    AND (
+        (h.region IS NULL AND h.city IS NULL)
+        OR (h.city IS NULL AND h.region IS NOT NULL AND (
+            h.region_id = e.region_id
+            OR ((h.region_id IS NULL OR e.region_id IS NULL) AND lower(h.region) = lower(e.region))
+        ))
+        OR (h.city IS NOT NULL AND (
+            h.city_id = e.city_id
+            OR ((h.city_id IS NULL OR e.city_id IS NULL) AND lower(h.city) = lower(e.city))
+        ))
+    )
+WHERE h.active = true
+ON CONFLICT (employee_id, holiday_id) DO NOTHING;
+
+ANALYZE employee_holiday;
+
+COMMENT ON TABLE employee_holiday IS 'Festivos activos aplicables por empleado (materializado desde employee y holiday)';
@@ -0,0 +1,37 @@
+-- Migración: Contadores desnormalizados de notificaciones no leídas
+-- Fecha: 2026-10-19
+-- Descripción: Tabla notification_counter (una fila por usuario) para que el badge
+-- y el resumen de notificaciones no ejecuten COUNT/GROUP BY sobre notification.
+-- La aplicación mantiene los contadores al crear/leer/eliminar notificaciones y
+-- `flask reconcile-notification-counters` corrige desviaciones periódicamente.
+
+CREATE TABLE IF NOT EXISTS notification_counter (
+    user_id INTEGER PRIMARY KEY REFERENCES "user"(id) ON DELETE CASCADE,
+    unread_urgent INTEGER NOT NULL DEFAULT 0,
+    unread_high INTEGER NOT NULL DEFAULT 0,
+    unread_medium INTEGER NOT NULL DEFAULT 0,
+    unread_low INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Backfill inicial desde las notificaciones no leídas existentes
+-- (prioridades desconocidas cuentan como 'medium', igual que Notification.priority)
+INSERT INTO notification_counter (user_id, unread_urgent, unread_high, unread_medium, unread_low, updated_at)
+SELECT
+    user_id,
+    COUNT(*) FILTER (WHERE priority = 'urgent'),
+    COUNT(*) FILTER (WHERE priority = 'high'),
+    COUNT(*) FILTER (WHERE priority IS NULL OR priority NOT IN ('urgent', 'high', 'low')),
+    COUNT(*) FILTER (WHERE priority = 'low'),
+    CURRENT_TIMESTAMP
+FROM notification
+WHERE read = false
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET
+    unread_urgent = EXCLUDED.unread_urgent,
+    unread_high = EXCLUDED.unread_high,
+    unread_medium = EXCLUDED.unread_medium,
+    unread_low = EXCLUDED.unread_low,
+    updated_at = EXCLUDED.updated_at;
+
+COMMENT ON TABLE notification_counter IS 'Contadores de notificaciones no leídas por usuario y prioridad (desnormalizado)';
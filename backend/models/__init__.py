@@ -5,8 +5,10 @@ from .team import Team
 from .team_membership import TeamMembership
 from .project import Project, ProjectAssignment, project_team_link
 from .holiday import Holiday
+from .employee_holiday import EmployeeHoliday
 from .calendar_activity import CalendarActivity
 from .notification import Notification
+from .notification_counter import NotificationCounter
 from .company import Company
 
 __all__ = [
@@ -20,7 +22,9 @@ __all__ = [
     'ProjectAssignment',
     'project_team_link',
     'Holiday',
+    'EmployeeHoliday',
     'CalendarActivity',
     'Notification',
+    'NotificationCounter',
     'Company'
 ]
@@ -146,12 +146,16 @@ class CalendarActivity(db.Model):
         
         return True, "Fecha válida"
     
-    def calculate_hours_impact(self):
-        """Calcula el impacto en horas de esta actividad"""
+    def calculate_hours_impact(self, holiday_dates=None):
+        """Calcula el impacto en horas de esta actividad
+        
+        Args:
+            holiday_dates: Set de fechas festivas del empleado precargadas (opcional)
+        """
         if not self.employee:
             return 0
         
-        daily_theoretical = self.employee.get_daily_hours(self.date)
+        daily_theoretical = self.employee.get_daily_hours(self.date, holiday_dates=holiday_dates)
         activity_info = self.get_activity_info(self.activity_type)
         
         if activity_info['affects_hours'] == 'full_day':
@@ -210,8 +214,13 @@ class CalendarActivity(db.Model):
         conflicts = query.all()
         return len(conflicts), conflicts
     
-    def to_dict(self):
-        """Convierte la actividad a diccionario para JSON"""
+    def to_dict(self, holiday_dates=None):
+        """Convierte la actividad a diccionario para JSON
+        
+        Args:
+            holiday_dates: Set de fechas festivas del empleado precargadas (opcional,
+                           evita consultar festivos al calcular hours_impact)
+        """
         activity_info = self.get_activity_info(self.activity_type)
         
         return {
@@ -228,13 +237,36 @@ class CalendarActivity(db.Model):
             'notes': self.description,  # Usar description como notes (columna notes no existe en BD)
             'display_text': self.get_display_text(),
             'color': self.get_color(),
-            'hours_impact': self.calculate_hours_impact(),
+            'hours_impact': self.calculate_hours_impact(holiday_dates),
             'approved_by': getattr(self, 'approved_by', None),  # Usar getattr por si la columna no existe
             'approved_at': getattr(self, 'approved_at', None).isoformat() if getattr(self, 'approved_at', None) else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
-    
+
+    # Columnas de to_row (formato compacto): sin empleado (va implícito en la fila
+    # del empleado), sin notes (copia de description) ni campos de aprobación (sin columna)
+    ROW_COLUMNS = ('id', 'date', 'activity_type', 'activity_name', 'hours', 'start_time', 'end_time',
+                   'description', 'display_text', 'color', 'hours_impact', 'created_at', 'updated_at')
+
+    def to_row(self, holiday_dates=None):
+        """Fila con los valores de ROW_COLUMNS, iguales a los de to_dict"""
+        return (
+            self.id,
+            self.date.isoformat() if self.date else None,
+            self.activity_type,
+            self.get_activity_info(self.activity_type).get('name', ''),
+            self.hours,
+            self.start_time.isoformat() if self.start_time else None,
+            self.end_time.isoformat() if self.end_time else None,
+            self.description,
+            self.get_display_text(),
+            self.get_color(),
+            self.calculate_hours_impact(holiday_dates),
+            self.created_at.isoformat() if self.created_at else None,
+            self.updated_at.isoformat() if self.updated_at else None
+        )
+
     def __str__(self):
         return f"{self.employee.full_name if self.employee else 'Unknown'} - {self.activity_type} ({self.date})"
     
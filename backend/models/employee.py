@@ -1,7 +1,10 @@
 from datetime import datetime, date
 from calendar import monthrange
 import json
+from sqlalchemy import event
 from .base import db
+from .fieldsets import Field, FieldSet
+from .location import LocationResolver, location_changed
 
 class Employee(db.Model):
     """Modelo para empleados"""
@@ -37,6 +40,12 @@ class Employee(db.Model):
     region = db.Column(db.String(100), nullable=True)  # Estado/Provincia/Comunidad
     city = db.Column(db.String(100), nullable=True)
     
+    # Claves canónicas de ubicación (sincronizadas al escribir, ver LocationResolver)
+    country_code = db.Column(db.String(2), nullable=True)  # ISO 3166-1 alfa-2
+    country_id = db.Column(db.Integer, db.ForeignKey('countries.id'), nullable=True)
+    region_id = db.Column(db.Integer, db.ForeignKey('autonomous_communities.id'), nullable=True)
+    city_id = db.Column(db.Integer, db.ForeignKey('cities.id'), nullable=True)
+    
     # Estado del empleado
     active = db.Column(db.Boolean, default=True)
     approved = db.Column(db.Boolean, default=False)  # Aprobado por manager
@@ -66,6 +75,15 @@ class Employee(db.Model):
         lazy='selectin'
     )
     
+    __table_args__ = (
+        db.Index('idx_employee_location_keys', 'country_code', 'region_id', 'city_id'),
+    )
+    
+    @property
+    def location_keys(self):
+        """Tupla (country_code, region_id, city_id) para cruzar con festivos"""
+        return self.country_code, self.region_id, self.city_id
+    
     @property
     def summer_months_list(self):
         """Retorna la lista de meses de verano"""
@@ -84,8 +102,13 @@ class Employee(db.Model):
         else:
             self.summer_months = None
     
-    def get_daily_hours(self, target_date):
-        """Calcula las horas teóricas para una fecha específica"""
+    def get_daily_hours(self, target_date, holiday_dates=None):
+        """Calcula las horas teóricas para una fecha específica
+        
+        Args:
+            target_date: Fecha (date o 'YYYY-MM-DD')
+            holiday_dates: Set de fechas festivas precargadas (opcional, evita una query por día)
+        """
         if not isinstance(target_date, date):
             target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
         
@@ -94,7 +117,10 @@ class Employee(db.Model):
             return 0
         
         # Verificar si es festivo
-        if self.is_holiday(target_date):
+        if holiday_dates is not None:
+            if target_date in holiday_dates:
+                return 0
+        elif self.is_holiday(target_date):
             return 0
         
         # Verificar si es horario de verano
@@ -117,28 +143,14 @@ class Employee(db.Model):
     
     def is_holiday(self, target_date):
         """Verifica si una fecha es festivo para este empleado"""
-        from .holiday import Holiday
-        from utils.country_mapper import get_country_variants
+        from .employee_holiday import EmployeeHoliday
         
-        # Obtener variantes del país del empleado
-        variants = get_country_variants(self.country)
-        countries_to_search = []
-        
-        if variants:
-            countries_to_search = [variants['en'], variants['es']]
-        else:
-            countries_to_search = [self.country]
-        
-        holidays = Holiday.query.filter(
-            Holiday.date == target_date,
-            Holiday.country.in_(countries_to_search)
-        ).filter(
-            (Holiday.region.is_(None)) |  # Festivos nacionales
-            (Holiday.region == self.region) |  # Festivos regionales
-            (Holiday.city == self.city)  # Festivos locales
+        holiday = EmployeeHoliday.query.filter(
+            EmployeeHoliday.employee_id == self.id,
+            EmployeeHoliday.date == target_date
         ).first()
         
-        return holidays is not None
+        return holiday is not None
     
     def get_calendar_activities(self, year=None, month=None):
         """Obtiene las actividades del calendario del empleado"""
@@ -162,14 +174,16 @@ class Employee(db.Model):
         
         return query.order_by('date').all()
     
-    def get_hours_summary(self, year=None, month=None, precached_holidays=None):
+    def get_hours_summary(self, year=None, month=None, precached_holidays=None, precached_activities=None):
         """Calcula el resumen de horas del empleado
         
         Args:
             year: Año a calcular
             month: Mes a calcular (opcional, si es None calcula todo el año)
-            precached_holidays: Set de tuplas (date, country, location) con festivos precargados
+            precached_holidays: Set de tuplas (date, holiday_id, level) con festivos precargados
                                 para optimización. Si es None, carga festivos normalmente.
+            precached_activities: Actividades del empleado ya cargadas (pueden cubrir un rango
+                                  mayor que el período). Si es None, se consultan.
         """
         if not year:
             year = datetime.now().year
@@ -186,46 +200,21 @@ class Employee(db.Model):
         # Cargar festivos si no están precargados
         if precached_holidays is None:
             # Cargar festivos del período una sola vez
-            holidays_set = set()
-            from .holiday import Holiday
-            from utils.country_mapper import get_country_variants
-            
-            variants = get_country_variants(self.country) if self.country else None
-            countries_to_search = []
+            from .employee_holiday import EmployeeHoliday
             
-            if variants:
-                countries_to_search = [variants['en'], variants['es']]
-            elif self.country:
-                countries_to_search = [self.country]
-            
-            if countries_to_search:
-                holidays = Holiday.query.filter(
-                    Holiday.date >= start_date,
-                    Holiday.date <= end_date,
-                    Holiday.country.in_(countries_to_search),
-                    Holiday.active == True
-                ).all()
-                
-                for holiday in holidays:
-                    if not holiday.region:
-                        holidays_set.add((holiday.date, holiday.country, ''))
-                    elif holiday.region == self.region:
-                        holidays_set.add((holiday.date, holiday.country, holiday.region or ''))
-                    elif holiday.city == self.city:
-                        holidays_set.add((holiday.date, holiday.country, holiday.city or ''))
+            holidays_set = {
+                (row.date, row.holiday_id, row.level)
+                for row in EmployeeHoliday.for_employees([self.id], start_date, end_date)
+            }
             
             precached_holidays = holidays_set
         
+        holiday_dates = {holiday_tuple[0] for holiday_tuple in precached_holidays or ()}
+        
         # Función auxiliar para verificar si es festivo usando el set precargado
         def is_holiday_cached(target_date):
             """Verifica si una fecha es festivo usando el set precargado"""
-            if not precached_holidays:
-                return False
-            # Buscar en el set de festivos precargados
-            for holiday_tuple in precached_holidays:
-                if holiday_tuple[0] == target_date:
-                    return True
-            return False
+            return target_date in holiday_dates
         
         # Función auxiliar para obtener horas diarias usando festivos precargados
         def get_daily_hours_cached(target_date):
@@ -246,13 +235,19 @@ class Employee(db.Model):
             else:  # Fin de semana
                 return 0
         
-        # Obtener actividades del período usando la relación directamente
-        from models.calendar_activity import CalendarActivity
-        activities = CalendarActivity.query.filter(
-            CalendarActivity.employee_id == self.id,
-            CalendarActivity.date >= start_date,
-            CalendarActivity.date <= end_date
-        ).all()
+        # Obtener actividades del período (precargadas o en una query)
+        if precached_activities is not None:
+            activities = [
+                activity for activity in precached_activities
+                if start_date <= activity.date <= end_date
+            ]
+        else:
+            from models.calendar_activity import CalendarActivity
+            activities = CalendarActivity.query.filter(
+                CalendarActivity.employee_id == self.id,
+                CalendarActivity.date >= start_date,
+                CalendarActivity.date <= end_date
+            ).all()
         
         # Crear diccionario de actividades por fecha
         activities_dict = {activity.date: activity for activity in activities}
@@ -323,12 +318,22 @@ class Employee(db.Model):
             'period': f"{year}-{month:02d}" if month else str(year)
         }
     
-    def get_remaining_benefits(self, year=None):
-        """Calcula los beneficios restantes del empleado"""
+    def get_remaining_benefits(self, year=None, precached_holidays=None, precached_activities=None):
+        """Calcula los beneficios restantes del empleado
+        
+        Args:
+            year: Año a calcular
+            precached_holidays: Festivos del año precargados (ver get_hours_summary)
+            precached_activities: Actividades del año precargadas (ver get_hours_summary)
+        """
         if not year:
             year = datetime.now().year
         
-        summary = self.get_hours_summary(year)
+        summary = self.get_hours_summary(
+            year,
+            precached_holidays=precached_holidays,
+            precached_activities=precached_activities
+        )
         
         return {
             'remaining_vacation_days': max(0, self.annual_vacation_days - summary['vacation_days']),
@@ -353,8 +358,38 @@ class Employee(db.Model):
                 return membership
         return active_memberships[0]
 
-    def to_dict(self, include_summary=False, year=None):
-        """Convierte el empleado a diccionario para JSON"""
+    def _memberships_data(self):
+        """Membresías activas tal y como aparecen en ``teams``"""
+        return [
+            {
+                'membership_id': membership.id,
+                'team_id': membership.team_id,
+                'team_name': membership.team.name if membership.team else None,
+                'role': membership.role,
+                'allocation_percent': membership.allocation_percent,
+                'is_primary': membership.is_primary,
+                'active': membership.active,
+                'notes': membership.notes
+            } for membership in self.get_active_memberships()
+        ]
+    
+    def _projects_data(self):
+        """Asignaciones a proyectos activas tal y como aparecen en ``projects``"""
+        return [
+            assignment.to_dict(include_employee=False)
+            for assignment in self.project_assignments or []
+            if assignment.active
+        ]
+    
+    def to_dict(self, include_summary=False, year=None, fields=None):
+        """
+        Convierte el empleado a diccionario para JSON.
+        
+        Con ``fields`` (ver EMPLOYEE_FIELDS) solo se serializan esos campos.
+        """
+        if fields is not None:
+            return EMPLOYEE_FIELDS.serialize(self, fields)
+        
         # Obtener team_name de forma segura sin lazy loading
         team_name = None
         try:
@@ -385,39 +420,16 @@ class Employee(db.Model):
             'country': self.country,
             'region': self.region,
             'city': self.city,
+            'country_code': self.country_code,
             'active': self.active,
             'approved': self.approved,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'approved_at': self.approved_at.isoformat() if self.approved_at else None
         }
 
-        # Equipos (membresías)
-        active_memberships = self.get_active_memberships()
-        if active_memberships:
-            data['teams'] = [
-                {
-                    'membership_id': membership.id,
-                    'team_id': membership.team_id,
-                    'team_name': membership.team.name if membership.team else None,
-                    'role': membership.role,
-                    'allocation_percent': membership.allocation_percent,
-                    'is_primary': membership.is_primary,
-                    'active': membership.active,
-                    'notes': membership.notes
-                } for membership in active_memberships
-            ]
-        else:
-            data['teams'] = []
-
-        # Proyectos asignados
-        if self.project_assignments:
-            data['projects'] = [
-                assignment.to_dict(include_employee=False)
-                for assignment in self.project_assignments
-                if assignment.active
-            ]
-        else:
-            data['projects'] = []
+        # Equipos (membresías) y proyectos asignados
+        data['teams'] = self._memberships_data()
+        data['projects'] = self._projects_data()
         
         if include_summary:
             data['hours_summary'] = self.get_hours_summary(year)
@@ -430,3 +442,88 @@ class Employee(db.Model):
     
     def __repr__(self):
         return f'<Employee {self.full_name}>'
+
+
+def _team_loader():
+    from sqlalchemy.orm import lazyload, load_only, selectinload
+    from .team import Team
+    # Solo el nombre: sin las membresías ni proyectos que Team carga por defecto
+    return selectinload(Employee.team).options(load_only(Team.id, Team.name), lazyload('*'))
+
+
+def _memberships_loader():
+    from sqlalchemy.orm import lazyload, load_only, selectinload
+    from .team import Team
+    from .team_membership import TeamMembership
+    return selectinload(Employee.memberships).selectinload(TeamMembership.team).options(
+        load_only(Team.id, Team.name), lazyload('*')
+    )
+
+
+def _projects_loader():
+    from sqlalchemy.orm import selectinload
+    return selectinload(Employee.project_assignments)
+
+
+def _user_roles_loader():
+    from sqlalchemy.orm import lazyload, load_only, selectinload
+    from .user import User
+    return selectinload(Employee.user).options(load_only(User.id), lazyload('*'), selectinload(User.roles))
+
+
+# Campos de ``?fields=`` en los listados de empleados (mismos valores que to_dict)
+EMPLOYEE_FIELDS = FieldSet(Employee, {
+    'id': Field(),
+    'user_id': Field(),
+    'full_name': Field(),
+    'team_id': Field(),
+    'team_name': Field(columns=['team_id'], relationships=['team'], loader=_team_loader,
+                       value=lambda employee: employee.team.name if employee.team else None),
+    'hours_monday_thursday': Field(),
+    'hours_friday': Field(),
+    'hours_summer': Field(),
+    'has_summer_schedule': Field(),
+    'summer_months': Field(columns=['summer_months'], value=lambda employee: employee.summer_months_list),
+    'annual_vacation_days': Field(),
+    'annual_hld_hours': Field(),
+    'hourly_rate': Field(),
+    'country': Field(),
+    'region': Field(),
+    'city': Field(),
+    'country_code': Field(),
+    'active': Field(),
+    'approved': Field(),
+    'created_at': Field(),
+    'approved_at': Field(),
+    'teams': Field(relationships=['memberships'], loader=_memberships_loader,
+                   value=lambda employee: employee._memberships_data()),
+    'projects': Field(relationships=['project_assignments'], loader=_projects_loader,
+                      value=lambda employee: employee._projects_data()),
+    'user_roles': Field(columns=['user_id'], relationships=['user'], loader=_user_roles_loader,
+                        value=lambda employee: [role.name for role in employee.user.roles] if employee.user else []),
+})
+
+
+# Solo catálogo existente: lo que no está queda sin clave y se cruza por texto
+@event.listens_for(Employee, 'before_insert')
+def _sync_location_keys_on_insert(mapper, connection, target):
+    LocationResolver(connection).apply(target)
+
+
+@event.listens_for(Employee, 'before_update')
+def _sync_location_keys_on_update(mapper, connection, target):
+    if location_changed(target):
+        LocationResolver(connection).apply(target)
+
+
+@event.listens_for(Employee, 'after_insert')
+def _refresh_holidays_on_insert(mapper, connection, target):
+    from .employee_holiday import EmployeeHoliday
+    EmployeeHoliday.refresh(connection, employee_ids=[target.id])
+
+
+@event.listens_for(Employee, 'after_update')
+def _refresh_holidays_on_update(mapper, connection, target):
+    if location_changed(target):
+        from .employee_holiday import EmployeeHoliday
+        EmployeeHoliday.refresh(connection, employee_ids=[target.id])
@@ -0,0 +1,147 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, union_all
+
+from .base import db
+from .location import key_or_text
+
+
+class EmployeeHoliday(db.Model):
+    """
+    Festivos aplicables a cada empleado (tabla materializada).
+
+    Se deriva de ``Employee`` y ``Holiday`` por sus claves canónicas de ubicación
+    y se refresca de forma incremental: al cambiar la ubicación de un empleado
+    y al cargar, activar/desactivar o eliminar festivos. Las vistas de
+    calendario y horas leen de aquí por ``employee_id IN (...) AND date BETWEEN``
+    sin decidir en Python qué festivo aplica a quién.
+    """
+    __tablename__ = 'employee_holiday'
+
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id', ondelete='CASCADE'), primary_key=True)
+    holiday_id = db.Column(db.Integer, db.ForeignKey('holiday.id', ondelete='CASCADE'), primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    level = db.Column(db.String(20), nullable=False)  # national, regional, local
+
+    __table_args__ = (
+        db.Index('idx_employee_holiday_employee_date', 'employee_id', 'date'),
+        db.Index('idx_employee_holiday_holiday', 'holiday_id'),
+    )
+
+    @staticmethod
+    def _applicability_select(holiday_filters, employee_filters):
+        """
+        SELECT (employee_id, holiday_id, date, level) de los pares aplicables.
+
+        Cruce por claves canónicas; una ubicación sin clave (texto fuera del
+        catálogo o pendiente de ``flask backfill-location-keys``) se cruza por
+        texto, como antes de las claves. El país va en dos ramas (UNION ALL)
+        para que el caso habitual siga siendo una igualdad indexada.
+        """
+        from .employee import Employee
+        from .holiday import Holiday
+
+        e = Employee.__table__
+        h = Holiday.__table__
+
+        level = case(
+            (h.c.city.isnot(None), 'local'),
+            (h.c.region.isnot(None), 'regional'),
+            else_='national'
+        )
+        # Misma jerarquía que Holiday.location_filter
+        applies = or_(
+            and_(h.c.region.is_(None), h.c.city.is_(None)),
+            and_(h.c.city.is_(None), h.c.region.isnot(None),
+                 key_or_text(h.c.region_id, e.c.region_id, h.c.region, e.c.region)),
+            and_(h.c.city.isnot(None), key_or_text(h.c.city_id, e.c.city_id, h.c.city, e.c.city))
+        )
+        same_country_key = h.c.country_code == e.c.country_code
+        same_country_text = and_(
+            or_(h.c.country_code.is_(None), e.c.country_code.is_(None)),
+            func.lower(h.c.country) == func.lower(e.c.country)
+        )
+
+        return union_all(*(
+            select(e.c.id, h.c.id, h.c.date, level).select_from(
+                e.join(h, and_(same_country, applies))
+            ).where(h.c.active == True, *holiday_filters, *employee_filters)
+            for same_country in (same_country_key, same_country_text)
+        ))
+
+    @classmethod
+    def refresh(cls, executor, employee_ids: Optional[Iterable[int]] = None,
+                holiday_ids: Optional[Iterable[int]] = None,
+                start_date=None, end_date=None,
+                country_codes: Optional[Iterable[str]] = None) -> int:
+        """
+        Recalcula las filas del ámbito indicado con un DELETE + INSERT ... SELECT.
+
+        Sin filtros reconstruye la tabla completa. ``executor`` puede ser la
+        sesión o la conexión del flush (eventos de mapper).
+
+        Returns:
+            Número de filas insertadas
+        """
+        from .employee import Employee
+        from .holiday import Holiday
+
+        table = cls.__table__
+        h = Holiday.__table__
+
+        delete_filters = []
+        holiday_filters = []
+        employee_filters = []
+
+        if employee_ids is not None:
+            employee_ids = list(employee_ids)
+            if not employee_ids:
+                return 0
+            delete_filters.append(table.c.employee_id.in_(employee_ids))
+            employee_filters.append(Employee.__table__.c.id.in_(employee_ids))
+        if holiday_ids is not None:
+            holiday_ids = list(holiday_ids)
+            if not holiday_ids:
+                return 0
+            delete_filters.append(table.c.holiday_id.in_(holiday_ids))
+            holiday_filters.append(h.c.id.in_(holiday_ids))
+        if start_date is not None:
+            delete_filters.append(table.c.date >= start_date)
+            holiday_filters.append(h.c.date >= start_date)
+        if end_date is not None:
+            delete_filters.append(table.c.date <= end_date)
+            holiday_filters.append(h.c.date <= end_date)
+        if country_codes is not None:
+            country_codes = [code for code in country_codes if code]
+            if not country_codes:
+                return 0
+            delete_filters.append(table.c.holiday_id.in_(
+                select(h.c.id).where(h.c.country_code.in_(country_codes))
+            ))
+            holiday_filters.append(h.c.country_code.in_(country_codes))
+
+        executor.execute(delete(table).where(*delete_filters))
+        result = executor.execute(
+            insert(table).from_select(
+                ['employee_id', 'holiday_id', 'date', 'level'],
+                cls._applicability_select(holiday_filters, employee_filters)
+            )
+        )
+        return result.rowcount or 0
+
+    @classmethod
+    def for_employees(cls, employee_ids: Iterable[int], start_date, end_date):
+        """Filas (employee_id, date, holiday_id, level) de los empleados en el rango"""
+        employee_ids = list(employee_ids)
+        if not employee_ids:
+            return []
+        return db.session.query(
+            cls.employee_id, cls.date, cls.holiday_id, cls.level
+        ).filter(
+            cls.employee_id.in_(employee_ids),
+            cls.date >= start_date,
+            cls.date <= end_date
+        ).all()
+
+    def __repr__(self):
+        return f'<EmployeeHoliday employee:{self.employee_id} holiday:{self.holiday_id} {self.date}>'
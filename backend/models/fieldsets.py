@@ -0,0 +1,110 @@
+"""
+Proyecciones de los modelos para ``?fields=`` (sparse fieldsets)
+
+Cada modelo declara sus campos serializables: qué columnas necesita cada
+uno, qué relación hay que cargar (con su opción de carga) y cómo se obtiene
+el valor. Con la lista de campos pedidos, ``FieldSet.options`` construye un
+``load_only`` con solo esas columnas más las cargas agrupadas necesarias, y
+pasa a carga perezosa las relaciones que el modelo carga por defecto
+(``lazy='selectin'``) y no se han pedido. ``FieldSet.serialize`` devuelve
+exactamente los campos pedidos, con los mismos valores que ``to_dict``.
+"""
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import lazyload, load_only
+
+
+class InvalidFields(ValueError):
+    """``?fields=`` con campos que el modelo no expone"""
+
+
+def plain_value(value):
+    """Fechas en ISO 8601 como en los ``to_dict``"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class Field:
+    """
+    Campo serializable.
+
+    Args:
+        columns: Atributos columna que necesita (además de la clave primaria)
+        value: Función objeto -> valor; por defecto la columna del mismo nombre
+        relationships: Relaciones de primer nivel que carga ``loader``
+        loader: Función sin argumentos que devuelve la opción (o lista de opciones)
+            de carga; se llama al construir la consulta para no importar modelos al definirlo
+    """
+
+    def __init__(self, columns: Iterable[str] = (), value: Optional[Callable] = None,
+                 relationships: Iterable[str] = (), loader: Optional[Callable] = None):
+        self.columns = tuple(columns)
+        self.value = value
+        self.relationships = tuple(relationships)
+        self.loader = loader
+
+
+class FieldSet:
+    """Campos de un modelo que se pueden pedir con ``?fields=``"""
+
+    def __init__(self, model, fields: Dict[str, Field], required: Iterable[str] = ('id',)):
+        self.model = model
+        self.fields = {}
+        for name, field in fields.items():
+            if field.value is None:
+                # Campo columna: mismo nombre en el modelo y en la respuesta
+                field.columns = field.columns or (name,)
+                field.value = lambda obj, attribute=name: plain_value(getattr(obj, attribute))
+            self.fields[name] = field
+        self.required = tuple(required)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.fields)
+
+    def parse(self, raw: Optional[str]) -> Optional[List[str]]:
+        """
+        Lista de campos pedidos (con los obligatorios delante) o None si no se
+        ha pedido proyección.
+
+        Raises:
+            InvalidFields: Si algún campo no existe
+        """
+        if raw is None or not raw.strip():
+            return None
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise InvalidFields(
+                f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(self.fields)}"
+            )
+        return list(dict.fromkeys(list(self.required) + requested))
+
+    def options(self, names: List[str]) -> list:
+        """Opciones de carga para que la consulta traiga solo lo necesario para ``names``"""
+        columns, loaders, covered = [], [], set()
+        for name in names:
+            field = self.fields[name]
+            columns.extend(column for column in field.columns if column not in columns)
+            if field.loader is not None and field.loader not in loaders:
+                loaders.append(field.loader)
+            covered.update(field.relationships)
+
+        mapper = inspect(self.model)
+        options = [load_only(*[getattr(self.model, column) for column in columns])]
+        for loader in loaders:
+            option = loader()
+            options.extend(option if isinstance(option, list) else [option])
+        # Relaciones con carga ansiosa por defecto que no hacen falta: solo si se acceden
+        options.extend(
+            lazyload(getattr(self.model, relationship.key))
+            for relationship in mapper.relationships
+            if relationship.lazy in ('selectin', 'joined', 'subquery') and relationship.key not in covered
+        )
+        return options
+
+    def serialize(self, obj, names: List[str]) -> Dict:
+        return {name: self.fields[name].value(obj) for name in names}
@@ -1,5 +1,13 @@
 from datetime import datetime, date
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
 from .base import db
+from .fieldsets import Field, FieldSet
+from .location import LocationResolver, key_or_text, location_changed, same_location_part
+
+# session.info: años con festivos modificados en la transacción (invalidación de cachés)
+CHANGED_YEARS_KEY = 'holiday_years_changed'
+
 
 class Holiday(db.Model):
     """Modelo para festivos globales"""
@@ -16,6 +24,12 @@ class Holiday(db.Model):
     region = db.Column(db.String(100), nullable=True)  # Estado/Provincia/Comunidad
     city = db.Column(db.String(100), nullable=True)
     
+    # Claves canónicas de ubicación (derivadas del texto, ver LocationResolver)
+    country_code = db.Column(db.String(2), nullable=True)  # ISO 3166-1 alfa-2
+    country_id = db.Column(db.Integer, db.ForeignKey('countries.id'), nullable=True)
+    region_id = db.Column(db.Integer, db.ForeignKey('autonomous_communities.id'), nullable=True)
+    city_id = db.Column(db.Integer, db.ForeignKey('cities.id'), nullable=True)
+    
     # Tipo de festivo
     holiday_type = db.Column(db.String(50), default='national')  # national, regional, local
     
@@ -39,25 +53,44 @@ class Holiday(db.Model):
         db.Index('idx_holiday_date_country', 'date', 'country'),
         db.Index('idx_holiday_country_region', 'country', 'region'),
         db.Index('idx_holiday_location', 'country', 'region', 'city'),
+        db.Index('idx_holiday_country_code_date', 'country_code', 'date'),
+        db.Index('idx_holiday_region_id_date', 'region_id', 'date'),
+        db.Index('idx_holiday_city_id_date', 'city_id', 'date'),
     )
     
     @classmethod
-    def get_holidays_for_location(cls, country, region=None, city=None, year=None):
-        """Obtiene todos los festivos para una ubicación específica"""
-        from utils.country_mapper import get_country_variants
+    def location_filter(cls, country_code, region_id=None, city_id=None,
+                        country=None, region=None, city=None):
+        """
+        Condición SQL de festivos aplicables a una ubicación canónica:
+        nacionales del país, regionales de su región y locales de su ciudad.
+        Las partes sin clave (texto fuera del catálogo) se cruzan por el texto
+        ``country``/``region``/``city``.
+        """
+        same_country = key_or_text(cls.country_code, country_code, cls.country, country)
         
-        # Normalizar país y obtener variantes (inglés y español)
-        variants = get_country_variants(country)
-        countries_to_search = []
+        applicable = [db.and_(cls.region.is_(None), cls.city.is_(None))]
+        if region_id or region:
+            applicable.append(db.and_(cls.region.isnot(None), cls.city.is_(None),
+                                      key_or_text(cls.region_id, region_id, cls.region, region)))
+        if city_id or city:
+            applicable.append(db.and_(cls.city.isnot(None), key_or_text(cls.city_id, city_id, cls.city, city)))
         
-        if variants:
-            countries_to_search = [variants['en'], variants['es']]
-        else:
-            countries_to_search = [country]
+        return db.and_(same_country, db.or_(*applicable))
+    
+    @classmethod
+    def _resolve_location(cls, country, region=None, city=None):
+        """Claves canónicas de una ubicación en texto (sin dar de alta catálogo)"""
+        return LocationResolver(db.session, create_missing=False).resolve(country, region, city)
+    
+    @classmethod
+    def get_holidays_for_location(cls, country, region=None, city=None, year=None):
+        """Obtiene todos los festivos para una ubicación específica"""
+        keys = cls._resolve_location(country, region, city)
         
-        # Buscar festivos que coincidan con cualquiera de las variantes del país
         query = cls.query.filter(
-            cls.country.in_(countries_to_search),
+            cls.location_filter(keys['country_code'], keys['region_id'], keys['city_id'],
+                                country, region, city),
             cls.active == True
         )
         
@@ -67,40 +100,18 @@ class Holiday(db.Model):
             end_date = date(year, 12, 31)
             query = query.filter(cls.date >= start_date, cls.date <= end_date)
         
-        # Incluir festivos nacionales, regionales y locales
-        location_filter = db.or_(
-            cls.region.is_(None),  # Festivos nacionales
-            cls.region == region if region else False,  # Festivos regionales
-            db.and_(cls.region == region, cls.city == city) if city else False  # Festivos locales
-        )
-        
-        query = query.filter(location_filter)
-        
         return query.order_by(cls.date).all()
     
     @classmethod
     def get_holidays_for_date(cls, target_date, country, region=None, city=None):
         """Verifica si una fecha específica es festivo en una ubicación"""
-        from utils.country_mapper import get_country_variants
-        
-        # Normalizar país y obtener variantes (inglés y español)
-        variants = get_country_variants(country)
-        countries_to_search = []
-        
-        if variants:
-            countries_to_search = [variants['en'], variants['es']]
-        else:
-            countries_to_search = [country]
+        keys = cls._resolve_location(country, region, city)
         
         return cls.query.filter(
             cls.date == target_date,
-            cls.country.in_(countries_to_search),
-            cls.active == True,
-            db.or_(
-                cls.region.is_(None),  # Festivos nacionales
-                cls.region == region if region else False,  # Festivos regionales
-                db.and_(cls.region == region, cls.city == city) if city else False  # Festivos locales
-            )
+            cls.location_filter(keys['country_code'], keys['region_id'], keys['city_id'],
+                                country, region, city),
+            cls.active == True
         ).all()
     
     @classmethod
@@ -125,6 +136,14 @@ class Holiday(db.Model):
             cls.city.isnot(None)
         ).distinct().order_by(cls.city).all()
     
+    @staticmethod
+    def mark_years_changed(session, years):
+        """Registra en la sesión los años afectados; las cachés se invalidan al hacer commit"""
+        if session is not None:
+            session.info.setdefault(CHANGED_YEARS_KEY, set()).update(
+                year for year in years if year
+            )
+    
     @classmethod
     def bulk_create_holidays(cls, holidays_data):
         """
@@ -133,6 +152,8 @@ class Holiday(db.Model):
         """
         holidays_to_create = []
         skipped_count = 0
+        # bulk_save_objects no dispara eventos de mapper: claves resueltas aquí
+        resolver = LocationResolver(db.session)
         
         for holiday_data in holidays_data:
             # Verificar si ya existe usando múltiples criterios
@@ -185,10 +206,23 @@ class Holiday(db.Model):
             
             # Si no existe, crear nuevo festivo
             holiday = cls(**holiday_data)
+            resolver.apply(holiday)
             holidays_to_create.append(holiday)
         
         if holidays_to_create:
+            from .employee_holiday import EmployeeHoliday
+            
             db.session.bulk_save_objects(holidays_to_create)
+            cls.mark_years_changed(db.session, {holiday.date.year for holiday in holidays_to_create})
+            # bulk_save_objects tampoco refresca employee_holiday: ámbito de la carga
+            # (sin filtrar por país si alguno quedó sin código y se cruza por nombre)
+            country_codes = {holiday.country_code for holiday in holidays_to_create}
+            EmployeeHoliday.refresh(
+                db.session,
+                start_date=min(holiday.date for holiday in holidays_to_create),
+                end_date=max(holiday.date for holiday in holidays_to_create),
+                country_codes=None if None in country_codes else country_codes
+            )
             db.session.commit()
         
         return len(holidays_to_create)
@@ -211,27 +245,35 @@ class Holiday(db.Model):
             parts.append(self.city)
         return ' > '.join(parts)
     
-    def is_applicable_for_employee(self, employee):
-        """Verifica si este festivo aplica para un empleado específico"""
-        if self.country != employee.country:
+    def applies_to(self, country_code, region_id=None, city_id=None,
+                   country=None, region=None, city=None):
+        """Equivalente en memoria de ``location_filter``"""
+        if not same_location_part(self.country_code, country_code, self.country, country):
             return False
         
         # Festivo nacional - aplica para todos
-        if not self.region:
+        if not self.region and not self.city:
             return True
         
-        # Festivo regional - debe coincidir la región
-        if self.region == employee.region:
-            # Si no hay ciudad específica, aplica para toda la región
-            if not self.city:
-                return True
-            # Si hay ciudad específica, debe coincidir
-            return self.city == employee.city
+        # Festivo local - debe coincidir la ciudad
+        if self.city:
+            return same_location_part(self.city_id, city_id, self.city, city)
         
-        return False
+        # Festivo regional - debe coincidir la región
+        return same_location_part(self.region_id, region_id, self.region, region)
     
-    def to_dict(self):
-        """Convierte el festivo a diccionario para JSON"""
+    def is_applicable_for_employee(self, employee):
+        """Verifica si este festivo aplica para un empleado específico"""
+        return self.applies_to(*employee.location_keys, employee.country, employee.region, employee.city)
+    
+    def to_dict(self, fields=None):
+        """
+        Convierte el festivo a diccionario para JSON.
+        
+        Con ``fields`` (ver HOLIDAY_FIELDS) solo se serializan esos campos.
+        """
+        if fields is not None:
+            return HOLIDAY_FIELDS.serialize(self, fields)
         return {
             'id': self.id,
             'name': self.name,
@@ -239,6 +281,7 @@ class Holiday(db.Model):
             'country': self.country,
             'region': self.region,
             'city': self.city,
+            'country_code': self.country_code,
             'holiday_type': self.holiday_type,
             'hierarchy_level': self.get_hierarchy_level(),
             'location_string': self.get_location_string(),
@@ -254,3 +297,58 @@ class Holiday(db.Model):
     
     def __repr__(self):
         return f'<Holiday {self.name} {self.date} {self.country}>'
+
+
+# Campos de ``?fields=`` en los listados de festivos (mismos valores que to_dict)
+HOLIDAY_FIELDS = FieldSet(Holiday, {
+    'id': Field(),
+    'name': Field(),
+    'date': Field(),
+    'country': Field(),
+    'region': Field(),
+    'city': Field(),
+    'country_code': Field(),
+    'holiday_type': Field(),
+    'hierarchy_level': Field(columns=['region', 'city'], value=lambda holiday: holiday.get_hierarchy_level()),
+    'location_string': Field(columns=['country', 'region', 'city'],
+                             value=lambda holiday: holiday.get_location_string()),
+    'description': Field(),
+    'is_fixed': Field(),
+    'source': Field(),
+    'active': Field(),
+    'created_at': Field(),
+})
+
+
+# Solo catálogo existente: lo que no está queda sin clave y se cruza por texto
+@event.listens_for(Holiday, 'before_insert')
+def _sync_location_keys_on_insert(mapper, connection, target):
+    LocationResolver(connection).apply(target)
+
+
+@event.listens_for(Holiday, 'before_update')
+def _sync_location_keys_on_update(mapper, connection, target):
+    if location_changed(target):
+        LocationResolver(connection).apply(target)
+
+
+@event.listens_for(Holiday, 'after_insert')
+@event.listens_for(Holiday, 'after_delete')
+def _refresh_employees_on_insert_or_delete(mapper, connection, target):
+    from .employee_holiday import EmployeeHoliday
+    EmployeeHoliday.refresh(connection, holiday_ids=[target.id])
+    Holiday.mark_years_changed(object_session(target), [target.date and target.date.year])
+
+
+@event.listens_for(Holiday, 'after_update')
+def _refresh_employees_on_update(mapper, connection, target):
+    from .employee_holiday import EmployeeHoliday
+    
+    state = inspect(target)
+    date_history = state.attrs.date.history
+    Holiday.mark_years_changed(
+        object_session(target),
+        [day.year for day in (date_history.deleted or ()) if day] + [target.date and target.date.year]
+    )
+    if location_changed(target) or state.attrs.active.history.has_changes() or date_history.has_changes():
+        EmployeeHoliday.refresh(connection, holiday_ids=[target.id])
@@ -1,4 +1,8 @@
 from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import and_, func, insert, or_, select
+
 from .base import db
 
 class Country(db.Model):
@@ -95,3 +99,172 @@ class City(db.Model):
     def __repr__(self):
         return f'<City {self.name}>'
 
+
+
+class LocationResolver:
+    """
+    Traduce la ubicación en texto libre (país/región/ciudad) a claves canónicas:
+    código ISO 3166-1 alfa-2 del país e ids de Country/AutonomousCommunity/City.
+
+    Empleados y festivos guardan estas claves junto al texto, de modo que el
+    cruce festivo-empleado es una igualdad de enteros indexada en lugar de
+    expandir variantes de nombre ('Spain'/'España') y comparar cadenas.
+
+    ``executor`` puede ser la sesión o la conexión del flush (eventos de mapper).
+    Por defecto solo se busca en el catálogo: lo que no existe queda sin clave
+    y se cruza por texto (ver ``key_or_text``). ``create_missing`` da de alta
+    las regiones/ciudades que faltan y solo lo usan la siembra y el comando
+    ``flask backfill-location-keys``, nunca las escrituras de empleados o
+    festivos (una errata no debe acabar en el catálogo). Los resultados se
+    cachean por instancia, así que conviene reutilizar un resolver en cargas masivas.
+    """
+
+    KEY_FIELDS = ('country_code', 'country_id', 'region_id', 'city_id')
+
+    def __init__(self, executor, create_missing: bool = False):
+        self.executor = executor
+        self.create_missing = create_missing
+        self._countries = {}
+        self._regions = {}
+        self._cities = {}
+
+    @staticmethod
+    def _clean(value) -> Optional[str]:
+        value = (value or '').strip()
+        return value or None
+
+    def _insert(self, table, values) -> int:
+        result = self.executor.execute(insert(table).values(**values))
+        return result.inserted_primary_key[0]
+
+    def country(self, country) -> Dict[str, Optional[object]]:
+        """Código ISO e id de catálogo del país (cualquier formato de entrada)"""
+        from utils.country_mapper import COUNTRY_MAPPING, normalize_country_name
+
+        country = self._clean(country)
+        if not country:
+            return {'country_code': None, 'country_id': None}
+
+        _, code = normalize_country_name(country)
+        if not code:
+            return {'country_code': None, 'country_id': None}
+
+        if code not in self._countries:
+            names = COUNTRY_MAPPING[code]
+            table = Country.__table__
+            country_id = self.executor.execute(
+                select(table.c.id).where(or_(
+                    func.upper(table.c.code) == code,
+                    func.lower(table.c.name).in_([names['en'].lower(), names['es'].lower()])
+                )).order_by(table.c.id).limit(1)
+            ).scalar()
+            if country_id is None and self.create_missing:
+                # Alta inactiva: no aparece en los selectores de ubicación
+                country_id = self._insert(table, {
+                    'name': names['en'], 'code': code, 'is_active': False
+                })
+            self._countries[code] = country_id
+
+        return {'country_code': code, 'country_id': self._countries[code]}
+
+    def region(self, country_id: Optional[int], region) -> Optional[int]:
+        """Id de la comunidad autónoma / estado dentro del país"""
+        from utils.subdivisions import SUBDIVISION_CODE, name_for_code
+
+        region = self._clean(region)
+        if not region or country_id is None:
+            return None
+        # Código ISO 3166-2 ('PT-11', 'ES-MD'): se busca por el nombre de la región
+        region = name_for_code(region) or region
+
+        key = (country_id, region.lower())
+        if key not in self._regions:
+            table = AutonomousCommunity.__table__
+            region_id = self.executor.execute(
+                select(table.c.id).where(
+                    table.c.country_id == country_id,
+                    func.lower(table.c.name) == key[1]
+                ).order_by(table.c.id).limit(1)
+            ).scalar()
+            if region_id is None and self.create_missing and not SUBDIVISION_CODE.match(region):
+                region_id = self._insert(table, {'name': region, 'country_id': country_id})
+            self._regions[key] = region_id
+
+        return self._regions[key]
+
+    def city(self, region_id: Optional[int], city) -> Optional[int]:
+        """Id de la ciudad (dentro de la región si se conoce)"""
+        city = self._clean(city)
+        if not city:
+            return None
+
+        key = (region_id, city.lower())
+        if key not in self._cities:
+            table = City.__table__
+            query = select(table.c.id).where(func.lower(table.c.name) == key[1])
+            if region_id is not None:
+                query = query.where(table.c.autonomous_community_id == region_id)
+            city_id = self.executor.execute(query.order_by(table.c.id).limit(1)).scalar()
+            if city_id is None and self.create_missing and region_id is not None:
+                city_id = self._insert(table, {'name': city, 'autonomous_community_id': region_id})
+            self._cities[key] = city_id
+
+        return self._cities[key]
+
+    def resolve(self, country, region=None, city=None) -> Dict[str, Optional[object]]:
+        """Claves canónicas de una ubicación completa"""
+        keys = self.country(country)
+        keys['region_id'] = self.region(keys['country_id'], region)
+        keys['city_id'] = self.city(keys['region_id'], city)
+        return keys
+
+    def apply(self, target):
+        """Rellena las claves canónicas de un Employee/Holiday a partir de su texto"""
+        keys = self.resolve(target.country, target.region, target.city)
+        for field in self.KEY_FIELDS:
+            setattr(target, field, keys[field])
+        return keys
+
+
+def key_or_text(key_column, key, text_column, text):
+    """
+    Condición SQL de que una parte de la ubicación (país, región o ciudad)
+    coincide: por clave canónica o, si falta en algún lado (texto fuera del
+    catálogo), por texto sin distinguir mayúsculas.
+
+    ``key``/``text`` pueden ser columnas de otra tabla (cruce empleado-festivo)
+    o valores ya resueltos.
+    """
+    if hasattr(key, 'is_'):
+        return or_(
+            key_column == key,
+            and_(or_(key_column.is_(None), key.is_(None)), func.lower(text_column) == func.lower(text))
+        )
+
+    conditions = []
+    if key is not None:
+        conditions.append(key_column == key)
+    text = (text or '').strip()
+    if text:
+        text_match = func.lower(text_column) == func.lower(text)
+        conditions.append(text_match if key is None else and_(key_column.is_(None), text_match))
+    return or_(*conditions) if conditions else db.false()
+
+
+def same_location_part(key_a, key_b, text_a, text_b) -> bool:
+    """Equivalente en memoria de ``key_or_text``"""
+    if key_a is not None and key_b is not None:
+        return key_a == key_b
+    text_a = (text_a or '').strip().lower()
+    return bool(text_a) and text_a == (text_b or '').strip().lower()
+
+
+def location_changed(target) -> bool:
+    """Indica si cambió el texto de ubicación de una instancia pendiente de flush"""
+    from sqlalchemy import inspect
+
+    state = inspect(target)
+    return any(
+        state.attrs[field].history.has_changes()
+        for field in ('country', 'region', 'city')
+    )
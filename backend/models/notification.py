@@ -1,6 +1,9 @@
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import event, update, case
+from sqlalchemy.orm.attributes import get_history
 from .base import db
+from .notification_counter import NotificationCounter
 
 class NotificationType(Enum):
     """Tipos de notificación"""
@@ -424,6 +427,16 @@ class Notification(db.Model):
         db.session.add(notification)
         return notification
     
+    @classmethod
+    def priority_rank(cls):
+        """Expresión SQL para ordenar por prioridad (urgent > high > medium > low)"""
+        return case(
+            (cls._priority == 'urgent', 4),
+            (cls._priority == 'high', 3),
+            (cls._priority == 'low', 1),
+            else_=2
+        )
+    
     @classmethod
     def get_unread_for_user(cls, user_id, limit=50):
         """Obtiene notificaciones no leídas para un usuario"""
@@ -431,7 +444,7 @@ class Notification(db.Model):
             cls.user_id == user_id,
             cls.read == False
         ).order_by(
-            cls.priority.desc(),
+            cls.priority_rank().desc(),
             cls.created_at.desc()
         ).limit(limit).all()
     
@@ -452,16 +465,39 @@ class Notification(db.Model):
     @classmethod
     def mark_as_read(cls, notification_ids, user_id):
         """Marca notificaciones como leídas"""
-        cls.query.filter(
+        cls.mark_read_and_count(
             cls.id.in_(notification_ids),
             cls.user_id == user_id
-        ).update({
-            'read': True,
-            'read_at': datetime.utcnow()
-        }, synchronize_session=False)
+        )
         
         db.session.commit()
     
+    @classmethod
+    def mark_read_and_count(cls, *criteria):
+        """
+        Marca como leídas las notificaciones no leídas que cumplen ``criteria`` y
+        descuenta los contadores por prioridad con las filas realmente actualizadas.
+        No hace commit. Devuelve el número de notificaciones actualizadas.
+        """
+        rows = db.session.execute(
+            update(cls)
+            .where(cls.read == False, *criteria)
+            .values(read=True, read_at=datetime.utcnow())
+            .returning(cls.user_id, cls._priority)
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        deltas_by_user = {}
+        for user_id, priority in rows:
+            deltas = deltas_by_user.setdefault(user_id, {})
+            priority = NotificationCounter.normalize_priority(priority)
+            deltas[priority] = deltas.get(priority, 0) - 1
+        
+        for user_id, deltas in deltas_by_user.items():
+            NotificationCounter.apply_deltas(db.session, user_id, deltas)
+        
+        return len(rows)
+    
     @classmethod
     def get_pending_emails(cls, limit=100):
         """Obtiene notificaciones pendientes de envío por email"""
@@ -469,7 +505,7 @@ class Notification(db.Model):
             cls.send_email == True,
             cls.email_sent == False
         ).order_by(
-            cls._priority.desc(),
+            cls.priority_rank().desc(),
             cls.created_at.asc()
         ).limit(limit).all()
     
@@ -559,3 +595,30 @@ class Notification(db.Model):
     def __repr__(self):
         type_value = self.notification_type.value if isinstance(self.notification_type, NotificationType) else self._notification_type
         return f'<Notification {self.id} {type_value or "Unknown"}>'
+
+
+
+# Mantenimiento de contadores de no leídas (NotificationCounter) en escrituras ORM.
+# Las actualizaciones masivas usan Notification.mark_read_and_count.
+
+@event.listens_for(Notification, 'after_insert')
+def _count_new_notification(mapper, connection, target):
+    if not target.read:
+        NotificationCounter.apply_deltas(connection, target.user_id, {target._priority: 1})
+
+
+@event.listens_for(Notification, 'after_update')
+def _count_read_change(mapper, connection, target):
+    history = get_history(target, 'read')
+    if not history.added or not history.deleted:
+        return
+    was_read, is_read = bool(history.deleted[0]), bool(history.added[0])
+    if was_read != is_read:
+        NotificationCounter.apply_deltas(connection, target.user_id, {target._priority: -1 if is_read else 1})
+
+
+@event.listens_for(Notification, 'after_delete')
+def _count_deleted_notification(mapper, connection, target):
+    # Sólo si el estado está cargado; si no, la reconciliación corrige el contador
+    if target.__dict__.get('read') is False:
+        NotificationCounter.apply_deltas(connection, target.user_id, {target.__dict__.get('_priority'): -1})
@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from .base import db
+
+
+def _dialect_name(executor) -> str:
+    """Dialecto de una sesión o conexión"""
+    if hasattr(executor, 'get_bind'):
+        return executor.get_bind().dialect.name
+    return executor.dialect.name
+
+
+class NotificationCounter(db.Model):
+    """
+    Contadores desnormalizados de notificaciones no leídas por usuario y prioridad.
+
+    Se mantienen de forma atómica (UPSERT con incremento) al crear, leer o
+    eliminar notificaciones, de modo que el badge es una lectura de una fila.
+    La reconciliación periódica (``NotificationService.reconcile_notification_counters``)
+    corrige cualquier desviación.
+    """
+    __tablename__ = 'notification_counter'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    unread_urgent = db.Column(db.Integer, nullable=False, default=0)
+    unread_high = db.Column(db.Integer, nullable=False, default=0)
+    unread_medium = db.Column(db.Integer, nullable=False, default=0)
+    unread_low = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Prioridad -> columna
+    PRIORITY_COLUMNS = {
+        'urgent': 'unread_urgent',
+        'high': 'unread_high',
+        'medium': 'unread_medium',
+        'low': 'unread_low'
+    }
+
+    @classmethod
+    def normalize_priority(cls, priority) -> str:
+        """Normaliza la prioridad almacenada (igual que Notification.priority: desconocida -> medium)"""
+        value = getattr(priority, 'value', priority)
+        return value if value in cls.PRIORITY_COLUMNS else 'medium'
+
+    @classmethod
+    def apply_deltas(cls, executor, user_id: int, deltas: Dict[str, int]):
+        """
+        Aplica incrementos/decrementos por prioridad con un único UPSERT atómico.
+
+        ``executor`` puede ser la sesión o la conexión del flush (eventos de mapper).
+        Los contadores nunca bajan de cero.
+        """
+        deltas = {cls.normalize_priority(p): d for p, d in deltas.items() if d}
+        if not deltas:
+            return
+
+        dialect = _dialect_name(executor)
+        clamp = 'GREATEST' if dialect == 'postgresql' else 'MAX'
+
+        params = {'user_id': user_id, 'now': datetime.utcnow()}
+        insert_values = []
+        update_sets = []
+        for priority, column in cls.PRIORITY_COLUMNS.items():
+            delta = deltas.get(priority, 0)
+            params[f'd_{priority}'] = delta
+            params[f'i_{priority}'] = max(delta, 0)
+            insert_values.append(f':i_{priority}')
+            if delta:
+                update_sets.append(
+                    f'{column} = {clamp}(notification_counter.{column} + :d_{priority}, 0)'
+                )
+        update_sets.append('updated_at = :now')
+
+        executor.execute(text(
+            'INSERT INTO notification_counter '
+            '(user_id, unread_urgent, unread_high, unread_medium, unread_low, updated_at) '
+            f'VALUES (:user_id, {", ".join(insert_values)}, :now) '
+            f'ON CONFLICT (user_id) DO UPDATE SET {", ".join(update_sets)}'
+        ), params)
+
+    @classmethod
+    def increment_many(cls, executor, user_ids: List[int], priority, chunk_size: int = 1000):
+        """
+        Suma una notificación no leída de ``priority`` a cada usuario de ``user_ids``
+        con UPSERTs multi-fila (una sentencia por bloque), para fan-outs masivos.
+        """
+        column = cls.PRIORITY_COLUMNS[cls.normalize_priority(priority)]
+        dialect = _dialect_name(executor)
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+
+        table = cls.__table__
+        now = datetime.utcnow()
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            stmt = upsert(table).values([
+                {'user_id': user_id, column: 1, 'updated_at': now}
+                for user_id in chunk
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={column: table.c[column] + 1, 'updated_at': now}
+            )
+            executor.execute(stmt)
+
+    @property
+    def unread_total(self) -> int:
+        return (self.unread_urgent or 0) + (self.unread_high or 0) + \
+            (self.unread_medium or 0) + (self.unread_low or 0)
+
+    def priority_counts(self) -> Dict[str, int]:
+        return {
+            priority: getattr(self, column) or 0
+            for priority, column in self.PRIORITY_COLUMNS.items()
+        }
+
+    def to_dict(self):
+        counts = self.priority_counts()
+        return {
+            'user_id': self.user_id,
+            'unread_count': self.unread_total,
+            'priority_counts': counts,
+            'has_urgent': counts['urgent'] > 0,
+            'has_high': counts['high'] > 0,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<NotificationCounter user:{self.user_id} unread:{self.unread_total}>'
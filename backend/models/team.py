@@ -2,6 +2,7 @@ from datetime import datetime
 from types import SimpleNamespace
 
 from .base import db
+from .fieldsets import Field, FieldSet
 from .team_membership import TeamMembership
 from .project import project_team_link
 
@@ -44,6 +45,18 @@ class Team(db.Model):
     manager = db.relationship('Employee', foreign_keys=[manager_id], 
                              post_update=True, uselist=False)
     
+    @classmethod
+    def members_load_option(cls):
+        """
+        Opción de carga de las membresías con sus empleados (y las membresías de
+        estos) en consultas agrupadas, para que _active_memberships y to_dict no
+        lancen una query por miembro.
+        """
+        from sqlalchemy.orm import selectinload
+        from .employee import Employee
+
+        return selectinload(cls.memberships).joinedload(TeamMembership.employee).selectinload(Employee.memberships)
+
     @property
     def employee_count(self):
         """Retorna el número de empleados en el equipo considerando membresías activas."""
@@ -163,8 +176,14 @@ class Team(db.Model):
         conflicts = query.all()
         return len(conflicts), conflicts
     
-    def to_dict(self, include_employees=False):
-        """Convierte el equipo a diccionario para JSON"""
+    def to_dict(self, include_employees=False, fields=None):
+        """
+        Convierte el equipo a diccionario para JSON.
+        
+        Con ``fields`` (ver TEAM_FIELDS) solo se serializan esos campos.
+        """
+        if fields is not None:
+            return TEAM_FIELDS.serialize(self, fields)
         try:
             data = {
                 'id': self.id,
@@ -216,3 +235,39 @@ class Team(db.Model):
     
     def __repr__(self):
         return f'<Team {self.name}>'
+
+
+def _manager_loader():
+    from sqlalchemy.orm import joinedload, lazyload, load_only
+    from .employee import Employee
+    # Lo que usan manager_name, manager y employee_count; sin las relaciones de Employee
+    return joinedload(Team.manager).options(
+        load_only(Employee.id, Employee.full_name, Employee.active, Employee.team_id), lazyload('*')
+    )
+
+
+def _members_loader():
+    # employee_count mira las membresías activas y si el manager es miembro
+    return [Team.members_load_option(), _manager_loader()]
+
+
+# Campos de ``?fields=`` en los listados de equipos (mismos valores que to_dict)
+TEAM_FIELDS = FieldSet(Team, {
+    'id': Field(),
+    'name': Field(),
+    'description': Field(),
+    'manager_id': Field(),
+    'manager_name': Field(columns=['manager_id'], relationships=['manager'], loader=_manager_loader,
+                          value=lambda team: team.manager.full_name if team.manager else None),
+    'manager': Field(columns=['manager_id'], relationships=['manager'], loader=_manager_loader,
+                     value=lambda team: {
+                         'id': team.manager.id,
+                         'full_name': team.manager.full_name,
+                         'name': team.manager.full_name
+                     } if team.manager else None),
+    'active': Field(value=lambda team: True),
+    'employee_count': Field(columns=['manager_id'], relationships=['memberships', 'manager'],
+                            loader=_members_loader, value=lambda team: team.employee_count),
+    'created_at': Field(),
+    'updated_at': Field(),
+})
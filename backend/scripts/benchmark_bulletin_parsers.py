@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la capa de parseo de boletines oficiales
+
+Parsea un corpus guardado (sin red) con las reglas registradas y mide el
+rendimiento en documentos por segundo. Los ficheros del corpus se nombran
+``<regla>_<año>[_sufijo].html|txt`` (p. ej. ``dog_2026.html``).
+
+Uso:
+    python scripts/benchmark_bulletin_parsers.py
+    python scripts/benchmark_bulletin_parsers.py --iterations 200 --scale 20 --json
+    python scripts/benchmark_bulletin_parsers.py --min-docs-per-sec 50
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.parsers  # noqa: F401  (registra las reglas autonómicas)
+import services.boe_holiday_service  # noqa: F401  (registra la regla del BOE)
+from services.parsers.base import get_rule, registered_rules
+
+DEFAULT_CORPUS = Path(__file__).parent.parent / 'tests' / 'fixtures' / 'bulletins'
+
+
+def load_corpus(corpus_dir: Path, scale: int = 1) -> List[Dict]:
+    """Documentos del corpus: regla, año y texto (repetido ``scale`` veces)"""
+    # Códigos más largos primero: "boc_canarias_2026" no debe resolverse como "boc"
+    codes = sorted(registered_rules(), key=len, reverse=True)
+    documents = []
+    for path in sorted(corpus_dir.iterdir()):
+        if path.suffix not in ('.html', '.txt'):
+            continue
+        code = next((code for code in codes if path.stem.startswith(f'{code}_')), None)
+        year = path.stem[len(code) + 1:].split('_')[0] if code else ''
+        if not year.isdigit():
+            print(f"Ignorado (sin regla o año): {path.name}")
+            continue
+        text = path.read_text(encoding='utf-8')
+        documents.append({
+            'file': path.name,
+            'rule': code,
+            'year': int(year),
+            'text': '\n'.join([text] * scale)
+        })
+    return documents
+
+
+def run_benchmark(documents: List[Dict], iterations: int) -> Dict:
+    """Parsea cada documento ``iterations`` veces y agrega por regla"""
+    by_rule = {}
+    total_elapsed = 0.0
+
+    for document in documents:
+        rule = get_rule(document['rule'])
+        holidays = rule.parse(document['text'], document['year'])  # calentamiento
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            rule.parse(document['text'], document['year'])
+        elapsed = time.perf_counter() - start
+        total_elapsed += elapsed
+
+        entry = by_rule.setdefault(document['rule'], {
+            'documents': 0, 'holidays': 0, 'bytes': 0, 'seconds': 0.0
+        })
+        entry['documents'] += iterations
+        entry['holidays'] += len(holidays)
+        entry['bytes'] += len(document['text'].encode('utf-8')) * iterations
+        entry['seconds'] += elapsed
+
+    for entry in by_rule.values():
+        entry['docs_per_sec'] = round(entry['documents'] / entry['seconds'], 1) if entry['seconds'] else None
+        entry['mb_per_sec'] = round(entry['bytes'] / entry['seconds'] / 1e6, 2) if entry['seconds'] else None
+        entry['seconds'] = round(entry['seconds'], 4)
+
+    total_documents = sum(entry['documents'] for entry in by_rule.values())
+    total_bytes = sum(entry['bytes'] for entry in by_rule.values())
+    return {
+        'iterations': iterations,
+        'documents': total_documents,
+        'seconds': round(total_elapsed, 4),
+        'docs_per_sec': round(total_documents / total_elapsed, 1) if total_elapsed else None,
+        'mb_per_sec': round(total_bytes / total_elapsed / 1e6, 2) if total_elapsed else None,
+        'by_rule': by_rule
+    }
+
+
+def print_report(results: Dict):
+    """Tabla legible del resultado"""
+    print(f"{'Regla':<15} {'Docs':>7} {'Festivos':>9} {'Seg':>8} {'Docs/s':>9} {'MB/s':>7}")
+    print('-' * 60)
+    for code, entry in sorted(results['by_rule'].items()):
+        print(f"{code:<15} {entry['documents']:>7} {entry['holidays']:>9} "
+              f"{entry['seconds']:>8.3f} {entry['docs_per_sec']:>9} {entry['mb_per_sec']:>7}")
+    print('-' * 60)
+    print(f"{'TOTAL':<15} {results['documents']:>7} {'':>9} "
+          f"{results['seconds']:>8.3f} {results['docs_per_sec']:>9} {results['mb_per_sec']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de parseo de boletines oficiales')
+    parser.add_argument('--corpus', type=Path, default=DEFAULT_CORPUS, help='Directorio del corpus guardado')
+    parser.add_argument('--iterations', type=int, default=50, help='Parseos por documento')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repeticiones del texto de cada documento (simula boletines completos)')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    parser.add_argument('--min-docs-per-sec', type=float, default=None,
+                        help='Falla (código 1) si el rendimiento total queda por debajo')
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus, args.scale)
+    if not documents:
+        print(f"No hay documentos en {args.corpus}")
+        return 1
+
+    results = run_benchmark(documents, args.iterations)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print_report(results)
+
+    if args.min_docs_per_sec is not None and results['docs_per_sec'] < args.min_docs_per_sec:
+        print(f"Rendimiento por debajo del mínimo: {results['docs_per_sec']} < {args.min_docs_per_sec} docs/s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de serialización JSON de respuestas grandes
+
+Genera un dataset sintético en SQLite en memoria, construye una vez el
+calendario anual de toda la plantilla (formato completo y ``compact``) y
+mide solo la serialización de la respuesta con el proveedor JSON de Flask
+(biblioteca estándar) y con ``FastJSONProvider`` (orjson): mediana y mínimo
+en ms y tamaño en bytes de cada combinación.
+
+Uso:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --employees 200 --iterations 20 --json
+    python scripts/benchmark_json.py --min-speedup 3
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from models import db
+from services.calendar_service import CalendarService
+from synthetic_dataset import DatasetSpec, generate_dataset
+from utils.json_provider import FastJSONProvider, orjson
+
+
+def build_payloads(employees: int) -> Dict[str, Dict]:
+    """Respuestas del calendario anual (completa y compacta) ya construidas"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    spec = DatasetSpec.preset('tiny', employees=employees, teams=1)
+    with app.app_context():
+        db.create_all()
+        generate_dataset(db.session, spec)
+        return {
+            'annual': {'success': True, 'calendar': CalendarService.get_annual_calendar_data(year=spec.base_year)},
+            'annual_compact': {'success': True, 'calendar': CalendarService.get_annual_calendar_data(
+                year=spec.base_year, compact=True
+            )},
+        }
+
+
+def measure(provider, payload: Dict, iterations: int) -> Dict:
+    """Tiempo de ``provider.response`` (lo que hace ``jsonify``) sobre ``payload``"""
+    body = provider.response(payload).get_data()  # calentamiento
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        provider.response(payload)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'bytes': len(body)
+    }
+
+
+def run_benchmark(employees: int, iterations: int) -> Dict:
+    payloads = build_payloads(employees)
+    app = Flask(__name__)
+    providers = {'flask': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = FastJSONProvider(app)
+
+    results = []
+    with app.app_context():
+        for payload_name, payload in payloads.items():
+            for provider_name, provider in providers.items():
+                results.append({'payload': payload_name, 'provider': provider_name,
+                                **measure(provider, payload, iterations)})
+
+    baseline = next(result for result in results if result['payload'] == 'annual' and result['provider'] == 'flask')
+    for result in results:
+        result['speedup'] = round(baseline['median_ms'] / result['median_ms'], 1) if result['median_ms'] else None
+    return {'employees': employees, 'iterations': iterations, 'results': results}
+
+
+def print_report(report: Dict):
+    print(f"Calendario anual, {report['employees']} empleados, {report['iterations']} iteraciones")
+    print(f"{'Respuesta':<16} {'Proveedor':<10} {'Mediana ms':>11} {'Mín ms':>8} {'KB':>9} {'x':>6}")
+    print('-' * 64)
+    for result in report['results']:
+        print(f"{result['payload']:<16} {result['provider']:<10} {result['median_ms']:>11.2f} "
+              f"{result['min_ms']:>8.2f} {result['bytes'] / 1024:>9.1f} {result['speedup']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de serialización JSON')
+    parser.add_argument('--employees', type=int, default=50, help='Empleados del calendario anual')
+    parser.add_argument('--iterations', type=int, default=10, help='Serializaciones por combinación')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    parser.add_argument('--min-speedup', type=float, default=None,
+                        help='Falla (código 1) si orjson + compacto no mejora al menos esto la respuesta completa con Flask')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.employees, args.iterations)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+    if args.min_speedup is not None:
+        best = max(result['speedup'] or 0 for result in report['results'])
+        if best < args.min_speedup:
+            print(f"Mejora por debajo del mínimo: {best} < {args.min_speedup}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
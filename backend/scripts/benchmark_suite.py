@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks offline y reproducible
+
+Sustituye a performance_study.py (que medía la URL de producción con
+credenciales fijas) para comparar rendimiento entre commits:
+
+1. Reconstruye una base de datos local dedicada (PostgreSQL con
+   BENCHMARK_DATABASE_URL o SQLite en fichero) y la llena con el generador
+   sintético (scripts/synthetic_dataset.py) del tamaño pedido.
+2. Ejecuta cada escenario N veces, con la sesión limpia en cada iteración:
+   servicios (CalendarService, HoursCalculator, ForecastCalculator) llamados
+   directamente y rutas de informes a través del cliente de test de Flask
+   autenticado como admin.
+3. Informa mediana, p95 y mínimo en ms y número de consultas SQL por
+   iteración, en tabla o JSON. Con ``--compare`` muestra la variación
+   respecto a un JSON anterior.
+
+Uso:
+    python scripts/benchmark_suite.py --size small
+    python scripts/benchmark_suite.py --size medium --iterations 10 --json > base.json
+    python scripts/benchmark_suite.py --size medium --compare base.json
+
+ATENCIÓN: la base de datos de benchmark se borra (drop_all) en cada ejecución.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Añadir el directorio backend al path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryCounter:
+    """Cuenta las sentencias SQL ejecutadas mientras está activo"""
+
+    def __init__(self):
+        self.count = 0
+        self.active = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.count += 1
+
+    def install(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, 'before_cursor_execute', self)
+
+
+class Scenario:
+    """Escenario medible: nombre, tipo (service/http) y función sin argumentos (http devuelve el estado)"""
+
+    def __init__(self, name: str, kind: str, run: Callable[[], object]):
+        self.name = name
+        self.kind = kind
+        self.run = run
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(scenario: Scenario, counter: QueryCounter, session,
+                 iterations: int = 5, warmup: int = 1) -> Dict:
+    """Ejecuta un escenario y devuelve sus tiempos y consultas por iteración"""
+    timings = []
+    queries = []
+    status = None
+    error = None
+    for index in range(warmup + iterations):
+        # Sesión limpia: el mapa de identidad no debe ocultar consultas
+        session.remove()
+        counter.count = 0
+        counter.active = True
+        started = time.perf_counter()
+        try:
+            value = scenario.run()
+            if scenario.kind == 'http':
+                status = value
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            counter.active = False
+        if error:
+            break
+        if index >= warmup:
+            timings.append(elapsed)
+            queries.append(counter.count)
+
+    result = {'name': scenario.name, 'kind': scenario.kind, 'iterations': len(timings)}
+    if error:
+        result['error'] = error
+        return result
+    result.update({
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': int(statistics.median(queries)),
+    })
+    if status is not None:
+        result['status'] = status
+    return result
+
+
+def build_scenarios(app, dataset: Dict, year: int, month: int) -> List[Scenario]:
+    """Escenarios de servicios y de rutas de informes sobre el dataset generado"""
+    from models import db, User
+    from models.company import Company
+    from models.employee import Employee
+    from models.team import Team
+    from services.calendar_service import CalendarService
+    from services.hours_calculator import HoursCalculator
+    from services.forecast_calculator import ForecastCalculator
+
+    team_id = dataset['team_ids'][0]
+    employee_id = dataset['employee_ids'][0]
+    admin = db.session.get(User, dataset['admin_user_id'])
+
+    def company():
+        return db.session.query(Company).order_by(Company.id).first()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        # Sesión de Flask-Login: Flask-Security carga el usuario por fs_uniquifier
+        session['_user_id'] = admin.fs_uniquifier
+        session['_fresh'] = True
+
+    def get(url):
+        return lambda: client.get(url).status_code
+
+    return [
+        Scenario('calendar.month.team', 'service',
+                 lambda: CalendarService.get_calendar_data(team_id=team_id, year=year, month=month)),
+        Scenario('calendar.month.all', 'service',
+                 lambda: CalendarService.get_calendar_data(year=year, month=month)),
+        Scenario('calendar.annual.employee', 'service',
+                 lambda: CalendarService.get_annual_calendar_data(employee_id=employee_id, year=year)),
+        Scenario('hours.employee_efficiency', 'service',
+                 lambda: HoursCalculator.calculate_employee_efficiency(
+                     db.session.get(Employee, employee_id), year, month)),
+        Scenario('hours.team_efficiency', 'service',
+                 lambda: HoursCalculator.calculate_team_efficiency(
+                     db.session.get(Team, team_id), year, month)),
+        Scenario('hours.global_efficiency', 'service',
+                 lambda: HoursCalculator.calculate_global_efficiency(year, month)),
+        Scenario('forecast.team', 'service',
+                 lambda: ForecastCalculator.calculate_forecast_for_team(
+                     db.session.get(Team, team_id), company(), year, month)),
+        Scenario('forecast.global', 'service',
+                 lambda: ForecastCalculator.calculate_forecast_global(company(), year, month)),
+        Scenario('GET /api/reports/employee/<id>', 'http',
+                 get(f'/api/reports/employee/{employee_id}?year={year}&month={month}')),
+        Scenario('GET /api/reports/team/<id>', 'http',
+                 get(f'/api/reports/team/{team_id}?year={year}&month={month}')),
+        Scenario('GET /api/reports/dashboard', 'http',
+                 get(f'/api/reports/dashboard?year={year}&month={month}')),
+        Scenario('GET /api/dashboard/overview', 'http',
+                 get(f'/api/dashboard/overview?year={year}&month={month}')),
+        Scenario('GET /api/reports/summary', 'http', get('/api/reports/summary')),
+    ]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def format_table(report: Dict, baseline: Optional[Dict] = None) -> str:
+    """Tabla de texto; con baseline añade la variación de mediana y consultas"""
+    previous = {item['name']: item for item in (baseline or {}).get('results', [])}
+    header = f"{'Escenario':<38} {'mediana':>10} {'p95':>10} {'mín':>10} {'SQL':>6}"
+    if baseline:
+        header += f" {'Δ mediana':>11} {'Δ SQL':>7}"
+    lines = [header, '-' * len(header)]
+    for item in report['results']:
+        if 'error' in item:
+            lines.append(f"{item['name']:<38} ERROR {item['error']}")
+            continue
+        line = (f"{item['name']:<38} {item['median_ms']:>8.1f}ms {item['p95_ms']:>8.1f}ms "
+                f"{item['min_ms']:>8.1f}ms {item['queries']:>6}")
+        old = previous.get(item['name'])
+        if baseline and old and 'error' not in old:
+            change = (item['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0
+            line += f" {change:>+10.1f}% {item['queries'] - old['queries']:>+7}"
+        if item.get('status') not in (None, 200):
+            line += f"  (HTTP {item['status']})"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def configure_benchmark_environment(database: Optional[str] = None):
+    """Fija la configuración 'benchmark' antes de importar la aplicación"""
+    if database:
+        os.environ['BENCHMARK_DATABASE_URL'] = database
+    os.environ['FLASK_ENV'] = 'benchmark'
+    import app_config  # noqa: F401  (carga los .env antes de limpiar variables)
+    for variable in ('RENDER', 'SUPABASE_HOST'):
+        os.environ.pop(variable, None)
+
+
+def rebuild_dataset(app, spec, log=print):
+    """Borra la base de datos de ``app`` y la llena con el dataset sintético"""
+    from models import db
+    from synthetic_dataset import generate_dataset
+
+    with app.app_context():
+        log(f"🗄️  Reconstruyendo base de datos de benchmark ({db.engine.url.render_as_string(hide_password=True)})")
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        dataset = generate_dataset(db.session, spec)
+        generation_s = time.perf_counter() - started
+        log(f"   Dataset '{spec.employees}' empleados generado en {generation_s:.1f}s: {dataset['counts']}")
+    return dataset, generation_s
+
+
+def run_benchmarks(app, spec, iterations: int = 5, warmup: int = 1, month: int = 3,
+                   only: Optional[str] = None, log=print) -> Dict:
+    """Regenera el dataset en la base de datos de ``app`` y ejecuta los escenarios"""
+    from models import db
+
+    counter = QueryCounter()
+    dataset, generation_s = rebuild_dataset(app, spec, log)
+    with app.app_context():
+        counter.install()
+        scenarios = build_scenarios(app, dataset, spec.base_year, month)
+        if only:
+            scenarios = [scenario for scenario in scenarios if only in scenario.name]
+
+        results = []
+        for scenario in scenarios:
+            log(f"   ▶ {scenario.name}")
+            results.append(run_scenario(scenario, counter, db.session, iterations, warmup))
+        dialect = db.engine.dialect.name
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'database': dialect,
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'year': spec.base_year,
+            'month': month,
+            'spec': spec.to_dict(),
+            'generation_s': round(generation_s, 2),
+        },
+        'dataset': dataset['counts'],
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks offline sobre datos sintéticos')
+    parser.add_argument('--size', default='small', help='tiny, small, medium o large')
+    parser.add_argument('--employees', type=int, help='Sobrescribe el número de empleados del tamaño')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--month', type=int, default=3)
+    parser.add_argument('--only', help='Solo escenarios cuyo nombre contenga este texto')
+    parser.add_argument('--database', help='URL de la base de datos (por defecto BENCHMARK_DATABASE_URL o SQLite)')
+    parser.add_argument('--json', action='store_true', help='Imprime el informe en JSON')
+    parser.add_argument('--compare', help='JSON de una ejecución anterior con el que comparar')
+    args = parser.parse_args()
+
+    configure_benchmark_environment(args.database)
+    from main import app
+    from synthetic_dataset import DatasetSpec
+
+    overrides = {'employees': args.employees} if args.employees else {}
+    spec = DatasetSpec.preset(args.size, **overrides)
+    log = (lambda message: print(message, file=sys.stderr)) if args.json else print
+    report = run_benchmarks(app, spec, args.iterations, args.warmup, args.month, args.only, log)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print()
+        print(f"📊 Revisión {report['meta']['revision'] or '?'} · {report['meta']['database']} · "
+              f"{args.iterations} iteraciones")
+        print(format_table(report, baseline))
+
+    failed = [item for item in report['results'] if 'error' in item]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
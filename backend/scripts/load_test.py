@@ -0,0 +1,633 @@
+#!/usr/bin/env python3
+"""
+Generador de carga concurrente contra la aplicación arrancada en local
+
+Valida la configuración de gunicorn (workers × hilos) y del pool de
+conexiones antes de desplegar:
+
+1. Reconstruye la base de datos de benchmark con el generador sintético
+   (mismo entorno que scripts/benchmark_suite.py).
+2. Arranca gunicorn con los workers, hilos, clase de worker y tamaño de pool
+   pedidos (o usa un servidor ya arrancado con ``--target``).
+3. Lanza N usuarios virtuales (admins, managers y empleados del dataset) que
+   repiten una mezcla ponderada de tráfico real (calendario, dashboard,
+   resumen de notificaciones y alta/baja de actividades) con un tiempo de
+   reflexión exponencial entre peticiones.
+4. Informa rendimiento (peticiones/s), p50/p95/p99 por tipo de tráfico,
+   tasa de errores y saturación del pool de conexiones de cada worker
+   (``/api/admin/metrics/pool``) y, en PostgreSQL, el máximo de conexiones
+   abiertas en ``pg_stat_activity``.
+
+Uso:
+    python scripts/load_test.py --size small --users 20 --duration 60
+    python scripts/load_test.py --workers 2 --threads 4 --pool-size 5 --max-overflow 10
+    python scripts/load_test.py --worker-class gevent --worker-connections 200 --users 100
+    python scripts/load_test.py --mix calendar=50,notifications=50 --think-ms 0
+    python scripts/load_test.py --target http://127.0.0.1:5000 --skip-dataset
+
+Con ``--target`` el servidor debe ejecutarse con FLASK_ENV=benchmark (misma
+SECRET_KEY y base de datos): las sesiones se firman en este proceso.
+
+ATENCIÓN: salvo con ``--skip-dataset``, la base de datos de benchmark se
+borra (drop_all) en cada ejecución.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Añadir el directorio backend al path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_suite import _percentile, configure_benchmark_environment, rebuild_dataset
+
+# Peso relativo de cada tipo de tráfico (aproximación al uso real)
+DEFAULT_MIX = {'calendar': 35, 'notifications': 35, 'dashboard': 15, 'activity_write': 15}
+
+# Reparto de usuarios virtuales por rol
+ADMIN_SHARE = 0.1
+MANAGER_SHARE = 0.2
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """``calendar=40,dashboard=20`` -> pesos por tipo de tráfico"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Tráfico desconocido: {name}. Opciones: {', '.join(DEFAULT_MIX)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"Peso inválido para {name}: {weight!r}")
+        if mix[name] < 0:
+            raise ValueError(f"Peso negativo para {name}")
+    if not any(mix.values()):
+        raise ValueError('La mezcla de tráfico no tiene ningún peso positivo')
+    return mix
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Usuario del dataset al que representa un usuario virtual"""
+    role: str
+    user_id: int
+    fs_uniquifier: str
+    employee_id: Optional[int] = None
+    team_id: Optional[int] = None
+
+
+def load_profiles(app, dataset: Dict, users: int) -> List[UserProfile]:
+    """Reparte ``users`` usuarios virtuales entre admin, managers y empleados del dataset"""
+    from models import db, User
+    from models.employee import Employee
+    from models.team import Team
+
+    with app.app_context():
+        admin = db.session.get(User, dataset['admin_user_id'])
+        admins = [UserProfile('admin', admin.id, admin.fs_uniquifier)]
+
+        manager_ids = set()
+        managers = []
+        for team in Team.query.filter(Team.manager_id.isnot(None)).order_by(Team.id):
+            manager = team.manager
+            manager_ids.add(manager.id)
+            managers.append(UserProfile('manager', manager.user.id, manager.user.fs_uniquifier,
+                                        manager.id, team.id))
+
+        employees = [
+            UserProfile('employee', user_id, fs_uniquifier, employee_id, team_id)
+            for employee_id, team_id, user_id, fs_uniquifier in db.session.query(
+                Employee.id, Employee.team_id, User.id, User.fs_uniquifier
+            ).join(User, Employee.user_id == User.id).order_by(Employee.id)
+            if employee_id not in manager_ids
+        ]
+
+    admin_count = max(1, round(users * ADMIN_SHARE))
+    manager_count = min(len(managers), max(1, round(users * MANAGER_SHARE))) if managers else 0
+    employee_count = max(0, users - admin_count - manager_count)
+
+    def take(pool: List[UserProfile], count: int) -> List[UserProfile]:
+        # Con más usuarios virtuales que usuarios reales se reutilizan en rueda
+        return [pool[index % len(pool)] for index in range(count)] if pool else []
+
+    profiles = take(admins, admin_count) + take(managers, manager_count) + take(employees, employee_count)
+    return profiles[:users]
+
+
+def session_cookie(app, fs_uniquifier: str) -> str:
+    """Cookie de sesión firmada con la que Flask-Security autentica al usuario"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.dumps({'_user_id': fs_uniquifier, '_fresh': True})
+
+
+class LoadRecorder:
+    """Latencias y estados por tipo de petición (seguro entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.measuring = True
+
+    def record(self, name: str, seconds: float, status):
+        """``status`` es el código HTTP o el nombre de la excepción de red"""
+        if not self.measuring:
+            return
+        with self._lock:
+            self.samples[name].append(seconds)
+            self.statuses[name][status] += 1
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.statuses.clear()
+
+    @staticmethod
+    def _failed(status) -> bool:
+        return not isinstance(status, int) or status >= 500
+
+    def _stats(self, samples: List[float], statuses: Counter, elapsed: float) -> Dict:
+        count = len(samples)
+        failed = sum(n for status, n in statuses.items() if self._failed(status))
+        result = {
+            'count': count,
+            'rps': round(count / elapsed, 2) if elapsed else 0,
+            'error_rate': round(failed / count, 4) if count else 0,
+            'statuses': {str(status): n for status, n in sorted(statuses.items(), key=lambda item: str(item[0]))}
+        }
+        if samples:
+            result.update({
+                'p50_ms': round(_percentile(samples, 0.50) * 1000, 1),
+                'p95_ms': round(_percentile(samples, 0.95) * 1000, 1),
+                'p99_ms': round(_percentile(samples, 0.99) * 1000, 1),
+                'max_ms': round(max(samples) * 1000, 1),
+            })
+        return result
+
+    def summary(self, elapsed: float) -> Dict:
+        """Totales y desglose por tipo de petición en la ventana medida"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+            statuses = {name: Counter(values) for name, values in self.statuses.items()}
+        every_sample = [value for values in samples.values() for value in values]
+        every_status = sum(statuses.values(), Counter())
+        return {
+            'elapsed_s': round(elapsed, 1),
+            'total': self._stats(every_sample, every_status, elapsed),
+            'requests': {name: self._stats(samples[name], statuses[name], elapsed) for name in sorted(samples)}
+        }
+
+
+class VirtualUser:
+    """Usuario simulado: elige tráfico según la mezcla y espera entre peticiones"""
+
+    def __init__(self, profile: UserProfile, client, base_url: str, mix: Dict[str, int],
+                 recorder: LoadRecorder, team_ids: List[int], year: int,
+                 think_seconds: float = 0.5, timeout: float = 30, seed: int = 0):
+        self.profile = profile
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.recorder = recorder
+        self.team_ids = team_ids
+        self.year = year
+        self.think_seconds = think_seconds
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+
+    def _request(self, name: str, method: str, path: str, payload: Optional[Dict] = None):
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, self.base_url + path, json=payload, timeout=self.timeout)
+        except Exception as e:
+            # Errores de red (conexión rechazada, timeout) cuentan como fallo
+            self.recorder.record(name, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.recorder.record(name, time.perf_counter() - started, response.status_code)
+        return response
+
+    def _calendar(self):
+        month = self.rng.randint(1, 12)
+        team_id = self.profile.team_id
+        if self.profile.role == 'admin':
+            team_id = self.rng.choice(self.team_ids)
+        if self.profile.role == 'employee':
+            self._request('calendar', 'GET', f'/api/calendar/?year={self.year}&month={month}')
+        else:
+            self._request('calendar', 'GET', f'/api/calendar/?team_id={team_id}&year={self.year}&month={month}')
+
+    def _notifications(self):
+        self._request('notifications', 'GET', '/api/notifications/summary')
+
+    def _dashboard(self):
+        self._request('dashboard', 'GET', '/api/dashboard/overview?widgets=stats,team_performance')
+
+    def _activity_write(self):
+        """Alta de una guardia en el año siguiente (sin actividades generadas) y su baja"""
+        if self.profile.employee_id is None:
+            return
+        day = self.rng.randint(1, 28)
+        month = self.rng.randint(1, 12)
+        response = self._request('activity.create', 'POST', '/api/calendar/activities', {
+            'employee_id': self.profile.employee_id,
+            'date': f'{self.year + 1}-{month:02d}-{day:02d}',
+            'activity_type': 'G',
+            'hours': 2,
+            'start_time': '18:00',
+            'end_time': '20:00',
+            'description': 'load-test'
+        })
+        if response is not None and response.status_code == 201:
+            activity_id = response.json()['activity']['id']
+            self._request('activity.delete', 'DELETE', f'/api/calendar/activities/{activity_id}')
+
+    def step(self):
+        """Una petición (dos en las escrituras) elegida según la mezcla"""
+        name = self.rng.choices(self.names, self.weights)[0]
+        getattr(self, f'_{name}')()
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            self.step()
+            if self.think_seconds > 0:
+                # Exponencial acotada: llegadas tipo Poisson sin esperas desmesuradas
+                stop.wait(min(self.rng.expovariate(1 / self.think_seconds), self.think_seconds * 5))
+
+
+class LocalServer:
+    """gunicorn en un subproceso con la configuración 'benchmark'"""
+
+    def __init__(self, port: int, workers: int, threads: int, worker_class: str,
+                 worker_connections: int, env: Dict[str, str], log=print):
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.worker_class = worker_class
+        self.worker_connections = worker_connections
+        self.env = env
+        self.log = log
+        self.process = None
+        self.output = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def command(self) -> List[str]:
+        command = [sys.executable, '-m', 'gunicorn', 'main:app',
+                   '--bind', f'127.0.0.1:{self.port}',
+                   '--workers', str(self.workers),
+                   '--worker-class', self.worker_class,
+                   '--timeout', '120']
+        if self.worker_class == 'gthread':
+            command += ['--threads', str(self.threads)]
+        if self.worker_class in ('gevent', 'eventlet'):
+            command += ['--worker-connections', str(self.worker_connections)]
+        return command
+
+    def start(self, ready_timeout: float = 60):
+        import requests
+
+        self.output = tempfile.NamedTemporaryFile(prefix='load_test_gunicorn_', suffix='.log', delete=False)
+        self.log(f"🚀 {' '.join(self.command()[1:])}")
+        self.process = subprocess.Popen(self.command(), cwd=BACKEND_DIR, env=self.env,
+                                        stdout=self.output, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + ready_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn terminó al arrancar (código {self.process.returncode}):\n{self.tail()}")
+            try:
+                if requests.get(self.url + '/', timeout=2).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"gunicorn no respondió en {ready_timeout:.0f}s:\n{self.tail()}")
+
+    def tail(self, lines: int = 30) -> str:
+        if self.output is None:
+            return ''
+        with open(self.output.name, errors='replace') as handle:
+            return ''.join(handle.readlines()[-lines:])
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.output is not None:
+            self.output.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+class SaturationSampler:
+    """Muestrea el pool de cada worker y, en PostgreSQL, las conexiones del servidor"""
+
+    def __init__(self, client, base_url: str, database_url: Optional[str] = None, interval: float = 1.0):
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+        self.interval = interval
+        self.workers: Dict[int, Dict] = {}
+        self.database = None
+        self._engine = None
+        if database_url and database_url.startswith('postgresql'):
+            from sqlalchemy import create_engine
+            from sqlalchemy.pool import NullPool
+            self._engine = create_engine(database_url, poolclass=NullPool)
+            self.database = {'peak_connections': 0, 'peak_active': 0, 'max_connections': None}
+
+    def _sample_pool(self):
+        # Connection: close para que cada muestra pueda caer en otro worker
+        response = self.client.get(self.base_url + '/api/admin/metrics/pool',
+                                   headers={'Connection': 'close'}, timeout=5)
+        if response.status_code == 200:
+            pool = response.json()['pool']
+            self.workers[pool['pid']] = pool
+
+    def _sample_database(self):
+        from sqlalchemy import text
+        with self._engine.connect() as connection:
+            if self.database['max_connections'] is None:
+                self.database['max_connections'] = int(connection.execute(text('SHOW max_connections')).scalar())
+            rows = connection.execute(text(
+                "SELECT state, count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid() GROUP BY state"
+            )).all()
+        total = sum(count for _, count in rows)
+        active = sum(count for state, count in rows if state == 'active')
+        self.database['peak_connections'] = max(self.database['peak_connections'], total)
+        self.database['peak_active'] = max(self.database['peak_active'], active)
+
+    def sample(self):
+        try:
+            self._sample_pool()
+        except Exception:
+            pass
+        if self._engine is not None:
+            try:
+                self._sample_database()
+            except Exception:
+                pass
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            self.sample()
+            stop.wait(self.interval)
+
+    def reset_workers(self, attempts: int):
+        """Reinicia las métricas del mayor número de workers posible (best effort)"""
+        for _ in range(attempts):
+            try:
+                self.client.post(self.base_url + '/api/admin/metrics/requests/reset',
+                                 headers={'Connection': 'close'}, timeout=5)
+            except Exception:
+                pass
+        self.workers.clear()
+
+    def summary(self) -> Dict:
+        return {'workers': sorted(self.workers.values(), key=lambda pool: pool['pid']), 'database': self.database}
+
+
+def run_load(base_url: str, profiles: List[UserProfile], cookies: Dict[str, str], cookie_name: str,
+             mix: Dict[str, int], team_ids: List[int], year: int, duration: float,
+             think_seconds: float, ramp_up: float = 0, sampler: Optional[SaturationSampler] = None,
+             seed: int = 42, log=print) -> Dict:
+    """Lanza un hilo por usuario virtual durante ``duration`` segundos y resume el resultado"""
+    import requests
+
+    recorder = LoadRecorder()
+    recorder.measuring = ramp_up <= 0
+    stop = threading.Event()
+    threads = []
+
+    for index, profile in enumerate(profiles):
+        client = requests.Session()
+        client.cookies.set(cookie_name, cookies[profile.fs_uniquifier])
+        user = VirtualUser(profile, client, base_url, mix, recorder, team_ids, year,
+                           think_seconds=think_seconds, seed=seed + index)
+        threads.append(threading.Thread(target=user.run, args=(stop,), daemon=True,
+                                        name=f'vu-{index}-{profile.role}'))
+
+    sampler_thread = None
+    if sampler is not None:
+        sampler_thread = threading.Thread(target=sampler.run, args=(stop,), daemon=True, name='sampler')
+
+    log(f"👥 {len(profiles)} usuarios virtuales "
+        f"({', '.join(f'{role}={n}' for role, n in sorted(Counter(p.role for p in profiles).items()))}), "
+        f"mezcla {mix}, reflexión media {think_seconds * 1000:.0f}ms")
+    for index, thread in enumerate(threads):
+        thread.start()
+        if ramp_up > 0:
+            time.sleep(ramp_up / len(threads))
+    if ramp_up > 0:
+        # La ventana medida empieza con todos los usuarios activos
+        recorder.reset()
+        recorder.measuring = True
+        if sampler is not None:
+            sampler.reset_workers(attempts=8)
+    if sampler_thread is not None:
+        sampler_thread.start()
+
+    started = time.perf_counter()
+    stop.wait(duration)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    recorder.measuring = False
+    for thread in threads:
+        thread.join(timeout=35)
+    if sampler is not None:
+        # Última muestra con los picos de toda la ventana
+        sampler.sample()
+
+    report = recorder.summary(elapsed)
+    report['saturation'] = sampler.summary() if sampler is not None else None
+    return report
+
+
+def format_report(report: Dict) -> str:
+    """Tabla de latencias por tipo de petición y saturación del pool"""
+    header = f"{'Petición':<18} {'n':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'máx':>9} {'errores':>8}"
+    lines = [header, '-' * len(header)]
+    rows = list(report['requests'].items()) + [('TOTAL', report['total'])]
+    for name, stats in rows:
+        if not stats['count']:
+            continue
+        lines.append(f"{name:<18} {stats['count']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>7.1f}ms "
+                     f"{stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms "
+                     f"{stats['error_rate'] * 100:>7.2f}%")
+    unexpected = {status: n for status, n in report['total']['statuses'].items() if status not in ('200', '201')}
+    if unexpected:
+        lines.append(f"Respuestas no 2xx: {unexpected}")
+
+    saturation = report.get('saturation')
+    if saturation:
+        lines.append('')
+        lines.append('Pool de conexiones por worker (desde el inicio de la ventana):')
+        for pool in saturation['workers']:
+            capacity = pool['capacity'] if pool['capacity'] is not None else '∞'
+            lines.append(f"  pid {pool['pid']:<7} pico {pool['peak_in_use']}/{capacity}  "
+                         f"saturado {pool['saturated_seconds']:.1f}s ({pool['saturated_share'] * 100:.1f}%)  "
+                         f"{pool['checkouts']} préstamos")
+        if not saturation['workers']:
+            lines.append('  (sin muestras)')
+        database = saturation.get('database')
+        if database:
+            lines.append(f"PostgreSQL: pico {database['peak_connections']} conexiones "
+                         f"({database['peak_active']} activas) de max_connections={database['max_connections']}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga concurrente sobre datos sintéticos')
+    parser.add_argument('--size', default='small', help='tiny, small, medium o large')
+    parser.add_argument('--employees', type=int, help='Sobrescribe el número de empleados del tamaño')
+    parser.add_argument('--database', help='URL de la base de datos (por defecto BENCHMARK_DATABASE_URL o SQLite)')
+    parser.add_argument('--skip-dataset', action='store_true', help='Reutiliza el dataset existente')
+    parser.add_argument('--users', type=int, default=20, help='Usuarios virtuales concurrentes')
+    parser.add_argument('--duration', type=float, default=60, help='Segundos de la ventana medida')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Segundos para arrancar todos los usuarios')
+    parser.add_argument('--think-ms', type=float, default=500, help='Tiempo medio de reflexión entre peticiones')
+    parser.add_argument('--mix', help=f"Pesos del tráfico (por defecto {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--worker-class', help='gthread (por defecto con --threads > 1), sync o gevent')
+    parser.add_argument('--worker-connections', type=int, default=200)
+    parser.add_argument('--pool-size', type=int, help='pool_size de SQLAlchemy (por defecto el de producción)')
+    parser.add_argument('--max-overflow', type=int, help='max_overflow de SQLAlchemy')
+    parser.add_argument('--pool-timeout', type=int, help='pool_timeout de SQLAlchemy en segundos')
+    parser.add_argument('--port', type=int, help='Puerto del servidor local (por defecto uno libre)')
+    parser.add_argument('--target', help='URL de un servidor ya arrancado con FLASK_ENV=benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Tasa de errores (5xx o de red) a partir de la cual el script falla')
+    parser.add_argument('--json', action='store_true', help='Imprime el informe en JSON')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # El pool se fija por entorno antes de cargar la configuración
+    for option, variable in (('pool_size', 'BENCHMARK_POOL_SIZE'), ('max_overflow', 'BENCHMARK_MAX_OVERFLOW'),
+                             ('pool_timeout', 'BENCHMARK_POOL_TIMEOUT')):
+        if getattr(args, option) is not None:
+            os.environ[variable] = str(getattr(args, option))
+    configure_benchmark_environment(args.database)
+
+    from main import app
+    from models import db, Team
+    from synthetic_dataset import DatasetSpec
+
+    log = (lambda message: print(message, file=sys.stderr)) if args.json else print
+    overrides = {'employees': args.employees} if args.employees else {}
+    spec = DatasetSpec.preset(args.size, **overrides)
+
+    if args.skip_dataset:
+        from models import User
+        from synthetic_dataset import ADMIN_EMAIL
+        with app.app_context():
+            admin = User.query.filter_by(email=ADMIN_EMAIL).first()
+            if admin is None:
+                parser.error('No hay dataset sintético en la base de datos: ejecuta sin --skip-dataset')
+            dataset = {'admin_user_id': admin.id}
+    else:
+        dataset, _ = rebuild_dataset(app, spec, log)
+
+    with app.app_context():
+        team_ids = [team_id for (team_id,) in db.session.query(Team.id).order_by(Team.id)]
+        database_url = db.engine.url.render_as_string(hide_password=False)
+        engine_options = {key: value for key, value in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+                          if key in ('pool_size', 'max_overflow', 'pool_timeout')}
+        # Sin conexiones abiertas heredadas por gunicorn ni compitiendo con él
+        db.engine.dispose()
+
+    profiles = load_profiles(app, dataset, args.users)
+    cookies = {profile.fs_uniquifier: session_cookie(app, profile.fs_uniquifier) for profile in profiles}
+    admin_profile = profiles[0]
+    cookie_name = app.config['SESSION_COOKIE_NAME']
+
+    worker_class = args.worker_class or ('gthread' if args.threads > 1 else 'sync')
+    server = None
+    if args.target:
+        base_url = args.target
+    else:
+        env = dict(os.environ, FLASK_ENV='benchmark', BENCHMARK_DATABASE_URL=database_url,
+                   BENCHMARK_POOL_SIZE=str(engine_options.get('pool_size', '')),
+                   BENCHMARK_MAX_OVERFLOW=str(engine_options.get('max_overflow', '')),
+                   BENCHMARK_POOL_TIMEOUT=str(engine_options.get('pool_timeout', '')),
+                   # Vacías (no ausentes) para que los .env no activen producción
+                   RENDER='', SUPABASE_HOST='')
+        server = LocalServer(args.port or _free_port(), args.workers, args.threads, worker_class,
+                             args.worker_connections, env, log)
+        server.start()
+        base_url = server.url
+
+    import requests
+    sampler_client = requests.Session()
+    sampler_client.cookies.set(cookie_name, cookies[admin_profile.fs_uniquifier])
+    sampler = SaturationSampler(sampler_client, base_url, database_url)
+    sampler.reset_workers(attempts=max(args.workers, 1) * 4)
+
+    try:
+        report = run_load(base_url, profiles, cookies, cookie_name, mix, team_ids, spec.base_year,
+                          args.duration, args.think_ms / 1000, args.ramp_up, sampler, args.seed, log)
+    finally:
+        if server is not None:
+            server.stop()
+
+    report['meta'] = {
+        'target': args.target,
+        'workers': None if args.target else args.workers,
+        'threads': None if args.target else args.threads,
+        'worker_class': None if args.target else worker_class,
+        'pool': engine_options,
+        'users': len(profiles),
+        'think_ms': args.think_ms,
+        'ramp_up_s': args.ramp_up,
+        'mix': mix,
+        'database': database_url.split(':', 1)[0],
+        'spec': spec.to_dict(),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        meta = report['meta']
+        print()
+        if args.target:
+            print(f"📊 {args.target} · {meta['users']} usuarios · {args.duration:.0f}s")
+        else:
+            print(f"📊 {meta['workers']} workers × {meta['threads']} hilos ({worker_class}) · pool {engine_options} · "
+                  f"{meta['users']} usuarios · {args.duration:.0f}s")
+        print(format_report(report))
+
+    sys.exit(1 if report['total']['error_rate'] > args.max_error_rate else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Corpus dorado de los parsers de boletines autonómicos
+
+Graba los boletines que descarga cada parser, los reproduce sin red y compara
+los festivos extraídos con las salidas doradas guardadas. Informa por parser
+del tiempo de parseo, la memoria pico y los documentos procesados.
+
+Uso:
+    python scripts/parser_corpus.py record --parser dog --year 2026   # requiere red
+    python scripts/parser_corpus.py replay                            # informe + comparación
+    python scripts/parser_corpus.py replay --check --json             # falla si hay diferencias
+    python scripts/parser_corpus.py bless --parser dog --year 2026    # actualiza la salida dorada
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.parsers import PARSERS
+from services.parsers.corpus import (
+    compare_golden, record_parser, recorded_cassettes, replay_parser, save_golden
+)
+
+
+def _selected(args):
+    """Pares (parser, año) a procesar según los argumentos"""
+    cassettes = recorded_cassettes()
+    if args.parser:
+        cassettes = [c for c in cassettes if c['parser'] == args.parser]
+    if args.year:
+        cassettes = [c for c in cassettes if c['year'] == args.year]
+    return cassettes
+
+
+def cmd_record(args):
+    if not args.parser or not args.year:
+        print("record requiere --parser y --year")
+        return 1
+    codes = list(PARSERS) if args.parser == 'all' else [args.parser]
+    for code in codes:
+        result = record_parser(code, args.year)
+        print(f"{code}: {result['responses']} respuestas, {result['holidays']} festivos -> {result['path']}")
+    return 0
+
+
+def cmd_replay(args):
+    rows = []
+    failures = 0
+    for cassette in _selected(args):
+        result = replay_parser(cassette['parser'], cassette['year'], iterations=args.iterations)
+        diff = compare_golden(cassette['parser'], cassette['year'], result['holidays'])
+        if diff is None:
+            status = 'sin golden'
+        elif diff['missing'] or diff['unexpected']:
+            status = f"DIFF -{len(diff['missing'])} +{len(diff['unexpected'])}"
+            failures += 1
+        else:
+            status = 'ok'
+        rows.append({
+            'parser': result['parser'],
+            'year': result['year'],
+            'documents': result['documents'],
+            'holidays': len(result['holidays']),
+            'bytes': result['bytes'],
+            'parse_ms': result['parse_ms'],
+            'peak_kb': result['peak_kb'],
+            'golden': status,
+            'misses': result['misses'],
+            'diff': diff if diff and (diff['missing'] or diff['unexpected']) else None
+        })
+
+    recorded = {row['parser'] for row in rows}
+    without_corpus = sorted(code for code in PARSERS if code not in recorded)
+
+    if args.json:
+        print(json.dumps({'results': rows, 'without_corpus': without_corpus}, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'Parser':<15} {'Año':>5} {'Docs':>5} {'Festivos':>9} {'KB':>8} {'ms':>9} {'Pico KB':>9}  Golden")
+        print('-' * 78)
+        for row in rows:
+            print(f"{row['parser']:<15} {row['year']:>5} {row['documents']:>5} {row['holidays']:>9} "
+                  f"{row['bytes'] / 1024:>8.1f} {row['parse_ms']:>9.3f} {row['peak_kb']:>9.1f}  {row['golden']}")
+            for key in row['misses']:
+                print(f"    petición no grabada: {key}")
+            if row['diff']:
+                for holiday in row['diff']['missing'][:5]:
+                    print(f"    - {holiday['date']} {holiday.get('city')} {holiday['name']}")
+                for holiday in row['diff']['unexpected'][:5]:
+                    print(f"    + {holiday['date']} {holiday.get('city')} {holiday['name']}")
+        if without_corpus:
+            print(f"Sin corpus grabado: {', '.join(without_corpus)}")
+
+    return 1 if args.check and failures else 0
+
+
+def cmd_bless(args):
+    cassettes = _selected(args)
+    if not cassettes:
+        print("No hay cassettes que coincidan")
+        return 1
+    for cassette in cassettes:
+        result = replay_parser(cassette['parser'], cassette['year'], iterations=1)
+        path = save_golden(cassette['parser'], cassette['year'], result['holidays'])
+        print(f"{cassette['parser']} {cassette['year']}: {len(result['holidays'])} festivos -> {path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus dorado de los parsers de boletines')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help='Graba los boletines de un parser (requiere red)')
+    record.add_argument('--parser', help=f"Código del parser o 'all' ({', '.join(sorted(PARSERS))})")
+    record.add_argument('--year', type=int)
+    record.set_defaults(func=cmd_record)
+
+    replay = subparsers.add_parser('replay', help='Reproduce el corpus y compara con las salidas doradas')
+    replay.add_argument('--parser')
+    replay.add_argument('--year', type=int)
+    replay.add_argument('--iterations', type=int, default=5, help='Ejecuciones para la mediana de tiempo')
+    replay.add_argument('--json', action='store_true', help='Salida en JSON')
+    replay.add_argument('--check', action='store_true', help='Código 1 si alguna salida difiere')
+    replay.set_defaults(func=cmd_replay)
+
+    bless = subparsers.add_parser('bless', help='Guarda la salida actual como dorada')
+    bless.add_argument('--parser')
+    bless.add_argument('--year', type=int)
+    bless.set_defaults(func=cmd_bless)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos escalable para benchmarks y pruebas de carga
+
+A diferencia de create_realistic_data.py (unas decenas de objetos creados uno
+a uno con el ORM), aquí el volumen se parametriza (empresas, equipos,
+empleados, años de actividades, países con festivos) y las filas se insertan
+en bloque con ``INSERT`` de Core (executemany), sin eventos de mapper:
+
+- Las claves de ubicación se resuelven una vez por ubicación distinta con un
+  único LocationResolver.
+- La tabla materializada employee_holiday se reconstruye al final con una
+  sola llamada a ``EmployeeHoliday.refresh``.
+
+El generador es determinista: la misma ``DatasetSpec`` (incluida la semilla)
+produce siempre los mismos datos, de modo que los tiempos son comparables
+entre commits.
+
+Uso (necesita un contexto de aplicación):
+    from scripts.synthetic_dataset import DatasetSpec, generate_dataset
+    summary = generate_dataset(db.session, DatasetSpec.preset('medium'))
+"""
+import os
+import random
+import sys
+import uuid
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, insert, select, update
+
+# Añadir el directorio backend al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db, User, Role
+from models.company import Company
+from models.employee import Employee
+from models.team import Team
+from models.team_membership import TeamMembership
+from models.holiday import Holiday
+from models.employee_holiday import EmployeeHoliday
+from models.calendar_activity import CalendarActivity
+from models.notification import Notification
+from models.notification_counter import NotificationCounter
+from models.location import LocationResolver
+from models.user import roles_users
+
+# Ubicaciones por país: (país, región, ciudad)
+LOCATIONS = {
+    'ES': [('España', 'Madrid', 'Madrid'), ('España', 'Cataluña', 'Barcelona'),
+           ('España', 'Andalucía', 'Sevilla'), ('España', 'Comunidad Valenciana', 'Valencia'),
+           ('España', 'Galicia', 'A Coruña')],
+    'PT': [('Portugal', 'Lisboa', 'Lisboa'), ('Portugal', 'Porto', 'Porto')],
+    'FR': [('Francia', 'Île-de-France', 'Paris'), ('Francia', 'Occitanie', 'Toulouse')],
+    'DE': [('Alemania', 'Bayern', 'München'), ('Alemania', 'Berlin', 'Berlin')],
+    'IT': [('Italia', 'Lombardia', 'Milano'), ('Italia', 'Lazio', 'Roma')],
+    'MX': [('México', 'Ciudad de México', 'Ciudad de México'), ('México', 'Jalisco', 'Guadalajara')],
+}
+
+# Festivos nacionales de fecha fija (mes, día) comunes a todos los países generados
+NATIONAL_FIXED = [(1, 1, 'Año Nuevo'), (5, 1, 'Día del Trabajo'), (8, 15, 'Asunción'),
+                  (11, 1, 'Todos los Santos'), (12, 25, 'Navidad')]
+
+# Tipos de actividad y peso relativo en la muestra
+ACTIVITY_WEIGHTS = [('V', 45), ('A', 10), ('HLD', 20), ('G', 10), ('F', 10), ('C', 5)]
+
+FIRST_NAMES = ['Ana', 'Carlos', 'María', 'David', 'Laura', 'Roberto', 'Elena', 'Javier',
+               'Lucía', 'Pablo', 'Sara', 'Miguel', 'Carmen', 'Andrés', 'Paula', 'Diego']
+LAST_NAMES = ['García', 'Rodríguez', 'López', 'Martín', 'Sánchez', 'Fernández', 'Pérez',
+              'Gómez', 'Díaz', 'Moreno', 'Álvarez', 'Romero', 'Navarro', 'Torres']
+
+# Hash fijo: los usuarios sintéticos no inician sesión con contraseña
+SYNTHETIC_PASSWORD = 'synthetic-benchmark-user'
+ADMIN_EMAIL = 'admin@benchmark.local'
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Volumen y forma del conjunto de datos sintético"""
+    companies: int = 2
+    teams: int = 10
+    employees: int = 200
+    years: int = 1                    # Años de actividades hasta base_year incluido
+    base_year: int = 2025
+    countries: Tuple[str, ...] = ('ES', 'PT', 'FR')
+    activity_density: float = 0.12   # Fracción de días laborables con actividad
+    notifications_per_user: int = 5
+    seed: int = 42
+
+    @classmethod
+    def preset(cls, name: str, **overrides) -> 'DatasetSpec':
+        """Tamaños predefinidos: tiny, small, medium, large"""
+        if name not in _PRESETS:
+            raise ValueError(f"Tamaño desconocido '{name}'. Opciones: {', '.join(_PRESETS)}")
+        return replace(_PRESETS[name], **overrides)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['countries'] = list(self.countries)
+        return data
+
+
+_PRESETS = {
+    'tiny': DatasetSpec(companies=1, teams=2, employees=12, years=1, countries=('ES', 'PT'),
+                        notifications_per_user=2),
+    'small': DatasetSpec(),
+    'medium': DatasetSpec(companies=3, teams=40, employees=2000, years=2,
+                          countries=('ES', 'PT', 'FR', 'DE')),
+    'large': DatasetSpec(companies=5, teams=150, employees=10000, years=3,
+                         countries=('ES', 'PT', 'FR', 'DE', 'IT', 'MX')),
+}
+
+
+def _chunked_insert(session, model, rows: List[Dict], chunk_size: int = 5000):
+    """INSERT en bloque por trozos (executemany) sin pasar por el ORM"""
+    table = model.__table__ if hasattr(model, '__table__') else model
+    for start in range(0, len(rows), chunk_size):
+        session.execute(insert(table), rows[start:start + chunk_size])
+
+
+def _workdays(year: int) -> List[date]:
+    current = date(year, 1, 1)
+    days = []
+    while current.year == year:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+class SyntheticDatasetGenerator:
+    """Construye el conjunto de datos de una DatasetSpec sobre una sesión"""
+
+    def __init__(self, session, spec: DatasetSpec):
+        self.session = session
+        self.spec = spec
+        self.random = random.Random(spec.seed)
+        self.now = datetime(spec.base_year, 1, 1)
+        self.counts: Dict[str, int] = {}
+        unknown = [code for code in spec.countries if code not in LOCATIONS]
+        if unknown:
+            raise ValueError(f"Países sin ubicaciones sintéticas: {', '.join(unknown)}")
+
+    def _uuid(self) -> str:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4).hex
+
+    def _max_id(self, model) -> int:
+        return self.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+
+    def _ensure_roles(self) -> Dict[str, int]:
+        existing = dict(self.session.execute(select(Role.name, Role.id)).all())
+        missing = [name for name in ('admin', 'manager', 'employee') if name not in existing]
+        if missing:
+            _chunked_insert(self.session, Role, [
+                {'name': name, 'description': f'Rol {name}', 'created_at': self.now, 'updated_at': self.now}
+                for name in missing
+            ])
+            existing = dict(self.session.execute(select(Role.name, Role.id)).all())
+        return existing
+
+    def _locations(self) -> List[Dict]:
+        """Ubicaciones del dataset con sus claves canónicas ya resueltas"""
+        resolver = LocationResolver(self.session, create_missing=True)
+        locations = []
+        for code in self.spec.countries:
+            for country, region, city in LOCATIONS[code]:
+                keys = resolver.resolve(country, region, city)
+                locations.append({'country': country, 'region': region, 'city': city, **keys})
+        return locations
+
+    def _holiday_rows(self, locations: List[Dict], years: List[int]) -> List[Dict]:
+        rows = []
+        base = {'active': True, 'is_fixed': True, 'source': 'synthetic',
+                'created_at': self.now, 'updated_at': self.now}
+        countries = {}
+        for location in locations:
+            countries.setdefault(location['country_code'], location)
+
+        for year in years:
+            for code, location in countries.items():
+                for month, day, name in NATIONAL_FIXED:
+                    rows.append({**base, 'name': name, 'date': date(year, month, day),
+                                 'holiday_type': 'national', 'country': location['country'],
+                                 'country_code': code, 'country_id': location['country_id'],
+                                 'region_id': None, 'city_id': None})
+            for index, location in enumerate(locations):
+                # Un festivo regional y otro local por ubicación, en fechas distintas
+                regional = date(year, 3 + index % 6, 10 + index % 10)
+                local = date(year, 6 + index % 5, 5 + index % 20)
+                rows.append({**base, 'name': f'Día de {location["region"]}', 'date': regional,
+                             'holiday_type': 'regional', 'country': location['country'],
+                             'region': location['region'], 'country_code': location['country_code'],
+                             'country_id': location['country_id'], 'region_id': location['region_id'],
+                             'city_id': None})
+                rows.append({**base, 'name': f'Fiesta local de {location["city"]}', 'date': local,
+                             'holiday_type': 'local', 'country': location['country'],
+                             'region': location['region'], 'city': location['city'],
+                             'country_code': location['country_code'],
+                             'country_id': location['country_id'], 'region_id': location['region_id'],
+                             'city_id': location['city_id']})
+        # Claves homogéneas para el executemany
+        for row in rows:
+            row.setdefault('region', None)
+            row.setdefault('city', None)
+        return rows
+
+    def _activity_rows(self, employee_ids: List[int], years: List[int]) -> List[Dict]:
+        types = [code for code, _ in ACTIVITY_WEIGHTS]
+        weights = [weight for _, weight in ACTIVITY_WEIGHTS]
+        rows = []
+        for year in years:
+            workdays = _workdays(year)
+            per_employee = int(len(workdays) * self.spec.activity_density)
+            for employee_id in employee_ids:
+                for day in sorted(self.random.sample(workdays, per_employee)):
+                    activity_type = self.random.choices(types, weights)[0]
+                    hours = None
+                    start_time = end_time = None
+                    if activity_type in ('HLD', 'F'):
+                        hours = float(self.random.choice((1, 2, 3, 4)))
+                    elif activity_type == 'G':
+                        hours = float(self.random.choice((2, 4)))
+                        start_time = time(18, 0)
+                        end_time = time(18 + int(hours), 0)
+                    rows.append({'employee_id': employee_id, 'date': day, 'activity_type': activity_type,
+                                 'hours': hours, 'start_time': start_time, 'end_time': end_time,
+                                 'description': None, 'created_at': self.now, 'updated_at': self.now})
+        return rows
+
+    def generate(self) -> Dict:
+        """Inserta el conjunto de datos y devuelve el recuento por tabla"""
+        spec = self.spec
+        session = self.session
+        years = list(range(spec.base_year - spec.years + 1, spec.base_year + 1))
+        roles = self._ensure_roles()
+        locations = self._locations()
+
+        # Empresas
+        company_offset = self._max_id(Company)
+        _chunked_insert(session, Company, [
+            {'name': f'Empresa Sintética {company_offset + i + 1}',
+             'billing_period_start_day': 26 if i % 2 else 1,
+             'billing_period_end_day': 25 if i % 2 else 31,
+             'active': True, 'created_at': self.now, 'updated_at': self.now}
+            for i in range(spec.companies)
+        ])
+
+        # Equipos (el manager se asigna cuando existen los empleados)
+        team_offset = self._max_id(Team)
+        _chunked_insert(session, Team, [
+            {'name': f'Equipo {team_offset + i + 1}', 'description': 'Equipo sintético',
+             'created_at': self.now, 'updated_at': self.now}
+            for i in range(spec.teams)
+        ])
+        team_ids = list(session.execute(
+            select(Team.id).where(Team.id > team_offset).order_by(Team.id)
+        ).scalars())
+
+        # Usuarios: un admin y uno por empleado
+        user_offset = self._max_id(User)
+        user_rows = []
+        admin_exists = session.execute(select(User.id).where(User.email == ADMIN_EMAIL)).scalar()
+        if admin_exists is None:
+            user_rows.append({'email': ADMIN_EMAIL, 'password': SYNTHETIC_PASSWORD, 'active': True,
+                              'fs_uniquifier': self._uuid(), 'first_name': 'Admin',
+                              'last_name': 'Benchmark', 'confirmed_at': self.now,
+                              'created_at': self.now, 'updated_at': self.now})
+        names = []
+        for i in range(spec.employees):
+            first = self.random.choice(FIRST_NAMES)
+            last = self.random.choice(LAST_NAMES)
+            names.append(f'{first} {last}')
+            user_rows.append({'email': f'empleado{user_offset + i + 1}@benchmark.local',
+                              'password': SYNTHETIC_PASSWORD, 'active': True,
+                              'fs_uniquifier': self._uuid(), 'first_name': first, 'last_name': last,
+                              'confirmed_at': self.now, 'created_at': self.now, 'updated_at': self.now})
+        _chunked_insert(session, User, user_rows)
+        users = session.execute(
+            select(User.id, User.email).where(User.id > user_offset).order_by(User.id)
+        ).all()
+        admin_id = admin_exists or next(user_id for user_id, email in users if email == ADMIN_EMAIL)
+        employee_user_ids = [user_id for user_id, email in users if email != ADMIN_EMAIL]
+
+        # Empleados repartidos por equipos y ubicaciones
+        employee_offset = self._max_id(Employee)
+        employee_rows = []
+        for i, user_id in enumerate(employee_user_ids):
+            location = self.random.choice(locations)
+            summer = self.random.random() < 0.3
+            employee_rows.append({
+                'user_id': user_id, 'full_name': names[i], 'team_id': team_ids[i % len(team_ids)],
+                'hours_monday_thursday': 8.0, 'hours_friday': 7.0,
+                'hours_summer': 7.0 if summer else None, 'has_summer_schedule': summer,
+                'summer_months': '[7, 8]' if summer else None,
+                'annual_vacation_days': 22, 'annual_hld_hours': 40,
+                'hourly_rate': float(self.random.randint(25, 70)),
+                'country': location['country'], 'region': location['region'], 'city': location['city'],
+                'country_code': location['country_code'], 'country_id': location['country_id'],
+                'region_id': location['region_id'], 'city_id': location['city_id'],
+                'active': True, 'approved': True, 'approved_at': self.now,
+                'created_at': self.now, 'updated_at': self.now
+            })
+        _chunked_insert(session, Employee, employee_rows)
+        employees = session.execute(
+            select(Employee.id, Employee.team_id, Employee.user_id)
+            .where(Employee.id > employee_offset).order_by(Employee.id)
+        ).all()
+        employee_ids = [employee_id for employee_id, _, _ in employees]
+
+        _chunked_insert(session, TeamMembership, [
+            {'employee_id': employee_id, 'team_id': team_id, 'is_primary': True, 'active': True,
+             'allocation_percent': 100.0, 'created_at': self.now, 'updated_at': self.now}
+            for employee_id, team_id, _ in employees
+        ])
+
+        # Primer empleado de cada equipo como manager
+        managers = {}
+        for employee_id, team_id, user_id in employees:
+            managers.setdefault(team_id, (employee_id, user_id))
+        for team_id, (employee_id, _) in managers.items():
+            session.execute(update(Team.__table__).where(Team.__table__.c.id == team_id)
+                            .values(manager_id=employee_id))
+
+        role_rows = [] if admin_exists else [{'user_id': admin_id, 'role_id': roles['admin']}]
+        manager_user_ids = {user_id for _, user_id in managers.values()}
+        for _, _, user_id in employees:
+            role_rows.append({'user_id': user_id,
+                              'role_id': roles['manager' if user_id in manager_user_ids else 'employee']})
+        _chunked_insert(session, roles_users, role_rows)
+
+        # Festivos multipaís y actividades
+        holiday_rows = self._holiday_rows(locations, years)
+        _chunked_insert(session, Holiday, holiday_rows)
+        activity_rows = self._activity_rows(employee_ids, years)
+        _chunked_insert(session, CalendarActivity, activity_rows)
+
+        # Notificaciones (mitad sin leer) y sus contadores
+        notification_rows = []
+        unread = {}
+        for _, _, user_id in employees:
+            for n in range(spec.notifications_per_user):
+                read = n % 2 == 0
+                priority = ('low', 'medium', 'high')[n % 3]
+                notification_rows.append({
+                    'user_id': user_id, 'title': 'Notificación sintética',
+                    'message': 'Mensaje generado para benchmarks', 'notification_type': 'system_announcement',
+                    'priority': priority, 'read': read, 'send_email': False, 'email_sent': False,
+                    'created_at': self.now - timedelta(days=n)
+                })
+                if not read:
+                    counter = unread.setdefault(user_id, {'unread_low': 0, 'unread_medium': 0, 'unread_high': 0})
+                    counter[f'unread_{priority}'] += 1
+        _chunked_insert(session, Notification, notification_rows)
+        _chunked_insert(session, NotificationCounter, [
+            {'user_id': user_id, 'unread_urgent': 0, **counter, 'updated_at': self.now}
+            for user_id, counter in unread.items()
+        ])
+
+        employee_holidays = EmployeeHoliday.refresh(session, employee_ids=employee_ids)
+        session.commit()
+
+        self.counts = {
+            'companies': spec.companies,
+            'teams': len(team_ids),
+            'users': len(user_rows),
+            'employees': len(employee_ids),
+            'holidays': len(holiday_rows),
+            'calendar_activities': len(activity_rows),
+            'notifications': len(notification_rows),
+            'employee_holidays': employee_holidays,
+        }
+        return {
+            'counts': self.counts,
+            'admin_user_id': admin_id,
+            'team_ids': team_ids,
+            'employee_ids': employee_ids,
+            'years': years,
+        }
+
+
+def generate_dataset(session, spec: DatasetSpec) -> Dict:
+    """Genera el conjunto de datos de ``spec`` y devuelve recuentos e ids creados"""
+    return SyntheticDatasetGenerator(session, spec).generate()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos en la base de datos configurada')
+    parser.add_argument('--size', default='small', choices=sorted(_PRESETS))
+    parser.add_argument('--employees', type=int)
+    parser.add_argument('--teams', type=int)
+    parser.add_argument('--years', type=int)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    overrides = {key: value for key, value in (('employees', args.employees), ('teams', args.teams),
+                                               ('years', args.years), ('seed', args.seed))
+                 if value is not None}
+    dataset_spec = DatasetSpec.preset(args.size, **overrides)
+
+    from main import app
+    with app.app_context():
+        db.create_all()
+        started = datetime.now()
+        result = generate_dataset(db.session, dataset_spec)
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"✅ Datos sintéticos generados en {elapsed:.1f}s")
+        for table, count in result['counts'].items():
+            print(f"   {table}: {count}")
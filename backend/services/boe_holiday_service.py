@@ -11,9 +11,67 @@ import json
 from models.holiday import Holiday
 from models.user import db
 from models.location import City, AutonomousCommunity, Province
+from services.parsers.base import RegionRule, register_pattern, register_rule
 
 logger = logging.getLogger(__name__)
 
+CANARY_ISLANDS = (
+    'El Hierro', 'Fuerteventura', 'Gran Canaria', 'La Gomera', 'La Palma',
+    'Lanzarote', 'La Graciosa', 'Tenerife'
+)
+
+# Notas aclaratorias: "en El Hierro: el 24 de septiembre, festividad de Nuestra Señora de los Reyes".
+# El "en <lugar>" puede ir precedido de texto en la misma cláusula ("..., y en La Palma:")
+BOE_LABEL = register_pattern('boe.label', r'^(?:.*?[\s,])?en\s+(?P<place>.+)$', re.IGNORECASE)
+BOE_FESTIVITY = register_pattern('boe.festivity', r'^festividad\s+de\s+', re.IGNORECASE)
+# "En el territorio de Arán, la fiesta del día 26 de diciembre (Sant Esteve) queda
+# sustituida por la de 17 de junio (Fiesta de Arán)"
+BOE_SUBSTITUTION = register_pattern(
+    'boe.substitution',
+    r'En\s+el\s+territorio\s+de\s+([^,]+?),\s+la\s+fiesta\s+del\s+día\s+\d+\s+de\s+\w+\s+\([^)]+\)'
+    r'\s+queda\s+sustituida\s+por\s+la\s+de\s+(\d+)\s+de\s+(\w+)\s+\(([^)]+)\)',
+    re.IGNORECASE
+)
+
+
+class BOEResolutionRule(RegionRule):
+    """Regla de las resoluciones del BOE: notas "en <lugar>: el <fecha>, festividad de ..." y sustituciones"""
+
+    def __init__(self):
+        super().__init__(
+            'boe', None, 'BOE', extract_names=True,
+            label_pattern=BOE_LABEL, name_prefix=BOE_FESTIVITY
+        )
+
+    def region_for(self, place: str) -> Optional[str]:
+        if any(island in place for island in CANARY_ISLANDS):
+            return 'Canarias'
+        if 'Arán' in place or 'Aran' in place:
+            return 'Cataluña'
+        return None
+
+    def holiday_name(self, raw: Optional[str], place: str) -> Optional[str]:
+        # Solo las notas "festividad de ..." son festivos locales
+        if not raw or not BOE_FESTIVITY.match(raw.strip()):
+            return None
+        return self.clean_name(raw)
+
+    def extra_holidays(self, text: str, year: int) -> List[Dict]:
+        holidays = []
+        for match in BOE_SUBSTITUTION.finditer(text):
+            location = match.group(1).strip()
+            name = self.clean_name(match.group(4)) or f'Festivo local de {location}'
+            holiday = self.build_holiday(
+                location, None, int(match.group(2)), match.group(3), name, year
+            )
+            if holiday:
+                holiday['description'] = f'Festivo local de {location} (sustitución)'[:500]
+                holidays.append(holiday)
+        return holidays
+
+
+BOE_RULE = register_rule(BOEResolutionRule())
+
 try:
     from bs4 import BeautifulSoup
     HAS_BS4 = True
@@ -114,135 +172,13 @@ class BOEHolidayService:
         if not year:
             year = datetime.now().year
         
-        local_holidays = []
-        
         try:
-            import re
-            
-            month_names_es = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            # Patrón 1: Festivos locales de Canarias y otras islas
-            # "en El Hierro: el 24 de septiembre, festividad de Nuestra Señora de los Reyes"
-            pattern1 = r'en\s+([^:]+?):\s+el\s+(\d+)\s+de\s+(\w+),\s+festividad\s+de\s+([^;]+?)(?=\s*;|\.|$)'
-            
-            matches1 = re.finditer(pattern1, boe_text, re.IGNORECASE | re.DOTALL)
-            for match in matches1:
-                location = match.group(1).strip()
-                day = int(match.group(2))
-                month_name = match.group(3).lower().strip()
-                holiday_name = match.group(4).strip()
-                
-                # Limpiar nombre del festivo (eliminar caracteres especiales al final)
-                holiday_name = re.sub(r'\s+', ' ', holiday_name).strip()
-                # Eliminar caracteres especiales al final como », ", etc.
-                holiday_name = re.sub(r'[»"»««]+$', '', holiday_name).strip()
-                if len(holiday_name) > 200:
-                    holiday_name = holiday_name[:197] + '...'
-                
-                if month_name in month_names_es:
-                    month = month_names_es[month_name]
-                    try:
-                        holiday_date = date(year, month, day)
-                    except ValueError:
-                        logger.warning(f"Fecha inválida: {day}/{month}/{year} para {location}")
-                        continue
-                    
-                    city = location
-                    region = None
-                    
-                    # Mapear ubicaciones conocidas a regiones
-                    if any(island in location for island in ['El Hierro', 'Fuerteventura', 'Gran Canaria', 
-                                                              'La Gomera', 'La Palma', 'Lanzarote', 'La Graciosa', 'Tenerife']):
-                        region = 'Canarias'
-                    elif 'Arán' in location or 'Aran' in location:
-                        region = 'Cataluña'
-                    
-                    local_holidays.append({
-                        'name': holiday_name,
-                        'date': holiday_date.isoformat(),
-                        'city': city[:100] if city else None,
-                        'region': region[:100] if region else None,
-                        'country': 'España',
-                        'description': f'Festivo local de {location}'[:500] if location else '',
-                        'is_fixed': False
-                    })
-            
-            # Patrón 2: Sustituciones de festivos (ej: Arán)
-            # "En el territorio de Arán, la fiesta del día 26 de diciembre (Sant Esteve) queda sustituida por la de 17 de junio (Fiesta de Arán)"
-            pattern2 = r'En\s+el\s+territorio\s+de\s+([^,]+?),\s+la\s+fiesta\s+del\s+día\s+\d+\s+de\s+\w+\s+\([^)]+\)\s+queda\s+sustituida\s+por\s+la\s+de\s+(\d+)\s+de\s+(\w+)\s+\(([^)]+)\)'
-            
-            matches2 = re.finditer(pattern2, boe_text, re.IGNORECASE | re.DOTALL)
-            for match in matches2:
-                location = match.group(1).strip()
-                day = int(match.group(2))
-                month_name = match.group(3).lower().strip()
-                holiday_name = match.group(4).strip()
-                
-                # Limpiar nombre
-                holiday_name = re.sub(r'\s+', ' ', holiday_name).strip()
-                if len(holiday_name) > 200:
-                    holiday_name = holiday_name[:197] + '...'
-                
-                if month_name in month_names_es:
-                    month = month_names_es[month_name]
-                    try:
-                        holiday_date = date(year, month, day)
-                    except ValueError:
-                        logger.warning(f"Fecha inválida: {day}/{month}/{year} para {location}")
-                        continue
-                    
-                    city = location
-                    region = None
-                    
-                    if 'Arán' in location or 'Aran' in location:
-                        region = 'Cataluña'
-                    
-                    local_holidays.append({
-                        'name': holiday_name,
-                        'date': holiday_date.isoformat(),
-                        'city': city[:100] if city else None,
-                        'region': region[:100] if region else None,
-                        'country': 'España',
-                        'description': f'Festivo local de {location} (sustitución)'[:500],
-                        'is_fixed': False
-                    })
-            
-            # Patrón 3: Buscar referencias a Boletines Oficiales de CCAA que mencionan festivos locales
-            # Ejemplo: "BOC de 5 de mayo de 2025" o "DOGC de 6 de mayo de 2025"
-            # Estas referencias indican dónde están publicados los festivos locales completos
-            
-            boe_references_pattern = r'(BOC|DOGC|BOP|BORM|BOPA|BOPV|DOG|BOJA|BOCM|BOCYL|BOCA|BODA|BOCL|BOCM|BORM|BOP|BOPA|BOPV|DOG|BOE)\s+de\s+(\d+)\s+de\s+(\w+)\s+de\s+(\d{4})'
-            boe_refs = re.finditer(boe_references_pattern, boe_text, re.IGNORECASE)
-            
-            boe_references = []
-            for ref_match in boe_refs:
-                boe_type = ref_match.group(1).upper()
-                day = int(ref_match.group(2))
-                month_name = ref_match.group(3).lower().strip()
-                year_ref = int(ref_match.group(4))
-                
-                if month_name in month_names_es:
-                    month = month_names_es[month_name]
-                    boe_references.append({
-                        'type': boe_type,
-                        'date': date(year_ref, month, day),
-                        'year': year_ref
-                    })
-            
-            if boe_references:
-                logger.info(f"Referencias encontradas a Boletines Oficiales: {len(boe_references)}")
-                # Guardar referencias para procesamiento futuro
-                # TODO: Implementar scraping de estos boletines
-            
+            return BOE_RULE.parse(boe_text, year)
         except Exception as e:
             logger.error(f"Error parseando resolución del BOE: {e}")
             import traceback
             logger.error(traceback.format_exc())
-        
-        return local_holidays
+            return []
     
     def load_local_holidays_from_boe_resolutions(self, year: int = None) -> Tuple[int, List[str]]:
         """
@@ -252,8 +188,22 @@ class BOEHolidayService:
         if not year:
             year = datetime.now().year
         
-        errors = []
+        holidays_to_create, errors = self.fetch_local_holidays_from_boe_resolutions(year)
+        
         created_count = 0
+        if holidays_to_create:
+            created_count = Holiday.bulk_create_holidays(holidays_to_create)
+            logger.info(f"Cargados {created_count} festivos locales desde el BOE")
+        
+        return created_count, errors
+    
+    def fetch_local_holidays_from_boe_resolutions(self, year: int) -> Tuple[List[Dict], List[str]]:
+        """
+        Festivos locales de la resolución del BOE de un año, validados y en el
+        formato de Holiday.bulk_create_holidays, sin escribirlos
+        """
+        errors = []
+        holidays_to_create = []
         
         try:
             # URL de la resolución del BOE para el año específico
@@ -270,7 +220,7 @@ class BOEHolidayService:
             boe_id = boe_id_map.get(year)
             if not boe_id:
                 errors.append(f"No hay mapeo de BOE ID para el año {year}")
-                return 0, errors
+                return [], errors
             
             boe_url = f"https://www.boe.es/diario_boe/txt.php?id={boe_id}"
             
@@ -284,8 +234,7 @@ class BOEHolidayService:
                 local_holidays_data = self.parse_boe_resolution(boe_text, year)
                 
                 if local_holidays_data:
-                    # Cargar festivos locales encontrados
-                    created_count, parse_errors = self.load_local_holidays_from_manual_data(
+                    holidays_to_create, parse_errors = self.build_local_holidays(
                         local_holidays_data, year
                     )
                     errors.extend(parse_errors)
@@ -299,7 +248,7 @@ class BOEHolidayService:
             errors.append(f"Error en load_local_holidays_from_boe_resolutions: {e}")
             logger.error(f"Error cargando desde BOE: {e}")
         
-        return created_count, errors
+        return holidays_to_create, errors
     
     def load_local_holidays_for_cities(self, cities: List[str], year: int = None) -> Tuple[int, List[str]]:
         """
@@ -345,13 +294,27 @@ class BOEHolidayService:
         """
         if not year:
             year = datetime.now().year
-            
-        errors = []
-        created_count = 0
         
         if not holidays_data:
             return 0, ["No se proporcionaron datos de festivos"]
         
+        holidays_to_create, errors = self.build_local_holidays(holidays_data, year)
+        
+        created_count = 0
+        if holidays_to_create:
+            created_count = Holiday.bulk_create_holidays(holidays_to_create)
+            logger.info(f"Cargados {created_count} festivos locales desde datos manuales")
+        
+        return created_count, errors
+    
+    def build_local_holidays(self, holidays_data: List[Dict], year: int) -> Tuple[List[Dict], List[str]]:
+        """
+        Valida y normaliza festivos locales (formato de load_local_holidays_from_manual_data)
+        
+        Returns:
+            Tupla (festivos en el formato de Holiday.bulk_create_holidays, errores)
+        """
+        errors = []
         holidays_to_create = []
         
         for holiday_data in holidays_data:
@@ -401,12 +364,7 @@ class BOEHolidayService:
                 errors.append(f"Error procesando festivo {holiday_data.get('name', 'Unknown')}: {e}")
                 continue
         
-        # Crear festivos en lote
-        if holidays_to_create:
-            created_count = Holiday.bulk_create_holidays(holidays_to_create)
-            logger.info(f"Cargados {created_count} festivos locales desde datos manuales")
-        
-        return created_count, errors
+        return holidays_to_create, errors
     
     def load_local_holidays_from_json_file(self, file_path: str) -> Tuple[int, List[str]]:
         """
@@ -0,0 +1,90 @@
+"""
+Tiempos de arranque del worker
+
+``main.py`` anota cuándo empieza a importar módulos y ``create_app`` marca
+el final de cada fase (configuración, extensiones, servicios, blueprints...).
+El resultado queda en ``app.extensions['boot_metrics']``, se registra una vez
+en el log y se expone en las métricas de admin y de Prometheus junto con la
+memoria residente del proceso y qué dependencias pesadas se han cargado ya
+(deben cargarse en el primer uso, no al arrancar).
+"""
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Dependencias que solo usan algunas rutas o comandos: no deben cargarse al arrancar
+DEFERRED_MODULES = ('alembic', 'reportlab', 'google_auth_oauthlib', 'google.oauth2', 'sendgrid')
+
+
+def resident_memory_mb() -> Optional[float]:
+    """Memoria residente máxima del proceso en MB (None si no se puede medir)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class BootMetrics:
+    """Duración de las importaciones y de cada fase de create_app"""
+
+    def __init__(self, imports_started: Optional[float] = None, imports_finished: Optional[float] = None):
+        self.imports_ms = None
+        if imports_started is not None and imports_finished is not None:
+            self.imports_ms = round((imports_finished - imports_started) * 1000, 1)
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.create_app_ms = None
+
+    def mark(self, phase: str):
+        """Cierra la fase ``phase`` (desde la marca anterior)"""
+        now = time.perf_counter()
+        self.phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    def finish(self) -> Dict:
+        self.create_app_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        return self.to_dict()
+
+    def to_dict(self) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'imports_ms': self.imports_ms,
+            'create_app_ms': self.create_app_ms,
+            'phases_ms': dict(self.phases),
+            'rss_mb': resident_memory_mb(),
+            'deferred_modules_loaded': [name for name in DEFERRED_MODULES if name in sys.modules]
+        }
+
+    def prometheus(self) -> str:
+        """Duración de cada fase en formato de texto de Prometheus"""
+        lines = [
+            '# HELP app_boot_phase_seconds Duración de cada fase del arranque del worker',
+            '# TYPE app_boot_phase_seconds gauge',
+        ]
+        phases = dict(self.phases)
+        if self.imports_ms is not None:
+            phases = {'imports': self.imports_ms, **phases}
+        for phase, milliseconds in phases.items():
+            lines.append(f'app_boot_phase_seconds{{phase="{phase}"}} {milliseconds / 1000:.4f}')
+        return '\n'.join(lines) + '\n'
+
+
+def log_boot_metrics(metrics: BootMetrics):
+    """Resumen de una línea del arranque"""
+    data = metrics.to_dict()
+    phases = ', '.join(f'{phase} {ms:.0f}ms' for phase, ms in data['phases_ms'].items())
+    imports = f"{data['imports_ms']:.0f}ms" if data['imports_ms'] is not None else '?'
+    logger.info(
+        f"Arranque del worker {data['pid']}: imports {imports}, create_app {data['create_app_ms']:.0f}ms "
+        f"({phases}), RSS {data['rss_mb']} MB"
+    )
+    if data['deferred_modules_loaded']:
+        logger.info(f"Dependencias diferidas cargadas en el arranque: {', '.join(data['deferred_modules_loaded'])}")
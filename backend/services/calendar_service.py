@@ -8,6 +8,7 @@ from models.employee import Employee
 from models.team import Team
 from models.calendar_activity import CalendarActivity
 from models.holiday import Holiday
+from models.employee_holiday import EmployeeHoliday
 from models.user import db
 from .notification_service import NotificationService
 
@@ -39,14 +40,15 @@ class CalendarService:
                 if not employees:
                     return {'error': 'Empleado no encontrado'}
             elif team_id:
-                team = Team.query.get(team_id)
+                team = CalendarService._load_team_with_members(team_id)
                 if not team:
                     return {'error': 'Equipo no encontrado'}
-                active_employees = team.active_employees
-                employee_ids = [emp.id for emp in active_employees]
-                employees = Employee.query.options(
-                    joinedload(Employee.team)
-                ).filter(Employee.id.in_(employee_ids)).all() if employee_ids else []
+                # Los empleados ya vienen cargados con las membresías (y su equipo
+                # principal está en el mapa de identidad): no se vuelven a consultar
+                employees = sorted(
+                    {emp.id: emp for emp in team.active_employees}.values(),
+                    key=lambda emp: emp.id
+                )
             else:
                 employees = Employee.query.options(
                     joinedload(Employee.team)
@@ -54,68 +56,30 @@ class CalendarService:
             
             employee_ids = [emp.id for emp in employees]
             
-            # OPTIMIZACIÓN CRÍTICA: Cargar TODAS las actividades del mes en UNA SOLA query
+            # OPTIMIZACIÓN CRÍTICA: Cargar TODAS las actividades del año en UNA SOLA query
+            # (el mes para la vista y el año para los beneficios restantes)
+            year_start = date(year, 1, 1)
+            year_end = date(year, 12, 31)
             all_activities = []
             if employee_ids:
                 all_activities = CalendarActivity.query.filter(
                     CalendarActivity.employee_id.in_(employee_ids),
-                    CalendarActivity.date >= start_date,
-                    CalendarActivity.date <= end_date
+                    CalendarActivity.date >= year_start,
+                    CalendarActivity.date <= year_end
                 ).all()
             
             # Agrupar actividades por empleado en memoria
+            year_activities_by_employee = {}
             activities_by_employee = {}
             for activity in all_activities:
-                if activity.employee_id not in activities_by_employee:
-                    activities_by_employee[activity.employee_id] = []
-                activities_by_employee[activity.employee_id].append(activity)
-            
-            # OPTIMIZACIÓN: Precargar festivos para todos los empleados ONCE
-            from utils.country_mapper import get_country_variants
-            holidays_by_employee = {}
-            
-            # Obtener países únicos de los empleados
-            employee_countries = set()
-            for emp in employees:
-                if emp.country:
-                    variants = get_country_variants(emp.country)
-                    if variants:
-                        employee_countries.add(variants['en'])
-                        employee_countries.add(variants['es'])
-                    else:
-                        employee_countries.add(emp.country)
-            
-            # Cargar todos los festivos del mes para todos los países
-            all_holidays = []
-            if employee_countries:
-                all_holidays = Holiday.query.filter(
-                    Holiday.date >= start_date,
-                    Holiday.date <= end_date,
-                    Holiday.country.in_(employee_countries),
-                    Holiday.active == True
-                ).all()
+                year_activities_by_employee.setdefault(activity.employee_id, []).append(activity)
+                if start_date <= activity.date <= end_date:
+                    activities_by_employee.setdefault(activity.employee_id, []).append(activity)
             
-            # Agrupar festivos por empleado según su país/región/ciudad
-            for employee in employees:
-                employee_holidays_set = set()
-                variants = get_country_variants(employee.country) if employee.country else None
-                countries_to_check = []
-                
-                if variants:
-                    countries_to_check = [variants['en'], variants['es']]
-                elif employee.country:
-                    countries_to_check = [employee.country]
-                
-                for holiday in all_holidays:
-                    if holiday.country in countries_to_check:
-                        if not holiday.region:
-                            employee_holidays_set.add((holiday.date, holiday.country, ''))
-                        elif holiday.region == employee.region:
-                            employee_holidays_set.add((holiday.date, holiday.country, holiday.region or ''))
-                        elif holiday.city == employee.city:
-                            employee_holidays_set.add((holiday.date, holiday.country, holiday.city or ''))
-                
-                holidays_by_employee[employee.id] = employee_holidays_set
+            # OPTIMIZACIÓN: Precargar festivos del año para todos los empleados ONCE
+            holidays_by_employee = CalendarService._load_holidays_by_employee(
+                employees, year_start, year_end
+            )
             
             # Generar estructura del calendario
             calendar_data = CalendarService._generate_calendar_structure(year, month)
@@ -128,7 +92,8 @@ class CalendarService:
                 employee_data = CalendarService._get_employee_calendar_data(
                     employee, year, month, 
                     precached_activities=employee_activities,
-                    precached_holidays=employee_holidays
+                    precached_holidays=employee_holidays,
+                    precached_year_activities=year_activities_by_employee.get(employee.id, [])
                 )
                 calendar_data['employees'].append(employee_data)
             
@@ -137,10 +102,11 @@ class CalendarService:
                 employees, year, month
             )
             
-            # Añadir resumen del mes usando precached holidays
+            # Añadir resumen del mes usando precached activities y holidays
             calendar_data['summary'] = CalendarService._calculate_month_summary(
                 employees, year, month, 
-                precached_holidays_by_employee=holidays_by_employee
+                precached_holidays_by_employee=holidays_by_employee,
+                precached_activities_by_employee=activities_by_employee
             )
             
             return calendar_data
@@ -182,10 +148,16 @@ class CalendarService:
             'days': days
         }
     
+    @staticmethod
+    def _load_team_with_members(team_id: int) -> Optional[Team]:
+        """Carga el equipo con sus membresías y empleados (evita una query por miembro)"""
+        return Team.query.options(Team.members_load_option()).filter(Team.id == team_id).first()
+    
     @staticmethod
     def _get_employee_calendar_data(employee: Employee, year: int, month: int,
                                     precached_activities: Optional[List[CalendarActivity]] = None,
-                                    precached_holidays: Optional[set] = None) -> Dict:
+                                    precached_holidays: Optional[set] = None,
+                                    precached_year_activities: Optional[List[CalendarActivity]] = None) -> Dict:
         """Obtiene datos del calendario para un empleado específico
         
         Args:
@@ -193,7 +165,9 @@ class CalendarService:
             year: Año
             month: Mes
             precached_activities: Actividades ya cargadas (opcional, para optimización)
-            precached_holidays: Festivos ya cargados como set de tuplas (date, country, location) (opcional)
+            precached_holidays: Festivos ya cargados como set de tuplas (date, holiday_id, level) (opcional)
+            precached_year_activities: Actividades del año ya cargadas, para los beneficios
+                                       restantes (opcional; requiere festivos del año en precached_holidays)
         """
         # Usar actividades precargadas si están disponibles, sino cargar
         if precached_activities is not None:
@@ -210,104 +184,173 @@ class CalendarService:
             ).all()
         
         # Crear diccionario de actividades por fecha
-        activities_dict = {activity.date.isoformat(): activity.to_dict() for activity in activities}
+        holiday_dates = {holiday[0] for holiday in precached_holidays} if precached_holidays is not None else None
+        activities_dict = {
+            activity.date.isoformat(): activity.to_dict(holiday_dates=holiday_dates)
+            for activity in activities
+        }
         
-        # Calcular resumen del empleado para el mes usando festivos precargados
-        month_summary = employee.get_hours_summary(year, month, precached_holidays=precached_holidays)
+        # Calcular resumen del empleado para el mes usando festivos y actividades precargados
+        month_summary = employee.get_hours_summary(
+            year, month,
+            precached_holidays=precached_holidays,
+            precached_activities=activities
+        )
+        
+        if precached_year_activities is not None:
+            remaining_benefits = employee.get_remaining_benefits(
+                year,
+                precached_holidays=precached_holidays,
+                precached_activities=precached_year_activities
+            )
+        else:
+            remaining_benefits = employee.get_remaining_benefits(year)
         
         return {
             'employee': employee.to_dict(),
             'activities': activities_dict,
             'month_summary': month_summary,
-            'remaining_benefits': employee.get_remaining_benefits(year)
+            'remaining_benefits': remaining_benefits
         }
     
+    # Columnas de las filas de días en el formato compacto
+    DAY_COLUMNS = ('date', 'day', 'weekday', 'weekday_name', 'is_weekend', 'is_today')
+    
+    @staticmethod
+    def _get_compact_employees(employees: List[Employee], year: int,
+                               holidays_by_employee: Dict[int, set],
+                               activities_by_employee: Dict[int, List[CalendarActivity]]) -> Dict:
+        """Cabecera del formato compacto: columnas y empleados con sus beneficios del año"""
+        return {
+            'format': 'compact',
+            'day_columns': list(CalendarService.DAY_COLUMNS),
+            'activity_columns': list(CalendarActivity.ROW_COLUMNS),
+            'employees': [
+                {
+                    'employee': employee.to_dict(),
+                    'remaining_benefits': employee.get_remaining_benefits(
+                        year,
+                        precached_holidays=holidays_by_employee.get(employee.id),
+                        precached_activities=activities_by_employee.get(employee.id, [])
+                    )
+                }
+                for employee in employees
+            ]
+        }
+    
+    @staticmethod
+    def _get_employee_compact_month(employee: Employee, year: int, month: int,
+                                    activities: List[CalendarActivity],
+                                    precached_holidays: Optional[set]) -> Dict:
+        """Mes de un empleado en formato compacto: actividades en filas y resumen"""
+        holiday_dates = {holiday[0] for holiday in precached_holidays} if precached_holidays is not None else None
+        return {
+            'employee_id': employee.id,
+            'activities': [activity.to_row(holiday_dates) for activity in activities],
+            'month_summary': employee.get_hours_summary(
+                year, month,
+                precached_holidays=precached_holidays,
+                precached_activities=activities
+            )
+        }
+    
+    @staticmethod
+    def _load_holidays_by_employee(employees: List[Employee], start_date: date,
+                                   end_date: date) -> Dict[int, set]:
+        """
+        Carga en una sola query indexada los festivos aplicables del rango para
+        todos los empleados desde la tabla materializada employee_holiday.
+        
+        Returns:
+            Dict employee_id -> set de tuplas (date, holiday_id, level)
+        """
+        holidays_by_employee = {employee.id: set() for employee in employees}
+        
+        rows = EmployeeHoliday.for_employees(holidays_by_employee.keys(), start_date, end_date)
+        for row in rows:
+            holidays_by_employee[row.employee_id].add((row.date, row.holiday_id, row.level))
+        
+        return holidays_by_employee
+    
+    @staticmethod
+    def _load_country_holidays(employees: List[Employee], start_date: date, end_date: date) -> List[Holiday]:
+        """Festivos activos del rango en los países de los empleados (una sola query)"""
+        # Países únicos de los empleados por su código canónico (por nombre si no lo tienen)
+        country_codes = {emp.country_code for emp in employees if emp.country_code}
+        country_names = {emp.country.strip().lower() for emp in employees if not emp.country_code and emp.country}
+        if not country_codes and not country_names:
+            return []
+        
+        return Holiday.query.filter(
+            db.or_(
+                Holiday.country_code.in_(country_codes),
+                db.func.lower(Holiday.country).in_(country_names)
+            ),
+            Holiday.date >= start_date,
+            Holiday.date <= end_date,
+            Holiday.active == True
+        ).all()
+    
     @staticmethod
-    def _get_holidays_for_month(employees: List[Employee], year: int, month: int) -> List[Dict]:
-        """Obtiene festivos aplicables para los empleados en el mes"""
-        from utils.country_mapper import normalize_country_name, get_country_variants, COUNTRY_MAPPING
+    def _get_holidays_for_month(employees: List[Employee], year: int, month: int,
+                                precached_country_holidays: Optional[List[Holiday]] = None) -> List[Dict]:
+        """Obtiene festivos aplicables para los empleados en el mes
+        
+        Args:
+            precached_country_holidays: Festivos ya cargados con _load_country_holidays para
+                                        un rango que incluye el mes (opcional)
+        """
+        from utils.country_mapper import COUNTRY_MAPPING
         
         start_date = date(year, month, 1)
         _, last_day = monthrange(year, month)
         end_date = date(year, month, last_day)
         
-        # Obtener países únicos de los empleados y normalizar
-        employee_countries = list(set(emp.country for emp in employees if emp.country))
-        countries_to_search = set()  # Usar set para evitar duplicados
+        if precached_country_holidays is not None:
+            country_holidays = [
+                holiday for holiday in precached_country_holidays
+                if start_date <= holiday.date <= end_date
+            ]
+        else:
+            country_holidays = CalendarService._load_country_holidays(employees, start_date, end_date)
         
-        for country_input in employee_countries:
-            if not country_input:
-                continue
+        spanish_country_names = {names['es'] for names in COUNTRY_MAPPING.values()}
+        holidays_dict = {}  # Deduplicar: key = (fecha, país, región, ciudad)
+        
+        for holiday in country_holidays:
+            key = (
+                holiday.date,
+                holiday.country_code,
+                holiday.region_id or holiday.region or '',
+                holiday.city_id or holiday.city or ''
+            )
             
-            # Normalizar país y obtener todas las variantes
-            variants = get_country_variants(country_input)
-            if variants:
-                # Agregar nombre en inglés (formato estándar en BD)
-                countries_to_search.add(variants['en'])
-                # También agregar nombre en español por si acaso
-                countries_to_search.add(variants['es'])
-            else:
-                # Si no se encuentra en el mapeo, usar el valor original
-                countries_to_search.add(country_input)
-        
-        # Buscar festivos para todos los países posibles
-        holidays_dict = {}  # Usar dict para deduplicar: key = (date, country_normalized)
-        
-        for country in countries_to_search:
-            country_holidays = Holiday.query.filter(
-                Holiday.country == country,
-                Holiday.date >= start_date,
-                Holiday.date <= end_date,
-                Holiday.active == True
-            ).all()
+            existing = holidays_dict.get(key)
+            if existing is None:
+                # Primer festivo para esta fecha/ubicación
+                holidays_dict[key] = holiday
+                continue
             
-            for holiday in country_holidays:
-                # Normalizar el país del festivo para la clave de deduplicación
-                holiday_variants = get_country_variants(holiday.country)
-                if holiday_variants:
-                    normalized_country = holiday_variants['en']  # Usar inglés como estándar
-                else:
-                    normalized_country = holiday.country
-                
-                # Crear clave única: (fecha, país_normalizado, región, ciudad)
-                key = (str(holiday.date), normalized_country, holiday.region or '', holiday.city or '')
-                
-                # Si ya existe un festivo para esta fecha y ubicación, priorizar español
-                if key in holidays_dict:
-                    existing_holiday = holidays_dict[key]
-                    existing_country = existing_holiday.get('country', '')
-                    holiday_country = holiday.country
-                    
-                    # Priorizar festivos con nombre en español o país en español
-                    existing_is_spanish = existing_country in [v['es'] for v in COUNTRY_MAPPING.values() if v]
-                    holiday_is_spanish = holiday_country in [v['es'] for v in COUNTRY_MAPPING.values() if v]
-                    
-                    # Si el nuevo festivo es en español y el existente no, reemplazar
-                    if holiday_is_spanish and not existing_is_spanish:
-                        holidays_dict[key] = holiday.to_dict()
-                    # Si ambos son en español o ambos en inglés, mantener el que tiene nombre en español
-                    elif holiday_is_spanish == existing_is_spanish:
-                        # Verificar si el nombre del festivo está en español
-                        existing_name = existing_holiday.get('name', '')
-                        holiday_name = holiday.name
-                        
-                        # Priorizar nombres que parecen estar en español (heurística simple)
-                        # Si el nuevo tiene nombre en español y el existente no, reemplazar
-                        if any(word in holiday_name.lower() for word in ['día', 'santos', 'virgen', 'inmaculada', 'navidad', 'año nuevo']) and \
-                           not any(word in existing_name.lower() for word in ['day', 'saint', 'virgin', 'immaculate', 'christmas', 'new year']):
-                            holidays_dict[key] = holiday.to_dict()
-                else:
-                    # Primer festivo para esta fecha/ubicación
-                    holidays_dict[key] = holiday.to_dict()
-        
-        # Convertir dict a lista
-        holidays = list(holidays_dict.values())
-        
-        return holidays
+            # Si ya existe un festivo para esta fecha y ubicación, priorizar español
+            existing_is_spanish = existing.country in spanish_country_names
+            holiday_is_spanish = holiday.country in spanish_country_names
+            
+            # Si el nuevo festivo es en español y el existente no, reemplazar
+            if holiday_is_spanish and not existing_is_spanish:
+                holidays_dict[key] = holiday
+            # Si ambos son en español o ambos en inglés, mantener el que tiene nombre en español
+            elif holiday_is_spanish == existing_is_spanish:
+                # Priorizar nombres que parecen estar en español (heurística simple)
+                if any(word in holiday.name.lower() for word in ['día', 'santos', 'virgen', 'inmaculada', 'navidad', 'año nuevo']) and \
+                   not any(word in existing.name.lower() for word in ['day', 'saint', 'virgin', 'immaculate', 'christmas', 'new year']):
+                    holidays_dict[key] = holiday
+        
+        return [holiday.to_dict() for holiday in holidays_dict.values()]
     
     @staticmethod
     def _calculate_month_summary(employees: List[Employee], year: int, month: int,
-                                 precached_holidays_by_employee: Optional[Dict[int, set]] = None) -> Dict:
+                                 precached_holidays_by_employee: Optional[Dict[int, set]] = None,
+                                 precached_activities_by_employee: Optional[Dict[int, List]] = None) -> Dict:
         """Calcula resumen del mes para todos los empleados
         
         Args:
@@ -315,6 +358,7 @@ class CalendarService:
             year: Año
             month: Mes
             precached_holidays_by_employee: Dict con festivos precargados por employee_id (opcional)
+            precached_activities_by_employee: Dict con actividades precargadas por employee_id (opcional)
         """
         summary = {
             'total_employees': len(employees),
@@ -334,7 +378,13 @@ class CalendarService:
         
         for employee in employees:
             employee_holidays = precached_holidays_by_employee.get(employee.id) if precached_holidays_by_employee else None
-            emp_summary = employee.get_hours_summary(year, month, precached_holidays=employee_holidays)
+            employee_activities = precached_activities_by_employee.get(employee.id, []) \
+                if precached_activities_by_employee is not None else None
+            emp_summary = employee.get_hours_summary(
+                year, month,
+                precached_holidays=employee_holidays,
+                precached_activities=employee_activities
+            )
             
             summary['total_theoretical_hours'] += emp_summary['theoretical_hours']
             summary['total_actual_hours'] += emp_summary['actual_hours']
@@ -578,13 +628,20 @@ class CalendarService:
         elif team_id:
             query = query.join(Employee).filter(Employee.team_id == team_id)
         
-        activities = query.order_by(CalendarActivity.date).all()
+        activities = query.options(
+            joinedload(CalendarActivity.employee)
+        ).order_by(CalendarActivity.date).all()
         
-        return [activity.to_dict() for activity in activities]
+        # Festivos del rango en una consulta (hours_impact no consulta uno por actividad)
+        holiday_dates = {activity.employee_id: set() for activity in activities}
+        for row in EmployeeHoliday.for_employees(holiday_dates.keys(), start_date, end_date):
+            holiday_dates[row.employee_id].add(row.date)
+        
+        return [activity.to_dict(holiday_dates=holiday_dates[activity.employee_id]) for activity in activities]
     
     @staticmethod
     def get_annual_calendar_data(employee_id: int = None, team_id: int = None, 
-                                 year: int = None) -> Dict:
+                                 year: int = None, compact: bool = False) -> Dict:
         """Obtiene datos del calendario para todo el año con optimización máxima
         
         Este método optimiza la carga de datos anuales cargando:
@@ -593,10 +650,17 @@ class CalendarService:
         - Todos los festivos del año en una sola query
         - Agrupando datos por mes en memoria
         
+        Con ``compact`` (``?format=compact``) la respuesta es la misma en
+        forma de tablas: días y actividades como filas con las columnas en
+        ``day_columns`` / ``activity_columns``, y cada empleado (con sus
+        beneficios restantes, que son anuales) una sola vez en ``employees``
+        en lugar de repetido en los doce meses.
+        
         Args:
             employee_id: ID del empleado (opcional)
             team_id: ID del equipo (opcional)
             year: Año a obtener (por defecto año actual)
+            compact: Formato compacto en filas
             
         Returns:
             Dict con estructura: {
@@ -621,14 +685,15 @@ class CalendarService:
                 if not employees:
                     return {'error': 'Empleado no encontrado'}
             elif team_id:
-                team = Team.query.get(team_id)
+                team = CalendarService._load_team_with_members(team_id)
                 if not team:
                     return {'error': 'Equipo no encontrado'}
-                active_employees = team.active_employees
-                employee_ids = [emp.id for emp in active_employees]
-                employees = Employee.query.options(
-                    joinedload(Employee.team)
-                ).filter(Employee.id.in_(employee_ids)).all() if employee_ids else []
+                # Los empleados ya vienen cargados con las membresías (y su equipo
+                # principal está en el mapa de identidad): no se vuelven a consultar
+                employees = sorted(
+                    {emp.id: emp for emp in team.active_employees}.values(),
+                    key=lambda emp: emp.id
+                )
             else:
                 employees = Employee.query.options(
                     joinedload(Employee.team)
@@ -647,6 +712,7 @@ class CalendarService:
             
             # Agrupar actividades por empleado y por mes en memoria
             activities_by_employee_month = {}
+            activities_by_employee = {}
             for activity in all_activities:
                 emp_id = activity.employee_id
                 month = activity.date.month
@@ -654,53 +720,15 @@ class CalendarService:
                 if key not in activities_by_employee_month:
                     activities_by_employee_month[key] = []
                 activities_by_employee_month[key].append(activity)
+                activities_by_employee.setdefault(emp_id, []).append(activity)
             
             # OPTIMIZACIÓN: Precargar festivos para todo el año UNA VEZ
-            from utils.country_mapper import get_country_variants
-            holidays_by_employee = {}
-            
-            # Obtener países únicos de los empleados
-            employee_countries = set()
-            for emp in employees:
-                if emp.country:
-                    variants = get_country_variants(emp.country)
-                    if variants:
-                        employee_countries.add(variants['en'])
-                        employee_countries.add(variants['es'])
-                    else:
-                        employee_countries.add(emp.country)
-            
-            # Cargar todos los festivos del año para todos los países
-            all_holidays = []
-            if employee_countries:
-                all_holidays = Holiday.query.filter(
-                    Holiday.date >= start_date,
-                    Holiday.date <= end_date,
-                    Holiday.country.in_(employee_countries),
-                    Holiday.active == True
-                ).all()
+            holidays_by_employee = CalendarService._load_holidays_by_employee(
+                employees, start_date, end_date
+            )
             
-            # Agrupar festivos por empleado según su país/región/ciudad
-            for employee in employees:
-                employee_holidays_set = set()
-                variants = get_country_variants(employee.country) if employee.country else None
-                countries_to_check = []
-                
-                if variants:
-                    countries_to_check = [variants['en'], variants['es']]
-                elif employee.country:
-                    countries_to_check = [employee.country]
-                
-                for holiday in all_holidays:
-                    if holiday.country in countries_to_check:
-                        if not holiday.region:
-                            employee_holidays_set.add((holiday.date, holiday.country, ''))
-                        elif holiday.region == employee.region:
-                            employee_holidays_set.add((holiday.date, holiday.country, holiday.region or ''))
-                        elif holiday.city == employee.city:
-                            employee_holidays_set.add((holiday.date, holiday.country, holiday.city or ''))
-                
-                holidays_by_employee[employee.id] = employee_holidays_set
+            # Festivos del año en los países de los empleados (para visualización), una vez
+            country_holidays = CalendarService._load_country_holidays(employees, start_date, end_date)
             
             # Construir respuesta con datos agrupados por mes
             calendar_data = {
@@ -708,6 +736,10 @@ class CalendarService:
                 'year': year,
                 'months': []
             }
+            if compact:
+                calendar_data.update(CalendarService._get_compact_employees(
+                    employees, year, holidays_by_employee, activities_by_employee
+                ))
             
             # Procesar cada mes del año
             for month_num in range(1, 13):
@@ -720,6 +752,11 @@ class CalendarService:
                 
                 # Añadir datos de empleados para este mes
                 month_structure['employees'] = []
+                if compact:
+                    month_structure['days'] = [
+                        [day[column] for column in CalendarService.DAY_COLUMNS]
+                        for day in month_structure['days']
+                    ]
                 
                 for employee in employees:
                     # Obtener actividades de este empleado para este mes
@@ -729,23 +766,32 @@ class CalendarService:
                     # Obtener festivos de este empleado
                     employee_holidays = holidays_by_employee.get(employee.id)
                     
+                    if compact:
+                        month_structure['employees'].append(CalendarService._get_employee_compact_month(
+                            employee, year, month_num, employee_activities, employee_holidays
+                        ))
+                        continue
+                    
                     # Obtener datos del empleado para este mes
                     employee_data = CalendarService._get_employee_calendar_data(
                         employee, year, month_num,
                         precached_activities=employee_activities,
-                        precached_holidays=employee_holidays
+                        precached_holidays=employee_holidays,
+                        precached_year_activities=activities_by_employee.get(employee.id, [])
                     )
                     month_structure['employees'].append(employee_data)
                 
                 # Añadir festivos del mes (para visualización)
                 month_structure['holidays'] = CalendarService._get_holidays_for_month(
-                    employees, year, month_num
+                    employees, year, month_num,
+                    precached_country_holidays=country_holidays
                 )
                 
                 # Añadir resumen del mes usando festivos precargados
                 month_structure['summary'] = CalendarService._calculate_month_summary(
                     employees, year, month_num,
-                    precached_holidays_by_employee=holidays_by_employee
+                    precached_holidays_by_employee=holidays_by_employee,
+                    precached_activities_by_employee=activities_by_employee
                 )
                 
                 calendar_data['months'].append(month_structure)
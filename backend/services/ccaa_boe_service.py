@@ -2,6 +2,7 @@
 Servicio para cargar festivos locales desde Boletines Oficiales de Comunidades Autónomas
 """
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 import logging
@@ -213,6 +214,9 @@ class CCAABOEService:
         }
     }
     
+    # Boletines descargados y parseados a la vez en fetch_local_holidays_from_all_ccaas
+    MAX_PARALLEL_REGIONS = 4
+    
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
@@ -227,11 +231,35 @@ class CCAABOEService:
         if not year:
             year = datetime.now().year
         
+        local_holidays_data, errors = self.extract_local_holidays(region, year)
+        holidays_to_create, errors = self._build_extracted(local_holidays_data, errors, year)
+        created_count = Holiday.bulk_create_holidays(holidays_to_create) if holidays_to_create else 0
+        return created_count, errors
+    
+    def _build_extracted(self, local_holidays_data: List[Dict], errors: List[str],
+                         year: int) -> Tuple[List[Dict], List[str]]:
+        """Valida los festivos extraídos de un boletín y los deja listos para insertar"""
+        if not local_holidays_data:
+            return [], errors
+        
+        from services.boe_holiday_service import BOEHolidayService
+        holidays_to_create, build_errors = BOEHolidayService().build_local_holidays(
+            local_holidays_data, year
+        )
+        return holidays_to_create, errors + build_errors
+    
+    def extract_local_holidays(self, region: str, year: int, session=None) -> Tuple[List[Dict], List[str]]:
+        """
+        Descarga y parsea el boletín de una CCAA sin tocar la base de datos.
+        
+        Es seguro ejecutarlo en paralelo (un ``session`` por hilo): la
+        extracción de PDFs va al pool de procesos de ``services.parsers.pdf``.
+        """
+        session = session or self.session
         errors = []
-        created_count = 0
         
         if region not in self.BOE_URLS:
-            return 0, [f"Región '{region}' no tiene configuración de BOE"]
+            return [], [f"Región '{region}' no tiene configuración de BOE"]
         
         boe_config = self.BOE_URLS[region]
         logger.info(f"Buscando festivos locales en {boe_config['boe']} para {region} ({year})")
@@ -241,7 +269,7 @@ class CCAABOEService:
         # Usar parser específico según la CCAA
         try:
             if region == 'Galicia' and HAS_DOG_PARSER:
-                parser = DOGParser(self.session)
+                parser = DOGParser(session)
                 # Buscar URL de resolución
                 resolution_url = parser.find_resolution_url(year)
                 if not resolution_url and year == 2026:
@@ -255,82 +283,82 @@ class CCAABOEService:
                     errors.append(f"No se encontró resolución del DOG para {year}")
             
             elif region == 'Andalucía' and HAS_BOJA_PARSER:
-                parser = BOJAParser(self.session)
+                parser = BOJAParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOJA para {region}")
             
             elif region == 'Cataluña' and HAS_DOGC_PARSER:
-                parser = DOGCParser(self.session)
+                parser = DOGCParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del DOGC para {region}")
             
             elif region == 'Madrid' and HAS_BOCM_PARSER:
-                parser = BOCMParser(self.session)
+                parser = BOCMParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOCM para {region}")
             
             elif region == 'Comunidad Valenciana' and HAS_DOGV_PARSER:
-                parser = DOGVParser(self.session)
+                parser = DOGVParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del DOGV para {region}")
             
             elif region == 'País Vasco' and HAS_BOPV_PARSER:
-                parser = BOPVParser(self.session)
+                parser = BOPVParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOPV para {region}")
             
             elif region == 'Aragón' and HAS_BOA_PARSER:
-                parser = BOAParser(self.session)
+                parser = BOAParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOA para {region}")
             
             elif region == 'Asturias' and HAS_BOPA_PARSER:
-                parser = BOPAParser(self.session)
+                parser = BOPAParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOPA para {region}")
             
             elif region == 'Baleares' and HAS_BOIB_PARSER:
-                parser = BOIBParser(self.session)
+                parser = BOIBParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOIB para {region}")
             
             elif region == 'Canarias' and HAS_BOC_CANARIAS_PARSER:
-                parser = BOCCanariasParser(self.session)
+                parser = BOCCanariasParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOC Canarias para {region}")
             
             elif region == 'Cantabria' and HAS_BOC_CANTABRIA_PARSER:
-                parser = BOCCantabriaParser(self.session)
+                parser = BOCCantabriaParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOC Cantabria para {region}")
             
             elif region == 'Castilla-La Mancha' and HAS_DOCM_PARSER:
-                parser = DOCMParser(self.session)
+                parser = DOCMParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del DOCM para {region}")
             
             elif region == 'Castilla y León' and HAS_BOCYL_PARSER:
-                parser = BOCYLParser(self.session)
+                parser = BOCYLParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOCYL para {region}")
             
             elif region == 'Extremadura' and HAS_DOE_PARSER:
-                parser = DOEParser(self.session)
+                parser = DOEParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del DOE para {region}")
             
             elif region == 'Murcia' and HAS_BORM_PARSER:
-                parser = BORMParser(self.session)
+                parser = BORMParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BORM para {region}")
             
             elif region == 'Navarra' and HAS_BON_PARSER:
-                parser = BONParser(self.session)
+                parser = BONParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BON para {region}")
             
             elif region == 'La Rioja' and HAS_BOR_PARSER:
-                parser = BORParser(self.session)
+                parser = BORParser(session)
                 local_holidays_data = parser.load_local_holidays_for_year(year)
                 logger.info(f"Extraídos {len(local_holidays_data)} festivos locales del BOR para {region}")
             
@@ -344,16 +372,7 @@ class CCAABOEService:
             logger.error(error_msg)
             errors.append(error_msg)
         
-        # Cargar festivos locales encontrados
-        if local_holidays_data:
-            from services.boe_holiday_service import BOEHolidayService
-            boe_service = BOEHolidayService()
-            created_count, load_errors = boe_service.load_local_holidays_from_manual_data(
-                local_holidays_data, year
-            )
-            errors.extend(load_errors)
-        
-        return created_count, errors
+        return local_holidays_data, errors
     
     def load_local_holidays_from_all_ccaas(self, year: int = None) -> Dict:
         """
@@ -369,6 +388,24 @@ class CCAABOEService:
             'errors': []
         }
         
+        for region, (holidays_to_create, errors) in self.fetch_local_holidays_from_all_ccaas(year).items():
+            count = Holiday.bulk_create_holidays(holidays_to_create) if holidays_to_create else 0
+            results['by_region'][region] = {
+                'loaded': count,
+                'errors': errors
+            }
+            results['total_loaded'] += count
+            results['errors'].extend(errors)
+        
+        return results
+    
+    def fetch_local_holidays_from_all_ccaas(self, year: int) -> Dict[str, Tuple[List[Dict], List[str]]]:
+        """
+        Festivos locales de los Boletines de las CCAA con empleados, sin escribirlos
+        
+        Returns:
+            Dict región -> (festivos en el formato de Holiday.bulk_create_holidays, errores)
+        """
         # Obtener regiones con empleados
         from models.employee import Employee
         regions_with_employees = db.session.query(
@@ -383,14 +420,31 @@ class CCAABOEService:
         
         logger.info(f"Buscando festivos locales en {len(regions_list)} CCAA con empleados")
         
-        for region in regions_list:
-            if region in self.BOE_URLS:
-                count, errors = self.search_local_holidays_in_ccaa_boe(region, year)
-                results['by_region'][region] = {
-                    'loaded': count,
-                    'errors': errors
+        # Descarga y parseo en paralelo (red + pool de PDFs); la validación y la
+        # carga en BD, en este hilo con su sesión
+        regions_list = [region for region in regions_list if region in self.BOE_URLS]
+        extracted = {}
+        if regions_list:
+            with ThreadPoolExecutor(max_workers=min(len(regions_list), self.MAX_PARALLEL_REGIONS)) as executor:
+                futures = {
+                    executor.submit(self._extract_with_own_session, region, year): region
+                    for region in regions_list
                 }
-                results['total_loaded'] += count
-                results['errors'].extend(errors)
+                for future in as_completed(futures):
+                    extracted[futures[future]] = future.result()
         
-        return results
+        return {
+            region: self._build_extracted(*extracted[region], year)
+            for region in regions_list
+        }
+    
+    def _extract_with_own_session(self, region: str, year: int) -> Tuple[List[Dict], List[str]]:
+        session = requests.Session()
+        session.headers.update(self.session.headers)
+        try:
+            return self.extract_local_holidays(region, year, session)
+        except Exception as e:
+            logger.error(f"Error extrayendo festivos de {region}: {e}")
+            return [], [f"Error procesando {region}: {e}"]
+        finally:
+            session.close()
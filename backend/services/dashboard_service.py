@@ -0,0 +1,534 @@
+"""
+Dashboard compuesto: todos los widgets en una sola petición
+
+El dashboard pedía por separado estadísticas, informe de eficiencia,
+resumen de notificaciones y próximas actividades, y cada endpoint volvía a
+resolver el empleado, los equipos y los roles del usuario. Aquí:
+
+- ``DashboardPrincipal`` resuelve una vez al usuario: roles, empleado (con
+  su equipo) y equipos que puede ver.
+- Los contadores salen de consultas agrupadas (``GROUP BY`` y ``COUNT``
+  condicionales), no de un ``COUNT`` por equipo.
+- El rendimiento por equipo (lo más caro) se calcula en bloque con
+  actividades y festivos precargados y se cachea en ``widget_cache`` durante
+  ``DASHBOARD_CACHE_TTL`` segundos por (widget, usuario, rol, año, mes). Las
+  estadísticas de admin y manager toman de ahí su eficiencia. La caché se
+  invalida al confirmar cambios en actividades, equipos, membresías,
+  empleados o festivos; las escrituras masivas (``query.update``) no pasan
+  por la sesión y quedan cubiertas sólo por el TTL.
+- ``build_dashboard`` ejecuta los widgets pedidos, cada uno aislado (un
+  fallo deja ese widget a None con un mensaje genérico en ``errors`` y la
+  excepción en el log), y mide su tiempo y sus consultas SQL con su propio
+  contador (no depende de que el middleware de métricas esté activo).
+"""
+import logging
+import threading
+import time
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload, lazyload, selectinload
+
+from models.base import db
+from models.calendar_activity import CalendarActivity
+from models.employee import Employee
+from models.employee_holiday import EmployeeHoliday
+from models.holiday import Holiday
+from models.notification import Notification
+from models.team import Team
+from models.team_membership import TeamMembership
+from services.calendar_service import CalendarService
+from services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+WIDGETS = ('stats', 'team_performance', 'notifications', 'upcoming')
+ROLE_HIERARCHY = ('admin', 'manager', 'employee', 'viewer')
+# Lo que ve el cliente de un widget que falla; la excepción sólo va al log
+WIDGET_ERROR_MESSAGE = 'Error calculando el widget'
+
+# Clave en session.info: la transacción tocó datos de los que dependen los widgets
+STALE_WIDGETS_KEY = '_dashboard_widgets_stale'
+# Modelos cuyos cambios dejan obsoleto el rendimiento por equipo
+TRACKED_MODELS = (CalendarActivity, Team, TeamMembership, Employee, Holiday)
+
+
+class WidgetCache:
+    """Widgets calculados por (widget, usuario, rol, parámetros), en el proceso con TTL"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(widget: str, principal: 'DashboardPrincipal', params: Hashable = ()) -> Tuple:
+        return (widget, principal.user.id, principal.role, params)
+
+    def get_or_compute(self, widget: str, principal: 'DashboardPrincipal', params: Hashable,
+                       compute: Callable[[], Any], ttl: float) -> Tuple[Any, bool]:
+        """Valor del widget y si vino de caché"""
+        key = self.key_for(widget, principal, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < ttl:
+                self._entries.move_to_end(key)
+                return entry[1], True
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value, False
+
+    def invalidate(self, widget: Optional[str] = None, user_id: Optional[int] = None) -> int:
+        """Descarta las entradas del widget y/o del usuario (todas si no se indica nada)"""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (widget is None or key[0] == widget) and (user_id is None or key[1] == user_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self.invalidate()
+
+
+widget_cache = WidgetCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_widgets_stale(session, flush_context):
+    if STALE_WIDGETS_KEY in session.info:
+        return
+    if any(isinstance(instance, TRACKED_MODELS)
+           for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info[STALE_WIDGETS_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(STALE_WIDGETS_KEY, None):
+        widget_cache.invalidate('team_performance')
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(STALE_WIDGETS_KEY, None)
+
+
+# Sentencias SQL del widget en curso, por hilo (None = no se está midiendo)
+_widget_sql = threading.local()
+_sql_listener_installed = False
+_sql_listener_lock = threading.Lock()
+
+
+def _count_widget_statement(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_widget_sql, 'count', None) is not None:
+        _widget_sql.count += 1
+
+
+def install_widget_sql_listener():
+    """Cuenta las sentencias de todos los engines mientras se mide un widget (una sola vez)"""
+    global _sql_listener_installed
+    with _sql_listener_lock:
+        if _sql_listener_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _count_widget_statement)
+        _sql_listener_installed = True
+
+
+class DashboardPrincipal:
+    """Usuario del dashboard resuelto una vez: roles, empleado y equipos visibles"""
+
+    def __init__(self, user, roles: Iterable[str], employee: Optional[Employee],
+                 team_ids: Optional[List[int]]):
+        self.user = user
+        self.roles = set(roles)
+        self.employee = employee
+        # None = todos los equipos (admin)
+        self.team_ids = team_ids
+
+    @property
+    def role(self) -> Optional[str]:
+        return next((role for role in ROLE_HIERARCHY if role in self.roles), None)
+
+    @property
+    def is_admin(self) -> bool:
+        return 'admin' in self.roles
+
+    @property
+    def is_manager(self) -> bool:
+        return 'manager' in self.roles
+
+    @classmethod
+    def resolve(cls, user) -> 'DashboardPrincipal':
+        roles = [role.name for role in user.roles]
+        # Solo el empleado y su equipo: las relaciones selectin no hacen falta aquí
+        employee = Employee.query.options(
+            joinedload(Employee.team).lazyload('*'), lazyload('*')
+        ).filter(Employee.user_id == user.id).first()
+
+        if 'admin' in roles:
+            team_ids = None
+        elif 'manager' in roles and employee:
+            # Equipos gestionados más el propio, en una consulta
+            team_ids = [team_id for team_id, in db.session.query(Team.id).filter(
+                Team.manager_id == employee.id
+            ).order_by(Team.id)]
+            if employee.team_id and employee.team_id not in team_ids:
+                team_ids.append(employee.team_id)
+        else:
+            team_ids = [employee.team_id] if employee and employee.team_id else []
+        return cls(user, roles, employee, team_ids)
+
+
+def _recent_activity(query) -> List[Dict]:
+    """Últimas 5 notificaciones de la consulta como actividad reciente"""
+    notifications = query.order_by(Notification.created_at.desc()).limit(5).all()
+    return [{
+        'type': notif.notification_type.value if notif.notification_type else 'unknown',
+        'message': notif.message,
+        'timestamp': notif.created_at.isoformat() if notif.created_at else None
+    } for notif in notifications]
+
+
+def _pending_condition():
+    # approved es boolean: False = pendiente, True = aprobado
+    return and_(Employee.active == True, Employee.approved == False)
+
+
+def _average_efficiency(performance: List[Dict]) -> float:
+    """Media de los equipos con eficiencia (como /api/reports/dashboard)"""
+    efficiencies = [team['efficiency'] for team in performance if team['efficiency'] > 0]
+    return round(sum(efficiencies) / len(efficiencies), 2) if efficiencies else 0
+
+
+def admin_stats(performance: List[Dict]) -> Dict:
+    """Estadísticas globales: totales y miembros por equipo en dos consultas agrupadas"""
+    total_employees, pending_approvals = db.session.query(
+        func.count(Employee.id),
+        func.count(case((_pending_condition(), Employee.id)))
+    ).one()
+
+    teams = db.session.query(Team.id, Team.name, func.count(Employee.id)).outerjoin(
+        Employee, and_(Employee.team_id == Team.id, Employee.active == True, Employee.approved == True)
+    ).group_by(Team.id, Team.name).order_by(Team.id).all()
+    total_teams = len(teams)
+    efficiency_by_team = {team['team_id']: team['efficiency'] for team in performance}
+
+    alerts = []
+    if pending_approvals > 0:
+        alerts.append({
+            'type': 'warning',
+            'message': f'Hay {pending_approvals} empleado(s) pendiente(s) de aprobación',
+            'action': 'review_employees'
+        })
+    if total_teams == 0:
+        alerts.append({
+            'type': 'info',
+            'message': 'No hay equipos creados. Crea el primer equipo.',
+            'action': 'create_team'
+        })
+
+    return {
+        'type': 'admin',
+        'statistics': {
+            'total_employees': total_employees,
+            'total_teams': total_teams,
+            'pending_approvals': pending_approvals,
+            'global_efficiency': _average_efficiency(performance)
+        },
+        'recent_activity': _recent_activity(Notification.query),
+        'team_performance': [{
+            'team_id': team_id,
+            'team_name': name,
+            'members_count': members,
+            'efficiency': efficiency_by_team.get(team_id, 0)
+        } for team_id, name, members in teams],
+        'alerts': alerts
+    }
+
+
+def manager_stats(team_ids: List[int], performance: List[Dict]) -> Dict:
+    """Estadísticas de los equipos del manager con un COUNT condicional"""
+    in_teams = Employee.team_id.in_(team_ids)
+    team_members, pending_approvals = db.session.query(
+        func.count(case((and_(Employee.active == True, Employee.approved == True), Employee.id))),
+        func.count(case((_pending_condition(), Employee.id)))
+    ).filter(in_teams).one()
+
+    team_user_ids = db.session.query(Employee.user_id).filter(in_teams)
+    recent_activity = _recent_activity(Notification.query.filter(Notification.user_id.in_(team_user_ids)))
+
+    alerts = []
+    if pending_approvals > 0:
+        alerts.append({
+            'type': 'warning',
+            'message': f'Hay {pending_approvals} empleado(s) de tu equipo pendiente(s) de aprobación',
+            'action': 'review_team_employees'
+        })
+
+    team_efficiency = _average_efficiency(performance)
+    return {
+        'type': 'manager',
+        'statistics': {
+            'managed_teams': len(team_ids),
+            'team_members': team_members,
+            'total_employees': team_members,
+            'pending_approvals': pending_approvals,
+            'team_efficiency': team_efficiency,
+            'average_efficiency': team_efficiency,  # Alias para compatibilidad
+            'projects': 0
+        },
+        'team_stats': {
+            'members': team_members,
+            'efficiency': team_efficiency
+        },
+        'recent_activity': recent_activity,
+        'alerts': alerts,
+        'pending_requests': []  # Asegurar que siempre existe como array
+    }
+
+
+def _days_worked(year: int, month: int, holiday_dates: set, activities: List[CalendarActivity]) -> int:
+    """Laborables del mes (lunes a viernes no festivos) sin vacaciones, ausencia ni otros"""
+    days_off = {activity.date for activity in activities if activity.activity_type in ('V', 'A', 'C')}
+    start_date = date(year, month, 1)
+    return sum(
+        1 for offset in range(monthrange(year, month)[1])
+        if (day := start_date + timedelta(days=offset)).weekday() < 5
+        and day not in holiday_dates and day not in days_off
+    )
+
+
+def employee_stats(employee: Employee, year: int, month: int) -> Dict:
+    """Estadísticas personales del empleado ya cargado (festivos y actividades del año en dos consultas)"""
+    start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+    holidays = {
+        (row.date, row.holiday_id, row.level)
+        for row in EmployeeHoliday.for_employees([employee.id], start_date, end_date)
+    }
+    activities = CalendarActivity.query.filter(
+        CalendarActivity.employee_id == employee.id,
+        CalendarActivity.date >= start_date,
+        CalendarActivity.date <= end_date
+    ).all()
+
+    annual = employee.get_hours_summary(year, precached_holidays=holidays, precached_activities=activities)
+    monthly = employee.get_hours_summary(year, month, precached_holidays=holidays, precached_activities=activities)
+    # Vacaciones y horas de libre disposición restantes del año
+    vacation_days_left = max(0, employee.annual_vacation_days - annual['vacation_days'])
+    hld_hours_left = max(0, employee.annual_hld_hours - annual['hld_hours'])
+
+    alerts = []
+    if not employee.approved:
+        alerts.append({
+            'type': 'info',
+            'message': 'Tu perfil está pendiente de aprobación',
+            'action': 'wait_approval'
+        })
+    if not employee.active:
+        alerts.append({
+            'type': 'warning',
+            'message': 'Tu perfil está inactivo. Contacta con tu manager.',
+            'action': 'contact_manager'
+        })
+
+    return {
+        'type': 'employee',
+        'statistics': {
+            'hours_this_month': round(monthly['actual_hours'], 2),
+            'efficiency': monthly['efficiency'],
+            'vacation_days_left': vacation_days_left,
+            'hld_hours_left': hld_hours_left
+        },
+        'monthly_summary': {
+            'theoretical_hours': round(monthly['theoretical_hours'], 2),
+            'actual_hours': round(monthly['actual_hours'], 2),
+            'efficiency': monthly['efficiency'],
+            'vacation_days': monthly['vacation_days'],
+            'hld_hours': monthly['hld_hours'],
+            'days_worked': _days_worked(
+                year, month, {holiday[0] for holiday in holidays},
+                [activity for activity in activities if activity.date.month == month]
+            )
+        },
+        'annual_summary': {
+            'total_theoretical_hours': round(annual['theoretical_hours'], 2),
+            'total_actual_hours': round(annual['actual_hours'], 2),
+            'total_efficiency': annual['efficiency'],
+            'total_vacation_days': employee.annual_vacation_days,
+            'remaining_vacation_days': vacation_days_left,
+            'total_hld_hours': employee.annual_hld_hours,
+            'remaining_hld_hours': hld_hours_left
+        },
+        'recent_activity': _recent_activity(Notification.query.filter_by(user_id=employee.user_id)),
+        'alerts': alerts
+    }
+
+
+def viewer_stats() -> Dict:
+    """Usuario sin empleado (probablemente admin nuevo)"""
+    return {
+        'type': 'viewer',
+        'statistics': {
+            'message': 'Complete su perfil de empleado para ver estadísticas'
+        },
+        'recent_activity': [],
+        'alerts': []
+    }
+
+
+def cached_team_performance(principal: DashboardPrincipal, year: int, month: int,
+                            cache_ttl: float = 60) -> Tuple[List[Dict], bool]:
+    """Rendimiento por equipo visible para el usuario (desde ``widget_cache``) y si vino de caché"""
+    if not (principal.is_admin or principal.is_manager):
+        return [], False
+    return widget_cache.get_or_compute(
+        'team_performance', principal, (year, month),
+        lambda: team_performance(principal.team_ids, year, month), cache_ttl
+    )
+
+
+def stats_for(principal: DashboardPrincipal, year: int = None, month: int = None,
+              cache_ttl: float = 60) -> Dict:
+    """Estadísticas según el rol (mismo formato que /api/dashboard/stats) para el mes indicado"""
+    year = year or datetime.now().year
+    month = month or datetime.now().month
+    if principal.is_admin:
+        return admin_stats(cached_team_performance(principal, year, month, cache_ttl)[0])
+    if principal.is_manager and principal.team_ids:
+        return manager_stats(principal.team_ids, cached_team_performance(principal, year, month, cache_ttl)[0])
+    if principal.employee:
+        return employee_stats(principal.employee, year, month)
+    return viewer_stats()
+
+
+def team_performance(team_ids: Optional[List[int]], year: int, month: int) -> List[Dict]:
+    """
+    Eficiencia del mes por equipo en bloque: equipos con sus miembros,
+    actividades del mes y festivos en consultas agrupadas y el cálculo de
+    cada empleado con ``get_hours_summary`` sobre los datos precargados
+    (ponderado por dedicación, como ``HoursCalculator.calculate_team_efficiency``).
+    """
+    query = Team.query.options(
+        Team.members_load_option(),
+        selectinload(Team.memberships).joinedload(TeamMembership.employee).lazyload(Employee.project_assignments),
+        lazyload(Team.projects)
+    ).order_by(Team.id)
+    if team_ids is not None:
+        if not team_ids:
+            return []
+        query = query.filter(Team.id.in_(team_ids))
+    teams = query.all()
+
+    memberships_by_team = {team.id: team._active_memberships() for team in teams}
+    employee_ids = {
+        membership.employee.id
+        for memberships in memberships_by_team.values()
+        for membership in memberships if membership.employee
+    }
+
+    start_date = date(year, month, 1)
+    end_date = date(year, month, monthrange(year, month)[1])
+    activities_by_employee = {}
+    holidays_by_employee = {employee_id: set() for employee_id in employee_ids}
+    if employee_ids:
+        for activity in CalendarActivity.query.filter(
+            CalendarActivity.employee_id.in_(employee_ids),
+            CalendarActivity.date >= start_date,
+            CalendarActivity.date <= end_date
+        ):
+            activities_by_employee.setdefault(activity.employee_id, []).append(activity)
+        for row in EmployeeHoliday.for_employees(employee_ids, start_date, end_date):
+            holidays_by_employee[row.employee_id].add((row.date, row.holiday_id, row.level))
+
+    summaries = {}
+    performance = []
+    for team in teams:
+        theoretical = actual = 0.0
+        for membership in memberships_by_team[team.id]:
+            employee = membership.employee
+            if not employee:
+                continue
+            if employee.id not in summaries:
+                summaries[employee.id] = employee.get_hours_summary(
+                    year, month,
+                    precached_holidays=holidays_by_employee.get(employee.id),
+                    precached_activities=activities_by_employee.get(employee.id, [])
+                )
+            weight = max(0.0, min((membership.allocation_percent or 100.0) / 100.0, 1.0))
+            theoretical += summaries[employee.id]['theoretical_hours'] * weight
+            actual += summaries[employee.id]['actual_hours'] * weight
+        performance.append({
+            'team_id': team.id,
+            'team_name': team.name,
+            'members_count': len(memberships_by_team[team.id]),
+            'efficiency': round(actual / theoretical * 100, 2) if theoretical > 0 else 0
+        })
+    return performance
+
+
+def upcoming_for(principal: DashboardPrincipal, days_ahead: int = 10) -> List[Dict]:
+    """Próximas actividades del empleado del usuario (como /api/calendar/upcoming sin filtros)"""
+    if not principal.employee:
+        return []
+    return CalendarService.get_upcoming_activities(employee_id=principal.employee.id, days_ahead=days_ahead)
+
+
+def build_dashboard(principal: DashboardPrincipal, widgets: Iterable[str], year: int = None,
+                    month: int = None, cache_ttl: float = 60, days_ahead: int = 10) -> Dict:
+    """
+    Ejecuta los widgets pedidos y ensambla la respuesta.
+
+    Returns:
+        Dict con ``widgets`` (nombre -> datos o None), ``timings`` (nombre ->
+        ms, consultas SQL y si vino de caché) y ``errors`` (nombre -> mensaje genérico)
+    """
+    year = year or datetime.now().year
+    month = month or datetime.now().month
+    install_widget_sql_listener()
+    cache_hits = set()
+
+    def performance():
+        value, hit = cached_team_performance(principal, year, month, cache_ttl)
+        if hit:
+            cache_hits.add('team_performance')
+        return value
+
+    builders = {
+        'stats': lambda: stats_for(principal, year, month, cache_ttl),
+        'team_performance': performance,
+        'notifications': lambda: NotificationService.get_notification_summary(principal.user.id),
+        'upcoming': lambda: upcoming_for(principal, days_ahead),
+    }
+
+    result = {'widgets': {}, 'timings': {}, 'errors': {}}
+    for name in widgets:
+        started = time.perf_counter()
+        _widget_sql.count = 0
+        try:
+            result['widgets'][name] = builders[name]()
+        except Exception as e:
+            logger.error(f"Error en el widget '{name}' del dashboard: {e}", exc_info=True)
+            db.session.rollback()
+            result['widgets'][name] = None
+            result['errors'][name] = WIDGET_ERROR_MESSAGE
+        finally:
+            sql_count, _widget_sql.count = _widget_sql.count, None
+        result['timings'][name] = {
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+            'sql': sql_count,
+            'cached': name in cache_hits
+        }
+    return result
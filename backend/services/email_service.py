@@ -1,6 +1,7 @@
 from flask import current_app, render_template, url_for
 from flask_mail import Mail, Message
 from typing import List, Dict, Optional
+import importlib.util
 import logging
 import os
 from datetime import datetime
@@ -9,13 +10,8 @@ from models.notification import Notification
 from models.user import User
 from .mock_email_service import MockEmailService
 
-# SendGrid Web API (no SMTP - Render bloquea puerto 587)
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail as SendGridMail, Email, To, Content
-    HAS_SENDGRID = True
-except ImportError:
-    HAS_SENDGRID = False
+# SendGrid Web API (no SMTP - Render bloquea puerto 587); el SDK se importa al enviar
+HAS_SENDGRID = importlib.util.find_spec('sendgrid') is not None
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +76,8 @@ class EmailService:
                 return False
             
             # Crear mensaje usando SendGrid SDK
+            from sendgrid import SendGridAPIClient
+            from sendgrid.helpers.mail import Mail as SendGridMail, Email, To, Content
             message = SendGridMail(
                 from_email=Email(from_email),
                 to_emails=To(to_email),
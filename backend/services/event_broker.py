@@ -0,0 +1,437 @@
+"""
+Broker de eventos en tiempo real para el canal Server-Sent Events (SSE)
+
+Los eventos (notificaciones nuevas, cambios de resumen, cambios de calendario)
+se publican por canal lógico (``user:<id>``, ``team:<id>``) y se entregan a
+los suscriptores de ``/api/events/stream``.
+
+Dos implementaciones:
+- ``PostgresEventBroker``: usa LISTEN/NOTIFY. La publicación se hace con
+  ``pg_notify`` dentro de la transacción que origina el evento, por lo que
+  PostgreSQL sólo lo entrega si hay commit. Cada worker mantiene una única
+  conexión LISTEN y reparte los eventos a sus suscriptores locales.
+- ``InProcessEventBroker``: fallback para desarrollo local (SQLite o un único
+  proceso). Los eventos se acumulan en la sesión y se despachan en
+  ``after_commit``.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Canal de PostgreSQL para LISTEN/NOTIFY
+PG_CHANNEL = 'team_time_events'
+
+# Límite de payload de NOTIFY en PostgreSQL (8000 bytes por defecto)
+PG_PAYLOAD_LIMIT = 7900
+
+# Clave en session.info donde se acumulan eventos pendientes de commit
+PENDING_EVENTS_KEY = 'pending_realtime_events'
+
+# Tamaño máximo de la cola de cada suscriptor; si un cliente no consume, se descartan eventos
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id: int) -> str:
+    """Canal de eventos de un usuario"""
+    return f'user:{user_id}'
+
+
+def team_channel(team_id: int) -> str:
+    """Canal de eventos de un equipo"""
+    return f'team:{team_id}'
+
+
+def format_sse(event_type: str, data: Dict, event_id: Optional[str] = None) -> str:
+    """Serializa un evento en formato text/event-stream"""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """Suscripción de un cliente SSE a un conjunto de canales"""
+
+    def __init__(self, channels: Iterable[str]):
+        self.channels = frozenset(channels)
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def put(self, message: Dict):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Cliente lento: descartar y avisar para que recargue el resumen
+            self.dropped += 1
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class InProcessEventBroker:
+    """Broker en memoria: entrega eventos a suscriptores del mismo proceso"""
+
+    name = 'in_process'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, set] = {}
+
+    # --- Suscripción -----------------------------------------------------
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({sub for subs in self._subscriptions.values() for sub in subs})
+
+    def dispatch(self, message: Dict):
+        """Entrega un mensaje a los suscriptores locales de su canal"""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(message.get('channel'), ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    # --- Publicación -----------------------------------------------------
+
+    def enqueue(self, session: Session, message: Dict, connection=None):
+        """Registra un evento ligado a la transacción actual de la sesión"""
+        session.info.setdefault(PENDING_EVENTS_KEY, []).append(message)
+
+    def enqueue_many(self, session: Session, messages: List[Dict], connection=None):
+        """Registra varios eventos ligados a la transacción actual"""
+        session.info.setdefault(PENDING_EVENTS_KEY, []).extend(messages)
+
+    def flush_committed(self, session: Session):
+        """Despacha los eventos acumulados tras un commit correcto"""
+        for message in session.info.pop(PENDING_EVENTS_KEY, []):
+            self.dispatch(message)
+
+    def discard_pending(self, session: Session):
+        session.info.pop(PENDING_EVENTS_KEY, None)
+
+    def start(self):
+        """El broker en memoria no necesita hilos auxiliares"""
+
+    def stop(self):
+        """El broker en memoria no necesita hilos auxiliares"""
+
+
+class PostgresEventBroker(InProcessEventBroker):
+    """Broker basado en LISTEN/NOTIFY de PostgreSQL"""
+
+    name = 'postgres'
+
+    def __init__(self, listen_dsn: str, reconnect_delay: float = 5.0):
+        super().__init__()
+        self.listen_dsn = listen_dsn
+        self.reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # Número máximo de NOTIFY por sentencia en publicaciones masivas
+    NOTIFY_BATCH_SIZE = 1000
+
+    @staticmethod
+    def _payload(message: Dict) -> str:
+        payload = json.dumps(message, ensure_ascii=False, default=str)
+        if len(payload.encode('utf-8')) > PG_PAYLOAD_LIMIT:
+            # Payload demasiado grande: enviar sólo la referencia, el cliente recargará
+            payload = json.dumps({
+                'channel': message['channel'],
+                'type': message['type'],
+                'data': {'truncated': True},
+                'ts': message.get('ts')
+            })
+        return payload
+
+    def enqueue(self, session: Session, message: Dict, connection=None):
+        """Publica con pg_notify dentro de la transacción (se entrega sólo si hay commit)"""
+        statement = text('SELECT pg_notify(:channel, :payload)')
+        params = {'channel': PG_CHANNEL, 'payload': self._payload(message)}
+        (connection if connection is not None else session).execute(statement, params)
+
+    def enqueue_many(self, session: Session, messages: List[Dict], connection=None):
+        """Publica muchos eventos con una sentencia pg_notify por bloque (unnest)"""
+        executor = connection if connection is not None else session
+        statement = text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload')
+        for start in range(0, len(messages), self.NOTIFY_BATCH_SIZE):
+            payloads = [self._payload(m) for m in messages[start:start + self.NOTIFY_BATCH_SIZE]]
+            executor.execute(statement, {'channel': PG_CHANNEL, 'payloads': payloads})
+
+    def flush_committed(self, session: Session):
+        """PostgreSQL entrega los NOTIFY al confirmar la transacción"""
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._listen_loop, name='event-broker-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _listen_loop(self):
+        """Mantiene una conexión LISTEN y reparte los eventos a los suscriptores locales"""
+        import psycopg2
+        import psycopg2.extensions
+
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.listen_dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {PG_CHANNEL};')
+                logger.info('Broker de eventos escuchando en PostgreSQL')
+
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self.dispatch(json.loads(notify.payload))
+                        except ValueError:
+                            logger.warning('Payload de evento inválido descartado')
+            except Exception as e:
+                logger.error(f'Error en listener de eventos PostgreSQL: {e}')
+                self._stop_event.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_broker = None
+
+
+def get_broker():
+    """Obtiene el broker activo (en memoria si no se ha inicializado)"""
+    global _broker
+    if _broker is None:
+        _broker = InProcessEventBroker()
+    return _broker
+
+
+def _resolve_listen_dsn(app) -> Optional[str]:
+    """
+    Determina la conexión para LISTEN.
+
+    El Transaction Pooler de Supabase (puerto 6543) no soporta LISTEN, por lo
+    que sólo se usa la URL principal si no apunta a él. ``EVENTS_DATABASE_URL``
+    permite indicar una conexión directa o de Session Pooler.
+    """
+    dsn = app.config.get('EVENTS_DATABASE_URL')
+    if dsn:
+        return dsn
+
+    database_uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not database_uri.startswith('postgresql'):
+        return None
+    if ':6543/' in database_uri:
+        return None
+    return database_uri
+
+
+def init_event_broker(app):
+    """Inicializa el broker de eventos según la configuración de la aplicación"""
+    global _broker
+
+    backend = app.config.get('EVENTS_BROKER', 'auto')
+    listen_dsn = _resolve_listen_dsn(app) if backend in ('auto', 'postgres') else None
+
+    if listen_dsn:
+        _broker = PostgresEventBroker(listen_dsn)
+        _broker.start()
+    else:
+        if backend == 'postgres':
+            logger.warning('EVENTS_BROKER=postgres sin conexión LISTEN válida; usando broker en memoria')
+        _broker = InProcessEventBroker()
+
+    register_model_events()
+    app.extensions['event_broker'] = _broker
+    logger.info(f'Broker de eventos inicializado: {_broker.name}')
+    return _broker
+
+
+def build_message(channel: str, event_type: str, data: Optional[Dict] = None) -> Dict:
+    """Construye el mensaje interno de un evento"""
+    return {
+        'channel': channel,
+        'type': event_type,
+        'data': data or {},
+        'ts': datetime.utcnow().isoformat()
+    }
+
+
+def publish_event(session: Session, channel: str, event_type: str,
+                  data: Optional[Dict] = None, connection=None):
+    """
+    Publica un evento ligado a la transacción de ``session``.
+
+    Nunca lanza excepciones: un fallo en tiempo real no debe romper la escritura.
+    """
+    try:
+        get_broker().enqueue(session, build_message(channel, event_type, data), connection=connection)
+    except Exception as e:
+        logger.error(f'Error publicando evento {event_type} en {channel}: {e}')
+
+
+def publish_events(session: Session, messages: List[Dict], connection=None):
+    """Publica varios mensajes ya construidos con ``build_message``"""
+    if not messages:
+        return
+    try:
+        get_broker().enqueue_many(session, messages, connection=connection)
+    except Exception as e:
+        logger.error(f"Error publicando {len(messages)} eventos: {e}")
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_after_commit(session):
+    if PENDING_EVENTS_KEY in session.info:
+        get_broker().flush_committed(session)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    if PENDING_EVENTS_KEY in session.info:
+        get_broker().discard_pending(session)
+
+
+def stream_events(subscription: Subscription, broker, heartbeat: float = 20.0,
+                  max_duration: float = 300.0, retry_ms: int = 5000):
+    """
+    Generador text/event-stream para una suscripción.
+
+    No usa la sesión de base de datos: la conexión se libera antes de empezar a
+    emitir. Tras ``max_duration`` se cierra el stream y EventSource reconecta.
+    """
+    started = time.monotonic()
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        yield format_sse('ready', {'channels': sorted(subscription.channels)})
+
+        while time.monotonic() - started < max_duration:
+            message = subscription.get(timeout=heartbeat)
+            if message is None:
+                # Comentario SSE como keep-alive para proxies
+                yield ': ping\n\n'
+                continue
+
+            if subscription.dropped:
+                subscription.dropped = 0
+                yield format_sse('resync', {'reason': 'dropped_events'})
+
+            yield format_sse(message['type'], {
+                'channel': message.get('channel'),
+                'ts': message.get('ts'),
+                **(message.get('data') or {})
+            })
+    finally:
+        broker.unsubscribe(subscription)
+
+
+# --- Eventos derivados de los modelos ------------------------------------
+
+# Canal al que se suscriben los administradores para ver cambios de cualquier equipo
+CALENDAR_ALL_CHANNEL = 'calendar:all'
+
+_model_events_registered = False
+
+
+def _employee_team_ids(connection, employee_id: int) -> List[int]:
+    """Equipos (principal + membresías activas) de un empleado, usando la conexión del flush"""
+    rows = connection.execute(text(
+        'SELECT team_id FROM employee WHERE id = :employee_id '
+        'UNION SELECT team_id FROM team_membership '
+        'WHERE employee_id = :employee_id AND active = :active'
+    ), {'employee_id': employee_id, 'active': True}).fetchall()
+    return [row[0] for row in rows if row[0] is not None]
+
+
+def register_model_events():
+    """Registra los listeners de modelos que generan eventos en tiempo real"""
+    global _model_events_registered
+    if _model_events_registered:
+        return
+    _model_events_registered = True
+
+    from sqlalchemy.orm import object_session
+    from models.notification import Notification
+    from models.calendar_activity import CalendarActivity
+
+    @event.listens_for(Notification, 'after_insert')
+    def _notification_created(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        publish_event(session, user_channel(target.user_id), 'notification', {
+            'id': target.id,
+            'title': target.title,
+            'notification_type': target._notification_type,
+            'priority': target._priority or 'medium',
+            'created_at': target.created_at.isoformat() if target.created_at else None
+        }, connection=connection)
+
+    def _calendar_changed(action):
+        def listener(mapper, connection, target):
+            session = object_session(target)
+            if session is None:
+                return
+            try:
+                team_ids = _employee_team_ids(connection, target.employee_id)
+            except Exception as e:
+                logger.error(f'Error resolviendo equipos para evento de calendario: {e}')
+                team_ids = []
+
+            data = {
+                'action': action,
+                'activity_id': target.id,
+                'employee_id': target.employee_id,
+                'date': target.date.isoformat() if target.date else None,
+                'activity_type': target.activity_type
+            }
+            channels = [team_channel(team_id) for team_id in team_ids]
+            channels.append(CALENDAR_ALL_CHANNEL)
+            publish_events(session, [build_message(channel, 'calendar_change', data) for channel in channels],
+                           connection=connection)
+        return listener
+
+    event.listen(CalendarActivity, 'after_insert', _calendar_changed('created'))
+    event.listen(CalendarActivity, 'after_update', _calendar_changed('updated'))
+    event.listen(CalendarActivity, 'after_delete', _calendar_changed('deleted'))
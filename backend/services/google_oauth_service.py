@@ -1,7 +1,4 @@
 from flask import current_app, session, redirect, url_for
-from google.auth.transport import requests
-from google.oauth2 import id_token
-from google_auth_oauthlib.flow import Flow
 import os
 import logging
 from typing import Dict, Optional, Tuple
@@ -29,7 +26,8 @@ class GoogleOAuthService:
             logger.warning("Google OAuth no configurado completamente")
             return
         
-        # Configurar OAuth flow
+        # Configurar OAuth flow (google-auth solo se carga si OAuth está configurado)
+        from google_auth_oauthlib.flow import Flow
         self.flow = Flow.from_client_config(
             client_config={
                 "web": {
@@ -89,6 +87,8 @@ class GoogleOAuthService:
             
             # Obtener información del usuario
             credentials = self.flow.credentials
+            from google.auth.transport import requests
+            from google.oauth2 import id_token
             request_session = requests.Request()
             id_info = id_token.verify_oauth2_token(
                 credentials.id_token, request_session, self.client_id
@@ -247,6 +247,8 @@ class GoogleOAuthService:
     def get_user_info_from_token(self, token: str) -> Optional[Dict]:
         """Obtiene información del usuario desde un token"""
         try:
+            from google.auth.transport import requests
+            from google.oauth2 import id_token
             request_session = requests.Request()
             id_info = id_token.verify_oauth2_token(token, request_session, self.client_id)
             
@@ -0,0 +1,162 @@
+"""
+Consulta de festivos por lotes para muchos días, empleados y ubicaciones.
+
+Cada elemento de la petición es un par (empleado o ubicación, rango de
+fechas). En lugar de preguntar día a día, se lanza una única consulta por
+rango para todos los empleados (``employee_holiday`` unido a ``holiday`` por
+``idx_employee_holiday_employee_date``) y otra para todas las ubicaciones
+sueltas (OR de ``Holiday.location_filter`` sobre el rango común); el reparto
+por elemento y día se hace en memoria.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from models.employee_holiday import EmployeeHoliday
+from models.holiday import Holiday
+from models.location import LocationResolver
+from models.user import db
+
+# Límites por petición (una vista de equipo-mes cabe con holgura)
+MAX_BATCH_ITEMS = 200
+MAX_RANGE_DAYS = 366
+
+
+class HolidayBatchCheck:
+    """Marcas de festivo por día para lotes de (empleado | ubicación, rango)"""
+
+    @staticmethod
+    def _holiday_entry(holiday_id: int, name: str, level: str) -> Dict:
+        return {'id': holiday_id, 'name': name, 'level': level}
+
+    @classmethod
+    def _employee_holidays(cls, employee_ids: List[int], start: date, end: date) -> Dict:
+        """{employee_id: {fecha: [festivos]}} con una consulta por rango"""
+        by_employee = defaultdict(lambda: defaultdict(list))
+        if not employee_ids:
+            return by_employee
+
+        rows = db.session.query(
+            EmployeeHoliday.employee_id, EmployeeHoliday.date, EmployeeHoliday.level,
+            Holiday.id, Holiday.name
+        ).join(
+            Holiday, Holiday.id == EmployeeHoliday.holiday_id
+        ).filter(
+            EmployeeHoliday.employee_id.in_(employee_ids),
+            EmployeeHoliday.date >= start,
+            EmployeeHoliday.date <= end
+        ).all()
+
+        for employee_id, day, level, holiday_id, name in rows:
+            by_employee[employee_id][day].append(cls._holiday_entry(holiday_id, name, level))
+        return by_employee
+
+    @classmethod
+    def _location_holidays(cls, locations: List[tuple], start: date, end: date) -> Dict:
+        """{(claves, texto) de ubicación: {fecha: [festivos]}} con una consulta por rango"""
+        by_location = defaultdict(lambda: defaultdict(list))
+        locations = [keys for keys in set(locations) if keys[0] or keys[3]]
+        if not locations:
+            return by_location
+
+        holidays = Holiday.query.filter(
+            Holiday.active == True,
+            Holiday.date >= start,
+            Holiday.date <= end,
+            db.or_(*(Holiday.location_filter(*keys) for keys in locations))
+        ).all()
+
+        for holiday in holidays:
+            entry = cls._holiday_entry(holiday.id, holiday.name, holiday.get_hierarchy_level())
+            for keys in locations:
+                if holiday.applies_to(*keys):
+                    by_location[keys][holiday.date].append(entry)
+        return by_location
+
+    @staticmethod
+    def _days(start: date, end: date, holidays_by_day: Dict) -> List[Dict]:
+        """Un registro por día del rango con marcas de festivo y fin de semana"""
+        days = []
+        current = start
+        while current <= end:
+            holidays = holidays_by_day.get(current, [])
+            is_weekend = current.weekday() >= 5
+            days.append({
+                'date': current.isoformat(),
+                'is_holiday': bool(holidays),
+                'is_weekend': is_weekend,
+                'is_workable': not holidays and not is_weekend,
+                'holidays': holidays
+            })
+            current += timedelta(days=1)
+        return days
+
+    @classmethod
+    def check(cls, items: List[Dict], resolver: Optional[LocationResolver] = None) -> List[Dict]:
+        """
+        Festivos por día para cada elemento del lote.
+
+        Args:
+            items: Lista de dicts con ``start_date`` y ``end_date`` (``date``) y
+                ``employee`` (instancia de Employee) o ``location``
+                (``{'country', 'region', 'city'}`` en texto)
+            resolver: Resolutor de ubicaciones (por defecto, sin dar de alta catálogo)
+
+        Returns:
+            Lista en el mismo orden con ``start_date``, ``end_date``, la
+            identificación del elemento y ``days``
+        """
+        if len(items) > MAX_BATCH_ITEMS:
+            raise ValueError(f'Máximo {MAX_BATCH_ITEMS} elementos por petición')
+        if not items:
+            return []
+
+        for item in items:
+            if item['end_date'] < item['start_date']:
+                raise ValueError('La fecha de fin es anterior a la de inicio')
+            if (item['end_date'] - item['start_date']).days >= MAX_RANGE_DAYS:
+                raise ValueError(f'Máximo {MAX_RANGE_DAYS} días por elemento')
+
+        # Rango común: una sola consulta por tipo de elemento
+        start = min(item['start_date'] for item in items)
+        end = max(item['end_date'] for item in items)
+
+        resolver = resolver or LocationResolver(db.session, create_missing=False)
+        resolved = {}
+        for item in items:
+            location = item.get('location')
+            if item.get('employee') is None and location is not None:
+                text_key = (location.get('country'), location.get('region'), location.get('city'))
+                if text_key not in resolved:
+                    keys = resolver.resolve(*text_key)
+                    # Claves y texto: lo que no está en el catálogo se cruza por texto
+                    resolved[text_key] = (keys['country_code'], keys['region_id'], keys['city_id'], *text_key)
+
+        employee_ids = list({item['employee'].id for item in items if item.get('employee') is not None})
+        by_employee = cls._employee_holidays(employee_ids, start, end)
+        by_location = cls._location_holidays(list(resolved.values()), start, end)
+
+        results = []
+        for item in items:
+            employee = item.get('employee')
+            if employee is not None:
+                holidays_by_day = by_employee.get(employee.id, {})
+                result = {
+                    'employee_id': employee.id,
+                    'location': {'country': employee.country, 'region': employee.region,
+                                 'city': employee.city}
+                }
+            else:
+                location = item['location']
+                text_key = (location.get('country'), location.get('region'), location.get('city'))
+                holidays_by_day = by_location.get(resolved[text_key], {})
+                result = {
+                    'location': {'country': text_key[0], 'region': text_key[1], 'city': text_key[2]}
+                }
+            result.update({
+                'start_date': item['start_date'].isoformat(),
+                'end_date': item['end_date'].isoformat(),
+                'days': cls._days(item['start_date'], item['end_date'], holidays_by_day)
+            })
+            results.append(result)
+        return results
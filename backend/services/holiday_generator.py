@@ -0,0 +1,132 @@
+"""
+Generación local de festivos nacionales y regionales con el paquete `holidays`.
+
+Sustituye a la API Nager.Date como fuente principal: calcula los festivos en
+proceso para cualquier país/año soportado y los devuelve con el esquema de
+``Holiday`` listo para ``Holiday.bulk_create_holidays``.
+"""
+from datetime import date
+from functools import lru_cache
+from zlib import crc32
+from typing import Dict, Iterable, List, Optional
+import logging
+
+import holidays
+
+from utils.subdivisions import subdivision_name
+
+logger = logging.getLogger(__name__)
+
+SOURCE_NAME = 'holidays'
+
+@lru_cache(maxsize=1)
+def _supported_countries() -> Dict[str, List[str]]:
+    """País -> subdivisiones soportadas (se calcula una vez por proceso)"""
+    return holidays.list_supported_countries()
+
+
+class HolidayGenerator:
+    """Genera festivos en proceso a partir de las reglas del paquete `holidays`"""
+
+    def __init__(self):
+        self._supported = _supported_countries()
+
+    def supports(self, country_code: str) -> bool:
+        """Indica si el país tiene reglas locales"""
+        return bool(country_code) and country_code.upper() in self._supported
+
+    def subdivisions(self, country_code: str) -> List[str]:
+        """Códigos de subdivisión (ISO 3166-2 sin prefijo) del país"""
+        return list(self._supported.get(country_code.upper(), []))
+
+    @staticmethod
+    def region_name(country_code: str, subdivision: str) -> str:
+        """Nombre de región a guardar (ver utils.subdivisions) o, si no se conoce, código ISO 3166-2"""
+        return subdivision_name(country_code, subdivision) or f'{country_code}-{subdivision}'
+
+    @staticmethod
+    def _entries(calendar) -> Dict[date, List[str]]:
+        """Festivos de un calendario como fecha -> nombres (separa los combinados)"""
+        return {day: calendar.get_list(day) for day in sorted(calendar.keys())}
+
+    def generate(self, country_code: str, years: Iterable[int], country_name: str,
+                 include_regional: bool = True) -> List[Dict]:
+        """
+        Festivos nacionales (y regionales) de un país para varios años.
+
+        Args:
+            country_code: Código ISO 3166-1 alfa-2
+            years: Años a generar
+            country_name: Nombre de país a guardar en ``Holiday.country``
+            include_regional: Si True, añade los festivos propios de cada subdivisión
+
+        Returns:
+            Lista de dicts con el esquema de Holiday
+        """
+        country_code = country_code.upper()
+        years = sorted(set(years))
+        if not self.supports(country_code) or not years:
+            return []
+
+        # El año siguiente sirve para decidir si un festivo es de fecha fija
+        years_with_next = years + [years[-1] + 1]
+        national = holidays.country_holidays(country_code, years=years_with_next)
+        fixed_names = self._fixed_names(national)
+        national_pairs = set()
+        results = []
+
+        for day, names in self._entries(national).items():
+            if day.year not in years:
+                continue
+            for name in names:
+                national_pairs.add((day, name))
+                results.append(self._holiday_dict(
+                    country_code, country_name, day, name, None, 'national', fixed_names
+                ))
+
+        if include_regional:
+            for subdivision in self.subdivisions(country_code):
+                regional = holidays.country_holidays(
+                    country_code, subdiv=subdivision, years=years_with_next
+                )
+                regional_fixed = self._fixed_names(regional)
+                region = self.region_name(country_code, subdivision)
+                for day, names in self._entries(regional).items():
+                    if day.year not in years:
+                        continue
+                    for name in names:
+                        if (day, name) in national_pairs:
+                            continue
+                        results.append(self._holiday_dict(
+                            country_code, country_name, day, name, region, 'regional',
+                            regional_fixed, subdivision
+                        ))
+
+        return results
+
+    @staticmethod
+    def _fixed_names(calendar) -> set:
+        """Nombres que caen el mismo día/mes en años consecutivos"""
+        by_name = {}
+        for day, names in HolidayGenerator._entries(calendar).items():
+            for name in names:
+                by_name.setdefault(name, set()).add((day.month, day.day))
+        return {name for name, days in by_name.items() if len(days) == 1}
+
+    @staticmethod
+    def _holiday_dict(country_code: str, country_name: str, day: date, name: str,
+                      region: Optional[str], holiday_type: str, fixed_names: set,
+                      subdivision: Optional[str] = None) -> Dict:
+        scope = f'{country_code}-{subdivision}' if subdivision else country_code
+        return {
+            'name': name[:200],
+            'date': day,
+            'country': country_name,
+            'region': region,
+            'city': None,
+            'holiday_type': holiday_type,
+            'description': name,
+            'is_fixed': name in fixed_names,
+            'source': SOURCE_NAME,
+            'source_id': f'{SOURCE_NAME}_{scope}_{day.isoformat()}_{crc32(name.encode()):08x}'
+        }
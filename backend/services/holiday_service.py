@@ -6,6 +6,10 @@ from flask import current_app
 
 from models.holiday import Holiday
 from models.user import db
+from services.holiday_batch_check import HolidayBatchCheck
+from services.holiday_generator import HolidayGenerator
+from services.holiday_statistics import HolidayStatistics
+from utils.subdivisions import name_for_code
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +73,9 @@ class HolidayService:
     
     def __init__(self):
         self.api_base_url = current_app.config.get('NAGER_DATE_API_URL', 'https://date.nager.at/api/v3')
+        self.provider = current_app.config.get('HOLIDAYS_PROVIDER', 'local')
+        self.reconcile_with_api = current_app.config.get('HOLIDAYS_RECONCILE_WITH_API', False)
+        self.generator = HolidayGenerator()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'TeamTimeManagement/1.0',
@@ -98,70 +105,179 @@ class HolidayService:
             logger.error(f"Error obteniendo países disponibles: {e}")
             return []
     
+    def localized_country_name(self, country_code: str) -> str:
+        """Nombre de país guardado en Holiday.country (español para países hispanohablantes)"""
+        return self.COUNTRY_NAME_ES.get(country_code, self.SUPPORTED_COUNTRIES.get(country_code, country_code))
+    
     def load_holidays_for_country(self, country_code: str, year: int = None) -> Tuple[int, List[str]]:
-        """Carga festivos para un país específico"""
+        """
+        Carga festivos para un país específico.
+        
+        Usa el generador local (paquete `holidays`) salvo que el país no esté
+        soportado o HOLIDAYS_PROVIDER='nager'; en ese caso consulta Nager.Date.
+        """
         if not year:
             year = datetime.now().year
         
+        if self.provider == 'local' and self.generator.supports(country_code):
+            return self.load_holidays_for_countries([country_code], [year])
+        
+        return self._load_holidays_from_api(country_code, year)
+    
+    def fetch_holidays_for_country(self, country_code: str, year: int) -> Tuple[List[Dict], List[str]]:
+        """Festivos de un país y año (mismas fuentes que load_holidays_for_country) sin escribirlos"""
+        if self.provider == 'local' and self.generator.supports(country_code):
+            return self.generate_holidays_for_countries([country_code], [year])
+        
+        return self._fetch_api_holidays(country_code, year)
+    
+    def load_holidays_for_countries(self, country_codes: List[str], years: List[int],
+                                    reconcile: Optional[bool] = None) -> Tuple[int, List[str]]:
+        """
+        Genera en proceso los festivos nacionales y regionales de varios países y
+        años y los crea en una sola carga. Sin dependencias de red.
+        
+        Args:
+            country_codes: Códigos ISO de país
+            years: Años a generar
+            reconcile: Si True, añade los festivos nacionales que Nager.Date tenga en
+                       fechas que el generador local no cubre (por defecto
+                       HOLIDAYS_RECONCILE_WITH_API)
+        """
+        holidays_to_create, errors = self.generate_holidays_for_countries(country_codes, years, reconcile)
+        
+        created_count = Holiday.bulk_create_holidays(holidays_to_create) if holidays_to_create else 0
+        
+        logger.info(
+            f"Generados {len(holidays_to_create)} festivos ({created_count} nuevos) para "
+            f"{', '.join(country_codes)} ({', '.join(str(y) for y in years)})"
+        )
+        
+        return created_count, errors
+    
+    def generate_holidays_for_countries(self, country_codes: List[str], years: List[int],
+                                        reconcile: Optional[bool] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Festivos que cargaría load_holidays_for_countries, sin escribirlos.
+        
+        Returns:
+            Tupla (festivos en el formato de Holiday.bulk_create_holidays, errores)
+        """
+        if reconcile is None:
+            reconcile = self.reconcile_with_api
+        
+        holidays_to_create = []
+        errors = []
+        
+        for country_code in country_codes:
+            country_code = country_code.upper()
+            if not self.generator.supports(country_code):
+                errors.append(f"País '{country_code}' no soportado por el generador local de festivos")
+                continue
+            
+            generated = self.generator.generate(
+                country_code, years, self.localized_country_name(country_code)
+            )
+            holidays_to_create.extend(generated)
+            
+            if reconcile:
+                for year in years:
+                    missing, api_errors = self._reconcile_with_api(country_code, year, generated)
+                    holidays_to_create.extend(missing)
+                    errors.extend(api_errors)
+        
+        return holidays_to_create, errors
+    
+    def _reconcile_with_api(self, country_code: str, year: int,
+                            generated: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Festivos nacionales de Nager.Date en fechas sin festivo nacional generado.
+        
+        Los fallos de red no son fatales: la carga local sigue siendo válida.
+        """
+        holidays_data, errors = self._fetch_api_holidays(country_code, year)
+        
+        generated_dates = {
+            holiday['date'] for holiday in generated
+            if holiday['region'] is None and holiday['date'].year == year
+        }
+        missing = [
+            holiday for holiday in holidays_data
+            if holiday['region'] is None and holiday['date'] not in generated_dates
+        ]
+        if missing:
+            logger.warning(
+                f"Reconciliación {country_code} {year}: {len(missing)} festivos de Nager.Date "
+                f"no generados localmente: {', '.join(h['name'] for h in missing)}"
+            )
+        
+        return missing, errors
+    
+    def _fetch_api_holidays(self, country_code: str, year: int) -> Tuple[List[Dict], List[str]]:
+        """Descarga y mapea los festivos de Nager.Date al esquema de Holiday"""
         try:
             response = self.session.get(f"{self.api_base_url}/PublicHolidays/{year}/{country_code}")
             response.raise_for_status()
             
             holidays_data = response.json()
-            
-            if not holidays_data:
-                return 0, [f"No se encontraron festivos para {country_code} en {year}"]
-            
-            holidays_to_create = []
-            errors = []
-            
-            for holiday_data in holidays_data:
-                try:
-                    # Parsear fecha
-                    holiday_date = datetime.strptime(holiday_data['date'], '%Y-%m-%d').date()
-                    
-                    # Determinar tipo y ubicación
-                    holiday_type = 'national'
-                    region = None
-                    city = None
-                    
-                    # Algunos festivos pueden tener información regional
-                    if 'counties' in holiday_data and holiday_data['counties']:
-                        # Si tiene condados/regiones específicas, es regional
-                        holiday_type = 'regional'
-                        region = holiday_data['counties'][0] if holiday_data['counties'] else None
-                    
-                    localized_country = self.COUNTRY_NAME_ES.get(country_code, self.SUPPORTED_COUNTRIES.get(country_code, country_code))
-                    holiday_dict = {
-                        'name': holiday_data.get('localName') or holiday_data['name'],
-                        'date': holiday_date,
-                        'country': localized_country,
-                        'region': region,
-                        'city': city,
-                        'holiday_type': holiday_type,
-                        'description': holiday_data.get('name', ''),
-                        'is_fixed': holiday_data.get('fixed', True),
-                        'source': 'nager.date',
-                        'source_id': f"{country_code}_{year}_{holiday_data['date']}"
-                    }
-                    
-                    holidays_to_create.append(holiday_dict)
-                    
-                except Exception as e:
-                    errors.append(f"Error procesando festivo {holiday_data.get('name', 'Unknown')}: {e}")
-                    continue
-            
-            # Crear festivos en lote
-            created_count = Holiday.bulk_create_holidays(holidays_to_create)
-            
-            logger.info(f"Cargados {created_count} festivos para {country_code} ({year})")
-            
-            return created_count, errors
-            
         except requests.RequestException as e:
             error_msg = f"Error cargando festivos para {country_code}: {e}"
             logger.error(error_msg)
-            return 0, [error_msg]
+            return [], [error_msg]
+        
+        if not holidays_data:
+            return [], [f"No se encontraron festivos para {country_code} en {year}"]
+        
+        holidays_to_create = []
+        errors = []
+        
+        for holiday_data in holidays_data:
+            try:
+                # Parsear fecha
+                holiday_date = datetime.strptime(holiday_data['date'], '%Y-%m-%d').date()
+                
+                # Determinar tipo y ubicación
+                holiday_type = 'national'
+                region = None
+                
+                # Algunos festivos pueden tener información regional
+                if 'counties' in holiday_data and holiday_data['counties']:
+                    # Si tiene condados/regiones específicas, es regional
+                    holiday_type = 'regional'
+                    # Código ISO 3166-2 ('ES-MD'): se guarda el nombre de la región
+                    region = name_for_code(holiday_data['counties'][0]) or holiday_data['counties'][0]
+                
+                holidays_to_create.append({
+                    'name': holiday_data.get('localName') or holiday_data['name'],
+                    'date': holiday_date,
+                    'country': self.localized_country_name(country_code),
+                    'region': region,
+                    'city': None,
+                    'holiday_type': holiday_type,
+                    'description': holiday_data.get('name', ''),
+                    'is_fixed': holiday_data.get('fixed', True),
+                    'source': 'nager.date',
+                    'source_id': f"{country_code}_{year}_{holiday_data['date']}"
+                })
+                
+            except Exception as e:
+                errors.append(f"Error procesando festivo {holiday_data.get('name', 'Unknown')}: {e}")
+                continue
+        
+        return holidays_to_create, errors
+    
+    def _load_holidays_from_api(self, country_code: str, year: int) -> Tuple[int, List[str]]:
+        """Carga festivos desde Nager.Date (países sin reglas locales)"""
+        holidays_to_create, errors = self._fetch_api_holidays(country_code, year)
+        if not holidays_to_create:
+            return 0, errors
+        
+        # Crear festivos en lote
+        created_count = Holiday.bulk_create_holidays(holidays_to_create)
+        
+        logger.info(f"Cargados {created_count} festivos para {country_code} ({year})")
+        
+        return created_count, errors
     
     def load_holidays_for_employee_location(self, employee) -> Tuple[int, List[str]]:
         """Carga festivos automáticamente para la ubicación de un empleado"""
@@ -173,6 +289,9 @@ class HolidayService:
         
         # Cargar festivos para el año actual y siguiente
         current_year = datetime.now().year
+        if self.provider == 'local' and self.generator.supports(country_code):
+            return self.load_holidays_for_countries([country_code], [current_year, current_year + 1])
+        
         total_created = 0
         all_errors = []
         
@@ -200,11 +319,7 @@ class HolidayService:
     
     def auto_load_missing_holidays(self) -> Dict:
         """Carga automáticamente festivos para países que no los tienen"""
-        from models.employee import Employee
-        
-        # Obtener países únicos de empleados
-        countries_in_use = db.session.query(Employee.country).distinct().all()
-        countries_in_use = [country[0] for country in countries_in_use if country[0]]
+        countries_in_use = self._countries_in_use()
         
         results = {
             'processed_countries': [],
@@ -242,6 +357,9 @@ class HolidayService:
             return 0, [f"País '{country_name}' no soportado"]
         
         current_year = datetime.now().year
+        if self.provider == 'local' and self.generator.supports(country_code):
+            return self.load_holidays_for_countries([country_code], [current_year, current_year + 1])
+        
         total_created = 0
         all_errors = []
         
@@ -264,59 +382,23 @@ class HolidayService:
             year=year
         )
     
+    def check_holidays_batch(self, items: List[Dict]) -> List[Dict]:
+        """Festivos por día para lotes de (empleado | ubicación, rango) (ver HolidayBatchCheck)"""
+        return HolidayBatchCheck.check(items)
+
     def get_holidays_summary(self) -> Dict:
-        """Obtiene resumen estadístico de festivos cargados"""
-        total_holidays = Holiday.query.filter(Holiday.active == True).count()
-        
-        # Festivos por país
-        countries_stats = db.session.query(
-            Holiday.country,
-            db.func.count(Holiday.id).label('count')
-        ).filter(
-            Holiday.active == True
-        ).group_by(Holiday.country).order_by(db.desc('count')).all()
-        
-        # Festivos por tipo
-        type_stats = db.session.query(
-            Holiday.holiday_type,
-            db.func.count(Holiday.id).label('count')
-        ).filter(
-            Holiday.active == True
-        ).group_by(Holiday.holiday_type).all()
+        """Obtiene resumen estadístico de festivos cargados (motor de estadísticas cacheado)"""
+        from models.employee import Employee
         
         # Países sin festivos
-        from models.employee import Employee
         countries_with_employees = db.session.query(Employee.country).distinct().all()
         countries_with_employees = [c[0] for c in countries_with_employees if c[0]]
         
-        countries_with_holidays = [c[0] for c in countries_stats]
-        countries_without_holidays = [
-            c for c in countries_with_employees 
-            if c not in countries_with_holidays
-        ]
-        
-        return {
-            'total_holidays': total_holidays,
-            'countries_with_holidays': len(countries_stats),
-            'countries_without_holidays': len(countries_without_holidays),
-            'countries_stats': [
-                {'country': country, 'count': count} 
-                for country, count in countries_stats[:10]  # Top 10
-            ],
-            'type_stats': [
-                {'type': holiday_type, 'count': count}
-                for holiday_type, count in type_stats
-            ],
-            'missing_countries': countries_without_holidays
-        }
+        return HolidayStatistics.summary(countries_with_employees)
     
     def refresh_holidays_for_year(self, year: int) -> Dict:
         """Actualiza todos los festivos para un año específico"""
-        from models.employee import Employee
-        
-        # Obtener países únicos de empleados
-        countries_in_use = db.session.query(Employee.country).distinct().all()
-        countries_in_use = [country[0] for country in countries_in_use if country[0]]
+        countries_in_use = self._countries_in_use()
         
         results = {
             'year': year,
@@ -339,3 +421,27 @@ class HolidayService:
                 results['errors'].extend(errors)
         
         return results
+    
+    def fetch_holidays_for_year(self, year: int) -> Tuple[List[Dict], List[str]]:
+        """
+        Festivos nacionales y regionales de un año para los países con empleados,
+        sin escribirlos (los mismos que cargaría refresh_holidays_for_year)
+        """
+        holidays_data = []
+        errors = []
+        
+        for country in self._countries_in_use():
+            country_code = self.get_country_code(country)
+            if country_code:
+                fetched, fetch_errors = self.fetch_holidays_for_country(country_code, year)
+                holidays_data.extend(fetched)
+                errors.extend(fetch_errors)
+        
+        return holidays_data, errors
+    
+    def _countries_in_use(self) -> List[str]:
+        """Países distintos de los empleados"""
+        from models.employee import Employee
+        
+        countries_in_use = db.session.query(Employee.country).distinct().all()
+        return [country[0] for country in countries_in_use if country[0]]
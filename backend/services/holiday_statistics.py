@@ -0,0 +1,221 @@
+"""
+Estadísticas de festivos calculadas en una sola pasada y cacheadas por año.
+
+Una única consulta ``GROUP BY año, tipo, país, región`` sobre los festivos
+activos alimenta todos los agregados (totales, por tipo, por país, por región
+y tipo × país); los niveles superiores se acumulan en memoria a partir de esa
+agrupación, como haría un ``ROLLUP`` (portable a SQLite). El resultado se
+cachea por año en el proceso y se invalida al confirmar transacciones que
+cambian festivos de ese año.
+"""
+from datetime import date
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.holiday import Holiday, CHANGED_YEARS_KEY
+from models.user import db
+
+logger = logging.getLogger(__name__)
+
+HOLIDAY_TYPES = ('national', 'regional', 'local')
+# Cota de obsolescencia entre workers (cada proceso invalida su propia caché)
+CACHE_TTL_SECONDS = 300
+
+
+class HolidayStatistics:
+    """Motor de estadísticas de festivos con caché por año"""
+
+    _cache: Dict[int, Dict] = {}
+    _cached_at: Dict[int, float] = {}
+    _all_years_at: Optional[float] = None
+    _lock = Lock()
+
+    @classmethod
+    def invalidate(cls, years: Optional[Iterable[int]] = None):
+        """Invalida la caché de los años indicados (o de todos)"""
+        with cls._lock:
+            if years is None:
+                cls._cache.clear()
+                cls._cached_at.clear()
+            else:
+                for year in years:
+                    cls._cache.pop(year, None)
+                    cls._cached_at.pop(year, None)
+            cls._all_years_at = None
+
+    @classmethod
+    def _fresh(cls, cached_at: Optional[float]) -> bool:
+        return cached_at is not None and time.monotonic() - cached_at < CACHE_TTL_SECONDS
+
+    @staticmethod
+    def _grouped_rows(years: Optional[List[int]] = None):
+        """Única consulta agregada: (año, tipo, país, región, total)"""
+        year_column = db.extract('year', Holiday.date)
+        query = db.session.query(
+            year_column.label('year'),
+            Holiday.holiday_type,
+            Holiday.country,
+            Holiday.region,
+            db.func.count(Holiday.id).label('count')
+        ).filter(Holiday.active == True)
+
+        if years is not None:
+            query = query.filter(
+                Holiday.date >= date(min(years), 1, 1),
+                Holiday.date <= date(max(years), 12, 31)
+            )
+
+        return query.group_by(
+            year_column, Holiday.holiday_type, Holiday.country, Holiday.region
+        ).all()
+
+    @staticmethod
+    def _empty(year: int) -> Dict:
+        return {
+            'year': year,
+            'total': 0,
+            **{holiday_type: 0 for holiday_type in HOLIDAY_TYPES},
+            'by_type': {},
+            'by_country': {},
+            'by_country_type': {},
+            'by_region': []
+        }
+
+    @classmethod
+    def _build(cls, rows, years: Iterable[int]) -> Dict[int, Dict]:
+        """Acumula los niveles superiores (tipo, país, país × tipo) desde la agrupación fina"""
+        stats = {year: cls._empty(year) for year in years}
+        regions = {}
+
+        for row in rows:
+            year = int(row.year)
+            entry = stats.setdefault(year, cls._empty(year))
+            holiday_type = row.holiday_type or 'national'
+            count = row.count
+
+            entry['total'] += count
+            if holiday_type in HOLIDAY_TYPES:
+                entry[holiday_type] += count
+            entry['by_type'][holiday_type] = entry['by_type'].get(holiday_type, 0) + count
+            entry['by_country'][row.country] = entry['by_country'].get(row.country, 0) + count
+            country_types = entry['by_country_type'].setdefault(row.country, {})
+            country_types[holiday_type] = country_types.get(holiday_type, 0) + count
+            if row.region:
+                key = (year, row.country, row.region)
+                regions[key] = regions.get(key, 0) + count
+
+        for (year, country, region), count in regions.items():
+            stats[year]['by_region'].append({'country': country, 'region': region, 'count': count})
+        for entry in stats.values():
+            entry['by_region'].sort(key=lambda item: (-item['count'], item['country'], item['region']))
+
+        return stats
+
+    @classmethod
+    def for_years(cls, years: Iterable[int]) -> Dict[int, Dict]:
+        """Estadísticas de varios años; los no cacheados se calculan en una sola consulta"""
+        years = sorted(set(years))
+        with cls._lock:
+            missing = [year for year in years if not cls._fresh(cls._cached_at.get(year))]
+
+        if missing:
+            rows = cls._grouped_rows(missing)
+            computed = cls._build(rows, missing)
+            now = time.monotonic()
+            with cls._lock:
+                for year in missing:
+                    cls._cache[year] = computed[year]
+                    cls._cached_at[year] = now
+
+        with cls._lock:
+            return {year: cls._cache[year] for year in years}
+
+    @classmethod
+    def for_year(cls, year: int) -> Dict:
+        """Estadísticas de un año (formato de get_holiday_statistics)"""
+        return cls.for_years([year])[year]
+
+    @classmethod
+    def compare(cls, years: Iterable[int]) -> Dict:
+        """Comparativa multi-año: estadísticas por año y variación respecto al año anterior"""
+        stats = cls.for_years(years)
+        ordered = sorted(stats)
+        comparison = []
+        for previous, current in zip(ordered, ordered[1:]):
+            comparison.append({
+                'from': previous,
+                'to': current,
+                'total_delta': stats[current]['total'] - stats[previous]['total'],
+                **{
+                    f'{holiday_type}_delta': stats[current][holiday_type] - stats[previous][holiday_type]
+                    for holiday_type in HOLIDAY_TYPES
+                }
+            })
+        return {
+            'years': {str(year): stats[year] for year in ordered},
+            'comparison': comparison
+        }
+
+    @classmethod
+    def all_years(cls) -> Dict[int, Dict]:
+        """Estadísticas de todos los años con festivos activos (una consulta si no hay caché)"""
+        with cls._lock:
+            if cls._fresh(cls._all_years_at):
+                return dict(cls._cache)
+
+        rows = cls._grouped_rows()
+        computed = cls._build(rows, [])
+        now = time.monotonic()
+        with cls._lock:
+            cls._cache = dict(computed)
+            cls._cached_at = {year: now for year in computed}
+            cls._all_years_at = now
+            return dict(cls._cache)
+
+    @classmethod
+    def summary(cls, countries_with_employees: Iterable[str]) -> Dict:
+        """Resumen global (formato de HolidayService.get_holidays_summary)"""
+        totals_by_country = {}
+        totals_by_type = {}
+        total = 0
+        for entry in cls.all_years().values():
+            total += entry['total']
+            for country, count in entry['by_country'].items():
+                totals_by_country[country] = totals_by_country.get(country, 0) + count
+            for holiday_type, count in entry['by_type'].items():
+                totals_by_type[holiday_type] = totals_by_type.get(holiday_type, 0) + count
+
+        countries_stats = sorted(totals_by_country.items(), key=lambda item: -item[1])
+        missing = [country for country in countries_with_employees if country not in totals_by_country]
+
+        return {
+            'total_holidays': total,
+            'countries_with_holidays': len(countries_stats),
+            'countries_without_holidays': len(missing),
+            'countries_stats': [
+                {'country': country, 'count': count}
+                for country, count in countries_stats[:10]  # Top 10
+            ],
+            'type_stats': [
+                {'type': holiday_type, 'count': count}
+                for holiday_type, count in totals_by_type.items()
+            ],
+            'missing_countries': missing
+        }
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    years = session.info.pop(CHANGED_YEARS_KEY, None)
+    if years:
+        HolidayStatistics.invalidate(years)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(CHANGED_YEARS_KEY, None)
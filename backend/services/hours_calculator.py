@@ -233,7 +233,7 @@ class HoursCalculator:
             'total_teams': 0
         }
         
-        teams = Team.query.filter(Team.active == True).all()
+        teams = Team.query.all()
         
         for team in teams:
             team_efficiency = HoursCalculator.calculate_team_efficiency(team, year, month)
@@ -0,0 +1,323 @@
+"""
+Búsqueda en los logs estructurados (JSON por línea) que escribe logging_config
+
+Cada categoría es un fichero de ``LOG_DIR`` con sus rotaciones
+(``auth.log``, ``auth.log.1``...). Los ficheros se recorren del final hacia
+el principio con ``mmap``, así que la primera página sale de los últimos
+bytes sin leer el fichero entero.
+
+Para no recorrer bloques que no pueden coincidir, cada fichero tiene un
+índice lateral en ``LOG_DIR/.index``: trozos de ~64 KB alineados a línea
+con su rango de fechas y los niveles que contienen. El índice se guarda por
+inodo, de modo que al rotar (``auth.log`` -> ``auth.log.1``, mismo inodo)
+sigue valiendo, y se amplía de forma incremental cuando el fichero crece.
+
+La paginación es por cursor: apunta al inodo y al byte donde empieza la
+última línea devuelta, y la página siguiente continúa justo antes.
+"""
+import base64
+import json
+import logging
+import mmap
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Categoría -> fichero base (ver setup_logging)
+LOG_CATEGORIES = {
+    'app': 'team_time_management.log',
+    'errors': 'errors.log',
+    'auth': 'auth.log',
+    'email': 'email.log',
+    'database': 'database.log',
+    'external_api': 'external_api.log',
+}
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+# Un bit por nivel en la máscara de cada bloque del índice
+_LEVEL_BITS = {name: 1 << index for index, name in enumerate(LEVELS)}
+_ALL_LEVELS = sum(_LEVEL_BITS.values())
+
+INDEX_DIR = '.index'
+INDEX_VERSION = 1
+BLOCK_SIZE = 64 * 1024
+
+# StructuredFormatter escribe siempre timestamp y level al principio de la línea
+_LINE_PREFIX = re.compile(rb'^\{"timestamp": "([^"]+)", "level": "([A-Z]+)"')
+
+
+class InvalidCursor(ValueError):
+    """Cursor mal formado o de un fichero que ya no existe"""
+
+
+def parse_timestamp(value: str) -> float:
+    """Fecha ISO (con o sin 'Z') a epoch en UTC"""
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _line_header(line: bytes):
+    """(epoch, nivel) de una línea sin decodificar el JSON entero"""
+    match = _LINE_PREFIX.match(line)
+    try:
+        if match:
+            return parse_timestamp(match.group(1).decode()), match.group(2).decode()
+        entry = json.loads(line)
+        return parse_timestamp(entry['timestamp']), entry.get('level')
+    except (ValueError, KeyError, TypeError):
+        return None, None
+
+
+def encode_cursor(inode: int, offset: int) -> str:
+    raw = json.dumps({'i': inode, 'o': offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return int(data['i']), int(data['o'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Cursor no válido') from e
+
+
+class LogIndex:
+    """Índice lateral de un fichero de log: bloques [inicio, fin, ts_min, ts_max, niveles]"""
+
+    def __init__(self, index_dir: str, base_name: str, inode: int):
+        self.path = os.path.join(index_dir, f'{base_name}.{inode}.json')
+        self.blocks: List[list] = []
+        self.indexed_to = 0
+        # Primeros bytes del fichero: detectan un inodo reutilizado por otro fichero
+        self.head = None
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                data = json.load(handle)
+            if data.get('version') == INDEX_VERSION:
+                self.blocks = data['blocks']
+                self.indexed_to = data['indexed_to']
+                self.head = data.get('head')
+        except (OSError, ValueError, KeyError):
+            self.blocks, self.indexed_to, self.head = [], 0, None
+        return self
+
+    def save(self):
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump({'version': INDEX_VERSION, 'head': self.head, 'indexed_to': self.indexed_to,
+                       'blocks': self.blocks}, handle)
+        # Reemplazo atómico: otros workers pueden estar leyendo el índice
+        os.replace(temporary, self.path)
+
+    def update(self, data, size: int) -> bool:
+        """
+        Indexa lo que falte hasta la última línea completa.
+
+        El último bloque se rehace si estaba incompleto, para que el índice de
+        un fichero que crece no acabe en bloques diminutos.
+
+        Returns:
+            True si el índice ha cambiado
+        """
+        head = data[:256].decode('utf-8', 'replace')
+        if size < self.indexed_to or (self.head is not None and self.head != head):
+            # Fichero truncado o distinto con el mismo inodo: se reindexa entero
+            # (un fichero de menos de 256 bytes que crece también, y es barato)
+            self.blocks, self.indexed_to = [], 0
+        self.head = head
+        if self.blocks and self.blocks[-1][1] - self.blocks[-1][0] < BLOCK_SIZE:
+            self.indexed_to = self.blocks.pop()[0]
+
+        end = data.rfind(b'\n', self.indexed_to, size) + 1
+        if end <= self.indexed_to:
+            return False
+
+        position = self.indexed_to
+        while position < end:
+            block_end = data.find(b'\n', min(position + BLOCK_SIZE, end) - 1, end) + 1 or end
+            self.blocks.append(self._summarize(data, position, block_end))
+            position = block_end
+        self.indexed_to = end
+        return True
+
+    @staticmethod
+    def _summarize(data, start: int, end: int) -> list:
+        lowest, highest, mask = None, None, 0
+        position = start
+        while position < end:
+            line_end = data.find(b'\n', position, end)
+            line_end = end if line_end < 0 else line_end
+            timestamp, level = _line_header(data[position:line_end])
+            if timestamp is not None:
+                lowest = timestamp if lowest is None else min(lowest, timestamp)
+                highest = timestamp if highest is None else max(highest, timestamp)
+            # Niveles desconocidos marcan todos los bits: el bloque nunca se descarta por nivel
+            mask |= _LEVEL_BITS.get(level, _ALL_LEVELS)
+            position = line_end + 1
+        return [start, end, lowest, highest, mask]
+
+
+class LogSearch:
+    """Consulta los logs estructurados de ``log_dir`` del más reciente al más antiguo"""
+
+    def __init__(self, log_dir: str, max_scan_bytes: int = 64 * 1024 * 1024):
+        self.log_dir = log_dir
+        self.index_dir = os.path.join(log_dir, INDEX_DIR)
+        self.max_scan_bytes = max_scan_bytes
+
+    def files(self, category: str) -> List[dict]:
+        """Fichero activo y rotaciones de una categoría, del más nuevo al más antiguo"""
+        base_name = LOG_CATEGORIES[category]
+        found = []
+        suffix = 0
+        while True:
+            path = os.path.join(self.log_dir, base_name if suffix == 0 else f'{base_name}.{suffix}')
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if suffix == 0:
+                    suffix += 1
+                    continue
+                break
+            found.append({'path': path, 'inode': stat.st_ino, 'size': stat.st_size})
+            suffix += 1
+        return found
+
+    def search(self, category: str = 'app', level: Optional[str] = None, logger_name: Optional[str] = None,
+               text: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Busca entradas que cumplan todos los filtros, de la más reciente a la más antigua.
+
+        Args:
+            category: Clave de LOG_CATEGORIES
+            level: Nivel mínimo ('WARNING' devuelve WARNING, ERROR y CRITICAL)
+            logger_name: Prefijo del nombre del logger
+            text: Texto a buscar (sin distinguir mayúsculas) en la línea
+            since, until: Ventana de tiempo en epoch UTC (ambos incluidos)
+            limit: Entradas por página
+            cursor: ``next_cursor`` de la página anterior
+
+        Returns:
+            Diccionario con ``logs``, ``next_cursor`` (None al terminar) y
+            bytes recorridos
+        """
+        if category not in LOG_CATEGORIES:
+            raise ValueError(f"Categoría desconocida: {category}")
+        if level and level not in LEVELS:
+            raise ValueError(f"Nivel desconocido: {level}")
+
+        wanted_mask = sum(bit for name, bit in _LEVEL_BITS.items()
+                          if not level or LEVELS[name] >= LEVELS[level])
+        needle = text.lower() if text else None
+
+        files = self.files(category)
+        start_file, end_offset = 0, None
+        if cursor:
+            inode, end_offset = decode_cursor(cursor)
+            positions = [index for index, info in enumerate(files) if info['inode'] == inode]
+            if not positions:
+                raise InvalidCursor('El fichero del cursor ya no existe (rotación)')
+            start_file = positions[0]
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._prune_indexes(category, files)
+
+        results, scanned = [], 0
+        for position in range(start_file, len(files)):
+            info = files[position]
+            if info['size'] == 0:
+                continue
+            with open(info['path'], 'rb') as handle, \
+                    mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                index = LogIndex(self.index_dir, LOG_CATEGORIES[category], info['inode']).load()
+                if index.update(data, size):
+                    index.save()
+
+                end = index.indexed_to if end_offset is None else min(end_offset, index.indexed_to)
+                end_offset = None
+                for block_start, block_end, lowest, highest, mask in reversed(index.blocks):
+                    if block_start >= end:
+                        continue
+                    if not mask & wanted_mask:
+                        continue
+                    if lowest is not None and ((since is not None and highest < since) or
+                                               (until is not None and lowest > until)):
+                        continue
+
+                    if scanned >= self.max_scan_bytes:
+                        # Presupuesto agotado: el cursor continúa en este bloque
+                        return self._page(results, info['inode'], min(end, block_end), scanned)
+
+                    block_stop = min(end, block_end)
+                    scanned += block_stop - block_start
+                    line_end = block_stop
+                    while line_end > block_start:
+                        line_start = max(data.rfind(b'\n', block_start, line_end - 1) + 1, block_start)
+                        entry = self._match(data[line_start:line_end], wanted_mask, logger_name,
+                                            needle, since, until, level)
+                        if entry is not None:
+                            results.append(entry)
+                            if len(results) >= limit:
+                                return self._page(results, info['inode'], line_start, scanned)
+                        line_end = line_start
+
+        return self._page(results, None, None, scanned)
+
+    @staticmethod
+    def _match(line: bytes, wanted_mask: int, logger_name, needle, since, until, level) -> Optional[dict]:
+        line = line.rstrip(b'\n')
+        if not line:
+            return None
+        if needle is not None and needle not in line.decode('utf-8', 'replace').lower():
+            return None
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        if level and not _LEVEL_BITS.get(entry.get('level'), 0) & wanted_mask:
+            return None
+        if logger_name and not str(entry.get('logger', '')).startswith(logger_name):
+            return None
+        if since is not None or until is not None:
+            try:
+                timestamp = parse_timestamp(entry['timestamp'])
+            except (ValueError, KeyError, TypeError):
+                return None
+            if (since is not None and timestamp < since) or (until is not None and timestamp > until):
+                return None
+        return entry
+
+    @staticmethod
+    def _page(results: List[dict], inode: Optional[int], offset: Optional[int], scanned: int) -> Dict:
+        return {
+            'logs': results,
+            'next_cursor': encode_cursor(inode, offset) if inode is not None else None,
+            'scanned_bytes': scanned
+        }
+
+    def _prune_indexes(self, category: str, files: List[dict]):
+        """Borra índices de inodos que ya no están en la rotación"""
+        prefix = f'{LOG_CATEGORIES[category]}.'
+        live = {f"{prefix}{info['inode']}.json" for info in files}
+        try:
+            names = os.listdir(self.index_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix) and name.endswith('.json') and name not in live:
+                # Solo índices de esta categoría: el resto del nombre es un inodo
+                if name[len(prefix):-len('.json')].isdigit():
+                    try:
+                        os.remove(os.path.join(self.index_dir, name))
+                    except OSError:
+                        pass
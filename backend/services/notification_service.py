@@ -4,10 +4,14 @@ import logging
 from flask import current_app
 
 from models.notification import Notification, NotificationType, NotificationPriority
-from models.user import User, db
+from models.notification_counter import NotificationCounter
+from models.user import User, Role, db
 from models.employee import Employee
 from models.team import Team
+from models.team_membership import TeamMembership
 from models.calendar_activity import CalendarActivity
+from sqlalchemy import select, insert, or_, and_
+from .event_broker import publish_event, publish_events, build_message, user_channel
 
 logger = logging.getLogger(__name__)
 
@@ -238,6 +242,106 @@ class NotificationService:
             db.session.rollback()
             return None
     
+    # Tamaño de bloque para inserciones multi-fila en notificaciones masivas
+    BROADCAST_CHUNK_SIZE = 1000
+    
+    @staticmethod
+    def get_broadcast_target_query(target_type: str, team_id: int = None):
+        """
+        Construye la consulta (una sola sentencia) de IDs de usuarios destino de
+        una notificación masiva: 'all', 'employees', 'managers' o 'team'.
+        """
+        query = select(User.id).where(User.active == True)
+        
+        if target_type == 'all':
+            return query
+        if target_type in ('employees', 'managers'):
+            role_name = 'employee' if target_type == 'employees' else 'manager'
+            return query.where(User.roles.any(Role.name == role_name))
+        if target_type == 'team':
+            return query.join(Employee, Employee.user_id == User.id).where(
+                Employee.active == True,
+                or_(
+                    Employee.team_id == team_id,
+                    Employee.memberships.any(and_(
+                        TeamMembership.team_id == team_id,
+                        TeamMembership.active == True
+                    ))
+                )
+            ).distinct()
+        
+        raise ValueError(f"target_type no válido: {target_type}")
+    
+    @staticmethod
+    def broadcast_system_notification(target_type: str, title: str, message: str,
+                                      priority: str = 'medium', send_email: bool = False,
+                                      data: Dict = None, team_id: int = None,
+                                      created_by: int = None) -> Dict:
+        """
+        Envía una notificación del sistema a muchos usuarios con operaciones por
+        conjuntos: destinatarios resueltos en una consulta, inserción multi-fila
+        por bloques, contadores y eventos en bloque y un único commit.
+        
+        Los emails no se envían aquí: las notificaciones con send_email quedan en
+        la cola (``process_notification_queue``).
+        """
+        user_ids = db.session.execute(
+            NotificationService.get_broadcast_target_query(target_type, team_id)
+        ).scalars().all()
+        
+        if not user_ids:
+            return {'notifications_sent': 0, 'emails_queued': 0}
+        
+        priority_value = NotificationCounter.normalize_priority(priority)
+        now = datetime.utcnow()
+        table = Notification.__table__
+        
+        try:
+            messages = []
+            for start in range(0, len(user_ids), NotificationService.BROADCAST_CHUNK_SIZE):
+                chunk = user_ids[start:start + NotificationService.BROADCAST_CHUNK_SIZE]
+                rows = [{
+                    'user_id': user_id,
+                    'title': title,
+                    'message': message,
+                    'notification_type': NotificationType.SYSTEM_ALERT.value,
+                    'priority': priority_value,
+                    'read': False,
+                    'data': data or {},
+                    'send_email': bool(send_email),
+                    'email_sent': False,
+                    'created_by': created_by,
+                    'created_at': now
+                } for user_id in chunk]
+                
+                inserted = db.session.execute(
+                    insert(table).returning(table.c.id, table.c.user_id), rows
+                ).all()
+                
+                messages.extend(build_message(user_channel(user_id), 'notification', {
+                    'id': notification_id,
+                    'title': title,
+                    'notification_type': NotificationType.SYSTEM_ALERT.value,
+                    'priority': priority_value,
+                    'created_at': now.isoformat()
+                }) for notification_id, user_id in inserted)
+            
+            NotificationCounter.increment_many(db.session, user_ids, priority_value)
+            publish_events(db.session, messages)
+            
+            db.session.commit()
+            
+        except Exception as e:
+            logger.error(f"Error en notificación masiva ({target_type}): {e}")
+            db.session.rollback()
+            raise
+        
+        logger.info(f"Notificación masiva '{title}' enviada a {len(user_ids)} usuarios ({target_type})")
+        return {
+            'notifications_sent': len(user_ids),
+            'emails_queued': len(user_ids) if send_email else 0
+        }
+    
     @staticmethod
     def get_user_notifications(user_id: int, unread_only: bool = False, limit: int = 50) -> List[Notification]:
         """Obtiene notificaciones de un usuario"""
@@ -247,7 +351,7 @@ class NotificationService:
             query = query.filter(Notification.read == False)
         
         return query.order_by(
-            Notification.priority.desc(),
+            Notification.priority_rank().desc(),
             Notification.created_at.desc()
         ).limit(limit).all()
     
@@ -255,14 +359,16 @@ class NotificationService:
     def mark_notifications_as_read(notification_ids: List[int], user_id: int) -> int:
         """Marca notificaciones como leídas"""
         try:
-            updated = Notification.query.filter(
+            updated = Notification.mark_read_and_count(
                 Notification.id.in_(notification_ids),
-                Notification.user_id == user_id,
-                Notification.read == False
-            ).update({
-                'read': True,
-                'read_at': datetime.utcnow()
-            }, synchronize_session=False)
+                Notification.user_id == user_id
+            )
+            
+            if updated:
+                publish_event(db.session, user_channel(user_id), 'notifications_read', {
+                    'notification_ids': notification_ids,
+                    'updated_count': updated
+                })
             
             db.session.commit()
             logger.info(f"Marcadas {updated} notificaciones como leídas para usuario {user_id}")
@@ -274,39 +380,83 @@ class NotificationService:
             db.session.rollback()
             return 0
     
+    @staticmethod
+    def mark_all_notifications_as_read(user_id: int) -> int:
+        """Marca todas las notificaciones no leídas de un usuario como leídas"""
+        try:
+            # El contador baja solo por las filas que devuelve el UPDATE: las creadas
+            # en paralelo siguen contando (ponerlo a cero las perdería)
+            updated = Notification.mark_read_and_count(Notification.user_id == user_id)
+            
+            if updated:
+                publish_event(db.session, user_channel(user_id), 'notifications_read', {
+                    'all': True,
+                    'updated_count': updated
+                })
+            
+            db.session.commit()
+            logger.info(f"Marcadas {updated} notificaciones como leídas para usuario {user_id}")
+            
+            return updated
+            
+        except Exception as e:
+            logger.error(f"Error marcando todas las notificaciones como leídas: {e}")
+            db.session.rollback()
+            return 0
+    
+    @staticmethod
+    def get_unread_counters(user_id: int) -> NotificationCounter:
+        """
+        Obtiene los contadores de no leídas de un usuario (lectura de una fila por PK).
+        Si el usuario aún no tiene fila, se calculan desde ``notification`` sin
+        escribir: la fila la crea la siguiente escritura (UPSERT) o la
+        reconciliación periódica (``flask reconcile-notification-counters``).
+        """
+        counter = db.session.get(NotificationCounter, user_id)
+        if counter is None:
+            counts = NotificationService._count_unread([user_id]).get(
+                user_id, dict.fromkeys(NotificationCounter.PRIORITY_COLUMNS, 0)
+            )
+            # Instancia transitoria: no se añade a la sesión
+            counter = NotificationCounter(user_id=user_id, **{
+                column: counts[priority] for priority, column in NotificationCounter.PRIORITY_COLUMNS.items()
+            })
+        return counter
+    
+    @staticmethod
+    def _count_unread(user_ids: List[int] = None) -> Dict[int, Dict[str, int]]:
+        """No leídas por usuario y prioridad desde la tabla notification (GROUP BY)"""
+        query = db.session.query(
+            Notification.user_id,
+            Notification._priority,
+            db.func.count(Notification.id)
+        ).filter(Notification.read == False)
+        if user_ids is not None:
+            query = query.filter(Notification.user_id.in_(user_ids))
+        
+        counts_by_user = {}
+        for user_id, priority, count in query.group_by(Notification.user_id, Notification._priority).all():
+            counts = counts_by_user.setdefault(user_id, dict.fromkeys(NotificationCounter.PRIORITY_COLUMNS, 0))
+            counts[NotificationCounter.normalize_priority(priority)] += count
+        return counts_by_user
+    
     @staticmethod
     def get_notification_summary(user_id: int) -> Dict:
         """Obtiene resumen de notificaciones para un usuario"""
         try:
-            unread_count = Notification.query.filter(
-                Notification.user_id == user_id,
-                Notification.read == False
-            ).count()
-            
-            # Contar por prioridad
-            priority_counts = db.session.query(
-                Notification.priority,
-                db.func.count(Notification.id).label('count')
-            ).filter(
-                Notification.user_id == user_id,
-                Notification.read == False
-            ).group_by(Notification.priority).all()
-            
-            priority_summary = {
+            counter = NotificationService.get_unread_counters(user_id)
+            priority_summary = counter.priority_counts() if counter else {
                 'urgent': 0,
                 'high': 0,
                 'medium': 0,
                 'low': 0
             }
+            unread_count = sum(priority_summary.values())
             
-            for priority, count in priority_counts:
-                if priority:
-                    priority_summary[priority.value] = count
-            
-            # Obtener notificaciones recientes
+            # Obtener notificaciones recientes (sólo si hay no leídas)
             recent_notifications = NotificationService.get_user_notifications(
                 user_id, unread_only=True, limit=5
-            )
+            ) if unread_count else []
             
             return {
                 'unread_count': unread_count,
@@ -326,6 +476,50 @@ class NotificationService:
                 'has_high': False
             }
     
+    @staticmethod
+    def reconcile_notification_counters(user_ids: List[int] = None) -> Dict:
+        """
+        Recalcula los contadores de no leídas desde la tabla notification y corrige
+        desviaciones (escrituras masivas fuera del ORM, borrados en cascada, etc.)
+        """
+        results = {'checked': 0, 'corrected': 0}
+        
+        try:
+            counters_query = NotificationCounter.query
+            if user_ids is not None:
+                counters_query = counters_query.filter(NotificationCounter.user_id.in_(user_ids))
+            
+            # Bloquear los contadores antes de contar: un incremento concurrente
+            # (UPDATE ... SET unread = unread + 1) espera al commit y se suma al
+            # valor corregido en lugar de perderse al sobrescribirlo
+            existing = {counter.user_id: counter for counter in counters_query.with_for_update().all()}
+            expected = NotificationService._count_unread(user_ids)
+            
+            for user_id in set(expected) | set(existing) | set(user_ids or []):
+                counts = expected.get(user_id, dict.fromkeys(NotificationCounter.PRIORITY_COLUMNS, 0))
+                counter = existing.get(user_id)
+                results['checked'] += 1
+                
+                if counter is None:
+                    counter = NotificationCounter(user_id=user_id)
+                    db.session.add(counter)
+                elif counter.priority_counts() == counts:
+                    continue
+                
+                for priority, column in NotificationCounter.PRIORITY_COLUMNS.items():
+                    setattr(counter, column, counts[priority])
+                results['corrected'] += 1
+            
+            db.session.commit()
+            if results['corrected']:
+                logger.info(f"Contadores de notificaciones corregidos: {results['corrected']}/{results['checked']}")
+            
+        except Exception as e:
+            logger.error(f"Error reconciliando contadores de notificaciones: {e}")
+            db.session.rollback()
+        
+        return results
+    
     @staticmethod
     def cleanup_old_notifications(days_old: int = 30) -> int:
         """Limpia notificaciones antiguas leídas"""
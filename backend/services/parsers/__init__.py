@@ -19,8 +19,18 @@ from .borm_parser import BORMParser
 from .bon_parser import BONParser
 from .bor_parser import BORParser
 
+# Código de regla -> clase de parser (los 17 boletines autonómicos)
+PARSERS = {
+    parser.RULE.code: parser
+    for parser in (
+        DOGParser, BOJAParser, DOGCParser, BOCMParser, DOGVParser, BOPVParser,
+        BOAParser, BOPAParser, BOIBParser, BOCCanariasParser, BOCCantabriaParser,
+        DOCMParser, BOCYLParser, DOEParser, BORMParser, BONParser, BORParser
+    )
+}
+
 __all__ = [
-    'DOGParser', 'BOJAParser', 'DOGCParser', 'BOCMParser', 'DOGVParser', 'BOPVParser',
+    'PARSERS', 'DOGParser', 'BOJAParser', 'DOGCParser', 'BOCMParser', 'DOGVParser', 'BOPVParser',
     'BOAParser', 'BOPAParser', 'BOIBParser', 'BOCCanariasParser', 'BOCCantabriaParser',
     'DOCMParser', 'BOCYLParser', 'DOEParser', 'BORMParser', 'BONParser', 'BORParser'
 ]
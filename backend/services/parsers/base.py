@@ -0,0 +1,341 @@
+"""
+Capa común de parseo de boletines oficiales (BOE y diarios autonómicos)
+
+- Registro de patrones compilados a nivel de módulo (``register_pattern``):
+  los parsers registran sus expresiones al importarse y nunca compilan por
+  llamada.
+- Tokenización en una sola pasada: un único ``finditer`` sobre el texto
+  limpio emite anexos y cabeceras de provincia, etiquetas (municipio), fechas
+  con su nombre opcional, referencias a boletines y separadores; una pequeña
+  máquina de estados agrupa las fechas bajo su municipio.
+- Reglas por región (``RegionRule``) registrables con ``register_rule``:
+  idiomas de los meses, etiquetas aceptadas, limpieza de nombres y festivos
+  adicionales específicos de cada boletín.
+"""
+import html
+import logging
+import re
+import traceback
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from .pdf import get_pdf_extractor, is_pdf
+
+logger = logging.getLogger(__name__)
+
+_PATTERNS: Dict[str, re.Pattern] = {}
+_RULES: Dict[str, 'RegionRule'] = {}
+
+
+def register_pattern(name: str, pattern: str, flags: int = 0) -> re.Pattern:
+    """
+    Compila y registra un patrón con nombre.
+
+    Es idempotente: registrar de nuevo el mismo patrón devuelve el compilado
+    existente; registrar otro distinto con el mismo nombre es un error.
+    """
+    compiled = _PATTERNS.get(name)
+    if compiled is None:
+        compiled = _PATTERNS[name] = re.compile(pattern, flags)
+    elif compiled.pattern != pattern:
+        raise ValueError(f"Patrón '{name}' ya registrado con otra expresión")
+    return compiled
+
+
+def get_pattern(name: str) -> re.Pattern:
+    """Patrón compilado registrado con ese nombre"""
+    return _PATTERNS[name]
+
+
+def registered_patterns() -> Dict[str, re.Pattern]:
+    """Copia del registro de patrones (nombre -> patrón compilado)"""
+    return dict(_PATTERNS)
+
+
+# Meses por idioma (castellano y lenguas cooficiales)
+MONTHS = {
+    'es': {
+        'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+        'julio': 7, 'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10,
+        'noviembre': 11, 'diciembre': 12
+    },
+    'ca': {
+        'gener': 1, 'febrer': 2, 'març': 3, 'abril': 4, 'maig': 5, 'juny': 6,
+        'juliol': 7, 'agost': 8, 'setembre': 9, 'octubre': 10, 'novembre': 11, 'desembre': 12
+    },
+    'gl': {
+        'xaneiro': 1, 'febreiro': 2, 'marzo': 3, 'abril': 4, 'maio': 5, 'xuño': 6,
+        'xullo': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'decembro': 12
+    },
+    'eu': {
+        'urtarrila': 1, 'otsaila': 2, 'martxoa': 3, 'apirila': 4, 'maiatza': 5, 'ekaina': 6,
+        'uztaila': 7, 'abuztua': 8, 'iraila': 9, 'urria': 10, 'azaroa': 11, 'azaro': 11,
+        'abendua': 12
+    }
+}
+
+BULLETIN_CODES = (
+    'BOE', 'BOA', 'BOC', 'BOCM', 'BOCYL', 'BOIB', 'BOJA', 'BON', 'BOP', 'BOPA',
+    'BOPV', 'BOR', 'BORM', 'DOCM', 'DOE', 'DOG', 'DOGC', 'DOGV'
+)
+
+HTML_TAG = register_pattern('html.tag', r'<[^>]+>')
+WHITESPACE = register_pattern('text.whitespace', r'\s+')
+TRAILING_QUOTES = register_pattern('name.trailing_quotes', r'[»«"\s]+$')
+WEEKDAY_PREFIX = register_pattern(
+    'name.weekday_prefix',
+    r'^(?:lunes|martes|miércoles|jueves|viernes|sábado|domingo)\s+de\s+',
+    re.IGNORECASE
+)
+# "Coruña, A" -> "A Coruña"; "Bisbal d'Empordà, la" -> "la Bisbal d'Empordà"
+TRAILING_ARTICLE = register_pattern(
+    'place.trailing_article',
+    r"^(?P<name>.+?),\s*(?P<article>[AO]s?|El|La|Los|Las|Els|Les|L')$",
+    re.IGNORECASE
+)
+
+# Tokenizador único. Cada alternativa es un tipo de token (``lastgroup``):
+# las etiquetas se limitan a 80 caracteres sin dígitos ni puntuación fuerte,
+# lo que acota el retroceso en párrafos largos sin dos puntos.
+TOKENS = register_pattern('bulletin.tokens', r"""
+    (?P<reference>\b(?:""" + '|'.join(BULLETIN_CODES) + r""")
+        \s+de\s+\d{1,2}\s+de\s+[^\W\d_]+\s+de\s+\d{4})
+  | (?P<date>\b(?P<day>\d{1,2})\s+(?:de\s+|d['’]\s*)(?P<month>[^\W\d_]+)
+        (?:\s*,\s*(?P<name>[^\W\d_][^\d;:.]*))?)
+  | (?P<heading>\b(?:ANEXO\s+[IVXLC]+\s+)?Provincia(?:\s+de)?\s*:\s*
+        (?P<province>[^\W\d_][^\d;:.]{0,60}?)(?=\s*(?:\d|ANEXO\b|$)))
+  | (?P<annex>\bANEXO\s+(?P<numeral>[IVXLC]+)\b)
+  | \b(?P<label>[^\W\d_][^\d;:.]{0,80}?)\s*:
+  | (?P<separator>;)
+  | (?P<end>\.(?!\w))
+""", re.IGNORECASE | re.VERBOSE)
+
+
+def clean_text(raw: str) -> str:
+    """Quita etiquetas HTML, resuelve entidades y normaliza espacios"""
+    text = HTML_TAG.sub(' ', raw)
+    text = html.unescape(text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def normalize_place(value: str) -> str:
+    """Normaliza un nombre de municipio (espacios y artículo pospuesto)"""
+    place = WHITESPACE.sub(' ', value).strip(' ,')
+    match = TRAILING_ARTICLE.match(place)
+    if match:
+        article = match.group('article')
+        separator = '' if article.endswith("'") else ' '
+        place = f"{article}{separator}{match.group('name')}"
+    return place
+
+
+class RegionRule:
+    """
+    Reglas de parseo de un boletín.
+
+    La regla base convierte cada fecha que sigue a una etiqueta
+    ``Municipio:`` en un festivo local de ``region``. Las subclases pueden
+    restringir las etiquetas (``label_pattern``), extraer el nombre del
+    festivo o añadir festivos que no siguen el formato común
+    (``extra_holidays``).
+    """
+
+    def __init__(self, code: str, region: Optional[str], bulletin: str,
+                 languages: Iterable[str] = ('es',), extract_names: bool = False,
+                 label_pattern: Optional[re.Pattern] = None,
+                 name_prefix: Optional[re.Pattern] = None):
+        self.code = code
+        self.region = region
+        self.bulletin = bulletin
+        self.languages = tuple(languages)
+        self.extract_names = extract_names
+        self.label_pattern = label_pattern
+        self.name_prefix = name_prefix
+        self.months = {}
+        for language in self.languages:
+            self.months.update(MONTHS[language])
+
+    def accept_label(self, label: str) -> Optional[str]:
+        """Municipio de una etiqueta, o None si la etiqueta no aplica"""
+        if self.label_pattern is not None:
+            match = self.label_pattern.match(label)
+            if not match:
+                return None
+            label = match.group('place')
+        place = normalize_place(label)
+        return place or None
+
+    def region_for(self, place: str) -> Optional[str]:
+        """Región a guardar para un municipio"""
+        return self.region
+
+    def annex_province(self, numeral: str) -> Optional[str]:
+        """Provincia de un anexo ("ANEXO II") sin cabecera de provincia; None si no se conoce"""
+        return None
+
+    def clean_name(self, raw: Optional[str]) -> Optional[str]:
+        """Nombre del festivo limpio, o None si no es utilizable"""
+        if not raw:
+            return None
+        name = WHITESPACE.sub(' ', raw).strip(' ,')
+        if self.name_prefix is not None:
+            name = self.name_prefix.sub('', name)
+        name = TRAILING_QUOTES.sub('', name).strip()
+        if len(name) > 200:
+            name = name[:197] + '...'
+        return name if len(name) >= 5 else None
+
+    def holiday_name(self, raw: Optional[str], place: str) -> Optional[str]:
+        """Nombre a guardar; None descarta la fecha"""
+        name = self.clean_name(raw) if self.extract_names else None
+        return name or f'Festivo local de {place}'
+
+    def build_holiday(self, place: str, province: Optional[str], day: int,
+                      month_name: str, name: str, year: int) -> Optional[Dict]:
+        """Dict de festivo con el esquema que consumen los servicios de carga"""
+        month = self.months.get(month_name.lower())
+        if not month:
+            return None
+        try:
+            holiday_date = date(year, month, day)
+        except ValueError:
+            logger.warning(f"Fecha inválida: {day}/{month}/{year} para {place}")
+            return None
+
+        region = self.region_for(place)
+        description = f'Festivo local de {place}'
+        if province:
+            description = f'{description} ({province})'
+
+        return {
+            'name': name,
+            'date': holiday_date.isoformat(),
+            'city': place[:100],
+            'region': region[:100] if region else None,
+            'country': 'España',
+            'description': description[:500],
+            'is_fixed': False
+        }
+
+    def extra_holidays(self, text: str, year: int) -> List[Dict]:
+        """Festivos con formatos propios del boletín (por defecto ninguno)"""
+        return []
+
+    def parse(self, text: str, year: int, clean: bool = True) -> List[Dict]:
+        """
+        Extrae los festivos de un documento en una sola pasada.
+
+        Args:
+            text: HTML o texto del boletín
+            year: Año de los festivos
+            clean: Si True, limpia HTML y espacios antes de tokenizar
+
+        Returns:
+            Lista de dicts de festivos locales
+        """
+        if clean:
+            text = clean_text(text)
+
+        holidays = []
+        place = None
+        province = None
+        references = 0
+
+        for match in TOKENS.finditer(text):
+            kind = match.lastgroup
+            if kind == 'date':
+                name = self.holiday_name(match.group('name'), place) if place else None
+                if name:
+                    holiday = self.build_holiday(
+                        place, province, int(match.group('day')), match.group('month'), name, year
+                    )
+                    if holiday:
+                        holidays.append(holiday)
+            elif kind == 'label':
+                place = self.accept_label(match.group('label'))
+            elif kind == 'end':
+                place = None
+            elif kind == 'heading':
+                province = normalize_place(match.group('province'))
+                place = None
+            elif kind == 'annex':
+                # Cada anexo abre una provincia; la cabecera que le siga, si la hay, prevalece
+                province = self.annex_province(match.group('numeral').upper())
+                place = None
+            elif kind == 'reference':
+                references += 1
+            # 'separator': el municipio sigue vigente hasta el punto
+
+        holidays.extend(self.extra_holidays(text, year))
+
+        if references:
+            logger.info(f"{self.bulletin}: {references} referencias a otros boletines oficiales")
+
+        return holidays
+
+
+def register_rule(rule: RegionRule) -> RegionRule:
+    """Registra la regla de un boletín por su código"""
+    _RULES[rule.code] = rule
+    return rule
+
+
+def get_rule(code: str) -> RegionRule:
+    """Regla registrada para un código de boletín"""
+    return _RULES[code]
+
+
+def registered_rules() -> Dict[str, RegionRule]:
+    """Copia del registro de reglas (código -> regla)"""
+    return dict(_RULES)
+
+
+class BulletinParser:
+    """
+    Base de los parsers de boletines autonómicos.
+
+    Gestiona la sesión HTTP y delega el parseo en la regla de la clase
+    (``RULE``), de modo que el mismo texto se puede parsear sin red con
+    ``parse_text``.
+    """
+
+    RULE: RegionRule = None
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'TeamTimeManagement/1.0',
+            'Accept': 'text/html, application/xhtml+xml, */*'
+        })
+
+    def fetch_text(self, url: str) -> Optional[str]:
+        """
+        Descarga un documento; None si la respuesta no es 200.
+
+        Los PDF (BOA, DOE...) se convierten a texto en el pool de procesos de
+        ``services.parsers.pdf``, con tiempo máximo y caché por contenido.
+        """
+        response = self.session.get(url, timeout=30)
+        if response.status_code != 200:
+            return None
+        if is_pdf(response.content, response.headers.get('Content-Type')):
+            return get_pdf_extractor().extract(response.content)
+        return response.text
+
+    def parse_text(self, text: str, year: int) -> List[Dict]:
+        """Parsea un documento ya descargado"""
+        return self.RULE.parse(text, year)
+
+    def parse_url(self, url: str, year: int) -> List[Dict]:
+        """Descarga y parsea un documento; los errores se registran y devuelven []"""
+        try:
+            text = self.fetch_text(url)
+            if text is None:
+                return []
+            return self.parse_text(text, year)
+        except Exception as e:
+            logger.error(f"Error parseando documento del {self.RULE.bulletin}: {e}")
+            logger.error(traceback.format_exc())
+            return []
@@ -2,25 +2,19 @@
 Parser específico para el Boletín Oficial de la Comunidad de Madrid (BOCM)
 Extrae festivos locales de las resoluciones publicadas
 """
-import requests
-import re
-from datetime import datetime, date
 from typing import List, Dict, Optional
 import logging
 
+from .base import BulletinParser, RegionRule, register_pattern, register_rule
+
 logger = logging.getLogger(__name__)
 
-class BOCMParser:
+class BOCMParser(BulletinParser):
     """Parser para festivos locales del BOCM (Madrid)"""
     
     BOCM_BASE_URL = "https://www.bocm.es"
-    
-    def __init__(self, session=None):
-        self.session = session or requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'TeamTimeManagement/1.0',
-            'Accept': 'text/html, application/xhtml+xml, */*'
-        })
+    LINK_PATTERN = register_pattern('bocm.link', r'/bocm/\d{4}/\d+/\d+')
+    RULE = register_rule(RegionRule('bocm', 'Madrid', 'BOCM'))
     
     def find_resolution_url(self, year: int) -> Optional[str]:
         """Busca la URL de la resolución de festivos locales para un año"""
@@ -40,8 +34,7 @@ class BOCMParser:
             response = self.session.get(search_url, params=search_params, timeout=30)
             if response.status_code == 200:
                 # Buscar enlaces a resoluciones
-                pattern = r'/bocm/\d{4}/\d+/\d+'
-                matches = re.findall(pattern, response.text)
+                matches = self.LINK_PATTERN.findall(response.text)
                 
                 if matches:
                     return f"https://www.bocm.es{matches[0]}"
@@ -52,62 +45,7 @@ class BOCMParser:
     
     def parse_resolution(self, url: str, year: int) -> List[Dict]:
         """Parsea una resolución del BOCM para extraer festivos locales"""
-        local_holidays = []
-        
-        try:
-            response = self.session.get(url, timeout=30)
-            if response.status_code != 200:
-                return local_holidays
-            
-            # Limpiar HTML
-            text = response.text
-            text = re.sub(r'<[^>]+>', ' ', text)
-            text = re.sub(r'\s+', ' ', text)
-            
-            month_names_es = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            # Patrón para municipios y fechas
-            # Formato típico: "Madrid: 15 de mayo, 9 de noviembre"
-            municipality_pattern = r'([A-ZÁÉÍÓÚÑ][^:]+?):\s*(\d+)\s+de\s+(\w+)[^;]*?;\s*(\d+)\s+de\s+(\w+)'
-            
-            matches = re.finditer(municipality_pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                municipality = match.group(1).strip()
-                municipality = re.sub(r'\s+', ' ', municipality)
-                
-                # Parsear ambas fechas
-                for day, month_name in [
-                    (int(match.group(2)), match.group(3)),
-                    (int(match.group(4)), match.group(5))
-                ]:
-                    month_name_lower = month_name.lower().strip()
-                    if month_name_lower in month_names_es:
-                        month = month_names_es[month_name_lower]
-                        try:
-                            holiday_date = date(year, month, day)
-                            
-                            local_holidays.append({
-                                'name': f'Festivo local de {municipality}',
-                                'date': holiday_date.isoformat(),
-                                'city': municipality,
-                                'region': 'Madrid',
-                                'country': 'España',
-                                'description': f'Festivo local de {municipality}',
-                                'is_fixed': False
-                            })
-                        except ValueError:
-                            logger.warning(f"Fecha inválida: {day}/{month}/{year} para {municipality}")
-            
-        except Exception as e:
-            logger.error(f"Error parseando resolución del BOCM: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-        
-        return local_holidays
+        return self.parse_url(url, year)
     
     def load_local_holidays_for_year(self, year: int) -> List[Dict]:
         """Carga festivos locales de Madrid para un año específico"""
@@ -2,27 +2,26 @@
 Parser específico para el Boletín Oficial del País Vasco (BOPV)
 Extrae festivos locales desde datos abiertos (JSON/CSV) o resoluciones
 """
-import requests
-import re
 import json
-from datetime import datetime, date
+from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 
+from .base import BulletinParser, RegionRule, register_pattern, register_rule
+
 logger = logging.getLogger(__name__)
 
-class BOPVParser:
+class BOPVParser(BulletinParser):
     """Parser para festivos locales del BOPV (País Vasco)"""
     
     BOPV_BASE_URL = "https://www.euskadi.eus/bopv"
     DATOS_ABIERTOS_URL = "https://www.euskadi.eus/contenidos/calendario_laboral/calendario_laboral_{year}.json"
+    LINK_PATTERN = register_pattern('bopv.link', r'/bopv/\d{4}/\d+/\d+')
+    RULE = register_rule(RegionRule('bopv', 'País Vasco', 'BOPV', languages=('es', 'eu')))
     
     def __init__(self, session=None):
-        self.session = session or requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'TeamTimeManagement/1.0',
-            'Accept': 'application/json, text/html, */*'
-        })
+        super().__init__(session)
+        self.session.headers.update({'Accept': 'application/json, text/html, */*'})
     
     def load_from_open_data(self, year: int) -> List[Dict]:
         """
@@ -95,8 +94,7 @@ class BOPVParser:
             response = self.session.get(search_url, params=search_params, timeout=30)
             if response.status_code == 200:
                 # Buscar enlaces a decretos/resoluciones
-                pattern = r'/bopv/\d{4}/\d+/\d+'
-                matches = re.findall(pattern, response.text)
+                matches = self.LINK_PATTERN.findall(response.text)
                 
                 if matches:
                     return f"https://www.euskadi.eus{matches[0]}"
@@ -107,63 +105,7 @@ class BOPVParser:
     
     def parse_resolution(self, url: str, year: int) -> List[Dict]:
         """Parsea una resolución del BOPV para extraer festivos locales"""
-        local_holidays = []
-        
-        try:
-            response = self.session.get(url, timeout=30)
-            if response.status_code != 200:
-                return local_holidays
-            
-            # Limpiar HTML
-            text = response.text
-            text = re.sub(r'<[^>]+>', ' ', text)
-            text = re.sub(r'\s+', ' ', text)
-            
-            month_names_es = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
-                'urtarrila': 1, 'otsaila': 2, 'martxoa': 3, 'apirila': 4, 'maiatza': 5, 'ekaina': 6,
-                'uztaila': 7, 'abuztua': 8, 'iraila': 9, 'urria': 10, 'azaro': 11, 'abendua': 12
-            }
-            
-            # Patrón para municipios y fechas (castellano/euskera)
-            municipality_pattern = r'([A-ZÁÉÍÓÚÑ][^:]+?):\s*(\d+)\s+de\s+(\w+)[^;]*?;\s*(\d+)\s+de\s+(\w+)'
-            
-            matches = re.finditer(municipality_pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                municipality = match.group(1).strip()
-                municipality = re.sub(r'\s+', ' ', municipality)
-                
-                # Parsear ambas fechas
-                for day, month_name in [
-                    (int(match.group(2)), match.group(3)),
-                    (int(match.group(4)), match.group(5))
-                ]:
-                    month_name_lower = month_name.lower().strip()
-                    if month_name_lower in month_names_es:
-                        month = month_names_es[month_name_lower]
-                        try:
-                            holiday_date = date(year, month, day)
-                            
-                            local_holidays.append({
-                                'name': f'Festivo local de {municipality}',
-                                'date': holiday_date.isoformat(),
-                                'city': municipality,
-                                'region': 'País Vasco',
-                                'country': 'España',
-                                'description': f'Festivo local de {municipality}',
-                                'is_fixed': False
-                            })
-                        except ValueError:
-                            logger.warning(f"Fecha inválida: {day}/{month}/{year} para {municipality}")
-            
-        except Exception as e:
-            logger.error(f"Error parseando resolución del BOPV: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-        
-        return local_holidays
+        return self.parse_url(url, year)
     
     def load_local_holidays_for_year(self, year: int) -> List[Dict]:
         """Carga festivos locales del País Vasco para un año específico"""
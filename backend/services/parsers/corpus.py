@@ -0,0 +1,249 @@
+"""
+Corpus grabado de boletines: grabación, reproducción sin red y salidas doradas
+
+- ``RecordingSession`` envuelve una sesión ``requests`` real y guarda cada
+  respuesta en un *cassette* JSON por parser y año.
+- ``ReplaySession`` sirve esas respuestas sin red, de modo que el flujo
+  completo de cada parser (búsqueda de la resolución + parseo) se ejecuta
+  offline.
+- ``replay_parser`` mide tiempo de parseo, memoria pico y documentos
+  procesados; ``compare_golden`` compara los festivos extraídos con la salida
+  dorada guardada.
+- ``published_excerpts`` carga extractos de boletines publicados (uno por
+  regla, con su fuente) y los pares municipio/fecha que deben extraerse.
+"""
+import base64
+import json
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from . import PARSERS
+from .pdf import is_pdf
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent.parent / 'tests' / 'fixtures' / 'bulletins'
+CASSETTES_DIR = CORPUS_DIR / 'cassettes'
+GOLDEN_DIR = CORPUS_DIR / 'golden'
+EXCERPTS_DIR = CORPUS_DIR / 'excerpts'
+
+
+def _request_key(url: str, params: Optional[Dict] = None) -> str:
+    """Clave estable de una petición (URL + parámetros ordenados)"""
+    if not params:
+        return url
+    return f"{url}?{json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)}"
+
+
+def cassette_path(code: str, year: int, directory: Path = CASSETTES_DIR) -> Path:
+    return directory / f'{code}_{year}.json'
+
+
+def golden_path(code: str, year: int, directory: Path = GOLDEN_DIR) -> Path:
+    return directory / f'{code}_{year}.json'
+
+
+class ReplayResponse:
+    """Respuesta grabada con la interfaz de ``requests.Response`` que usan los parsers"""
+
+    def __init__(self, status_code: int, text: str, url: str,
+                 content: Optional[bytes] = None, content_type: Optional[str] = None):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.content = content if content is not None else text.encode('utf-8')
+        self.headers = {'Content-Type': content_type} if content_type else {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class RecordingSession:
+    """Sesión que delega en ``requests`` y graba cada respuesta GET"""
+
+    def __init__(self, session=None):
+        self._session = session or requests.Session()
+        self.entries: List[Dict] = []
+
+    @property
+    def headers(self):
+        return self._session.headers
+
+    def get(self, url, params=None, **kwargs):
+        response = self._session.get(url, params=params, **kwargs)
+        entry = {
+            'key': _request_key(url, params),
+            'status': response.status_code,
+            'text': response.text
+        }
+        if is_pdf(response.content, response.headers.get('Content-Type')):
+            # Los PDF se guardan en base64 para reproducir los bytes exactos
+            entry['text'] = ''
+            entry['content_b64'] = base64.b64encode(response.content).decode('ascii')
+            entry['content_type'] = 'application/pdf'
+        self.entries.append(entry)
+        return response
+
+    def save(self, path: Path, code: str, year: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {'parser': code, 'year': year, 'responses': self.entries}
+        path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+class ReplaySession:
+    """Sesión sin red que sirve las respuestas de un cassette (404 si no está grabada)"""
+
+    def __init__(self, responses: List[Dict]):
+        self.headers = {}
+        self._responses = {entry['key']: entry for entry in responses}
+        self.served = set()
+        self.misses = []
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'ReplaySession':
+        payload = json.loads(path.read_text(encoding='utf-8'))
+        return cls(payload['responses'])
+
+    def get(self, url, params=None, **kwargs):
+        key = _request_key(url, params)
+        entry = self._responses.get(key)
+        if entry is None:
+            self.misses.append(key)
+            return ReplayResponse(404, '', url)
+        if entry['status'] == 200:
+            self.served.add(key)
+        content = base64.b64decode(entry['content_b64']) if 'content_b64' in entry else None
+        return ReplayResponse(entry['status'], entry['text'], url, content, entry.get('content_type'))
+
+
+def record_parser(code: str, year: int, directory: Path = CASSETTES_DIR) -> Dict:
+    """Ejecuta un parser contra los sitios reales y graba su cassette"""
+    session = RecordingSession()
+    holidays = PARSERS[code](session).load_local_holidays_for_year(year)
+    path = cassette_path(code, year, directory)
+    session.save(path, code, year)
+    return {'parser': code, 'year': year, 'responses': len(session.entries),
+            'holidays': len(holidays), 'path': str(path)}
+
+
+def _entry_size(entry: Dict) -> int:
+    if 'content_b64' in entry:
+        return len(entry['content_b64']) * 3 // 4
+    return len(entry['text'].encode('utf-8'))
+
+
+def _run(code: str, year: int, responses: List[Dict]):
+    session = ReplaySession(responses)
+    holidays = PARSERS[code](session).load_local_holidays_for_year(year)
+    return holidays, session
+
+
+def replay_parser(code: str, year: int, iterations: int = 5,
+                  directory: Path = CASSETTES_DIR) -> Optional[Dict]:
+    """
+    Reproduce un cassette con el parser y mide su coste.
+
+    El tiempo es la mediana de ``iterations`` ejecuciones; la memoria pico se
+    mide en una ejecución aparte con ``tracemalloc`` para no distorsionar el
+    tiempo.
+
+    Returns:
+        Dict con festivos extraídos y métricas, o None si no hay cassette
+    """
+    path = cassette_path(code, year, directory)
+    if not path.exists():
+        return None
+    responses = json.loads(path.read_text(encoding='utf-8'))['responses']
+
+    timings = []
+    holidays, session = [], None
+    for _ in range(max(iterations, 1)):
+        start = time.perf_counter()
+        holidays, session = _run(code, year, responses)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        _run(code, year, responses)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'parser': code,
+        'year': year,
+        'holidays': holidays,
+        'documents': len(session.served),
+        'bytes': sum(_entry_size(entry) for entry in responses),
+        'parse_ms': round(timings[len(timings) // 2] * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'misses': session.misses
+    }
+
+
+def _sort_key(holiday: Dict):
+    return (holiday['date'], holiday.get('city') or '', holiday['name'])
+
+
+def _canonical(holiday: Dict) -> str:
+    return json.dumps(holiday, sort_keys=True, ensure_ascii=False)
+
+
+def save_golden(code: str, year: int, holidays: List[Dict], directory: Path = GOLDEN_DIR) -> Path:
+    """Guarda la salida dorada (ordenada) de un parser"""
+    path = golden_path(code, year, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(sorted(holidays, key=_sort_key), indent=2, ensure_ascii=False) + '\n',
+        encoding='utf-8'
+    )
+    return path
+
+
+def compare_golden(code: str, year: int, holidays: List[Dict],
+                   directory: Path = GOLDEN_DIR) -> Optional[Dict]:
+    """
+    Compara festivos extraídos con la salida dorada.
+
+    Returns:
+        None si no hay salida dorada; si no, dict con ``missing`` (esperados no
+        extraídos) y ``unexpected`` (extraídos no esperados)
+    """
+    path = golden_path(code, year, directory)
+    if not path.exists():
+        return None
+    expected = Counter(_canonical(item) for item in json.loads(path.read_text(encoding='utf-8')))
+    actual = Counter(_canonical(item) for item in holidays)
+    return {
+        'missing': sorted((json.loads(key) for key in (expected - actual).elements()), key=_sort_key),
+        'unexpected': sorted((json.loads(key) for key in (actual - expected).elements()), key=_sort_key)
+    }
+
+
+def recorded_cassettes(directory: Path = CASSETTES_DIR) -> List[Dict]:
+    """Cassettes disponibles como [{'parser', 'year'}]"""
+    cassettes = []
+    if not directory.exists():
+        return cassettes
+    codes = sorted(PARSERS, key=len, reverse=True)
+    for path in sorted(directory.glob('*.json')):
+        code = next((code for code in codes if path.stem.startswith(f'{code}_')), None)
+        year = path.stem[len(code) + 1:] if code else ''
+        if year.isdigit():
+            cassettes.append({'parser': code, 'year': int(year)})
+    return cassettes
+
+
+def published_excerpts(directory: Path = EXCERPTS_DIR) -> Dict[str, Dict]:
+    """Extractos de boletines publicados por código de regla ({'source', 'year', 'text', 'expected'})"""
+    excerpts = {}
+    if not directory.exists():
+        return excerpts
+    for path in sorted(directory.glob('*.json')):
+        excerpt = json.loads(path.read_text(encoding='utf-8'))
+        excerpts[excerpt['parser']] = excerpt
+    return excerpts
@@ -0,0 +1,300 @@
+"""
+Extracción de texto de boletines en PDF fuera del proceso web
+
+La conversión PDF -> texto es intensiva en CPU, así que se envía a un pool de
+procesos acotado (``multiprocessing`` con contexto *spawn*, seguro también
+bajo gevent) con un tiempo máximo por documento. Si un PDF patológico agota
+ese tiempo, el pool se termina y se recrea, y el worker de gunicorn queda
+libre; los documentos de otros hilos que seguían en ese pool fallan en ese
+momento en lugar de esperar a su propio tiempo máximo. El texto extraído se
+cachea por el hash SHA-256 del contenido en memoria y, si se configura
+``PDF_TEXT_CACHE_DIR``, también en disco.
+
+Configuración (variables de entorno):
+    PDF_EXTRACTION_WORKERS  Procesos del pool (por defecto min(4, núcleos))
+    PDF_EXTRACTION_TIMEOUT  Segundos máximos por documento (por defecto 60)
+    PDF_TEXT_CACHE_DIR      Directorio de caché en disco (opcional)
+"""
+import atexit
+import functools
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pypdf import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+    logger.warning("pypdf no disponible. No se podrá extraer texto de boletines en PDF.")
+
+PDF_WORKERS = int(os.environ.get('PDF_EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_TIMEOUT = float(os.environ.get('PDF_EXTRACTION_TIMEOUT', 60))
+PDF_CACHE_DIR = os.environ.get('PDF_TEXT_CACHE_DIR') or None
+PDF_MEMORY_CACHE_SIZE = 64
+
+
+class PDFExtractionError(Exception):
+    """Error al extraer texto de un PDF (tiempo agotado, cola llena o PDF ilegible)"""
+
+
+def is_pdf(content: bytes, content_type: Optional[str] = None) -> bool:
+    """Indica si una respuesta es un PDF (cabecera o firma %PDF-)"""
+    if content_type and 'application/pdf' in content_type.lower():
+        return True
+    return content[:5] == b'%PDF-'
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """Texto de todas las páginas de un PDF (se ejecuta en el proceso hijo)"""
+    if not HAS_PYPDF:
+        raise PDFExtractionError('pypdf no instalado')
+    reader = PdfReader(io.BytesIO(content))
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+class _PDFTask:
+    """
+    Documento enviado al pool. Se resuelve por los callbacks de ``apply_async``
+    o, si su pool se termina antes, con error inmediato.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._text = None
+        self._error = None
+
+    def resolve(self, text: Optional[str] = None, error: Optional[BaseException] = None) -> bool:
+        """Fija el resultado (solo el primero cuenta); True si lo ha fijado esta llamada"""
+        with self._lock:
+            if self._done.is_set():
+                return False
+            self._text = text
+            self._error = error
+            self._done.set()
+            return True
+
+    def get(self, timeout: float) -> str:
+        """Texto extraído; ``multiprocessing.TimeoutError`` si no llega a tiempo"""
+        if not self._done.wait(timeout):
+            raise multiprocessing.TimeoutError()
+        if self._error is not None:
+            raise self._error
+        return self._text
+
+
+class PDFTextExtractor:
+    """Pool acotado de extracción de texto con caché por hash de contenido"""
+
+    def __init__(self, workers: int = PDF_WORKERS, timeout: float = PDF_TIMEOUT,
+                 cache_dir: Optional[str] = PDF_CACHE_DIR,
+                 memory_cache_size: int = PDF_MEMORY_CACHE_SIZE,
+                 extract_function: Callable[[bytes], str] = extract_pdf_text):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_cache_size = memory_cache_size
+        self.extract_function = extract_function
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Documentos en vuelo por pool, para resolverlos si ese pool se termina
+        self._tasks = {}
+        self._tasks_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Documentos en vuelo como máximo: evita acumular PDFs en la cola del pool
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                context = multiprocessing.get_context('spawn')
+                self._pool = context.Pool(processes=self.workers, maxtasksperchild=50)
+            return self._pool
+
+    def _terminate_pool(self, pool=None):
+        """
+        Mata los procesos (p. ej. uno colgado en un PDF patológico); se recrea
+        al siguiente uso. Con ``pool`` solo actúa si sigue siendo el pool
+        vigente, para no matar uno ya recreado por otro hilo.
+
+        Los documentos que seguían en ese pool (de cualquier hilo) fallan al
+        momento: sus resultados ya no llegarían y esperarían a su tiempo máximo.
+        """
+        with self._pool_lock:
+            if self._pool is None or (pool is not None and pool is not self._pool):
+                return
+            pool, self._pool = self._pool, None
+
+        with self._tasks_lock:
+            orphaned = self._tasks.pop(pool, ())
+        for task in orphaned:
+            task.resolve(error=PDFExtractionError('Pool de extracción reiniciado por otro documento'))
+
+        # Fuera de los locks: terminate() espera al hilo de callbacks del pool
+        pool.terminate()
+        pool.join()
+
+    def _submit(self, content: bytes) -> _PDFTask:
+        """Envía un documento al pool vigente y registra su tarea"""
+        pool = self._get_pool()
+        task = _PDFTask(pool)
+        with self._tasks_lock:
+            self._tasks.setdefault(pool, set()).add(task)
+        try:
+            pool.apply_async(
+                self.extract_function, (content,),
+                callback=functools.partial(self._finish, task),
+                error_callback=functools.partial(self._fail, task)
+            )
+        except Exception:
+            self._forget(task)
+            raise
+        return task
+
+    def _forget(self, task: _PDFTask):
+        with self._tasks_lock:
+            tasks = self._tasks.get(task.pool)
+            if tasks is not None:
+                tasks.discard(task)
+                if not tasks:
+                    del self._tasks[task.pool]
+
+    def _finish(self, task: _PDFTask, text: str):
+        """Callback del pool con el texto extraído"""
+        self._forget(task)
+        task.resolve(text=text)
+
+    def _fail(self, task: _PDFTask, error: BaseException):
+        """Callback del pool con la excepción del proceso hijo"""
+        self._forget(task)
+        task.resolve(error=error)
+
+    def shutdown(self):
+        """Cierra el pool"""
+        self._terminate_pool()
+
+    def _cache_get(self, digest: str) -> Optional[str]:
+        with self._cache_lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+        if self.cache_dir:
+            path = self.cache_dir / f'{digest}.txt'
+            if path.exists():
+                text = path.read_text(encoding='utf-8')
+                self._cache_put(digest, text, persist=False)
+                return text
+        return None
+
+    def _cache_put(self, digest: str, text: str, persist: bool = True):
+        with self._cache_lock:
+            self._cache[digest] = text
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.memory_cache_size:
+                self._cache.popitem(last=False)
+        if persist and self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_dir / f'{digest}.tmp'
+                tmp_path.write_text(text, encoding='utf-8')
+                tmp_path.replace(self.cache_dir / f'{digest}.txt')
+            except OSError as e:
+                logger.warning(f"No se pudo guardar el texto extraído en caché: {e}")
+
+    def extract(self, content: bytes, timeout: Optional[float] = None) -> str:
+        """Texto de un PDF; usa la caché y, si no está, el pool con tiempo máximo"""
+        return self.extract_many([content], timeout)[0]
+
+    def extract_many(self, contents: Iterable[bytes], timeout: Optional[float] = None) -> List[str]:
+        """
+        Texto de varios PDFs en paralelo (hasta ``workers`` a la vez).
+
+        Cada documento dispone de ``timeout`` segundos desde que entra en el
+        pool. Lanza ``PDFExtractionError`` si alguno falla o agota el tiempo.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        contents = list(contents)
+        digests = [self.content_hash(content) for content in contents]
+        results: List[Optional[str]] = [self._cache_get(digest) for digest in digests]
+        pending = [index for index, text in enumerate(results) if text is None]
+
+        # Documentos repetidos en la misma llamada: se extraen una vez
+        first_by_digest = {}
+        for index in pending:
+            first_by_digest.setdefault(digests[index], index)
+
+        extracted = {}
+        in_flight = []
+
+        def collect_oldest():
+            digest, task, deadline = in_flight.pop(0)
+            try:
+                text = task.get(max(0.0, deadline - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                logger.error(f"Extracción de PDF {digest[:12]} superó {timeout}s; reiniciando el pool")
+                self._terminate_pool(task.pool)
+                raise PDFExtractionError(f'Tiempo de extracción agotado ({timeout}s)')
+            except PDFExtractionError:
+                raise
+            except Exception as e:
+                raise PDFExtractionError(f'PDF ilegible: {e}') from e
+            finally:
+                self._slots.release()
+            self._cache_put(digest, text)
+            extracted[digest] = text
+
+        try:
+            for digest, index in first_by_digest.items():
+                # Con la cola llena se recoge primero lo propio ya enviado
+                while not self._slots.acquire(blocking=False):
+                    if in_flight:
+                        collect_oldest()
+                    elif self._slots.acquire(timeout=timeout):
+                        break
+                    else:
+                        raise PDFExtractionError('Cola de extracción de PDF llena')
+                try:
+                    task = self._submit(contents[index])
+                except Exception:
+                    self._slots.release()
+                    raise
+                in_flight.append((digest, task, time.monotonic() + timeout))
+
+            while in_flight:
+                collect_oldest()
+        finally:
+            for _ in in_flight:
+                self._slots.release()
+
+        return [text if text is not None else extracted[digests[index]]
+                for index, text in enumerate(results)]
+
+
+_extractor: Optional[PDFTextExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_pdf_extractor() -> PDFTextExtractor:
+    """Extractor compartido por el proceso (el pool se crea en el primer PDF)"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PDFTextExtractor()
+            atexit.register(_extractor.shutdown)
+        return _extractor
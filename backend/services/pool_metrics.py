@@ -0,0 +1,144 @@
+"""
+Ocupación del pool de conexiones a la base de datos
+
+Escucha los eventos ``checkout``/``checkin`` del pool del engine de la
+aplicación y mantiene, por proceso, las conexiones en uso, el máximo
+alcanzado y el tiempo que el pool ha pasado lleno (todas las conexiones de
+``pool_size + max_overflow`` prestadas). Con el pool lleno, la siguiente
+petición espera hasta ``pool_timeout``: ese tiempo es la señal de que los
+workers/hilos de gunicorn superan lo que el pool puede servir.
+
+Como las métricas por endpoint, los valores son por worker.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+def pool_capacity(pool) -> Optional[int]:
+    """Conexiones simultáneas que admite el pool (None si no tiene límite)"""
+    size = getattr(pool, 'size', None)
+    max_overflow = getattr(pool, '_max_overflow', None)
+    if not callable(size) or max_overflow is None or max_overflow < 0:
+        return None
+    return size() + max_overflow
+
+
+class PoolMetrics:
+    """Conexiones prestadas del pool del proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.capacity: Optional[int] = None
+        self.in_use = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.peak_in_use = self.in_use
+            self.checkouts = 0
+            self.saturations = 0
+            self.saturated_seconds = 0.0
+            self._saturated_since = time.perf_counter() if self._is_saturated() else None
+            self.started_at = time.time()
+
+    def _is_saturated(self) -> bool:
+        return self.capacity is not None and self.in_use >= self.capacity
+
+    def attach(self, pool):
+        """Empieza a observar ``pool`` (los eventos se conservan si el engine lo recrea)"""
+        if self.pool is pool:
+            return
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        self.pool = pool
+        self.capacity = pool_capacity(pool)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if self._saturated_since is None and self._is_saturated():
+                self._saturated_since = time.perf_counter()
+                self.saturations += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+            if self._saturated_since is not None and not self._is_saturated():
+                self.saturated_seconds += time.perf_counter() - self._saturated_since
+                self._saturated_since = None
+
+    def snapshot(self) -> Dict:
+        """Estado actual del pool y agregados desde el último reset"""
+        with self._lock:
+            saturated = self.saturated_seconds
+            if self._saturated_since is not None:
+                saturated += time.perf_counter() - self._saturated_since
+            window = max(time.time() - self.started_at, 1e-9)
+            return {
+                'pid': os.getpid(),
+                'pool_class': type(self.pool).__name__ if self.pool is not None else None,
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'peak_utilization': round(self.peak_in_use / self.capacity, 3) if self.capacity else None,
+                'checkouts': self.checkouts,
+                'saturations': self.saturations,
+                'saturated_seconds': round(saturated, 3),
+                'saturated_share': round(saturated / window, 4),
+                'window_seconds': round(window, 1),
+                'status': self.pool.status() if self.pool is not None else None
+            }
+
+    def prometheus(self) -> str:
+        """Gauges y contadores del pool en formato de texto de Prometheus"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP db_pool_connections_in_use Conexiones del pool prestadas ahora',
+            '# TYPE db_pool_connections_in_use gauge',
+            f"db_pool_connections_in_use {snapshot['in_use']}",
+            '# HELP db_pool_connections_peak Máximo de conexiones prestadas desde el último reset',
+            '# TYPE db_pool_connections_peak gauge',
+            f"db_pool_connections_peak {snapshot['peak_in_use']}",
+            '# HELP db_pool_saturated_seconds_total Tiempo con todas las conexiones del pool prestadas',
+            '# TYPE db_pool_saturated_seconds_total counter',
+            f"db_pool_saturated_seconds_total {snapshot['saturated_seconds']:.6f}",
+        ]
+        if snapshot['capacity'] is not None:
+            lines[3:3] = [
+                '# HELP db_pool_capacity Conexiones máximas del pool (pool_size + max_overflow)',
+                '# TYPE db_pool_capacity gauge',
+                f"db_pool_capacity {snapshot['capacity']}",
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+# Registro del proceso
+pool_metrics = PoolMetrics()
+
+
+def init_pool_metrics(app, metrics: PoolMetrics = pool_metrics):
+    """Observa el pool del engine de la aplicación"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    from models import db
+    try:
+        with app.app_context():
+            metrics.attach(db.engine.pool)
+    except Exception as e:
+        # Sin métricas de pool la aplicación sigue funcionando
+        logger.warning(f"No se pudo observar el pool de conexiones: {e}")
+        return None
+
+    app.extensions['pool_metrics'] = metrics
+    return metrics
@@ -0,0 +1,138 @@
+"""
+Presupuestos de consultas SQL por endpoint
+
+Cada vista puede declarar el número máximo de sentencias SQL que puede lanzar
+por petición con ``@query_budget(n)`` (o en ``QUERY_BUDGETS`` de la config,
+que tiene prioridad). El presupuesto es independiente del volumen de datos:
+si una petición lo supera es casi siempre un N+1 (``to_dict``,
+``_active_memberships``, ``get_hours_summary``...).
+
+Según ``QUERY_BUDGET_MODE``:
+
+- ``raise`` (por defecto en tests): la petición falla con QueryBudgetExceeded,
+  de modo que la regresión rompe la suite local.
+- ``warn`` (por defecto en debug): se registra un aviso con las sentencias
+  más repetidas.
+- ``off`` (por defecto en producción): no se instala nada.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.slow_query_log import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+BUDGET_ATTRIBUTE = '_query_budget'
+BUDGET_MODES = ('raise', 'warn', 'off')
+
+
+class QueryBudgetExceeded(Exception):
+    """Una petición lanzó más sentencias SQL que el presupuesto de su endpoint"""
+
+    def __init__(self, endpoint: str, budget: int, count: int, statements: Counter):
+        self.endpoint = endpoint
+        self.budget = budget
+        self.count = count
+        self.statements = statements
+        repeated = '\n'.join(f'  {times}x {sql[:160]}' for sql, times in statements.most_common(5))
+        super().__init__(
+            f"{endpoint}: {count} consultas SQL (presupuesto {budget}). Más repetidas:\n{repeated}"
+        )
+
+
+def query_budget(max_queries: int):
+    """Declara el máximo de sentencias SQL por petición de una vista"""
+    def decorator(view):
+        setattr(view, BUDGET_ATTRIBUTE, max_queries)
+        return view
+    return decorator
+
+
+def budget_for(app, endpoint: Optional[str]) -> Optional[int]:
+    """Presupuesto del endpoint: QUERY_BUDGETS de la config o el declarado en la vista"""
+    if not endpoint:
+        return None
+    overrides = app.config.get('QUERY_BUDGETS') or {}
+    if endpoint in overrides:
+        return overrides[endpoint]
+    view = app.view_functions.get(endpoint)
+    return getattr(view, BUDGET_ATTRIBUTE, None)
+
+
+_sql_listeners_installed = False
+_sql_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    statements = g.get('_query_budget')
+    if statements is not None:
+        statements.append(statement)
+
+
+def install_budget_sql_listeners():
+    global _sql_listeners_installed
+    with _sql_listeners_lock:
+        if _sql_listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        _sql_listeners_installed = True
+
+
+def _resolve_mode(app) -> str:
+    mode = app.config.get('QUERY_BUDGET_MODE')
+    if mode is None:
+        mode = 'raise' if app.testing else 'warn' if app.debug else 'off'
+    if mode not in BUDGET_MODES:
+        raise ValueError(f"QUERY_BUDGET_MODE inválido: {mode}. Opciones: {', '.join(BUDGET_MODES)}")
+    return mode
+
+
+def init_query_budget(app) -> Optional[str]:
+    """Registra la comprobación de presupuestos; devuelve el modo activo"""
+    mode = _resolve_mode(app)
+    if mode == 'off':
+        return None
+    install_budget_sql_listeners()
+
+    @app.before_request
+    def _start_query_budget():
+        if budget_for(current_app, request.endpoint) is not None:
+            g._query_budget = []
+
+    @app.after_request
+    def _check_query_budget(response):
+        statements = g.pop('_query_budget', None)
+        if statements is None:
+            return response
+        budget = budget_for(current_app, request.endpoint)
+        if len(statements) <= budget:
+            return response
+
+        error = QueryBudgetExceeded(
+            request.endpoint, budget, len(statements),
+            Counter(normalize_sql(statement) for statement in statements)
+        )
+        if mode == 'raise':
+            raise error
+        logger.warning(f"Presupuesto de consultas superado en {request.method} {request.path}: {error}")
+        return response
+
+    app.extensions['query_budget'] = mode
+    return mode
+
+
+def declared_budgets(app) -> Dict[str, int]:
+    """Presupuestos efectivos de todos los endpoints que declaran uno"""
+    return {
+        endpoint: budget
+        for endpoint in sorted(app.view_functions)
+        if (budget := budget_for(app, endpoint)) is not None
+    }
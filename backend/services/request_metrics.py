@@ -0,0 +1,289 @@
+"""
+Métricas por endpoint agregadas en memoria del worker
+
+Cada petición registra latencia (histograma de cubetas fijas), número y
+tiempo de sentencias SQL (eventos ``before/after_cursor_execute`` del
+engine), tamaño de la respuesta y código de estado. La agregación es un
+diccionario por (método, endpoint) protegido por un lock: registrar una
+petición cuesta unas pocas sumas, sin E/S.
+
+Los agregados son por proceso: con varios workers de gunicorn cada uno expone
+los suyos (Prometheus los distingue por instancia/``pid``).
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from logging_config import log_performance_metric
+
+logger = logging.getLogger(__name__)
+
+# Cubetas de latencia en segundos (las de los clientes oficiales de Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Endpoint de las peticiones que no casan con ninguna ruta (evita cardinalidad ilimitada)
+UNMATCHED_ENDPOINT = '<unmatched>'
+
+
+class EndpointStats:
+    """Agregados de un (método, endpoint)"""
+
+    __slots__ = ('buckets', 'count', 'duration_sum', 'duration_max',
+                 'sql_count', 'sql_time', 'response_bytes', 'statuses')
+
+    def __init__(self, bucket_count: int):
+        # Una cubeta por límite más la de +Inf (no acumuladas)
+        self.buckets = [0] * (bucket_count + 1)
+        self.count = 0
+        self.duration_sum = 0.0
+        self.duration_max = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.response_bytes = 0
+        self.statuses: Dict[int, int] = {}
+
+    def copy(self) -> 'EndpointStats':
+        clone = EndpointStats(len(self.buckets) - 1)
+        for slot in self.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        clone.buckets = list(self.buckets)
+        clone.statuses = dict(self.statuses)
+        return clone
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Registro de métricas por endpoint del proceso"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bucket_bounds = tuple(buckets)
+        self._stats: Dict[tuple, EndpointStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, method: str, endpoint: str, status: int, duration: float,
+               sql_count: int = 0, sql_time: float = 0.0, response_bytes: int = 0):
+        """Añade una petición a los agregados de su endpoint"""
+        index = bisect.bisect_left(self.bucket_bounds, duration)
+        key = (method, endpoint)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(len(self.bucket_bounds))
+            stats.buckets[index] += 1
+            stats.count += 1
+            stats.duration_sum += duration
+            if duration > stats.duration_max:
+                stats.duration_max = duration
+            stats.sql_count += sql_count
+            stats.sql_time += sql_time
+            stats.response_bytes += response_bytes
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    def _snapshot(self) -> Dict[tuple, EndpointStats]:
+        """Copia consistente de los agregados (el render no retiene el lock)"""
+        with self._lock:
+            return {key: stats.copy() for key, stats in self._stats.items()}
+
+    def _quantile(self, stats: EndpointStats, q: float) -> Optional[float]:
+        """Cuantil estimado por interpolación lineal dentro de la cubeta"""
+        if not stats.count:
+            return None
+        rank = q * stats.count
+        cumulative = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(stats.buckets):
+            upper = self.bucket_bounds[index] if index < len(self.bucket_bounds) else stats.duration_max
+            if bucket_count and cumulative + bucket_count >= rank:
+                fraction = (rank - cumulative) / bucket_count
+                return lower + (min(upper, stats.duration_max) - lower) * fraction
+            cumulative += bucket_count
+            lower = upper
+        return stats.duration_max
+
+    def summary(self, sort_by: str = 'total_ms', limit: Optional[int] = None) -> Dict:
+        """Resumen JSON por endpoint (medias, percentiles estimados, SQL y estados)"""
+        endpoints = []
+        for (method, endpoint), stats in self._snapshot().items():
+            count = stats.count or 1
+            errors = sum(n for status, n in stats.statuses.items() if status >= 500)
+            endpoints.append({
+                'method': method,
+                'endpoint': endpoint,
+                'count': stats.count,
+                'total_ms': round(stats.duration_sum * 1000, 1),
+                'avg_ms': round(stats.duration_sum / count * 1000, 2),
+                'p50_ms': round(self._quantile(stats, 0.50) * 1000, 2),
+                'p95_ms': round(self._quantile(stats, 0.95) * 1000, 2),
+                'p99_ms': round(self._quantile(stats, 0.99) * 1000, 2),
+                'max_ms': round(stats.duration_max * 1000, 2),
+                'avg_sql_queries': round(stats.sql_count / count, 2),
+                'avg_sql_ms': round(stats.sql_time / count * 1000, 2),
+                'sql_share': round(stats.sql_time / stats.duration_sum, 3) if stats.duration_sum else 0,
+                'avg_response_bytes': int(stats.response_bytes / count),
+                'error_rate': round(errors / count, 4),
+                'statuses': {str(status): n for status, n in sorted(stats.statuses.items())}
+            })
+
+        endpoints.sort(key=lambda item: item.get(sort_by, 0), reverse=True)
+        return {
+            'pid': os.getpid(),
+            'since': self.started_at,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests': sum(item['count'] for item in endpoints),
+            'endpoints': endpoints[:limit] if limit else endpoints
+        }
+
+    def prometheus(self) -> str:
+        """Exposición en formato de texto de Prometheus (versión 0.0.4)"""
+        snapshot = sorted(self._snapshot().items())
+        lines = []
+
+        def labels(method, endpoint, **extra):
+            pairs = {'method': method, 'endpoint': endpoint, **extra}
+            return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs.items()) + '}'
+
+        lines.append('# HELP http_request_duration_seconds Latencia de las peticiones HTTP')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for (method, endpoint), stats in snapshot:
+            cumulative = 0
+            for index, bound in enumerate(self.bucket_bounds):
+                cumulative += stats.buckets[index]
+                lines.append(f'http_request_duration_seconds_bucket{labels(method, endpoint, le=bound)} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{labels(method, endpoint, le="+Inf")} {stats.count}')
+            lines.append(f'http_request_duration_seconds_sum{labels(method, endpoint)} {stats.duration_sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{labels(method, endpoint)} {stats.count}')
+
+        lines.append('# HELP http_requests_total Peticiones HTTP por código de estado')
+        lines.append('# TYPE http_requests_total counter')
+        for (method, endpoint), stats in snapshot:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{labels(method, endpoint, status=status)} {count}')
+
+        lines.append('# HELP http_response_size_bytes_total Bytes de respuesta servidos')
+        lines.append('# TYPE http_response_size_bytes_total counter')
+        for (method, endpoint), stats in snapshot:
+            lines.append(f'http_response_size_bytes_total{labels(method, endpoint)} {stats.response_bytes}')
+
+        lines.append('# HELP db_statements_total Sentencias SQL ejecutadas durante las peticiones')
+        lines.append('# TYPE db_statements_total counter')
+        for (method, endpoint), stats in snapshot:
+            lines.append(f'db_statements_total{labels(method, endpoint)} {stats.sql_count}')
+
+        lines.append('# HELP db_statement_duration_seconds_total Tiempo en sentencias SQL durante las peticiones')
+        lines.append('# TYPE db_statement_duration_seconds_total counter')
+        for (method, endpoint), stats in snapshot:
+            lines.append(f'db_statement_duration_seconds_total{labels(method, endpoint)} {stats.sql_time:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registro del proceso
+request_metrics = RequestMetrics()
+
+_sql_listeners_installed = False
+_sql_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None or not has_request_context():
+        return
+    sample = g.get('_request_metrics')
+    if sample is not None:
+        sample['sql_count'] += 1
+        sample['sql_time'] += time.perf_counter() - started
+
+
+def install_sql_listeners():
+    """Cuenta y cronometra las sentencias SQL de todos los engines (una sola vez)"""
+    global _sql_listeners_installed
+    with _sql_listeners_lock:
+        if _sql_listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _sql_listeners_installed = True
+
+
+def current_sql_stats() -> Dict:
+    """Sentencias SQL y tiempo acumulados en la petición en curso"""
+    sample = g.get('_request_metrics') if has_request_context() else None
+    if sample is None:
+        return {'sql_count': 0, 'sql_time': 0.0}
+    return {'sql_count': sample['sql_count'], 'sql_time': sample['sql_time']}
+
+
+def _response_size(response) -> int:
+    if response.is_streamed:
+        return 0
+    length = response.content_length
+    if length is None:
+        length = response.calculate_content_length()
+    return length or 0
+
+
+def init_request_metrics(app, metrics: RequestMetrics = request_metrics):
+    """Registra el middleware de métricas en la aplicación"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    install_sql_listeners()
+
+    # Primera lectura de CPU: las siguientes cpu_percent(interval=None) miden
+    # desde la anterior sin bloquear la petición
+    try:
+        import psutil
+        psutil.cpu_percent(interval=None)
+    except ImportError:
+        pass
+
+    excluded = set(app.config.get('METRICS_EXCLUDED_ENDPOINTS') or [])
+    slow_ms = app.config.get('METRICS_SLOW_REQUEST_MS', 1000)
+
+    @app.before_request
+    def _start_request_metrics():
+        g._request_metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_time': 0.0}
+
+    @app.after_request
+    def _record_request_metrics(response):
+        sample = g.pop('_request_metrics', None)
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        if sample is None or endpoint in excluded:
+            return response
+
+        duration = time.perf_counter() - sample['start']
+        try:
+            metrics.record(
+                request.method, endpoint, response.status_code, duration,
+                sample['sql_count'], sample['sql_time'], _response_size(response)
+            )
+            if duration * 1000 >= slow_ms:
+                log_performance_metric(f'request.{endpoint}', round(duration * 1000, 1))
+        except Exception as e:
+            # Las métricas nunca deben romper una respuesta
+            logger.warning(f"No se pudieron registrar métricas de {endpoint}: {e}")
+        return response
+
+    app.extensions['request_metrics'] = metrics
+    return metrics
@@ -0,0 +1,297 @@
+"""
+Perfilado bajo demanda de peticiones individuales (solo admins)
+
+Un admin activa el perfilado de una petición con la cabecera
+``X-Profile: 1`` o el parámetro ``?_profile=1``. Durante esa petición:
+
+- Un muestreador en un hilo del sistema operativo (no un greenlet, para que
+  funcione también con workers gevent) lee la pila del hilo de la petición
+  cada ``PROFILING_INTERVAL_MS`` con ``sys._current_frames``. Las pilas se
+  recortan a partir de ``full_dispatch_request`` y se agregan en formato
+  *folded* (``a;b;c N``), el que consumen flamegraph.pl, speedscope e
+  inferno. Las muestras en que la petición no está en CPU (E/S, u otro
+  greenlet ejecutándose) se cuentan como ``[esperando]``.
+- Cada sentencia SQL se anota en una línea temporal con su desplazamiento,
+  duración, SQL normalizado y la línea de la aplicación que la lanzó.
+
+El resultado se guarda en memoria (últimos ``PROFILING_MAX_STORED``) y la
+respuesta lleva ``X-Profile-Id``. Con ``X-Profile: return`` (o
+``?_profile=return``) la respuesta se sustituye por el propio perfil.
+"""
+import _thread
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.slow_query_log import BACKEND_ROOT, _calling_frame, normalize_sql
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = '_profile'
+WAITING_FRAME = '[esperando]'
+ANCHOR_FUNCTION = 'full_dispatch_request'
+
+
+def _real_thread_primitives():
+    """start_new_thread, get_ident, allocate_lock y sleep del sistema operativo (aunque gevent haya parcheado)"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return (monkey.get_original('_thread', 'start_new_thread'),
+                    monkey.get_original('_thread', 'get_ident'),
+                    monkey.get_original('_thread', 'allocate_lock'),
+                    monkey.get_original('time', 'sleep'))
+    except ImportError:
+        pass
+    return _thread.start_new_thread, _thread.get_ident, _thread.allocate_lock, time.sleep
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_ROOT):
+        filename = os.path.relpath(filename, BACKEND_ROOT)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+
+
+class StackSampler:
+    """Muestreo periódico de la pila de un hilo, agregado en pilas *folded*"""
+
+    def __init__(self, thread_id: int, anchor=None, interval: float = 0.005, max_seconds: float = 30):
+        self.thread_id = thread_id
+        self.anchor = anchor
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._running = False
+        self._start_thread, _, allocate_lock, self._sleep = _real_thread_primitives()
+        self._done = allocate_lock()
+
+    def start(self):
+        self._running = True
+        self._done.acquire()
+        self._start_thread(self._run, ())
+
+    def stop(self) -> Counter:
+        self._running = False
+        # Espera acotada a que el muestreador termine su última lectura
+        if self._done.acquire(timeout=1.0):
+            self._done.release()
+        return self.stacks
+
+    def _collapse(self, frame) -> str:
+        labels = []
+        anchored = self.anchor is None
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code))
+            if frame is self.anchor:
+                anchored = True
+                break
+            frame = frame.f_back
+        if not anchored:
+            # La pila no pasa por la petición: está bloqueada o corre otro greenlet
+            return WAITING_FRAME
+        return ';'.join(reversed(labels))
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        try:
+            while self._running and time.monotonic() < deadline:
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+                    self.samples += 1
+                del frame
+                self._sleep(self.interval)
+        finally:
+            self._running = False
+            self._done.release()
+
+
+class RequestProfiler:
+    """Perfiles de las últimas peticiones perfiladas del proceso"""
+
+    def __init__(self, interval_ms: float = 5, max_stored: int = 20, max_seconds: float = 30):
+        self.interval_ms = interval_ms
+        self.max_stored = max_stored
+        self.max_seconds = max_seconds
+        self._profiles: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self) -> Dict:
+        """Empieza a perfilar la petición en curso"""
+        get_ident = _real_thread_primitives()[1]
+        anchor = sys._getframe()
+        while anchor is not None and anchor.f_code.co_name != ANCHOR_FUNCTION:
+            anchor = anchor.f_back
+
+        sampler = StackSampler(get_ident(), anchor, self.interval_ms / 1000, self.max_seconds)
+        state = {
+            'id': uuid.uuid4().hex[:12],
+            'started': time.perf_counter(),
+            'sampler': sampler,
+            'sql': []
+        }
+        sampler.start()
+        return state
+
+    def finish(self, state: Dict, status_code: int) -> Dict:
+        """Detiene el muestreo, construye el perfil y lo guarda"""
+        stacks = state['sampler'].stop()
+        duration_ms = (time.perf_counter() - state['started']) * 1000
+        samples = sum(stacks.values())
+        waiting = stacks.get(WAITING_FRAME, 0)
+        sql_ms = sum(item['duration_ms'] for item in state['sql'])
+
+        # Funciones propias (hoja de la pila) con más muestras
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+
+        profile = {
+            'id': state['id'],
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': status_code,
+            'created_at': time.time(),
+            'duration_ms': round(duration_ms, 2),
+            'interval_ms': self.interval_ms,
+            'samples': samples,
+            'waiting_share': round(waiting / samples, 3) if samples else 0,
+            'sql_count': len(state['sql']),
+            'sql_ms': round(sql_ms, 2),
+            'top_functions': [{'function': name, 'samples': count}
+                              for name, count in leaves.most_common(15)],
+            'folded': '\n'.join(f'{stack} {count}' for stack, count in stacks.most_common()),
+            'sql_timeline': state['sql']
+        }
+
+        with self._lock:
+            self._profiles[profile['id']] = profile
+            while len(self._profiles) > self.max_stored:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict]:
+        """Resumen de los perfiles guardados (más recientes primero)"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        summary_fields = ('id', 'method', 'path', 'endpoint', 'status', 'created_at',
+                          'duration_ms', 'samples', 'waiting_share', 'sql_count', 'sql_ms')
+        return [{field: profile[field] for field in summary_fields} for profile in reversed(profiles)]
+
+
+# Registro del proceso
+request_profiler = RequestProfiler()
+
+_sql_listeners_installed = False
+_sql_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and g.get('_profile') is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_profile_started', None)
+    if started is None or not has_request_context():
+        return
+    state = g.get('_profile')
+    if state is None:
+        return
+    now = time.perf_counter()
+    state['sql'].append({
+        'offset_ms': round((started - state['started']) * 1000, 3),
+        'duration_ms': round((now - started) * 1000, 3),
+        'sql': normalize_sql(statement),
+        'frame': _calling_frame()
+    })
+
+
+def install_profiler_sql_listeners():
+    global _sql_listeners_installed
+    with _sql_listeners_lock:
+        if _sql_listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _sql_listeners_installed = True
+
+
+def _is_admin() -> bool:
+    from flask_security import current_user
+    return bool(current_user and current_user.is_authenticated and current_user.is_admin())
+
+
+def _requested_mode() -> Optional[str]:
+    """'store', 'return' o None según la cabecera o el parámetro"""
+    value = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG)
+    if not value or value.lower() in ('0', 'false', 'no'):
+        return None
+    return 'return' if value.lower() == 'return' else 'store'
+
+
+def init_request_profiler(app, profiler: RequestProfiler = request_profiler,
+                          authorize: Callable[[], bool] = _is_admin):
+    """Registra los hooks de perfilado bajo demanda"""
+    if not app.config.get('PROFILING_ENABLED', True):
+        return None
+
+    profiler.interval_ms = app.config.get('PROFILING_INTERVAL_MS', profiler.interval_ms)
+    profiler.max_stored = app.config.get('PROFILING_MAX_STORED', profiler.max_stored)
+    profiler.max_seconds = app.config.get('PROFILING_MAX_SECONDS', profiler.max_seconds)
+    install_profiler_sql_listeners()
+
+    @app.before_request
+    def _start_profiling():
+        mode = _requested_mode()
+        if mode is None:
+            return
+        try:
+            if not authorize():
+                return
+        except Exception:
+            return
+        g._profile_mode = mode
+        g._profile = profiler.start()
+
+    @app.after_request
+    def _finish_profiling(response):
+        state = g.pop('_profile', None)
+        if state is None:
+            return response
+        try:
+            profile = profiler.finish(state, response.status_code)
+        except Exception as e:
+            logger.warning(f"No se pudo construir el perfil de la petición: {e}")
+            return response
+
+        logger.info(f"Petición perfilada {profile['id']}: {profile['method']} {profile['path']} "
+                    f"{profile['duration_ms']} ms, {profile['sql_count']} SQL")
+        if g.pop('_profile_mode', 'store') == 'return':
+            response = jsonify({'success': True, 'profile': profile})
+        response.headers['X-Profile-Id'] = profile['id']
+        return response
+
+    app.extensions['request_profiler'] = profiler
+    return profiler
@@ -0,0 +1,362 @@
+"""
+Registro de consultas lentas con planes de ejecución muestreados
+
+Un listener del engine cronometra cada sentencia. Las que superan
+``SLOW_QUERY_THRESHOLD_MS`` se agrupan por huella (SQL normalizado: literales
+y parámetros sustituidos por ``?``, listas ``IN`` colapsadas) con el endpoint
+que las lanzó y la línea de código de la aplicación que las originó. Solo se
+guarda el SQL normalizado; los parámetros reales viajan únicamente a la cola
+de EXPLAIN y se descartan tras usarlos.
+
+Los planes se obtienen fuera de la petición: se encola la sentencia (con
+muestreo) y un hilo en segundo plano ejecuta ``EXPLAIN`` (``EXPLAIN QUERY
+PLAN`` en SQLite), que no ejecuta la sentencia, dentro de una transacción que
+siempre se revierte. Solo se explican SELECT.
+
+``EXPLAIN (ANALYZE, BUFFERS)`` sí la ejecuta, así que requiere activarlo
+expresamente (``SLOW_QUERY_EXPLAIN_ANALYZE``) y solo se usa con SELECT de
+solo lectura (sin ``FOR UPDATE``/``FOR SHARE``, ``INTO`` ni funciones con
+efectos como ``nextval()``), en una transacción ``READ ONLY`` que se revierte.
+"""
+import hashlib
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Marca del hilo de EXPLAIN: sus propias sentencias no se registran
+_explain_context = threading.local()
+
+# Raíz del backend: el primer frame bajo ella (fuera de este módulo) es el llamador
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\([^)]+\)s|%s|:\w+|\$\d+|\?')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*(\(\s*[?,\s]*\)\s*,?\s*)+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+# Cláusulas y funciones que hacen que re-ejecutar un SELECT tenga efectos
+_NOT_READ_ONLY = re.compile(
+    r'\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b|\bFOR\s+KEY\s+SHARE\b|\bINTO\b|'
+    r'\b(?:nextval|setval|pg_advisory\w*|pg_try_advisory\w*|pg_notify|pg_sleep\w*|set_config|'
+    r'pg_terminate_backend|pg_cancel_backend|txid_current|lo_\w+|dblink\w*)\s*\(',
+    re.IGNORECASE
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL con literales y parámetros sustituidos por ``?`` (misma huella para la misma forma)"""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (...)', normalized)
+    normalized = _VALUES_LIST.sub('VALUES (...) ', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def is_read_only_select(statement: str) -> bool:
+    """SELECT único que se puede re-ejecutar sin efectos (candidato a EXPLAIN ANALYZE)"""
+    sql = _STRING_LITERAL.sub("''", statement).strip().rstrip(';')
+    if not sql[:6].lower() == 'select' or ';' in sql:
+        return False
+    return _NOT_READ_ONLY.search(sql) is None
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:16]
+
+
+def _calling_frame() -> Optional[str]:
+    """``fichero:línea (función)`` del primer frame de la aplicación que lanzó la sentencia"""
+    frame = sys._getframe(2)
+    this_file = os.path.abspath(__file__)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (filename.startswith(BACKEND_ROOT) and filename != this_file
+                and 'site-packages' not in filename):
+            relative = os.path.relpath(filename, BACKEND_ROOT)
+            return f'{relative}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Top de consultas lentas por huella con planes de ejecución muestreados"""
+
+    def __init__(self, threshold_ms: float = 200, max_entries: int = 200,
+                 explain: bool = True, explain_sample_rate: float = 0.1,
+                 explain_interval: float = 3600, explain_timeout_ms: int = 5000,
+                 explain_analyze: bool = False, queue_size: int = 20):
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self.explain_enabled = explain
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.explain_analyze = explain_analyze
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._pending_explains = set()
+
+    # Registro
+
+    def record(self, statement: str, duration_ms: float, endpoint: Optional[str] = None,
+               frame: Optional[str] = None) -> str:
+        """Acumula una ejecución lenta en la entrada de su huella"""
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Se descarta la huella con menos tiempo acumulado
+                    victim = min(self._entries.values(), key=lambda item: item['total_ms'])
+                    del self._entries[victim['fingerprint']]
+                entry = self._entries[key] = {
+                    'fingerprint': key,
+                    'sql': normalized,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'first_seen': now,
+                    'last_seen': now,
+                    'endpoints': Counter(),
+                    'frames': Counter(),
+                    'slowest_frame': None,
+                    'plan': None,
+                    'plan_analyzed': False,
+                    'plan_captured_at': None,
+                    'plan_error': None
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['last_seen'] = now
+            entry['endpoints'][endpoint or 'background'] += 1
+            if frame:
+                entry['frames'][frame] += 1
+            if duration_ms >= entry['max_ms']:
+                entry['max_ms'] = duration_ms
+                entry['slowest_frame'] = frame
+        return key
+
+    def _needs_plan(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or key in self._pending_explains:
+            return False
+        captured = entry['plan_captured_at']
+        return captured is None or time.time() - captured >= self.explain_interval
+
+    def maybe_explain(self, key: str, engine, statement: str, parameters):
+        """Encola un EXPLAIN (muestreado); nunca bloquea ni lanza"""
+        if not self.explain_enabled or not statement.lstrip()[:6].lower() == 'select':
+            return
+        if random.random() >= self.explain_sample_rate:
+            return
+        with self._lock:
+            if not self._needs_plan(key):
+                return
+            self._pending_explains.add(key)
+        try:
+            self._queue.put_nowait((key, engine, statement, parameters))
+        except queue.Full:
+            with self._lock:
+                self._pending_explains.discard(key)
+            return
+        self._ensure_worker()
+
+    # EXPLAIN en segundo plano
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_loop, name='slow-query-explain',
+                                                daemon=True)
+                self._worker.start()
+
+    def _explain_loop(self):
+        while True:
+            key, engine, statement, parameters = self._queue.get()
+            analyze = self.should_analyze(engine.dialect.name, statement)
+            try:
+                plan, error = self.explain(engine, statement, parameters, analyze), None
+            except Exception as e:
+                plan, error = None, str(e)
+                logger.warning(f"EXPLAIN de la consulta lenta {key} fallido: {e}")
+            with self._lock:
+                self._pending_explains.discard(key)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if plan is not None:
+                        entry['plan'] = plan
+                        entry['plan_analyzed'] = analyze
+                    entry['plan_error'] = error
+                    entry['plan_captured_at'] = time.time()
+            self._queue.task_done()
+
+    def should_analyze(self, dialect: str, statement: str) -> bool:
+        """EXPLAIN ANALYZE solo con opt-in, en PostgreSQL y para SELECT de solo lectura"""
+        return self.explain_analyze and dialect == 'postgresql' and is_read_only_select(statement)
+
+    def explain(self, engine, statement: str, parameters, analyze: bool = False) -> str:
+        """
+        Plan de ejecución de una sentencia en una transacción que se revierte.
+
+        Sin ``analyze`` la sentencia no se ejecuta; con ``analyze`` (ver
+        ``should_analyze``) se ejecuta en una transacción de solo lectura.
+        """
+        dialect = engine.dialect.name
+        _explain_context.active = True
+        try:
+            with engine.connect() as connection:
+                transaction = connection.begin()
+                try:
+                    if dialect == 'postgresql':
+                        if analyze:
+                            connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+                        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}')
+                        if analyze:
+                            prefix = 'EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) '
+                        else:
+                            prefix = 'EXPLAIN (FORMAT TEXT) '
+                    elif dialect == 'sqlite':
+                        prefix = 'EXPLAIN QUERY PLAN '
+                    else:
+                        prefix = 'EXPLAIN '
+                    rows = connection.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+                finally:
+                    transaction.rollback()
+        finally:
+            _explain_context.active = False
+
+        if dialect == 'sqlite':
+            return '\n'.join(str(row[-1]) for row in rows)
+        return '\n'.join(str(row[0]) for row in rows)
+
+    def wait_for_explains(self, timeout: float = 5.0) -> bool:
+        """Espera a que se vacíe la cola de EXPLAIN (scripts y tests)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    # Consulta
+
+    @staticmethod
+    def _public(entry: Dict, include_plan: bool) -> Dict:
+        result = {
+            'fingerprint': entry['fingerprint'],
+            'sql': entry['sql'],
+            'count': entry['count'],
+            'total_ms': round(entry['total_ms'], 1),
+            'avg_ms': round(entry['total_ms'] / entry['count'], 1),
+            'max_ms': round(entry['max_ms'], 1),
+            'first_seen': entry['first_seen'],
+            'last_seen': entry['last_seen'],
+            'endpoints': dict(entry['endpoints'].most_common(5)),
+            'frames': dict(entry['frames'].most_common(3)),
+            'slowest_frame': entry['slowest_frame'],
+            'has_plan': entry['plan'] is not None,
+            'plan_analyzed': entry['plan_analyzed'],
+            'plan_captured_at': entry['plan_captured_at'],
+            'plan_error': entry['plan_error']
+        }
+        if include_plan:
+            result['plan'] = entry['plan']
+        return result
+
+    def top(self, limit: int = 20, sort_by: str = 'total_ms', include_plan: bool = False) -> List[Dict]:
+        """Top-N por tiempo acumulado (o ``max_ms``, ``count``, ``avg_ms``)"""
+        with self._lock:
+            entries = [self._public(entry, include_plan) for entry in self._entries.values()]
+        entries.sort(key=lambda item: item.get(sort_by, 0), reverse=True)
+        return entries[:limit]
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return self._public(entry, include_plan=True) if entry else None
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Registro del proceso (el que alimentan los listeners, ver init_slow_query_log)
+slow_query_log = SlowQueryLog()
+_active_log = slow_query_log
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_slow_query_started', None)
+    if started is None or getattr(_explain_context, 'active', False):
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    log = _active_log
+    if duration_ms < log.threshold_ms:
+        return
+    try:
+        endpoint = request.endpoint if has_request_context() else None
+        key = log.record(statement, duration_ms, endpoint, _calling_frame())
+        if not executemany:
+            log.maybe_explain(key, conn.engine, statement, parameters)
+    except Exception as e:
+        # El registro nunca debe romper la consulta
+        logger.warning(f"No se pudo registrar la consulta lenta: {e}")
+
+
+def install_slow_query_listeners():
+    """Cronometra las sentencias de todos los engines (una sola vez)"""
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
+
+
+def init_slow_query_log(app, log: SlowQueryLog = slow_query_log):
+    """Configura el registro de consultas lentas a partir de la aplicación"""
+    global _active_log
+    if not app.config.get('SLOW_QUERY_LOG_ENABLED', True):
+        return None
+
+    log.threshold_ms = app.config.get('SLOW_QUERY_THRESHOLD_MS', log.threshold_ms)
+    log.max_entries = app.config.get('SLOW_QUERY_MAX_ENTRIES', log.max_entries)
+    log.explain_enabled = app.config.get('SLOW_QUERY_EXPLAIN', log.explain_enabled)
+    log.explain_sample_rate = app.config.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', log.explain_sample_rate)
+    log.explain_interval = app.config.get('SLOW_QUERY_EXPLAIN_INTERVAL', log.explain_interval)
+    log.explain_analyze = app.config.get('SLOW_QUERY_EXPLAIN_ANALYZE', log.explain_analyze)
+    _active_log = log
+    install_slow_query_listeners()
+
+    app.extensions['slow_query_log'] = log
+    return log
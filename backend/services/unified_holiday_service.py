@@ -7,10 +7,12 @@ from typing import Dict, List, Tuple
 import logging
 
 from models.holiday import Holiday
+from models.employee_holiday import EmployeeHoliday
 from models.user import db
 from services.holiday_service import HolidayService
 from services.boe_holiday_service import BOEHolidayService
 from services.ccaa_boe_service import CCAABOEService
+from services.holiday_statistics import HolidayStatistics
 
 logger = logging.getLogger(__name__)
 
@@ -22,19 +24,26 @@ class UnifiedHolidayService:
         self.boe_service = BOEHolidayService()
         self.ccaa_boe_service = CCAABOEService()
     
-    def refresh_all_holidays_for_year(self, year: int = None, clean_before_load: bool = True) -> Dict:
+    def refresh_all_holidays_for_year(self, year: int = None, clean_before_load: bool = True,
+                                      mode: str = 'reload') -> Dict:
         """
         Recarga todos los festivos para un año específico:
-        - Nacionales y autonómicos desde Nager.Date API
+        - Nacionales y autonómicos generados localmente (paquete holidays)
         - Locales desde BOE y Boletines de CCAA
         
         Args:
             year: Año para el cual recargar festivos
             clean_before_load: Si True, elimina festivos existentes del año antes de cargar nuevos
-                              (útil cuando festivos pueden cambiar de tipo entre años)
+                              (útil cuando festivos pueden cambiar de tipo entre años).
+                              Solo aplica en modo 'reload'.
+            mode: 'reload' (borrar y recargar) o 'diff' (aplicar solo altas, cambios y
+                  desactivaciones en una transacción, ver refresh_holidays_diff)
         
         Evita duplicados usando la lógica de deduplicación mejorada
         """
+        if mode == 'diff':
+            return self.refresh_holidays_diff(year)
+        
         if not year:
             year = datetime.now().year
         
@@ -71,11 +80,17 @@ class UnifiedHolidayService:
                 
                 deleted_count = len(holidays_to_delete)
                 
-                # Eliminar festivos del año
+                # Eliminar festivos del año (el borrado masivo no dispara eventos
+                # de mapper: limpiar antes la tabla materializada)
+                EmployeeHoliday.query.filter(
+                    EmployeeHoliday.date >= start_date,
+                    EmployeeHoliday.date <= end_date
+                ).delete(synchronize_session=False)
                 Holiday.query.filter(
                     Holiday.date >= start_date,
                     Holiday.date <= end_date
                 ).delete(synchronize_session=False)
+                Holiday.mark_years_changed(db.session, [year])
                 
                 db.session.commit()
                 
@@ -88,7 +103,260 @@ class UnifiedHolidayService:
                 results['errors'].append(error_msg)
                 db.session.rollback()
         
-        # 1. Cargar festivos nacionales y autonómicos desde Nager.Date
+        self._load_all_sources(year, results)
+        
+        logger.info(f"✅ Recarga completada: {results['total_loaded']} festivos cargados")
+        
+        return results
+    
+    # Fuentes gestionadas por la recarga: solo sus filas pueden desactivarse
+    NATIONAL_SOURCES = ('holidays', 'nager.date')
+    LOCAL_SOURCES = ('boe.manual',)
+    # Campos que se sincronizan en festivos existentes
+    DIFF_FIELDS = ('holiday_type', 'description', 'is_fixed', 'source', 'source_id')
+    
+    @staticmethod
+    def _normalize(value) -> str:
+        return (value or '').strip().lower()
+    
+    @classmethod
+    def _diff_key(cls, country_code, country, holiday_date, region, city, name) -> Tuple:
+        """
+        Clave natural de un festivo. Para festivos locales el nombre no forma parte
+        de la clave (un festivo local por fecha y ciudad, igual que bulk_create_holidays).
+        """
+        return (
+            holiday_date,
+            country_code or cls._normalize(country),
+            cls._normalize(region),
+            cls._normalize(city),
+            '' if city else cls._normalize(name)
+        )
+    
+    @classmethod
+    def _diff_scope(cls, source, country_code, country, region):
+        """Ámbito de desactivación: fuente + país (+ región en festivos locales)"""
+        country_key = country_code or cls._normalize(country)
+        if source in cls.NATIONAL_SOURCES:
+            return ('national_regional', country_key)
+        if source in cls.LOCAL_SOURCES:
+            return ('local', country_key, cls._normalize(region))
+        return None
+    
+    def refresh_holidays_diff(self, year: int = None) -> Dict:
+        """
+        Recarga los festivos de un año aplicando solo las diferencias.
+        
+        Obtiene de las mismas fuentes que la recarga completa los festivos que se
+        cargarían, sin escribirlos; después compara por clave natural con los guardados y,
+        en una única transacción, inserta los nuevos, actualiza los que cambian,
+        reactiva los que vuelven a aparecer y desactiva los que ya no publica su
+        fuente. El año nunca queda vacío para las peticiones concurrentes.
+        
+        Solo se desactivan festivos de fuentes gestionadas (generador, Nager.Date,
+        BOE) y dentro de ámbitos (país / región) de los que se han obtenido datos,
+        de modo que un fallo de red no borra festivos.
+        
+        Returns:
+            Dict con contadores y ``changed_locations`` (país/región/ciudad con cambios)
+            para invalidar solo las cachés afectadas
+        """
+        if not year:
+            year = datetime.now().year
+        
+        results = {
+            'year': year,
+            'mode': 'diff',
+            'national_regional': {'loaded': 0, 'errors': []},
+            'local': {'loaded': 0, 'errors': []},
+            'total_loaded': 0,
+            'fetched': 0,
+            'inserted': 0,
+            'updated': 0,
+            'reactivated': 0,
+            'deactivated': 0,
+            'unchanged': 0,
+            'changed_locations': [],
+            'affected_employees': 0,
+            'errors': []
+        }
+        
+        logger.info(f"🔄 Iniciando recarga diferencial de festivos para {year}")
+        
+        fetched = self._fetch_all_sources(year, results)
+        
+        start_date = date(year, 1, 1)
+        end_date = date(year, 12, 31)
+        fetched = [h for h in fetched if start_date <= h['date'] <= end_date]
+        results['fetched'] = len(fetched)
+        
+        try:
+            diff = self._apply_holiday_diff(fetched, start_date, end_date)
+            results.update(diff)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            error_msg = f"Error aplicando diferencias de festivos: {e}"
+            logger.error(error_msg)
+            results['errors'].append(error_msg)
+            return results
+        
+        logger.info(
+            f"✅ Recarga diferencial {year}: {results['inserted']} altas, {results['updated']} cambios, "
+            f"{results['reactivated']} reactivados, {results['deactivated']} desactivados, "
+            f"{results['unchanged']} sin cambios"
+        )
+        
+        return results
+    
+    def _apply_holiday_diff(self, fetched: List[Dict], start_date: date, end_date: date) -> Dict:
+        """Calcula y aplica (sin commit) el diff entre festivos obtenidos y guardados"""
+        from sqlalchemy import bindparam, insert, select, update
+        from models.location import LocationResolver
+        from services.event_broker import build_message, publish_events, team_channel, CALENDAR_ALL_CHANNEL
+        
+        table = Holiday.__table__
+        resolver = LocationResolver(db.session)
+        now = datetime.utcnow()
+        
+        # Festivos obtenidos por clave (el primero gana, como en bulk_create_holidays)
+        incoming = {}
+        scopes = set()
+        for holiday in fetched:
+            keys = resolver.resolve(holiday['country'], holiday.get('region'), holiday.get('city'))
+            key = self._diff_key(keys['country_code'], holiday['country'], holiday['date'],
+                                 holiday.get('region'), holiday.get('city'), holiday['name'])
+            if key in incoming:
+                continue
+            incoming[key] = {**holiday, **keys}
+            scope = self._diff_scope(holiday.get('source'), keys['country_code'],
+                                     holiday['country'], holiday.get('region'))
+            if scope:
+                scopes.add(scope)
+        
+        stored_rows = db.session.execute(
+            select(table).where(table.c.date >= start_date, table.c.date <= end_date)
+        ).mappings().all()
+        stored = {}
+        for row in stored_rows:
+            key = self._diff_key(row['country_code'], row['country'], row['date'],
+                                 row['region'], row['city'], row['name'])
+            # Con duplicados históricos se compara contra el activo
+            if key not in stored or (row['active'] and not stored[key]['active']):
+                stored[key] = row
+        
+        inserts, updates, deactivations = [], [], []
+        counters = {'inserted': 0, 'updated': 0, 'reactivated': 0, 'deactivated': 0, 'unchanged': 0}
+        changed_locations = set()
+        
+        def location_of(data):
+            return (data['country_code'] or data['country'], data.get('region'), data.get('city'))
+        
+        for key, holiday in incoming.items():
+            row = stored.get(key)
+            if row is None:
+                inserts.append({
+                    'name': holiday['name'], 'date': holiday['date'], 'country': holiday['country'],
+                    'region': holiday.get('region'), 'city': holiday.get('city'),
+                    'country_code': holiday['country_code'], 'country_id': holiday['country_id'],
+                    'region_id': holiday['region_id'], 'city_id': holiday['city_id'],
+                    'holiday_type': holiday.get('holiday_type', 'national'),
+                    'description': holiday.get('description'),
+                    'is_fixed': holiday.get('is_fixed', True),
+                    'source': holiday.get('source'), 'source_id': holiday.get('source_id'),
+                    'active': True, 'created_at': now, 'updated_at': now
+                })
+                changed_locations.add(location_of(holiday))
+                continue
+            
+            # Festivos creados a mano (fuera de las fuentes gestionadas) no se tocan
+            if self._diff_scope(row['source'], row['country_code'], row['country'], row['region']) is None:
+                counters['unchanged'] += 1
+                continue
+            
+            values = {field: holiday.get(field) for field in self.DIFF_FIELDS if field in holiday}
+            changed = {field: value for field, value in values.items() if row[field] != value}
+            if not row['active'] or changed:
+                updates.append({'row_id': row['id'], **{f: row[f] for f in self.DIFF_FIELDS}, **changed})
+                counters['reactivated' if not row['active'] else 'updated'] += 1
+                changed_locations.add(location_of(row))
+            else:
+                counters['unchanged'] += 1
+        
+        for key, row in stored.items():
+            if key in incoming or not row['active']:
+                continue
+            scope = self._diff_scope(row['source'], row['country_code'], row['country'], row['region'])
+            if scope in scopes:
+                deactivations.append(row['id'])
+                changed_locations.add(location_of(row))
+        
+        changed_ids = list(deactivations)
+        if inserts:
+            inserted_ids = db.session.execute(insert(table).returning(table.c.id), inserts).scalars().all()
+            changed_ids.extend(inserted_ids)
+            counters['inserted'] = len(inserted_ids)
+        if updates:
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('row_id')).values(
+                    active=True, updated_at=now,
+                    **{field: bindparam(field) for field in self.DIFF_FIELDS}
+                ),
+                updates
+            )
+            changed_ids.extend(item['row_id'] for item in updates)
+        if deactivations:
+            db.session.execute(
+                update(table).where(table.c.id.in_(deactivations)).values(active=False, updated_at=now)
+            )
+            counters['deactivated'] = len(deactivations)
+        
+        # Las escrituras core no disparan eventos de mapper: refrescar solo lo afectado
+        affected_employees = set()
+        if changed_ids:
+            Holiday.mark_years_changed(db.session, [start_date.year])
+            before = db.session.execute(
+                select(EmployeeHoliday.employee_id).where(EmployeeHoliday.holiday_id.in_(changed_ids))
+            ).scalars().all()
+            EmployeeHoliday.refresh(db.session, holiday_ids=changed_ids)
+            after = db.session.execute(
+                select(EmployeeHoliday.employee_id).where(EmployeeHoliday.holiday_id.in_(changed_ids))
+            ).scalars().all()
+            affected_employees = set(before) | set(after)
+        
+        locations = [
+            {'country': country, 'region': region, 'city': city}
+            for country, region, city in sorted(changed_locations, key=lambda loc: tuple(v or '' for v in loc))
+        ]
+        
+        if locations:
+            from models.employee import Employee
+            payload = {
+                'year': start_date.year,
+                'changed_locations': locations,
+                'affected_employees': len(affected_employees)
+            }
+            team_ids = set()
+            if affected_employees:
+                team_ids = set(db.session.execute(
+                    select(Employee.team_id).where(Employee.id.in_(affected_employees)).distinct()
+                ).scalars().all())
+            messages = [build_message(CALENDAR_ALL_CHANNEL, 'holidays_changed', payload)]
+            messages.extend(
+                build_message(team_channel(team_id), 'holidays_changed', payload)
+                for team_id in team_ids if team_id
+            )
+            publish_events(db.session, messages)
+        
+        return {
+            **counters,
+            'changed_locations': locations,
+            'affected_employees': len(affected_employees)
+        }
+    
+    def _load_all_sources(self, year: int, results: Dict):
+        """Ejecuta los cargadores (generador local, BOE, boletines de CCAA) acumulando en results"""
+        # 1. Generar festivos nacionales y autonómicos (paquete holidays, sin red)
         logger.info(f"📅 Cargando festivos nacionales y autonómicos para {year}...")
         try:
             national_results = self.holiday_service.refresh_holidays_for_year(year)
@@ -132,60 +400,70 @@ class UnifiedHolidayService:
             logger.error(error_msg)
             results['ccaa_boe'] = {'loaded': 0, 'errors': [error_msg]}
             results['errors'].append(error_msg)
+    
+    def _fetch_all_sources(self, year: int, results: Dict) -> List[Dict]:
+        """
+        Festivos que cargaría _load_all_sources (generador local, BOE, boletines de
+        CCAA), sin escribirlos. En results se anotan los obtenidos por fuente.
+        """
+        fetched = []
         
-        # 4. Contar duplicados evitados
-        # La lógica de deduplicación está en Holiday.bulk_create_holidays
-        # que verifica si ya existe antes de crear
+        logger.info(f"📅 Obteniendo festivos nacionales y autonómicos para {year}...")
+        try:
+            national, national_errors = self.holiday_service.fetch_holidays_for_year(year)
+            fetched.extend(national)
+            results['national_regional']['loaded'] = len(national)
+            results['national_regional']['errors'] = national_errors
+        except Exception as e:
+            error_msg = f"Error obteniendo festivos nacionales/autonómicos: {e}"
+            logger.error(error_msg)
+            results['national_regional']['errors'].append(error_msg)
+            results['errors'].append(error_msg)
         
-        logger.info(f"✅ Recarga completada: {results['total_loaded']} festivos cargados")
+        logger.info(f"🏛️ Obteniendo festivos locales desde BOE para {year}...")
+        try:
+            boe_holidays, boe_errors = self.boe_service.fetch_local_holidays_from_boe_resolutions(year)
+            fetched.extend(boe_holidays)
+            results['local']['loaded'] = len(boe_holidays)
+            results['local']['errors'] = boe_errors
+        except Exception as e:
+            error_msg = f"Error obteniendo festivos locales desde BOE: {e}"
+            logger.error(error_msg)
+            results['local']['errors'].append(error_msg)
+            results['errors'].append(error_msg)
         
-        return results
+        logger.info(f"🏛️ Buscando festivos locales en Boletines de CCAA para {year}...")
+        try:
+            by_region = self.ccaa_boe_service.fetch_local_holidays_from_all_ccaas(year)
+            results['ccaa_boe'] = {
+                'loaded': 0,
+                'by_region': {},
+                'errors': []
+            }
+            for region, (region_holidays, region_errors) in by_region.items():
+                fetched.extend(region_holidays)
+                results['ccaa_boe']['by_region'][region] = {
+                    'loaded': len(region_holidays),
+                    'errors': region_errors
+                }
+                results['ccaa_boe']['loaded'] += len(region_holidays)
+                results['ccaa_boe']['errors'].extend(region_errors)
+        except Exception as e:
+            error_msg = f"Error obteniendo festivos de Boletines de CCAA: {e}"
+            logger.error(error_msg)
+            results['ccaa_boe'] = {'loaded': 0, 'errors': [error_msg]}
+            results['errors'].append(error_msg)
+        
+        results['total_loaded'] = len(fetched)
+        return fetched
     
     def get_holiday_statistics(self, year: int = None) -> Dict:
-        """Obtiene estadísticas de festivos para un año"""
+        """Obtiene estadísticas de festivos para un año (una consulta agrupada, cacheada)"""
         if not year:
             year = datetime.now().year
         
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-        
-        # Contar por tipo
-        national = Holiday.query.filter(
-            Holiday.date >= start_date,
-            Holiday.date <= end_date,
-            Holiday.holiday_type == 'national',
-            Holiday.active == True
-        ).count()
-        
-        regional = Holiday.query.filter(
-            Holiday.date >= start_date,
-            Holiday.date <= end_date,
-            Holiday.holiday_type == 'regional',
-            Holiday.active == True
-        ).count()
-        
-        local = Holiday.query.filter(
-            Holiday.date >= start_date,
-            Holiday.date <= end_date,
-            Holiday.holiday_type == 'local',
-            Holiday.active == True
-        ).count()
-        
-        # Contar por país
-        by_country = db.session.query(
-            Holiday.country,
-            db.func.count(Holiday.id).label('count')
-        ).filter(
-            Holiday.date >= start_date,
-            Holiday.date <= end_date,
-            Holiday.active == True
-        ).group_by(Holiday.country).all()
-        
-        return {
-            'year': year,
-            'total': national + regional + local,
-            'national': national,
-            'regional': regional,
-            'local': local,
-            'by_country': {country: count for country, count in by_country}
-        }
+        return HolidayStatistics.for_year(year)
+    
+    def compare_holiday_statistics(self, years: List[int]) -> Dict:
+        """Estadísticas de varios años y variación entre años consecutivos"""
+        return HolidayStatistics.compare(years)
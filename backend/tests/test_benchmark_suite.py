@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests del generador de datos sintéticos y del runner de benchmarks
+"""
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, Team
+from models.employee import Employee
+from models.employee_holiday import EmployeeHoliday
+from synthetic_dataset import DatasetSpec, SyntheticDatasetGenerator, generate_dataset
+from benchmark_suite import QueryCounter, Scenario, run_scenario
+
+
+class TestSyntheticDataset(unittest.TestCase):
+    """Tests para el generador sintético y run_scenario"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_generates_scaled_dataset_with_location_keys(self):
+        """Test volumen pedido, claves de ubicación y festivos materializados"""
+        spec = DatasetSpec.preset('tiny', employees=20, teams=4)
+        result = generate_dataset(db.session, spec)
+
+        self.assertEqual(result['counts']['employees'], 20)
+        self.assertEqual(Employee.query.count(), 20)
+        self.assertEqual(Team.query.filter(Team.manager_id.isnot(None)).count(), 4)
+        self.assertEqual(Employee.query.filter(Employee.country_code.is_(None)).count(), 0)
+        # Cada empleado recibe los nacionales de su país más su regional y su local
+        self.assertEqual(EmployeeHoliday.query.count(), 20 * 7)
+        self.assertGreater(result['counts']['calendar_activities'], 0)
+
+    def test_same_seed_same_data(self):
+        """Test la misma semilla produce las mismas actividades"""
+        spec = DatasetSpec.preset('tiny')
+        generator_rows = []
+        for _ in range(2):
+            generator_rows.append(SyntheticDatasetGenerator(db.session, spec)._activity_rows([1, 2], [2025]))
+        self.assertEqual(generator_rows[0], generator_rows[1])
+
+    def test_run_scenario_counts_queries(self):
+        """Test tiempos e iteraciones y consultas contadas por iteración"""
+        generate_dataset(db.session, DatasetSpec.preset('tiny'))
+        counter = QueryCounter()
+        counter.install()
+
+        scenario = Scenario('teams', 'service', lambda: db.session.query(Team.name).all())
+        result = run_scenario(scenario, counter, db.session, iterations=3, warmup=1)
+        self.assertEqual(result['iterations'], 3)
+        self.assertEqual(result['queries'], 1)
+        self.assertLessEqual(result['min_ms'], result['median_ms'])
+
+        failing = run_scenario(Scenario('roto', 'service', lambda: 1 / 0), counter, db.session)
+        self.assertIn('ZeroDivisionError', failing['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests del arranque: métricas, dependencias diferidas y ajustes de esquema
+"""
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import inspect, text
+
+# Añadir el directorio backend al path
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from models import db
+from commands.ensure_schema import ensure_schema
+from services.boot_metrics import DEFERRED_MODULES, BootMetrics
+
+
+class TestBootMetrics(unittest.TestCase):
+    """Tests para BootMetrics y el arranque de main.py"""
+
+    def test_phases_and_prometheus(self):
+        """Test fases encadenadas desde la marca anterior"""
+        metrics = BootMetrics(imports_started=1.0, imports_finished=1.25)
+        metrics.mark('config')
+        metrics.mark('blueprints')
+        data = metrics.finish()
+
+        self.assertEqual(data['imports_ms'], 250.0)
+        self.assertEqual(list(data['phases_ms']), ['config', 'blueprints'])
+        self.assertGreaterEqual(data['create_app_ms'], sum(data['phases_ms'].values()) - 0.2)
+        self.assertIn('app_boot_phase_seconds{phase="imports"} 0.2500', metrics.prometheus())
+
+    def test_main_defers_heavy_dependencies(self):
+        """Test importar main.py no carga alembic, reportlab, google-auth ni sendgrid"""
+        script = (
+            "import json, sys; import main; "
+            "print(json.dumps({'loaded': [m for m in %r if m in sys.modules], "
+            "'boot': main.app.extensions['boot_metrics'].to_dict()}))" % (DEFERRED_MODULES,)
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, FLASK_ENV='benchmark', RENDER='', SUPABASE_HOST='',
+                       BENCHMARK_DATABASE_URL=f'sqlite:///{directory}/boot.db')
+            env.pop('FLASK_RUN_FROM_CLI', None)
+            result = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, env=env,
+                                    capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(report['loaded'], [])
+        self.assertIn('blueprints', report['boot']['phases_ms'])
+        self.assertNotIn('schema', report['boot']['phases_ms'])
+
+
+class TestEnsureSchema(unittest.TestCase):
+    """Tests para el comando ensure-schema"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_creates_missing_columns_once(self):
+        """Test crea la columna que falta y la segunda ejecución no hace nada"""
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE notification DROP COLUMN data'))
+
+        self.assertEqual(ensure_schema(), ['notification.data'])
+        columns = [col['name'] for col in inspect(db.engine).get_columns('notification')]
+        self.assertIn('data', columns)
+        self.assertEqual(ensure_schema(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
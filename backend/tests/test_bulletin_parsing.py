@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests de la capa común de parseo de boletines oficiales
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.parsers import DOGParser, BOCMParser, DOGCParser
+from services.parsers.base import (
+    RegionRule, get_pattern, get_rule, normalize_place, register_pattern, registered_rules
+)
+from services.boe_holiday_service import BOEHolidayService
+
+CORPUS = Path(__file__).parent / 'fixtures' / 'bulletins'
+
+
+class TestBulletinParsing(unittest.TestCase):
+    """Tests para el registro de patrones, el tokenizador y las reglas por región"""
+
+    def test_pattern_registry(self):
+        """Test patrones compilados una vez y nombres sin colisiones"""
+        compiled = register_pattern('test.registry', r'\d+')
+        self.assertIs(register_pattern('test.registry', r'\d+'), compiled)
+        self.assertIs(get_pattern('test.registry'), compiled)
+        with self.assertRaises(ValueError):
+            register_pattern('test.registry', r'\w+')
+
+    def test_all_regional_rules_registered(self):
+        """Test los 17 boletines autonómicos y el BOE tienen regla"""
+        rules = registered_rules()
+        for code in ('boa', 'boc_canarias', 'boc_cantabria', 'bocm', 'bocyl', 'boib', 'boja',
+                     'bon', 'bopa', 'bopv', 'bor', 'borm', 'docm', 'doe', 'dog', 'dogc',
+                     'dogv', 'boe'):
+            self.assertIn(code, rules)
+        self.assertIs(BOCMParser.RULE, get_rule('bocm'))
+
+    def test_normalize_place(self):
+        """Test artículos pospuestos y espacios en nombres de municipio"""
+        self.assertEqual(normalize_place('Coruña,  A'), 'A Coruña')
+        self.assertEqual(normalize_place("Hospitalet de Llobregat, L'"), "L'Hospitalet de Llobregat")
+        self.assertEqual(normalize_place('Madrid'), 'Madrid')
+
+    def test_single_pass_entries(self):
+        """Test varias fechas por municipio, separadores y fin de entrada"""
+        rule = RegionRule('test', 'Madrid', 'TEST')
+        text = ('Resolución de 6 de octubre de 2025. Madrid: 15 de mayo; 9 de noviembre. '
+                'Getafe: 25 de mayo. 3 de marzo sin municipio.')
+        holidays = rule.parse(text, 2026)
+
+        self.assertEqual(
+            [(h['city'], h['date']) for h in holidays],
+            [('Madrid', '2026-05-15'), ('Madrid', '2026-11-09'), ('Getafe', '2026-05-25')]
+        )
+        self.assertTrue(all(h['region'] == 'Madrid' for h in holidays))
+
+    def test_dog_names_and_provinces(self):
+        """Test DOG: nombres, artículo pospuesto y provincia del anexo"""
+        text = (CORPUS / 'dog_2026.html').read_text(encoding='utf-8')
+        holidays = DOGParser().parse_text(text, 2026)
+
+        coruna = [h for h in holidays if h['city'] == 'A Coruña']
+        self.assertEqual([h['date'] for h in coruna], ['2026-02-17', '2026-10-07'])
+        self.assertEqual(coruna[0]['name'], 'Carnaval')
+        self.assertEqual(coruna[0]['description'], 'Festivo local de A Coruña (A Coruña)')
+        vigo = [h for h in holidays if h['city'] == 'Vigo']
+        self.assertEqual(vigo[0]['description'], 'Festivo local de Vigo (Pontevedra)')
+
+    def test_dog_annex_without_heading_and_national_dates(self):
+        """Test DOG: provincia por número de anexo y fiestas nacionales descartadas"""
+        text = ('<p>ANEXO II</p><p>1. Lugo: 1 de enero, Año Nuevo; 4 de octubre, San Froilán.</p>'
+                '<p>ANEXO IV</p><p>1. Vigo: 28 de marzo, Reconquista; 12 de octubre, Fiesta Nacional.</p>')
+        holidays = DOGParser().parse_text(text, 2026)
+
+        self.assertEqual(
+            [(h['city'], h['date'], h['description']) for h in holidays],
+            [('Lugo', '2026-10-04', 'Festivo local de Lugo (Lugo)'),
+             ('Vigo', '2026-03-28', 'Festivo local de Vigo (Pontevedra)')]
+        )
+        self.assertTrue(DOGParser()._is_national_holiday(date(2026, 8, 15)))
+
+    def test_catalan_contractions(self):
+        """Test meses en catalán con contracción (29 d'octubre)"""
+        text = (CORPUS / 'dogc_2026.html').read_text(encoding='utf-8')
+        holidays = DOGCParser().parse_text(text, 2026)
+
+        girona = {h['date'] for h in holidays if h['city'] == 'Girona'}
+        self.assertEqual(girona, {'2026-07-25', '2026-10-29'})
+        self.assertTrue(all(h['region'] == 'Cataluña' for h in holidays))
+
+    def test_boe_resolution(self):
+        """Test BOE: notas de islas y sustitución de Arán"""
+        text = (CORPUS / 'boe_2026.txt').read_text(encoding='utf-8')
+        holidays = BOEHolidayService().parse_boe_resolution(text, 2026)
+        by_city = {h['city']: h for h in holidays}
+
+        self.assertEqual(by_city['El Hierro']['date'], '2026-09-24')
+        self.assertEqual(by_city['El Hierro']['name'], 'Nuestra Señora de los Reyes')
+        self.assertEqual(by_city['El Hierro']['region'], 'Canarias')
+        self.assertEqual(by_city['Arán']['date'], '2026-06-17')
+        self.assertEqual(by_city['Arán']['region'], 'Cataluña')
+        # Las etiquetas que no son notas "en <lugar>:" no generan festivos
+        self.assertNotIn('Madrid', by_city)
+        self.assertEqual(len(holidays), 8)
+
+    def test_boe_label_after_leading_text(self):
+        """Test BOE: notas "en <lugar>:" precedidas de texto en la misma cláusula"""
+        text = ('Asimismo, en Lanzarote: el 15 de septiembre, festividad de Nuestra Señora de los Volcanes; '
+                'y en La Palma: el 5 de agosto, festividad de Nuestra Señora de las Nieves. '
+                'Madrid: el 2 de mayo, festividad de la Comunidad.')
+        holidays = BOEHolidayService().parse_boe_resolution(text, 2026)
+
+        self.assertEqual(
+            [(h['city'], h['date']) for h in holidays],
+            [('Lanzarote', '2026-09-15'), ('La Palma', '2026-08-05')]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
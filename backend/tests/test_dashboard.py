@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests del dashboard compuesto (/api/dashboard/overview) y de /api/dashboard/stats
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from flask import Flask
+from flask_security import Security, SQLAlchemyUserDatastore
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, User, Role
+from models.calendar_activity import CalendarActivity
+from models.employee import Employee
+from models.team import Team
+from services.dashboard_service import WIDGET_ERROR_MESSAGE, DashboardPrincipal, build_dashboard, widget_cache
+from services.hours_calculator import HoursCalculator
+from services.query_budget import init_query_budget
+from services.request_metrics import init_request_metrics
+from synthetic_dataset import DatasetSpec, generate_dataset
+
+YEAR = DatasetSpec.preset('tiny').base_year
+
+
+class TestDashboardOverview(unittest.TestCase):
+    """Todos los widgets en una petición, dentro del presupuesto de consultas"""
+
+    def setUp(self):
+        from app.dashboard import dashboard_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            QUERY_BUDGET_MODE='raise'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(dashboard_bp)
+        init_request_metrics(self.app)
+        init_query_budget(self.app)
+        widget_cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(db.session, DatasetSpec.preset('tiny', employees=24, teams=3))
+            team = db.session.get(Team, self.dataset['team_ids'][0])
+            employee = next(
+                employee for employee in Employee.query.order_by(Employee.id)
+                if employee.user and employee.user.get_primary_role() == 'employee'
+            )
+            self.admin = db.session.get(User, self.dataset['admin_user_id']).fs_uniquifier
+            self.manager = team.manager.user.fs_uniquifier
+            self.employee = employee.user.fs_uniquifier
+            self.employee_id = employee.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _get(self, fs_uniquifier, url):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = fs_uniquifier
+            session['_fresh'] = True
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response
+
+    def test_admin_overview_matches_separate_endpoints(self):
+        """Test estadísticas como /stats y eficiencia por equipo como HoursCalculator"""
+        response = self._get(self.admin, f'/api/dashboard/overview?year={YEAR}&month=3')
+        data = response.get_json()
+        self.assertEqual(sorted(data['widgets']), ['notifications', 'stats', 'team_performance', 'upcoming'])
+        self.assertEqual(data['errors'], {})
+        self.assertEqual(data['user_role'], 'admin')
+        self.assertIn('team_performance;dur=', response.headers['Server-Timing'])
+
+        stats = self._get(self.admin, f'/api/dashboard/stats?year={YEAR}&month=3').get_json()
+        self.assertEqual(data['widgets']['stats']['team_performance'], stats['team_performance'])
+        with self.app.app_context():
+            self.assertEqual(stats['statistics']['total_employees'], Employee.query.count())
+            self.assertEqual(stats['statistics']['total_teams'], Team.query.count())
+            for team in stats['team_performance']:
+                self.assertEqual(team['members_count'], Employee.query.filter_by(
+                    team_id=team['team_id'], active=True, approved=True
+                ).count())
+
+            expected = {
+                team.id: HoursCalculator.calculate_team_efficiency(team, YEAR, 3)
+                for team in Team.query.all()
+            }
+        for team in data['widgets']['team_performance']:
+            self.assertEqual(team['efficiency'], expected[team['team_id']]['efficiency'], team)
+            self.assertEqual(team['members_count'], expected[team['team_id']]['employee_count'], team)
+        for team in stats['team_performance']:
+            self.assertEqual(team['efficiency'], expected[team['team_id']]['efficiency'], team)
+        self.assertGreater(data['widgets']['stats']['statistics']['global_efficiency'], 0)
+
+    def test_team_performance_is_cached(self):
+        """Test la segunda petición reutiliza el rendimiento por equipo sin consultas"""
+        url = f'/api/dashboard/overview?year={YEAR}&month=3&widgets=team_performance'
+        first = self._get(self.admin, url).get_json()
+        second = self._get(self.admin, url).get_json()
+        self.assertFalse(first['timings']['team_performance']['cached'])
+        self.assertGreater(first['timings']['team_performance']['sql'], 0)
+        self.assertTrue(second['timings']['team_performance']['cached'])
+        self.assertEqual(second['timings']['team_performance']['sql'], 0)
+        self.assertEqual(second['widgets'], first['widgets'])
+
+    def test_cache_is_per_user_and_invalidated_on_commit(self):
+        """Test la caché no se comparte entre usuarios y un commit de actividades la invalida"""
+        url = f'/api/dashboard/overview?year={YEAR}&month=3&widgets=team_performance'
+        self._get(self.admin, url)
+        manager = self._get(self.manager, url).get_json()
+        self.assertFalse(manager['timings']['team_performance']['cached'])
+        self.assertTrue(self._get(self.admin, url).get_json()['timings']['team_performance']['cached'])
+
+        with self.app.app_context():
+            admin_id = User.query.filter_by(fs_uniquifier=self.admin).one().id
+        self.assertEqual(widget_cache.invalidate(user_id=admin_id), 1)
+        self.assertFalse(self._get(self.admin, url).get_json()['timings']['team_performance']['cached'])
+        self.assertTrue(self._get(self.manager, url).get_json()['timings']['team_performance']['cached'])
+
+        with self.app.app_context():
+            db.session.add(CalendarActivity(employee_id=self.employee_id, date=date(YEAR, 3, 31), activity_type='A'))
+            db.session.commit()
+        for user in (self.admin, self.manager):
+            self.assertFalse(self._get(user, url).get_json()['timings']['team_performance']['cached'])
+
+    def test_widget_sql_counted_without_request_metrics(self):
+        """Test las consultas por widget se cuentan fuera de una petición (sin middleware de métricas)"""
+        with self.app.app_context():
+            user = User.query.filter_by(fs_uniquifier=self.admin).one()
+            dashboard = build_dashboard(DashboardPrincipal.resolve(user), ['stats', 'notifications'], YEAR, 3)
+        self.assertEqual(dashboard['errors'], {})
+        self.assertGreater(dashboard['timings']['stats']['sql'], 0)
+        self.assertGreater(dashboard['timings']['notifications']['sql'], 0)
+
+    def test_stats_report_real_hours_and_efficiency(self):
+        """Test horas del mes del empleado y eficiencia del manager calculadas, no fijas"""
+        employee_stats = self._get(self.employee, f'/api/dashboard/stats?year={YEAR}&month=3').get_json()
+        with self.app.app_context():
+            employee = db.session.get(Employee, self.employee_id)
+            monthly = employee.get_hours_summary(YEAR, 3)
+            annual = employee.get_hours_summary(YEAR)
+        self.assertGreater(employee_stats['statistics']['hours_this_month'], 0)
+        self.assertEqual(employee_stats['statistics']['hours_this_month'], round(monthly['actual_hours'], 2))
+        self.assertEqual(employee_stats['monthly_summary']['theoretical_hours'], round(monthly['theoretical_hours'], 2))
+        self.assertEqual(employee_stats['monthly_summary']['efficiency'], monthly['efficiency'])
+        self.assertEqual(employee_stats['annual_summary']['total_actual_hours'], round(annual['actual_hours'], 2))
+        self.assertGreater(employee_stats['monthly_summary']['days_worked'], 0)
+
+        manager_stats = self._get(self.manager, f'/api/dashboard/stats?year={YEAR}&month=3').get_json()
+        self.assertGreater(manager_stats['statistics']['team_efficiency'], 0)
+        self.assertEqual(manager_stats['team_stats']['efficiency'], manager_stats['statistics']['team_efficiency'])
+
+    def test_manager_and_employee_scopes(self):
+        """Test el manager ve sus equipos y el empleado sus datos personales"""
+        manager = self._get(self.manager, f'/api/dashboard/overview?year={YEAR}&month=3').get_json()
+        self.assertEqual(manager['user_role'], 'manager')
+        self.assertEqual(manager['widgets']['stats']['type'], 'manager')
+        team_ids = [team['team_id'] for team in manager['widgets']['team_performance']]
+        self.assertIn(self.dataset['team_ids'][0], team_ids)
+        self.assertEqual(manager['widgets']['stats']['statistics']['managed_teams'], len(team_ids))
+
+        employee = self._get(self.employee, '/api/dashboard/overview').get_json()
+        self.assertEqual(employee['widgets']['stats']['type'], 'employee')
+        self.assertEqual(employee['widgets']['team_performance'], [])
+        self.assertIn('unread_count', employee['widgets']['notifications'])
+        self.assertIsInstance(employee['widgets']['upcoming'], list)
+
+    def test_invalid_parameters(self):
+        """Test widgets desconocidos o mes fuera de rango devuelven 400"""
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = self.admin
+            session['_fresh'] = True
+        self.assertEqual(client.get('/api/dashboard/overview?widgets=stats,weather').status_code, 400)
+        self.assertEqual(client.get('/api/dashboard/overview?month=13').status_code, 400)
+        self.assertEqual(client.get('/api/dashboard/stats?month=0').status_code, 400)
+        for url in ('/api/dashboard/stats?year=10000', '/api/dashboard/overview?year=0&widgets=stats'):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('Año', response.get_json()['message'])
+
+    def test_failing_widget_reports_generic_error(self):
+        """Test un widget que falla queda a null sin exponer el mensaje de la excepción"""
+        with patch('services.dashboard_service.upcoming_for', side_effect=ValueError('detalle interno')):
+            data = self._get(self.employee, '/api/dashboard/overview?widgets=upcoming,notifications').get_json()
+        self.assertIsNone(data['widgets']['upcoming'])
+        self.assertEqual(data['errors'], {'upcoming': WIDGET_ERROR_MESSAGE})
+        self.assertNotIn('detalle interno', str(data))
+        self.assertIsNotNone(data['widgets']['notifications'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests del broker de eventos en tiempo real (SSE)
+"""
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask
+from flask_security import Security, SQLAlchemyUserDatastore
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.event_broker as event_broker
+from services.event_broker import (
+    InProcessEventBroker, build_message, format_sse, publish_event,
+    stream_events, user_channel, team_channel
+)
+
+
+class TestInProcessEventBroker(unittest.TestCase):
+    """Tests para el broker en memoria"""
+
+    def setUp(self):
+        self.broker = InProcessEventBroker()
+        self._previous_broker = event_broker._broker
+        event_broker._broker = self.broker
+        self.engine = create_engine('sqlite://')
+
+    def tearDown(self):
+        event_broker._broker = self._previous_broker
+
+    def test_dispatch_only_to_subscribed_channels(self):
+        """Test entrega por canal"""
+        sub_user = self.broker.subscribe([user_channel(1)])
+        sub_team = self.broker.subscribe([team_channel(7)])
+
+        self.broker.dispatch(build_message(user_channel(1), 'notification', {'id': 10}))
+
+        self.assertEqual(sub_user.get(timeout=0.1)['data'], {'id': 10})
+        self.assertIsNone(sub_team.get(timeout=0.01))
+
+    def test_unsubscribe_cleans_channels(self):
+        """Test que desuscribir libera los canales"""
+        subscription = self.broker.subscribe([user_channel(1), team_channel(2)])
+        self.assertEqual(self.broker.subscriber_count(), 1)
+
+        self.broker.unsubscribe(subscription)
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_events_delivered_only_after_commit(self):
+        """Test que los eventos se entregan tras commit y se descartan en rollback"""
+        subscription = self.broker.subscribe([user_channel(3)])
+
+        with Session(self.engine) as session:
+            session.execute(text('SELECT 1'))
+            publish_event(session, user_channel(3), 'notification', {'id': 1})
+            self.assertIsNone(subscription.get(timeout=0.01))
+            session.commit()
+        self.assertEqual(subscription.get(timeout=0.1)['type'], 'notification')
+
+        with Session(self.engine) as session:
+            session.execute(text('SELECT 1'))
+            publish_event(session, user_channel(3), 'notification', {'id': 2})
+            session.rollback()
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_stream_format_and_unsubscribe(self):
+        """Test del generador text/event-stream"""
+        subscription = self.broker.subscribe([user_channel(5)])
+        self.broker.dispatch(build_message(user_channel(5), 'notifications_read', {'updated_count': 2}))
+
+        stream = stream_events(subscription, self.broker, heartbeat=0.01, max_duration=5)
+        self.assertTrue(next(stream).startswith('retry:'))
+        self.assertIn('event: ready', next(stream))
+        chunk = next(stream)
+        self.assertIn('event: notifications_read', chunk)
+        self.assertIn('"updated_count": 2', chunk)
+
+        stream.close()
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_format_sse(self):
+        """Test de serialización SSE"""
+        chunk = format_sse('calendar_change', {'date': '2025-01-01'}, event_id='9')
+        self.assertEqual(chunk, 'id: 9\nevent: calendar_change\ndata: {"date": "2025-01-01"}\n\n')
+
+
+class TestEventStreamLimit(unittest.TestCase):
+    """El endpoint de stream no supera EVENTS_MAX_STREAMS por worker"""
+
+    def setUp(self):
+        from app.events import events_bp
+        from models import db, User, Role
+
+        self._previous_broker = event_broker._broker
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            EVENTS_BROKER='memory',
+            EVENTS_MAX_STREAMS=1
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(events_bp, url_prefix='/api/events')
+        self.broker = event_broker.init_event_broker(self.app)
+        self.db = db
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(email='stream@test.local', password='x', active=True)
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.fs_uniquifier = user.fs_uniquifier
+
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = self.fs_uniquifier
+            session['_fresh'] = True
+
+    def tearDown(self):
+        event_broker._broker = self._previous_broker
+        with self.app.app_context():
+            self.db.session.remove()
+            self.db.drop_all()
+
+    def test_stream_rejected_when_worker_is_full(self):
+        """Test 503 con Retry-After cuando el worker ya tiene el máximo de streams"""
+        held = self.broker.subscribe([user_channel(999)])
+        response = self.client.get('/api/events/stream')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        self.assertEqual(self.broker.subscriber_count(), 1)
+
+        self.broker.unsubscribe(held)
+        response = self.client.get('/api/events/stream', buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertTrue(next(response.response).startswith(b'retry:'))
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests de las proyecciones ?fields= de los listados
+"""
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask
+from flask_security import Security, SQLAlchemyUserDatastore
+from sqlalchemy import event
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, User, Role
+from models.employee import EMPLOYEE_FIELDS
+from models.fieldsets import InvalidFields
+from models.holiday import HOLIDAY_FIELDS
+from models.team import TEAM_FIELDS
+from synthetic_dataset import DatasetSpec, generate_dataset
+
+
+class TestFieldSet(unittest.TestCase):
+    """Tests para FieldSet.parse"""
+
+    def test_parse(self):
+        """Test id siempre incluido, sin duplicados y campos desconocidos rechazados"""
+        self.assertIsNone(EMPLOYEE_FIELDS.parse(None))
+        self.assertIsNone(EMPLOYEE_FIELDS.parse(' '))
+        self.assertEqual(EMPLOYEE_FIELDS.parse('full_name, team_name,full_name'), ['id', 'full_name', 'team_name'])
+        with self.assertRaises(InvalidFields) as context:
+            EMPLOYEE_FIELDS.parse('full_name,password')
+        self.assertIn('password', str(context.exception))
+
+
+class TestSparseListings(unittest.TestCase):
+    """Los listados con ?fields= devuelven los mismos valores con menos SQL"""
+
+    def setUp(self):
+        from app.employees import employees_bp
+        from app.holidays import holidays_bp
+        from app.teams import teams_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(employees_bp, url_prefix='/api/employees')
+        self.app.register_blueprint(holidays_bp, url_prefix='/api/holidays')
+        self.app.register_blueprint(teams_bp, url_prefix='/api/teams')
+
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(db.session, DatasetSpec.preset('tiny', employees=15, teams=3))
+            self.admin = db.session.get(User, self.dataset['admin_user_id']).fs_uniquifier
+            self.engine = db.engine
+
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = self.admin
+            session['_fresh'] = True
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _get(self, url):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json(), statements
+
+    def test_every_field_matches_full_serializer(self):
+        """Test cada campo proyectado vale lo mismo que en la respuesta completa"""
+        for url, key, fieldset in (('/api/employees/?per_page=100', 'employees', EMPLOYEE_FIELDS),
+                                   ('/api/teams/?per_page=100', 'teams', TEAM_FIELDS),
+                                   ('/api/holidays/?per_page=100', 'holidays', HOLIDAY_FIELDS)):
+            full, _ = self._get(url)
+            expected = {item['id']: item for item in full[key]}
+            sparse, _ = self._get(f"{url}&fields={','.join(fieldset.names)}")
+            self.assertEqual(len(sparse[key]), len(expected), url)
+            for item in sparse[key]:
+                self.assertEqual(sorted(item), sorted(fieldset.names), url)
+                for name, value in item.items():
+                    self.assertEqual(value, expected[item['id']][name], f'{url} {name}')
+
+    def test_picker_projection_is_cheaper(self):
+        """Test id, nombre y equipo: solo esas columnas y ninguna consulta de membresías ni proyectos"""
+        full, full_sql = self._get('/api/employees/?per_page=100')
+        sparse, sparse_sql = self._get('/api/employees/?per_page=100&fields=full_name,team_name')
+
+        self.assertEqual(sorted(sparse['employees'][0]), ['full_name', 'id', 'team_name'])
+        self.assertLess(len(str(sparse['employees'])), len(str(full['employees'])) / 5)
+        self.assertLess(len(sparse_sql), len(full_sql))
+
+        employee_select = next(sql for sql in sparse_sql if sql.startswith('SELECT DISTINCT employee.id'))
+        self.assertNotIn('employee.hours_friday', employee_select)
+        self.assertFalse([sql for sql in sparse_sql if 'FROM team_membership' in sql or 'project' in sql])
+
+    def test_combines_with_cursor_and_rejects_unknown(self):
+        """Test ?fields= con paginación por cursor y 400 con campos desconocidos"""
+        data, _ = self._get('/api/teams/?cursor=&per_page=2&fields=name')
+        self.assertEqual([sorted(team) for team in data['teams']], [['id', 'name'], ['id', 'name']])
+        self.assertIsNotNone(data['pagination']['next_cursor'])
+
+        response = self.client.get('/api/holidays/?fields=name,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.get_json()['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests de la consulta de festivos por lotes
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import event
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, User, Team, Employee, Holiday
+from models.location import Country, AutonomousCommunity
+from services.holiday_batch_check import HolidayBatchCheck
+
+
+class TestHolidayBatchCheck(unittest.TestCase):
+    """Tests para HolidayBatchCheck"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        spain = Country(name='España', code='ES')
+        db.session.add(spain)
+        db.session.flush()
+        db.session.add_all([
+            AutonomousCommunity(name='Madrid', country_id=spain.id),
+            AutonomousCommunity(name='Cataluña', country_id=spain.id),
+        ])
+        team = Team(name='Equipo')
+        users = [User(email=f'batch{i}@test.local', password='x') for i in range(2)]
+        db.session.add_all([team, *users])
+        db.session.commit()
+
+        self.madrid = Employee(user_id=users[0].id, full_name='Madrid', team_id=team.id,
+                               country='Spain', region='Madrid')
+        self.barcelona = Employee(user_id=users[1].id, full_name='Barcelona', team_id=team.id,
+                                  country='Spain', region='Cataluña')
+        db.session.add_all([self.madrid, self.barcelona])
+        db.session.commit()
+
+        Holiday.bulk_create_holidays([
+            {'name': 'Día del Trabajador', 'date': date(2026, 5, 1), 'country': 'España'},
+            {'name': 'Dos de mayo', 'date': date(2026, 5, 2), 'country': 'España',
+             'region': 'Madrid', 'holiday_type': 'regional'},
+            {'name': 'Sant Joan', 'date': date(2026, 6, 24), 'country': 'España',
+             'region': 'Cataluña', 'holiday_type': 'regional'},
+        ])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count_queries(self, function):
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            return function(), statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+    def test_team_month_single_range_query(self):
+        """Test marcas por día de varios empleados con una consulta"""
+        items = [
+            {'employee': employee, 'start_date': date(2026, 5, 1), 'end_date': date(2026, 5, 31)}
+            for employee in (self.madrid, self.barcelona)
+        ]
+        # Empleados ya cargados, como en la ruta (una consulta IN previa)
+        for employee in (self.madrid, self.barcelona):
+            db.session.refresh(employee)
+        results, statements = self._count_queries(lambda: HolidayBatchCheck.check(items))
+
+        self.assertEqual(len(statements), 1)
+        madrid_days = {day['date']: day for day in results[0]['days']}
+        barcelona_days = {day['date']: day for day in results[1]['days']}
+        self.assertEqual(len(madrid_days), 31)
+        self.assertEqual([h['name'] for h in madrid_days['2026-05-02']['holidays']], ['Dos de mayo'])
+        self.assertFalse(barcelona_days['2026-05-02']['is_holiday'])
+        self.assertTrue(barcelona_days['2026-05-01']['is_holiday'])
+        # 4 de mayo de 2026 es lunes laborable; 3 de mayo, domingo
+        self.assertTrue(madrid_days['2026-05-04']['is_workable'])
+        self.assertFalse(madrid_days['2026-05-03']['is_workable'])
+
+    def test_locations_and_limits(self):
+        """Test ubicaciones en texto y validación de rangos"""
+        results = HolidayBatchCheck.check([
+            {'location': {'country': 'España', 'region': 'Cataluña'},
+             'start_date': date(2026, 6, 20), 'end_date': date(2026, 6, 30)},
+            {'location': {'country': 'España', 'region': 'Madrid'},
+             'start_date': date(2026, 6, 20), 'end_date': date(2026, 6, 30)},
+        ])
+        catalonia = [day['date'] for day in results[0]['days'] if day['is_holiday']]
+        self.assertEqual(catalonia, ['2026-06-24'])
+        self.assertFalse(any(day['is_holiday'] for day in results[1]['days']))
+
+        with self.assertRaises(ValueError):
+            HolidayBatchCheck.check([{'employee': self.madrid, 'start_date': date(2026, 5, 2),
+                                      'end_date': date(2026, 5, 1)}])
+
+
+if __name__ == '__main__':
+    unittest.main()
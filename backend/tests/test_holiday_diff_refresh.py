@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests de la recarga diferencial de festivos
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, User, Team, Employee, Holiday, EmployeeHoliday
+from services.unified_holiday_service import UnifiedHolidayService
+
+
+def _holiday(name, day, region=None, source='holidays'):
+    return {
+        'name': name, 'date': day, 'country': 'España', 'region': region, 'city': None,
+        'holiday_type': 'regional' if region else 'national', 'source': source,
+        'source_id': f'{source}_{day.isoformat()}_{name}'
+    }
+
+
+class TestHolidayDiffRefresh(unittest.TestCase):
+    """Tests para UnifiedHolidayService.refresh_holidays_diff"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        team = Team(name='Equipo')
+        user = User(email='diff@test.local', password='x')
+        db.session.add_all([team, user])
+        db.session.commit()
+        self.employee = Employee(user_id=user.id, full_name='Empleado', team_id=team.id,
+                                 country='España', region='Madrid')
+        db.session.add(self.employee)
+        db.session.commit()
+
+        self.service = UnifiedHolidayService()
+        self.sources = []
+        # Los cargadores reales se sustituyen por una lista fija de festivos
+        self.service._fetch_all_sources = lambda year, results: list(self.sources)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_diff_inserts_updates_and_deactivates(self):
+        """Test altas, cambios y desactivaciones sin vaciar el año"""
+        self.sources = [
+            _holiday('Año nuevo', date(2025, 1, 1)),
+            _holiday('Fiesta de la Comunidad', date(2025, 5, 2), region='Madrid'),
+        ]
+        first = self.service.refresh_holidays_diff(2025)
+        self.assertEqual(first['inserted'], 2)
+        self.assertEqual(first['affected_employees'], 1)
+
+        manual = Holiday(name='Manual', date=date(2025, 3, 3), country='España')
+        db.session.add(manual)
+        db.session.commit()
+
+        self.sources = [
+            {**_holiday('Año nuevo', date(2025, 1, 1)), 'description': 'New Year'},
+            _holiday('Epifanía', date(2025, 1, 6)),
+        ]
+        second = self.service.refresh_holidays_diff(2025)
+
+        self.assertEqual((second['inserted'], second['updated'], second['deactivated']), (1, 1, 1))
+        self.assertIn({'country': 'ES', 'region': 'Madrid', 'city': None}, second['changed_locations'])
+        self.assertTrue(db.session.get(Holiday, manual.id).active)
+
+        dates = {row.date for row in EmployeeHoliday.for_employees([self.employee.id], date(2025, 1, 1), date(2025, 12, 31))}
+        self.assertEqual(dates, {date(2025, 1, 1), date(2025, 1, 6), date(2025, 3, 3)})
+
+    def test_failed_source_does_not_deactivate(self):
+        """Test que un ámbito sin datos obtenidos no se desactiva"""
+        self.sources = [_holiday('Año nuevo', date(2025, 1, 1))]
+        self.service.refresh_holidays_diff(2025)
+
+        self.sources = []
+        result = self.service.refresh_holidays_diff(2025)
+
+        self.assertEqual(result['deactivated'], 0)
+        self.assertEqual(Holiday.query.filter_by(active=True).count(), 1)
+
+    def test_generator_fetch_does_not_write(self):
+        """Test que obtener los festivos del generador devuelve filas sin insertarlas"""
+        self.employee.country = 'Spain'
+        db.session.commit()
+
+        fetched, errors = self.service.holiday_service.fetch_holidays_for_year(2025)
+
+        self.assertEqual(errors, [])
+        self.assertIn(date(2025, 5, 2), {h['date'] for h in fetched if h['region'] == 'Madrid'})
+        self.assertEqual(Holiday.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests del generador local de festivos (paquete holidays)
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, User, Team, Employee, Holiday
+from models.location import Country, AutonomousCommunity, LocationResolver
+from services.holiday_generator import HolidayGenerator
+
+
+class TestHolidayGenerator(unittest.TestCase):
+    """Tests para HolidayGenerator"""
+
+    def setUp(self):
+        self.generator = HolidayGenerator()
+
+    def test_national_and_regional_for_spain(self):
+        """Test festivos nacionales y autonómicos con nombres de región del registro"""
+        generated = self.generator.generate('ES', [2025], 'España')
+
+        national = {(h['date'], h['name']) for h in generated if h['holiday_type'] == 'national'}
+        self.assertIn((date(2025, 1, 1), 'Año nuevo'), national)
+
+        madrid = [h for h in generated if h['region'] == 'Madrid']
+        self.assertIn(date(2025, 5, 2), {h['date'] for h in madrid})
+        self.assertTrue(all(h['country'] == 'España' and h['source'] == 'holidays' for h in generated))
+
+    def test_multi_year_and_fixed_dates(self):
+        """Test generación multi-año y detección de fechas fijas"""
+        generated = self.generator.generate('ES', [2025, 2026], 'España', include_regional=False)
+
+        self.assertEqual({h['date'].year for h in generated}, {2025, 2026})
+        by_name = {h['name']: h['is_fixed'] for h in generated}
+        self.assertTrue(by_name['Año nuevo'])
+        self.assertFalse(by_name['Viernes Santo'])
+
+    def test_source_ids_are_stable_and_unique(self):
+        """Test que source_id es determinista y no colisiona"""
+        first = self.generator.generate('US', [2025], 'Estados Unidos')
+        second = self.generator.generate('US', [2025], 'Estados Unidos')
+
+        self.assertEqual([h['source_id'] for h in first], [h['source_id'] for h in second])
+        self.assertEqual(len({h['source_id'] for h in first}), len(first))
+
+    def test_regions_outside_spain_use_names(self):
+        """Test que las subdivisiones de otros países se guardan con su nombre, no con el código"""
+        regions = {h['region'] for h in self.generator.generate('PT', [2025], 'Portugal') if h['region']}
+        self.assertIn('Lisboa', regions)
+        self.assertFalse(any(region.startswith('PT-') for region in regions))
+
+    def test_unsupported_country(self):
+        """Test país sin reglas locales"""
+        self.assertFalse(self.generator.supports('XX'))
+        self.assertEqual(self.generator.generate('XX', [2025], 'Nowhere'), [])
+
+
+class TestRegionalHolidaysOutsideSpain(unittest.TestCase):
+    """Los festivos regionales generados llegan a empleados de fuera de España"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        team = Team(name='Lisboa')
+        user = User(email='lisboa@test.local', password='x')
+        db.session.add_all([team, user])
+        db.session.commit()
+        self.employee = Employee(
+            user_id=user.id, full_name='Empleada', team_id=team.id,
+            country='Portugal', region='Lisboa', city='Lisboa'
+        )
+        db.session.add(self.employee)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_regional_holiday_reaches_employee(self):
+        """Test Santo António (PT-11) es festivo para una empleada de Lisboa y no de Oporto"""
+        Holiday.bulk_create_holidays(HolidayGenerator().generate('PT', [2025], 'Portugal'))
+
+        self.assertTrue(self.employee.is_holiday(date(2025, 6, 13)))
+        self.assertTrue(self.employee.is_holiday(date(2025, 4, 25)))
+        self.employee.region = 'Porto'
+        db.session.commit()
+        self.assertFalse(self.employee.is_holiday(date(2025, 6, 13)))
+
+    def test_iso_code_resolves_to_catalogue_region(self):
+        """Test un código ISO 3166-2 ('PT-11') resuelve a la región del catálogo"""
+        portugal = Country(name='Portugal', code='PT')
+        db.session.add(portugal)
+        db.session.flush()
+        lisboa = AutonomousCommunity(name='Lisboa', country_id=portugal.id)
+        db.session.add(lisboa)
+        db.session.commit()
+
+        resolver = LocationResolver(db.session)
+        self.assertEqual(resolver.resolve('Portugal', 'PT-11')['region_id'], lisboa.id)
+        self.assertEqual(resolver.resolve('PT', 'lisboa')['region_id'], lisboa.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests del motor de estadísticas de festivos
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, Holiday
+from services.holiday_statistics import HolidayStatistics
+
+
+class TestHolidayStatistics(unittest.TestCase):
+    """Tests para HolidayStatistics"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        HolidayStatistics.invalidate()
+
+        Holiday.bulk_create_holidays([
+            {'name': 'Año nuevo', 'date': date(2024, 1, 1), 'country': 'España'},
+            {'name': 'Año nuevo', 'date': date(2025, 1, 1), 'country': 'España'},
+            {'name': 'Dos de mayo', 'date': date(2025, 5, 2), 'country': 'España',
+             'region': 'Madrid', 'holiday_type': 'regional'},
+        ])
+
+    def tearDown(self):
+        HolidayStatistics.invalidate()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_grouped_statistics_and_comparison(self):
+        """Test agregados por tipo/país/región y comparativa entre años"""
+        stats = HolidayStatistics.for_year(2025)
+        self.assertEqual((stats['total'], stats['national'], stats['regional']), (2, 1, 1))
+        self.assertEqual(stats['by_country_type'], {'España': {'national': 1, 'regional': 1}})
+        self.assertEqual(stats['by_region'], [{'country': 'España', 'region': 'Madrid', 'count': 1}])
+
+        comparison = HolidayStatistics.compare([2024, 2025])['comparison']
+        self.assertEqual(comparison[0]['total_delta'], 1)
+
+    def test_cache_invalidated_on_commit(self):
+        """Test que desactivar un festivo invalida la caché de su año"""
+        self.assertEqual(HolidayStatistics.for_year(2025)['total'], 2)
+
+        holiday = Holiday.query.filter_by(name='Dos de mayo').one()
+        holiday.active = False
+        db.session.commit()
+
+        self.assertEqual(HolidayStatistics.for_year(2025)['total'], 1)
+        self.assertEqual(HolidayStatistics.for_year(2024)['total'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests del proveedor JSON rápido y del formato compacto del calendario anual
+"""
+import json
+import unittest
+import sys
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+
+from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from flask_security import Security, SQLAlchemyUserDatastore
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, User, Role
+from synthetic_dataset import DatasetSpec, generate_dataset
+from utils.json_provider import FastJSONProvider, init_json_provider, orjson
+
+
+@unittest.skipIf(orjson is None, 'orjson no instalado')
+class TestFastJSONProvider(unittest.TestCase):
+    """Tests para FastJSONProvider instalado en una app"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_json_provider(self.app)
+
+        @self.app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify(request.get_json())
+
+        @self.app.route('/types')
+        def types():
+            return jsonify({
+                'date': date(2025, 3, 1),
+                'datetime': datetime(2025, 3, 1, 10, 30, 15, 250),
+                'time': time(18, 0),
+                'decimal': Decimal('12.50'),
+                'set': {3},
+                'by_month': {1: 'enero', 2: 'febrero'},
+                'text': 'Festividad de San José'
+            })
+
+    def test_installed_and_disableable(self):
+        """Test se instala por defecto y JSON_FAST_PROVIDER=false conserva el de Flask"""
+        self.assertIsInstance(self.app.json, FastJSONProvider)
+        disabled = Flask(__name__)
+        disabled.config['JSON_FAST_PROVIDER'] = False
+        init_json_provider(disabled)
+        self.assertNotIsInstance(disabled.json, FastJSONProvider)
+
+    def test_native_types(self):
+        """Test fechas en ISO 8601, Decimal como cadena y claves no textuales"""
+        response = self.app.test_client().get('/types')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_json(), {
+            'date': '2025-03-01',
+            'datetime': '2025-03-01T10:30:15.000250',
+            'time': '18:00:00',
+            'decimal': '12.50',
+            'set': [3],
+            'by_month': {'1': 'enero', '2': 'febrero'},
+            'text': 'Festividad de San José'
+        })
+        self.assertTrue(response.data.endswith(b'\n'))
+
+    def test_request_round_trip_and_invalid_body(self):
+        """Test get_json con orjson y cuerpo no válido como 400"""
+        client = self.app.test_client()
+        payload = {'ids': [1, 2], 'nested': {'a': None, 'b': 1.5}}
+        self.assertEqual(client.post('/echo', json=payload).get_json(), payload)
+        response = client.post('/echo', data='{no es json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_same_document_as_flask_provider(self):
+        """Test mismo contenido que el proveedor de Flask salvo fechas; sort_keys se respeta"""
+        data = {'b': [1, 'dos', None, True], 'a': {'x': 1.25}, 'by_id': {3: 'tres', 1: 'uno'}}
+        fast = self.app.json
+        self.assertEqual(json.loads(fast.dumps(data)), json.loads(DefaultJSONProvider(self.app).dumps(data)))
+        self.assertEqual(list(json.loads(fast.dumps(data))), ['b', 'a', 'by_id'])
+
+        fast.sort_keys = True
+        self.assertEqual(fast.dumps({'b': 1, 'a': 2}), '{"a":2,"b":1}')
+        # Argumentos de json se delegan en la biblioteca estándar
+        self.assertEqual(fast.dumps({'a': date(2025, 1, 2)}, indent=None), '{"a": "2025-01-02"}')
+
+
+class TestCompactAnnualCalendar(unittest.TestCase):
+    """El formato compacto del calendario anual contiene lo mismo que el completo"""
+
+    def setUp(self):
+        from app.calendar import calendar_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        init_json_provider(self.app)
+        self.app.register_blueprint(calendar_bp, url_prefix='/api/calendar')
+
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(db.session, DatasetSpec.preset('tiny', employees=8, teams=1))
+            self.admin = db.session.get(User, self.dataset['admin_user_id']).fs_uniquifier
+
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = self.admin
+            session['_fresh'] = True
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response
+
+    def test_compact_matches_full(self):
+        """Test días, actividades, resúmenes y empleados iguales; respuesta mucho menor"""
+        year = DatasetSpec.preset('tiny').base_year
+        team_id = self.dataset['team_ids'][0]
+        full_response = self._get(f'/api/calendar/annual?team_id={team_id}&year={year}')
+        compact_response = self._get(f'/api/calendar/annual?team_id={team_id}&year={year}&format=compact')
+        full = full_response.get_json()['calendar']
+        compact = compact_response.get_json()['calendar']
+
+        self.assertEqual(compact['format'], 'compact')
+        employees = {entry['employee']['id']: entry for entry in compact['employees']}
+        activities = 0
+        for full_month, compact_month in zip(full['months'], compact['months']):
+            self.assertEqual(
+                [dict(zip(compact['day_columns'], row)) for row in compact_month['days']],
+                full_month['days']
+            )
+            self.assertEqual(compact_month['holidays'], full_month['holidays'])
+            self.assertEqual(compact_month['summary'], full_month['summary'])
+            for full_employee, compact_employee in zip(full_month['employees'], compact_month['employees']):
+                employee_id = compact_employee['employee_id']
+                self.assertEqual(full_employee['employee'], employees[employee_id]['employee'])
+                self.assertEqual(full_employee['remaining_benefits'], employees[employee_id]['remaining_benefits'])
+                self.assertEqual(full_employee['month_summary'], compact_employee['month_summary'])
+
+                rows = [dict(zip(compact['activity_columns'], row)) for row in compact_employee['activities']]
+                self.assertEqual(len(rows), len(full_employee['activities']))
+                for row in rows:
+                    expected = full_employee['activities'][row['date']]
+                    self.assertEqual(row, {column: expected[column] for column in compact['activity_columns']})
+                activities += len(rows)
+
+        self.assertGreater(activities, 0)
+        self.assertLess(len(compact_response.data), len(full_response.data) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests del generador de carga y de las métricas del pool de conexiones
+"""
+import os
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from flask import Flask
+from flask_security import Security, SQLAlchemyUserDatastore
+from sqlalchemy import create_engine
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, User, Role
+from models.calendar_activity import CalendarActivity
+from services.pool_metrics import PoolMetrics
+from synthetic_dataset import DatasetSpec, generate_dataset
+from load_test import LoadRecorder, VirtualUser, load_profiles, parse_mix
+
+
+class TestPoolMetrics(unittest.TestCase):
+    """Tests para PoolMetrics"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.engine = create_engine(f'sqlite:///{self.path}', pool_size=1, max_overflow=1)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.unlink(self.path)
+
+    def test_peak_and_saturation(self):
+        """Test conexiones en uso, pico y tiempo con el pool lleno"""
+        metrics = PoolMetrics()
+        metrics.attach(self.engine.pool)
+        self.assertEqual(metrics.capacity, 2)
+
+        first = self.engine.connect()
+        second = self.engine.connect()
+        self.assertEqual(metrics.snapshot()['in_use'], 2)
+        time.sleep(0.01)
+        second.close()
+        first.close()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['in_use'], 0)
+        self.assertEqual(snapshot['peak_in_use'], 2)
+        self.assertEqual(snapshot['saturations'], 1)
+        self.assertGreater(snapshot['saturated_seconds'], 0)
+        self.assertIn('db_pool_capacity 2', metrics.prometheus())
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['peak_in_use'], 0)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Tests para la mezcla de tráfico, el registro de latencias y los usuarios virtuales"""
+
+    def test_parse_mix(self):
+        """Test pesos por defecto, parciales y errores"""
+        self.assertEqual(parse_mix(None)['calendar'], 35)
+        self.assertEqual(parse_mix('calendar=3, dashboard=1'), {'calendar': 3, 'dashboard': 1})
+        for invalid in ('reports=1', 'calendar=x', 'calendar=0'):
+            with self.assertRaises(ValueError):
+                parse_mix(invalid)
+
+    def test_recorder_percentiles_and_errors(self):
+        """Test percentiles, rendimiento y fallos de red o 5xx"""
+        recorder = LoadRecorder()
+        for index in range(100):
+            recorder.record('calendar', (index + 1) / 1000, 200)
+        recorder.record('dashboard', 0.5, 500)
+        recorder.record('dashboard', 0.5, 'ConnectionError')
+
+        summary = recorder.summary(elapsed=10)
+        calendar = summary['requests']['calendar']
+        self.assertEqual(calendar['p50_ms'], 51.0)
+        self.assertEqual(calendar['p99_ms'], 99.0)
+        self.assertEqual(calendar['rps'], 10.0)
+        self.assertEqual(summary['requests']['dashboard']['error_rate'], 1.0)
+        self.assertEqual(summary['total']['count'], 102)
+
+
+class _TestClientTransport:
+    """Adaptador del cliente de test de Flask a la interfaz de requests.Session"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, url, json=None, timeout=None):
+        response = self.client.open(url, method=method, json=json)
+        return SimpleNamespace(status_code=response.status_code, json=response.get_json)
+
+
+class TestVirtualUser(unittest.TestCase):
+    """Los usuarios virtuales recorren la mezcla contra la aplicación"""
+
+    def setUp(self):
+        from app.calendar import calendar_bp
+        from app.notifications import notifications_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(calendar_bp, url_prefix='/api/calendar')
+        self.app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(db.session, DatasetSpec.preset('tiny', employees=6, teams=2))
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_profiles_and_traffic(self):
+        """Test reparto por roles y escrituras que dejan la base de datos como estaba"""
+        profiles = load_profiles(self.app, self.dataset, 10)
+        self.assertEqual([profile.role for profile in profiles].count('admin'), 1)
+        self.assertEqual([profile.role for profile in profiles].count('manager'), 2)
+        self.assertTrue(all(profile.employee_id for profile in profiles if profile.role != 'admin'))
+
+        with self.app.app_context():
+            activities = CalendarActivity.query.count()
+
+        recorder = LoadRecorder()
+        for index, profile in enumerate(profiles[1:4]):
+            client = self.app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = profile.fs_uniquifier
+                session['_fresh'] = True
+            user = VirtualUser(profile, _TestClientTransport(client), '',
+                               {'calendar': 1, 'notifications': 1, 'activity_write': 1},
+                               recorder, self.dataset['team_ids'], 2025, seed=index)
+            for _ in range(6):
+                user.step()
+
+        summary = recorder.summary(elapsed=1)
+        self.assertEqual(summary['total']['error_rate'], 0)
+        self.assertEqual(set(summary['total']['statuses']) - {'200', '201'}, set())
+        self.assertEqual(summary['requests']['activity.create']['count'],
+                         summary['requests']['activity.delete']['count'])
+        with self.app.app_context():
+            self.assertEqual(CalendarActivity.query.count(), activities)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests de las claves canónicas de ubicación de empleados y festivos
+"""
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, User, Team, Employee, Holiday, EmployeeHoliday
+from models.location import Country, AutonomousCommunity, City
+
+
+class TestLocationKeys(unittest.TestCase):
+    """Tests para LocationResolver y el cruce festivo-empleado"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        spain = Country(name='España', code='ES')
+        db.session.add(spain)
+        db.session.flush()
+        db.session.add(AutonomousCommunity(name='Madrid', country_id=spain.id))
+        team = Team(name='Equipo')
+        user = User(email='location@test.local', password='x')
+        db.session.add_all([team, user])
+        db.session.commit()
+
+        self.employee = Employee(
+            user_id=user.id, full_name='Empleado', team_id=team.id,
+            country='Spain', region='madrid', city='Alcalá'
+        )
+        db.session.add(self.employee)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_keys_resolved_on_write(self):
+        """Test que el nombre en inglés/español y mayúsculas resuelven a las mismas claves"""
+        country_code, region_id, city_id = self.employee.location_keys
+        self.assertEqual(country_code, 'ES')
+        self.assertIsNotNone(region_id)
+        # La ciudad no está en el catálogo: queda sin clave y no se da de alta
+        self.assertIsNone(city_id)
+        self.assertEqual(City.query.count(), 0)
+
+        Holiday.bulk_create_holidays([
+            {'name': 'Dos de mayo', 'date': date(2025, 5, 2), 'country': 'España', 'region': 'Madrid'}
+        ])
+        holiday = Holiday.query.one()
+        self.assertEqual((holiday.country_code, holiday.region_id), ('ES', region_id))
+
+    def test_holiday_hierarchy_matching(self):
+        """Test festivos nacionales, regionales y locales de otra ciudad"""
+        Holiday.bulk_create_holidays([
+            {'name': 'Año Nuevo', 'date': date(2025, 1, 1), 'country': 'Spain'},
+            {'name': 'Dos de mayo', 'date': date(2025, 5, 2), 'country': 'España', 'region': 'Madrid'},
+            {'name': 'San Isidro', 'date': date(2025, 5, 15), 'country': 'España',
+             'region': 'Madrid', 'city': 'Madrid', 'holiday_type': 'local'},
+            {'name': 'Santos Niños', 'date': date(2025, 8, 6), 'country': 'España',
+             'region': 'Madrid', 'city': 'alcalá', 'holiday_type': 'local'},
+        ])
+
+        self.assertTrue(self.employee.is_holiday(date(2025, 1, 1)))
+        self.assertTrue(self.employee.is_holiday(date(2025, 5, 2)))
+        self.assertFalse(self.employee.is_holiday(date(2025, 5, 15)))
+        self.assertTrue(self.employee.is_holiday(date(2025, 8, 6)))
+
+    def test_writes_do_not_create_catalogue_entries(self):
+        """Test que una errata no entra en el catálogo y se cruza por texto"""
+        self.employee.region = 'Madird'
+        db.session.commit()
+        self.assertIsNone(self.employee.region_id)
+        self.assertEqual(AutonomousCommunity.query.count(), 1)
+
+        Holiday.bulk_create_holidays([
+            {'name': 'Regional', 'date': date(2025, 3, 3), 'country': 'España', 'region': 'madird'},
+            {'name': 'Otra', 'date': date(2025, 3, 4), 'country': 'España', 'region': 'Cantabria'},
+        ])
+        self.assertEqual(AutonomousCommunity.query.count(), 1)
+        self.assertTrue(self.employee.is_holiday(date(2025, 3, 3)))
+        self.assertFalse(self.employee.is_holiday(date(2025, 3, 4)))
+
+    def test_unknown_country_falls_back_to_name(self):
+        """Test que sin country_code los festivos se cruzan por nombre de país"""
+        self.employee.country = 'Atlantis'
+        self.employee.region = None
+        self.employee.city = None
+        db.session.commit()
+        self.assertEqual(self.employee.location_keys, (None, None, None))
+
+        Holiday.bulk_create_holidays([
+            {'name': 'Fiesta nacional', 'date': date(2025, 6, 1), 'country': 'atlantis'},
+            {'name': 'Año Nuevo', 'date': date(2025, 1, 1), 'country': 'Spain'},
+        ])
+        self.assertTrue(self.employee.is_holiday(date(2025, 6, 1)))
+        self.assertFalse(self.employee.is_holiday(date(2025, 1, 1)))
+        self.assertEqual(len(Holiday.get_holidays_for_location('Atlantis', year=2025)), 1)
+
+        holiday = Holiday.query.filter_by(name='Fiesta nacional').one()
+        self.assertTrue(holiday.is_applicable_for_employee(self.employee))
+
+    def test_location_change_resyncs_keys(self):
+        """Test que cambiar la ubicación recalcula las claves"""
+        self.employee.country = 'Portugal'
+        self.employee.region = None
+        self.employee.city = None
+        db.session.commit()
+
+        self.assertEqual(self.employee.location_keys, ('PT', None, None))
+
+    def test_employee_holiday_refreshed_incrementally(self):
+        """Test que employee_holiday sigue a cargas, toggles y cambios de ubicación"""
+        Holiday.bulk_create_holidays([
+            {'name': 'Año Nuevo', 'date': date(2025, 1, 1), 'country': 'Spain'},
+            {'name': 'Dos de mayo', 'date': date(2025, 5, 2), 'country': 'España', 'region': 'Madrid'},
+        ])
+        rows = EmployeeHoliday.for_employees([self.employee.id], date(2025, 1, 1), date(2025, 12, 31))
+        self.assertEqual(sorted(row.level for row in rows), ['national', 'regional'])
+
+        holiday = Holiday.query.filter_by(name='Año Nuevo').one()
+        holiday.active = False
+        db.session.commit()
+        self.assertFalse(self.employee.is_holiday(date(2025, 1, 1)))
+
+        self.employee.region = 'Cataluña'
+        db.session.commit()
+        self.assertEqual(EmployeeHoliday.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests de la búsqueda en logs estructurados (mmap, índice lateral y cursores)
+"""
+import json
+import os
+import tempfile
+import unittest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.log_search import INDEX_DIR, InvalidCursor, LogIndex, LogSearch, parse_timestamp
+
+START = datetime(2025, 3, 1, 8, 0, 0)
+LEVELS = ['INFO', 'INFO', 'INFO', 'WARNING', 'INFO', 'ERROR']
+
+
+def log_line(number):
+    """Línea con el mismo formato que StructuredFormatter"""
+    return json.dumps({
+        'timestamp': (START + timedelta(seconds=number)).isoformat() + 'Z',
+        'level': LEVELS[number % len(LEVELS)],
+        'logger': 'team_time.auth' if number % 10 == 0 else 'main',
+        'message': f'Evento {number} ' + 'x' * 80,
+        'module': 'auth',
+        'function': 'login',
+        'line': number
+    }, ensure_ascii=False) + '\n'
+
+
+class TestLogSearch(unittest.TestCase):
+    """Tests para LogSearch sobre un fichero activo y una rotación"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_dir = self.directory.name
+        # 0-1999 en la rotación, 2000-3999 en el fichero activo (~200 KB cada uno)
+        self._write('auth.log.1', range(0, 2000))
+        self._write('auth.log', range(2000, 4000))
+        self.search = LogSearch(self.log_dir)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, numbers, mode='w'):
+        with open(os.path.join(self.log_dir, name), mode, encoding='utf-8') as handle:
+            handle.writelines(log_line(number) for number in numbers)
+
+    def _collect(self, **filters):
+        numbers, cursor = [], None
+        while True:
+            page = self.search.search('auth', cursor=cursor, **filters)
+            numbers.extend(entry['line'] for entry in page['logs'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return numbers
+
+    def test_pages_newest_first_across_rotations(self):
+        """Test las páginas recorren el fichero activo y luego la rotación sin huecos"""
+        first = self.search.search('auth', limit=3)
+        self.assertEqual([entry['line'] for entry in first['logs']], [3999, 3998, 3997])
+        # La primera página solo recorre el último bloque del fichero activo
+        self.assertLessEqual(first['scanned_bytes'], 70 * 1024)
+
+        self.assertEqual(self._collect(limit=500), list(range(3999, -1, -1)))
+
+    def test_filters_and_block_skipping(self):
+        """Test nivel mínimo, logger, texto y ventana de tiempo"""
+        errors = self._collect(level='ERROR', limit=200)
+        self.assertEqual(errors, [n for n in range(3999, -1, -1) if LEVELS[n % 6] == 'ERROR'])
+        warnings = self._collect(level='WARNING', limit=200)
+        self.assertEqual(len(warnings), len([n for n in range(4000) if LEVELS[n % 6] != 'INFO']))
+
+        self.assertEqual(self._collect(logger_name='team_time.auth', text='EVENTO 1230 ', limit=10), [1230])
+
+        since = parse_timestamp((START + timedelta(seconds=100)).isoformat())
+        until = parse_timestamp((START + timedelta(seconds=110)).isoformat() + 'Z')
+        page = self.search.search('auth', since=since, until=until, limit=50)
+        self.assertEqual([entry['line'] for entry in page['logs']], list(range(110, 99, -1)))
+        # Solo los bloques que solapan la ventana
+        self.assertLess(page['scanned_bytes'], 140 * 1024)
+
+    def test_cursor_survives_rotation(self):
+        """Test el cursor sigue al inodo cuando el fichero activo se rota"""
+        page = self.search.search('auth', limit=5)
+        os.rename(os.path.join(self.log_dir, 'auth.log.1'), os.path.join(self.log_dir, 'auth.log.2'))
+        os.rename(os.path.join(self.log_dir, 'auth.log'), os.path.join(self.log_dir, 'auth.log.1'))
+        self._write('auth.log', range(4000, 4010))
+
+        next_page = self.search.search('auth', limit=5, cursor=page['next_cursor'])
+        self.assertEqual([entry['line'] for entry in next_page['logs']], [3994, 3993, 3992, 3991, 3990])
+
+        with self.assertRaises(InvalidCursor):
+            self.search.search('auth', cursor='no-es-un-cursor')
+
+    def test_index_is_incremental(self):
+        """Test el índice se guarda por inodo y se amplía al crecer el fichero"""
+        self.search.search('auth', limit=1)
+        path = os.path.join(self.log_dir, 'auth.log')
+        inode = os.stat(path).st_ino
+        index = LogIndex(os.path.join(self.log_dir, INDEX_DIR), 'auth.log', inode).load()
+        self.assertEqual(index.indexed_to, os.path.getsize(path))
+        full_blocks = index.blocks[:-1]
+
+        self._write('auth.log', range(4000, 4100), mode='a')
+        page = self.search.search('auth', limit=1)
+        self.assertEqual(page['logs'][0]['line'], 4099)
+
+        index = LogIndex(os.path.join(self.log_dir, INDEX_DIR), 'auth.log', inode).load()
+        self.assertEqual(index.indexed_to, os.path.getsize(path))
+        self.assertEqual(index.blocks[:len(full_blocks)], full_blocks)
+
+    def test_partial_last_line_is_ignored(self):
+        """Test una línea a medio escribir no se devuelve hasta que termina"""
+        with open(os.path.join(self.log_dir, 'auth.log'), 'a', encoding='utf-8') as handle:
+            handle.write(log_line(4000)[:40])
+        page = self.search.search('auth', limit=1)
+        self.assertEqual(page['logs'][0]['line'], 3999)
+
+    def test_unknown_category_or_level(self):
+        """Test categorías y niveles desconocidos son errores de validación"""
+        with self.assertRaises(ValueError):
+            self.search.search('nginx')
+        with self.assertRaises(ValueError):
+            self.search.search('auth', level='VERBOSE')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests del pipeline de logging asíncrono (cola acotada, listener y muestreo)
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from flask import Flask, g
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging_config
+from logging_config import (InfoSamplingFilter, LogPipeline, LogPipelineStats, StructuredFormatter,
+                            logging_pipeline_stats, setup_logging)
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    """Tests para setup_logging con LOG_ASYNC y sus piezas"""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.app = Flask('pipeline_test')
+        self.app.config.update(LOG_DIR=self.log_dir.name, LOG_LEVEL='INFO', LOG_ASYNC=True)
+
+    def tearDown(self):
+        logging_config._stop_pipeline()
+        logging_config._pipeline = None
+        self.log_dir.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.log_dir.name, name), encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+
+    def test_request_context_captured_before_queueing(self):
+        """Test el listener escribe el contexto de la petición capturado al encolar"""
+        setup_logging(self.app)
+        self.assertIsNotNone(logging_pipeline_stats())
+
+        with self.app.test_request_context('/api/teams/?page=2', method='GET'):
+            g._login_user = SimpleNamespace(is_authenticated=True, id=7, email='ana@example.com',
+                                            roles=[SimpleNamespace(name='manager')])
+            self.app.logger.error('Fallo %s', 'grave')
+
+        # Vaciar la cola: el formateo y la escritura ocurren en el listener
+        logging_config._stop_pipeline()
+        entries = self._read('errors.log')
+        self.assertEqual(entries[-1]['message'], 'Fallo grave')
+        self.assertEqual(entries[-1]['request']['url'], 'http://localhost/api/teams/?page=2')
+        self.assertEqual(entries[-1]['user'], {'id': 7, 'email': 'ana@example.com', 'roles': ['manager']})
+        # El INFO de arranque va al fichero principal, no al de errores
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(len(self._read('team_time_management.log')), 2)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test con la cola llena se descarta y se avisa al vaciarla"""
+        stream = logging.StreamHandler(open(os.devnull, 'w'))
+        pipeline = LogPipeline({'app': [stream]}, maxsize=1)
+        handler = pipeline.handler('app')
+        logger = logging.getLogger('pipeline_test.drops')
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            for index in range(3):
+                logger.warning('registro %d', index)
+            self.assertEqual(pipeline.snapshot()['dropped'], 2)
+            self.assertEqual(pipeline.snapshot()['queue_size'], 1)
+
+            pipeline.start()
+            pipeline.stop()
+            self.assertEqual(pipeline.stats.dropped_reported, 2)
+        finally:
+            logger.removeHandler(handler)
+
+    def test_info_sampling(self):
+        """Test sin muestreo para WARNING ni para loggers exentos"""
+        stats = LogPipelineStats()
+        sampler = InfoSamplingFilter(0.0, exempt_loggers=('team_time.auth',), stats=stats)
+
+        def record(name, level):
+            return logging.LogRecord(name, level, __file__, 1, 'm', None, None)
+
+        self.assertFalse(sampler.filter(record('team_time.performance', logging.INFO)))
+        self.assertTrue(sampler.filter(record('team_time.performance', logging.WARNING)))
+        self.assertTrue(sampler.filter(record('team_time.auth', logging.INFO)))
+        self.assertEqual(stats.sampled_out, 1)
+
+    def test_sync_mode_formats_in_place(self):
+        """Test LOG_ASYNC desactivado escribe directamente y sin pipeline"""
+        self.app.config['LOG_ASYNC'] = False
+        setup_logging(self.app)
+        self.assertIsNone(logging_pipeline_stats())
+        self.assertIsInstance(self.app.logger.handlers[0].formatter, StructuredFormatter)
+        self.assertEqual(self._read('team_time_management.log')[0]['message'], 'Sistema de logging inicializado')
+        for handler in self.app.logger.handlers:
+            handler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests de los contadores desnormalizados de notificaciones no leídas
+"""
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from flask import Flask
+from sqlalchemy import event
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, User, Role, Notification, NotificationCounter
+from models.notification import NotificationType
+from services.notification_service import NotificationService
+
+
+class TestNotificationCounters(unittest.TestCase):
+    """Tests para NotificationCounter y su mantenimiento"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.user = User(email='counter@test.local', password='x')
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _counts(self):
+        db.session.expire_all()
+        return db.session.get(NotificationCounter, self.user.id).priority_counts()
+
+    def _create(self, *priorities):
+        for priority in priorities:
+            NotificationService.create_system_notification(self.user.id, 'Título', 'Mensaje', priority=priority)
+
+    def test_counters_follow_create_and_read(self):
+        """Test incremento al crear y decremento al leer (ORM y masivo)"""
+        self._create('high', 'high', 'low', 'urgent')
+        self.assertEqual(self._counts(), {'urgent': 1, 'high': 2, 'medium': 0, 'low': 1})
+
+        notification = Notification.query.filter_by(_priority='high').first()
+        notification.read = True
+        db.session.commit()
+        self.assertEqual(self._counts()['high'], 1)
+
+        ids = [n.id for n in Notification.query.filter_by(_priority='low').all()]
+        self.assertEqual(NotificationService.mark_notifications_as_read(ids, self.user.id), 1)
+        self.assertEqual(self._counts(), {'urgent': 1, 'high': 1, 'medium': 0, 'low': 0})
+
+        self.assertEqual(NotificationService.mark_all_notifications_as_read(self.user.id), 2)
+        self.assertEqual(self._counts(), {'urgent': 0, 'high': 0, 'medium': 0, 'low': 0})
+
+    def test_summary_uses_counters(self):
+        """Test que el resumen refleja los contadores y las recientes"""
+        self._create('urgent', 'medium')
+        summary = NotificationService.get_notification_summary(self.user.id)
+
+        self.assertEqual(summary['unread_count'], 2)
+        self.assertTrue(summary['has_urgent'])
+        self.assertEqual(summary['recent_notifications'][0]['priority'], 'urgent')
+
+    def test_reconcile_corrects_drift(self):
+        """Test de la reconciliación periódica"""
+        self._create('low')
+        db.session.execute(db.text('UPDATE notification_counter SET unread_low = 9, unread_high = 3'))
+        db.session.commit()
+
+        results = NotificationService.reconcile_notification_counters()
+        self.assertEqual(results, {'checked': 1, 'corrected': 1})
+        self.assertEqual(self._counts(), {'urgent': 0, 'high': 0, 'medium': 0, 'low': 1})
+
+    def test_reconcile_keeps_concurrent_increment(self):
+        """Test un incremento entre el recuento y el commit de la reconciliación no se pierde"""
+        self._create('high')
+        locked = []
+        queued = []
+
+        def detect_counter_lock(conn, cursor, statement, parameters, context, executemany):
+            select = getattr(getattr(context, 'compiled', None), 'statement', None)
+            if getattr(select, '_for_update_arg', None) is not None and 'notification_counter' in statement:
+                locked.append(True)
+
+        def concurrent_create():
+            db.session.add(Notification(
+                user_id=self.user.id, title='Título', message='Mensaje',
+                notification_type=NotificationType.SYSTEM_ALERT, priority='high'
+            ))
+            db.session.flush()
+
+        count_unread = NotificationService._count_unread
+
+        def count_then_increment(user_ids=None):
+            counts = count_unread(user_ids)
+            # Otra transacción crea una no leída: si la fila del contador está
+            # bloqueada (SQLite no lo hace) espera al commit de la reconciliación
+            if locked:
+                queued.append(True)
+            else:
+                concurrent_create()
+            return counts
+
+        event.listen(db.engine, 'before_cursor_execute', detect_counter_lock)
+        try:
+            with patch.object(NotificationService, '_count_unread', staticmethod(count_then_increment)):
+                NotificationService.reconcile_notification_counters()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', detect_counter_lock)
+
+        self.assertEqual(queued, [True])
+        concurrent_create()
+        db.session.commit()
+        self.assertEqual(self._counts()['high'], 2)
+        self.assertEqual(NotificationService.reconcile_notification_counters()['corrected'], 0)
+
+    def test_read_without_row_does_not_write(self):
+        """Test que un usuario sin fila obtiene sus no leídas calculadas sin crearla"""
+        counter = NotificationService.get_unread_counters(self.user.id)
+        self.assertEqual(counter.unread_total, 0)
+
+        self._create('high')
+        db.session.execute(db.text('DELETE FROM notification_counter'))
+        db.session.commit()
+        counter = NotificationService.get_unread_counters(self.user.id)
+        self.assertEqual(counter.priority_counts()['high'], 1)
+        self.assertFalse(db.session.new or db.session.dirty)
+        self.assertEqual(db.session.query(NotificationCounter).count(), 0)
+
+    def test_mark_all_applies_only_updated_rows(self):
+        """Test marcar todas descuenta las filas del UPDATE, sin poner el contador a cero"""
+        self._create('high', 'low')
+        # Una no leída creada entre el UPDATE y el commit seguiría contando
+        db.session.execute(db.text('UPDATE notification_counter SET unread_high = unread_high + 1'))
+        db.session.commit()
+
+        self.assertEqual(NotificationService.mark_all_notifications_as_read(self.user.id), 2)
+        self.assertEqual(self._counts(), {'urgent': 0, 'high': 1, 'medium': 0, 'low': 0})
+
+    def test_broadcast_fan_out(self):
+        """Test de la notificación masiva por conjuntos (destinatarios por rol y contadores)"""
+        manager_role = Role(name='manager')
+        managers = [User(email=f'manager{i}@test.local', password='x') for i in range(3)]
+        for manager in managers:
+            manager.roles.append(manager_role)
+        db.session.add_all(managers)
+        db.session.commit()
+
+        result = NotificationService.broadcast_system_notification(
+            'managers', 'Aviso', 'Mensaje', priority='high', send_email=True
+        )
+        self.assertEqual(result, {'notifications_sent': 3, 'emails_queued': 3})
+        self.assertEqual(Notification.query.filter_by(send_email=True, email_sent=False).count(), 3)
+
+        counter = db.session.get(NotificationCounter, managers[0].id)
+        self.assertEqual(counter.priority_counts()['high'], 1)
+        self.assertIsNone(db.session.get(NotificationCounter, self.user.id))
+
+        result = NotificationService.broadcast_system_notification('all', 'Aviso', 'Mensaje')
+        self.assertEqual(result['notifications_sent'], 4)
+        self.assertEqual(NotificationService.reconcile_notification_counters()['corrected'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests de la paginación por cursor (keyset) de los listados
+"""
+import base64
+import json
+import unittest
+import sys
+from datetime import date
+from pathlib import Path
+
+from flask import Flask
+from flask_security import Security, SQLAlchemyUserDatastore
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, User, Role
+from models.holiday import Holiday
+from models.notification import Notification
+from models.team import Team
+from models.team_membership import TeamMembership
+from synthetic_dataset import DatasetSpec, generate_dataset
+from utils.pagination import (
+    CountCache, InvalidCursor, count_cache, decode_cursor, encode_cursor, order_signature
+)
+
+
+class TestCursorEncoding(unittest.TestCase):
+    """Tests para el cursor opaco y la caché de totales"""
+
+    def test_round_trip_and_invalid(self):
+        """Test fechas y valores simples ida y vuelta; cursores ajenos se rechazan"""
+        from datetime import date, datetime
+        values = [3, date(2025, 5, 1), datetime(2025, 5, 1, 10, 30, 15, 250), 'García', 17]
+        self.assertEqual(decode_cursor(encode_cursor(values), 5), values)
+
+        for invalid in ('%%%', encode_cursor([1, 2]), encode_cursor([{'x': 1}])):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(invalid, 1 if 'x' in invalid else 3)
+
+    def test_count_cache_ttl(self):
+        """Test el total se reutiliza dentro del TTL y se recalcula al caducar"""
+        cache = CountCache(max_entries=2)
+        calls = []
+
+        def count():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cache.get_or_count('a', count, ttl=60), 1)
+        self.assertEqual(cache.get_or_count('a', count, ttl=60), 1)
+        self.assertEqual(cache.get_or_count('a', count, ttl=0), 2)
+        cache.get_or_count('b', count, ttl=60)
+        cache.get_or_count('c', count, ttl=60)
+        self.assertEqual(cache.get_or_count('a', count, ttl=60), 5)
+
+
+class TestKeysetListings(unittest.TestCase):
+    """Los listados en modo cursor devuelven las mismas filas que el modo clásico"""
+
+    def setUp(self):
+        from app.employees import employees_bp
+        from app.holidays import holidays_bp
+        from app.notifications import notifications_bp
+        from app.teams import teams_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(employees_bp, url_prefix='/api/employees')
+        self.app.register_blueprint(holidays_bp, url_prefix='/api/holidays')
+        self.app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+        self.app.register_blueprint(teams_bp, url_prefix='/api/teams')
+        count_cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(
+                db.session, DatasetSpec.preset('tiny', employees=20, teams=3, notifications_per_user=9)
+            )
+            admin = db.session.get(User, self.dataset['admin_user_id'])
+            self.admin = admin.fs_uniquifier
+            # Membresías en todos los equipos: el JOIN de ?team_id= duplica filas que DISTINCT colapsa
+            existing = set(db.session.query(TeamMembership.employee_id, TeamMembership.team_id))
+            for employee_id in self.dataset['employee_ids'][:5]:
+                for team_id in self.dataset['team_ids']:
+                    if (employee_id, team_id) not in existing:
+                        db.session.add(TeamMembership(employee_id=employee_id, team_id=team_id, active=True))
+            # Mismas prioridad y fecha: el desempate es el id
+            created_at = Notification.query.first().created_at
+            Notification.query.filter(Notification.user_id == admin.id).update({'created_at': created_at})
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _client(self):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = self.admin
+            session['_fresh'] = True
+        return client
+
+    def _walk(self, client, url, key, per_page):
+        ids, cursor, pages = [], '', 0
+        while cursor is not None:
+            separator = '&' if '?' in url else '?'
+            response = client.get(f'{url}{separator}per_page={per_page}&cursor={cursor}')
+            self.assertEqual(response.status_code, 200, response.get_json())
+            data = response.get_json()
+            ids.extend(item['id'] for item in data[key])
+            cursor = data['pagination']['next_cursor']
+            pages += 1
+        return ids, data['pagination'], pages
+
+    def test_cursor_pages_cover_every_row_once(self):
+        """Test empleados (con JOIN), equipos, festivos y notificaciones sin huecos ni repetidos"""
+        client = self._client()
+        team_id = self.dataset['team_ids'][0]
+        for url, key, per_page in ((f'/api/employees/?team_id={team_id}', 'employees', 4),
+                                   ('/api/teams/', 'teams', 2),
+                                   ('/api/holidays/?year=2025', 'holidays', 3),
+                                   ('/api/notifications/', 'notifications', 4)):
+            classic = client.get(f'{url}{"&" if "?" in url else "?"}per_page=100').get_json()
+            expected = [item['id'] for item in classic[key]]
+
+            ids, pagination, pages = self._walk(client, url, key, per_page)
+            self.assertEqual(sorted(ids), sorted(expected), url)
+            self.assertEqual(len(ids), len(set(ids)), url)
+            self.assertEqual(pagination['total'], len(expected), url)
+            self.assertEqual(pages, -(-len(expected) // per_page) or 1, url)
+
+    def test_orderings(self):
+        """Test festivos por fecha descendente y notificaciones en el orden clásico"""
+        client = self._client()
+        holidays = []
+        cursor = ''
+        while cursor is not None:
+            data = client.get(f'/api/holidays/?per_page=4&cursor={cursor}').get_json()
+            holidays.extend((item['date'], item['id']) for item in data['holidays'])
+            cursor = data['pagination']['next_cursor']
+        self.assertEqual(holidays, sorted(holidays, reverse=True))
+
+        classic = client.get('/api/notifications/?per_page=50').get_json()['notifications']
+        ids, pagination, _ = self._walk(client, '/api/notifications/?unread_only=true', 'notifications', 2)
+        self.assertEqual(ids, [item['id'] for item in classic if not item['read']])
+        # Con unread_only el total sale del contador desnormalizado (exacto)
+        self.assertFalse(pagination['total_approximate'])
+
+    def test_total_is_cached_and_optional(self):
+        """Test el total se calcula una vez por filtros y se puede omitir"""
+        client = self._client()
+        first = client.get('/api/teams/?cursor=').get_json()['pagination']
+        self.assertTrue(first['total_approximate'])
+
+        with self.app.app_context():
+            db.session.add(Team(name='Equipo nuevo'))
+            db.session.commit()
+
+        cached = client.get('/api/teams/?cursor=').get_json()['pagination']
+        self.assertEqual(cached['total'], first['total'])
+        count_cache.clear()
+        self.assertEqual(client.get('/api/teams/?cursor=').get_json()['pagination']['total'], first['total'] + 1)
+        self.assertIsNone(client.get('/api/teams/?cursor=&include_total=false').get_json()['pagination']['total'])
+
+    def test_invalid_cursor_is_400(self):
+        """Test cursor corrupto o de otro listado devuelve 400"""
+        client = self._client()
+        holiday_cursor = client.get('/api/holidays/?per_page=1&cursor=').get_json()['pagination']['next_cursor']
+        self.assertEqual(client.get('/api/teams/?cursor=basura').status_code, 400)
+        self.assertEqual(client.get(f'/api/notifications/?cursor={holiday_cursor}').status_code, 400)
+
+    def test_cursor_from_same_shaped_listing_is_400(self):
+        """Test un cursor de empleados ([str, int]) no vale en /teams aunque tenga la misma forma"""
+        client = self._client()
+        employee_cursor = client.get('/api/employees/?per_page=1&cursor=').get_json()['pagination']['next_cursor']
+        self.assertIsNotNone(employee_cursor)
+        self.assertEqual(client.get(f'/api/teams/?cursor={employee_cursor}').status_code, 400)
+
+    def test_cursor_value_of_wrong_type_is_400(self):
+        """Test valores que no son del tipo de su columna devuelven 400, no 500"""
+        client = self._client()
+        signature = order_signature([(Holiday.date, True), (Holiday.id, True)])
+        for values in (['no-es-fecha', 5], [{'$d': 'no-es-fecha'}, 5], [{'$d': '2025-05-01'}, 'cinco'],
+                       [{'$dt': '2025-05-01T10:00:00'}, 5]):
+            with self.subTest(values=values):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps({'o': signature, 'v': values}).encode()
+                ).decode().rstrip('=')
+                self.assertEqual(client.get(f'/api/holidays/?cursor={cursor}').status_code, 400)
+
+        valid = encode_cursor([date(2025, 5, 1), 5], signature)
+        self.assertEqual(client.get(f'/api/holidays/?cursor={valid}').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
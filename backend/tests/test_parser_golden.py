@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests de regresión de los parsers de boletines contra el corpus dorado
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.parsers.base import get_rule, registered_rules
+from services.parsers.corpus import (
+    ReplaySession, compare_golden, published_excerpts, recorded_cassettes, replay_parser
+)
+# Registra la regla del BOE
+import services.boe_holiday_service  # noqa: F401
+
+
+class TestParserGoldenCorpus(unittest.TestCase):
+    """Reproduce cada cassette grabado sin red y compara con su salida dorada"""
+
+    def test_cassettes_match_golden(self):
+        """Test cada parser grabado extrae exactamente los festivos dorados"""
+        cassettes = recorded_cassettes()
+        self.assertTrue(cassettes)
+
+        for cassette in cassettes:
+            with self.subTest(**cassette):
+                result = replay_parser(cassette['parser'], cassette['year'], iterations=1)
+                self.assertEqual(result['misses'], [])
+                self.assertGreater(result['documents'], 0)
+                self.assertGreater(result['peak_kb'], 0)
+
+                diff = compare_golden(cassette['parser'], cassette['year'], result['holidays'])
+                self.assertIsNotNone(diff, 'Falta la salida dorada')
+                self.assertEqual(diff['missing'], [])
+                self.assertEqual(diff['unexpected'], [])
+
+    def test_published_excerpts(self):
+        """Test cada regla extrae los festivos de un extracto de su boletín publicado"""
+        excerpts = published_excerpts()
+        self.assertEqual(set(excerpts), set(registered_rules()))
+
+        for code, excerpt in excerpts.items():
+            with self.subTest(parser=code, source=excerpt['source']):
+                holidays = get_rule(code).parse(excerpt['text'], excerpt['year'])
+                self.assertEqual([[h['city'], h['date']] for h in holidays], excerpt['expected'])
+
+    def test_replay_session_unrecorded_request(self):
+        """Test las peticiones no grabadas devuelven 404 y se registran"""
+        session = ReplaySession([{'key': 'https://example.org/a', 'status': 200, 'text': 'ok'}])
+
+        self.assertEqual(session.get('https://example.org/a', timeout=30).text, 'ok')
+        self.assertEqual(session.get('https://example.org/b', params={'q': 1}).status_code, 404)
+        self.assertEqual(session.misses, ['https://example.org/b?{"q": 1}'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests de la extracción de texto de PDFs en pool de procesos
+"""
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.parsers import pdf
+from services.parsers.base import BulletinParser, RegionRule
+from services.parsers.corpus import ReplaySession
+from services.parsers.pdf import PDFExtractionError, PDFTextExtractor, is_pdf
+
+FAKE_PDF = b'%PDF-1.4\nMadrid: 15 de mayo; 9 de noviembre.'
+
+
+def fake_extract(content: bytes) -> str:
+    """Extractor de prueba (se ejecuta en el proceso hijo)"""
+    return content.split(b'\n', 1)[1].decode('utf-8')
+
+
+def slow_extract(content: bytes) -> str:
+    """Simula un PDF patológico"""
+    time.sleep(30)
+    return ''
+
+
+class TestPDFExtraction(unittest.TestCase):
+    """Tests para PDFTextExtractor"""
+
+    def test_is_pdf(self):
+        """Test detección por firma y por Content-Type"""
+        self.assertTrue(is_pdf(FAKE_PDF))
+        self.assertTrue(is_pdf(b'...', 'application/pdf; charset=binary'))
+        self.assertFalse(is_pdf(b'<html></html>', 'text/html'))
+
+    def test_extract_in_pool_with_content_cache(self):
+        """Test extracción en el pool y caché por hash en memoria y disco"""
+        with TemporaryDirectory() as cache_dir:
+            extractor = PDFTextExtractor(workers=1, timeout=30, cache_dir=cache_dir,
+                                         extract_function=fake_extract)
+            try:
+                texts = extractor.extract_many([FAKE_PDF, FAKE_PDF, b'%PDF-1.4\nOtro'])
+                self.assertEqual(texts, ['Madrid: 15 de mayo; 9 de noviembre.'] * 2 + ['Otro'])
+                digest = extractor.content_hash(FAKE_PDF)
+                self.assertTrue((Path(cache_dir) / f'{digest}.txt').exists())
+            finally:
+                extractor.shutdown()
+
+            # Otro proceso (nuevo extractor) reutiliza la caché en disco sin pool
+            cached = PDFTextExtractor(workers=1, cache_dir=cache_dir, extract_function=slow_extract)
+            self.assertEqual(cached.extract(FAKE_PDF), 'Madrid: 15 de mayo; 9 de noviembre.')
+            self.assertIsNone(cached._pool)
+
+    def test_timeout_resets_pool(self):
+        """Test un PDF que agota el tiempo no bloquea y el pool se recrea"""
+        extractor = PDFTextExtractor(workers=1, timeout=0.5, extract_function=slow_extract)
+        try:
+            start = time.monotonic()
+            with self.assertRaises(PDFExtractionError):
+                extractor.extract(b'%PDF-1.4\nlento')
+            self.assertLess(time.monotonic() - start, 15)
+            self.assertIsNone(extractor._pool)
+
+            extractor.extract_function = fake_extract
+            extractor.timeout = 30
+            self.assertEqual(extractor.extract(FAKE_PDF), 'Madrid: 15 de mayo; 9 de noviembre.')
+        finally:
+            extractor.shutdown()
+
+    def test_timeout_fails_other_threads_documents_at_once(self):
+        """Test al reiniciar el pool, los documentos de otros hilos fallan sin esperar a su plazo"""
+        extractor = PDFTextExtractor(workers=2, timeout=0.5, extract_function=slow_extract)
+        errors = []
+
+        def other_thread():
+            try:
+                extractor.extract(b'%PDF-1.4\notro hilo', timeout=60)
+            except PDFExtractionError as e:
+                errors.append((time.monotonic(), str(e)))
+
+        try:
+            worker = threading.Thread(target=other_thread)
+            start = time.monotonic()
+            worker.start()
+            time.sleep(0.2)
+            with self.assertRaises(PDFExtractionError):
+                extractor.extract(b'%PDF-1.4\nlento')
+            worker.join(20)
+
+            self.assertFalse(worker.is_alive())
+            self.assertEqual(len(errors), 1)
+            self.assertIn('reiniciado', errors[0][1])
+            self.assertLess(errors[0][0] - start, 15)
+            self.assertEqual(extractor._tasks, {})
+        finally:
+            extractor.shutdown()
+
+    def test_bulletin_parser_routes_pdf_to_extractor(self):
+        """Test BulletinParser convierte respuestas PDF antes de parsear"""
+        class TestParser(BulletinParser):
+            RULE = RegionRule('test_pdf', 'Madrid', 'TEST')
+
+        session = ReplaySession([{
+            'key': 'https://example.org/doc.pdf', 'status': 200, 'text': '',
+            'content_b64': 'JVBERi0xLjQKTWFkcmlkOiAxNSBkZSBtYXlvOyA5IGRlIG5vdmllbWJyZS4=',
+            'content_type': 'application/pdf'
+        }])
+        extractor = PDFTextExtractor(workers=1, timeout=30, extract_function=fake_extract)
+        previous, pdf._extractor = pdf._extractor, extractor
+        try:
+            holidays = TestParser(session).parse_url('https://example.org/doc.pdf', 2026)
+        finally:
+            pdf._extractor = previous
+            extractor.shutdown()
+
+        self.assertEqual([h['date'] for h in holidays], ['2026-05-15', '2026-11-09'])
+
+
+if __name__ == '__main__':
+    unittest.main()
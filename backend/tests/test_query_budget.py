@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests de los presupuestos de consultas SQL por endpoint
+"""
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+from flask_security import Security, SQLAlchemyUserDatastore
+
+# Añadir el directorio backend y scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from models import db, Team, User, Role
+from models.employee import Employee
+from services.query_budget import (QueryBudgetExceeded, declared_budgets, init_query_budget,
+                                   query_budget)
+from synthetic_dataset import DatasetSpec, generate_dataset
+
+
+class TestQueryBudget(unittest.TestCase):
+    """Tests para query_budget e init_query_budget"""
+
+    def _make_app(self, **config):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        app.config.update(config)
+        db.init_app(app)
+
+        @app.route('/teams')
+        @query_budget(1)
+        def teams():
+            Team.query.count()
+            Team.query.count()
+            return jsonify({'ok': True})
+
+        init_query_budget(app)
+        with app.app_context():
+            db.create_all()
+        return app
+
+    def test_raise_mode_fails_request_over_budget(self):
+        """Test en modo raise la petición falla con las sentencias más repetidas"""
+        app = self._make_app(TESTING=True)
+        with self.assertRaises(QueryBudgetExceeded) as context:
+            app.test_client().get('/teams')
+        self.assertEqual(context.exception.count, 2)
+        self.assertEqual(context.exception.budget, 1)
+        self.assertIn('2x SELECT count(*)', str(context.exception))
+
+    def test_warn_mode_and_config_override(self):
+        """Test modo warn registra el aviso y QUERY_BUDGETS sustituye al decorador"""
+        app = self._make_app(QUERY_BUDGET_MODE='warn')
+        with self.assertLogs('services.query_budget', level='WARNING'):
+            self.assertEqual(app.test_client().get('/teams').status_code, 200)
+
+        relaxed = self._make_app(TESTING=True, QUERY_BUDGETS={'teams': 2})
+        self.assertEqual(relaxed.test_client().get('/teams').status_code, 200)
+        self.assertEqual(declared_budgets(relaxed), {'teams': 2})
+
+    def test_off_mode_installs_nothing(self):
+        """Test sin testing ni debug no se comprueba nada"""
+        app = self._make_app()
+        self.assertNotIn('query_budget', app.extensions)
+        self.assertEqual(app.test_client().get('/teams').status_code, 200)
+
+
+class TestEndpointBudgets(unittest.TestCase):
+    """Los endpoints con presupuesto lo cumplen con un equipo de 50 personas"""
+
+    TEAM_SIZE = 50
+
+    def setUp(self):
+        from app.calendar import calendar_bp
+        from app.employees import employees_bp
+        from app.notifications import notifications_bp
+        from app.teams import teams_bp
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            TESTING=True,
+            SECRET_KEY='test',
+            SECURITY_PASSWORD_SALT='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            QUERY_BUDGET_MODE='raise'
+        )
+        db.init_app(self.app)
+        Security(self.app, SQLAlchemyUserDatastore(db, User, Role))
+        self.app.register_blueprint(calendar_bp, url_prefix='/api/calendar')
+        self.app.register_blueprint(employees_bp, url_prefix='/api/employees')
+        self.app.register_blueprint(teams_bp, url_prefix='/api/teams')
+        self.app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+        init_query_budget(self.app)
+
+        # Sin contexto de aplicación abierto durante las peticiones: cada una
+        # tiene su propio ``g`` (Flask-Login cachea ahí el usuario actual)
+        with self.app.app_context():
+            db.create_all()
+            self.dataset = generate_dataset(
+                db.session, DatasetSpec.preset('tiny', employees=self.TEAM_SIZE, teams=1)
+            )
+            team = db.session.get(Team, self.dataset['team_ids'][0])
+            employee = db.session.get(Employee, self.dataset['employee_ids'][1])
+            self.users = {
+                user.id: user.fs_uniquifier
+                for user in User.query.filter(User.id.in_([
+                    self.dataset['admin_user_id'], team.manager.user_id, employee.user_id
+                ]))
+            }
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _client_for(self, fs_uniquifier):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = fs_uniquifier
+            session['_fresh'] = True
+        return client
+
+    def test_budgeted_endpoints_for_each_role(self):
+        """Test admin, manager y empleado dentro del presupuesto en todos los endpoints"""
+        team_id = self.dataset['team_ids'][0]
+        employee_id = self.dataset['employee_ids'][1]
+        urls = [
+            f'/api/calendar/?team_id={team_id}&year=2025&month=3',
+            f'/api/calendar/?employee_id={employee_id}&year=2025&month=3',
+            '/api/calendar/?year=2025&month=3',
+            f'/api/calendar/annual?team_id={team_id}&year=2025',
+            f'/api/calendar/annual?team_id={team_id}&year=2025&format=compact',
+            '/api/employees/',
+            '/api/employees/?cursor=',
+            f'/api/employees/{employee_id}',
+            '/api/teams/',
+            '/api/teams/?cursor=',
+            f'/api/teams/{team_id}',
+            f'/api/teams/{team_id}/employees',
+            '/api/notifications/',
+            '/api/notifications/?cursor=&unread_only=true',
+            '/api/notifications/summary',
+            '/api/notifications/badge',
+        ]
+        violations = []
+        for user_id, fs_uniquifier in self.users.items():
+            client = self._client_for(fs_uniquifier)
+            for url in urls:
+                try:
+                    response = client.get(url)
+                except QueryBudgetExceeded as e:
+                    violations.append(f'usuario {user_id} {url}: {e}')
+                    continue
+                self.assertIn(response.status_code, (200, 403), f'usuario {user_id} {url}')
+        self.assertEqual(violations, [], '\n'.join(violations))
+
+        # Todos los endpoints probados declaran presupuesto
+        self.assertEqual(len(declared_budgets(self.app)), 10)
+
+if __name__ == '__main__':
+    unittest.main()
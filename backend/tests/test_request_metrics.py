@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests de las métricas por endpoint
+"""
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, Team
+from services.request_metrics import RequestMetrics, init_request_metrics
+
+
+class TestRequestMetrics(unittest.TestCase):
+    """Tests para RequestMetrics y su middleware"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.app.config['METRICS_EXCLUDED_ENDPOINTS'] = ['stream']
+        db.init_app(self.app)
+        self.metrics = RequestMetrics()
+        init_request_metrics(self.app, self.metrics)
+
+        @self.app.route('/teams/<int:team_id>')
+        def team(team_id):
+            Team.query.count()
+            Team.query.filter_by(id=team_id).first()
+            return jsonify({'id': team_id})
+
+        @self.app.route('/stream')
+        def stream():
+            return 'ok'
+
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def test_middleware_records_sql_and_status(self):
+        """Test latencia, sentencias SQL, tamaño y estados por endpoint"""
+        self.client.get('/teams/1')
+        self.client.get('/teams/2')
+        self.client.get('/stream')
+        self.client.get('/missing')
+
+        endpoints = {item['endpoint']: item for item in self.metrics.summary()['endpoints']}
+        self.assertEqual(endpoints['team']['count'], 2)
+        self.assertEqual(endpoints['team']['avg_sql_queries'], 2)
+        self.assertGreater(endpoints['team']['avg_response_bytes'], 0)
+        self.assertEqual(endpoints['team']['statuses'], {'200': 2})
+        self.assertEqual(endpoints['<unmatched>']['statuses'], {'404': 1})
+        self.assertNotIn('stream', endpoints)
+
+    def test_histogram_and_prometheus_text(self):
+        """Test cubetas acumuladas, cuantiles y formato de Prometheus"""
+        for duration in (0.002, 0.02, 0.02, 0.3):
+            self.metrics.record('GET', 'reports.summary', 200, duration, sql_count=3)
+        self.metrics.record('GET', 'reports.summary', 500, 12.0)
+
+        summary = self.metrics.summary()['endpoints'][0]
+        self.assertEqual(summary['count'], 5)
+        self.assertEqual(summary['error_rate'], 0.2)
+        self.assertLessEqual(summary['p50_ms'], 25)
+        self.assertEqual(summary['max_ms'], 12000)
+
+        text = self.metrics.prometheus()
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",endpoint="reports.summary",le="0.025"} 3', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",endpoint="reports.summary",le="+Inf"} 5', text)
+        self.assertIn('http_requests_total{method="GET",endpoint="reports.summary",status="500"} 1', text)
+        self.assertIn('db_statements_total{method="GET",endpoint="reports.summary"} 12', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
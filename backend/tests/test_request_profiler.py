@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests del perfilado bajo demanda de peticiones
+"""
+import time
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, Team
+from services.request_profiler import RequestProfiler, init_request_profiler
+
+
+def busy_wait(seconds):
+    """Consume CPU en una función reconocible en las pilas"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Tests para RequestProfiler y sus hooks"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.app.config['PROFILING_INTERVAL_MS'] = 1
+        db.init_app(self.app)
+        self.allowed = True
+        self.profiler = RequestProfiler()
+        init_request_profiler(self.app, self.profiler, authorize=lambda: self.allowed)
+
+        @self.app.route('/report')
+        def report():
+            Team.query.count()
+            busy_wait(0.05)
+            Team.query.all()
+            return jsonify({'ok': True})
+
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def test_profile_stored_with_stacks_and_sql_timeline(self):
+        """Test pilas folded con la vista y línea temporal SQL ordenada"""
+        response = self.client.get('/report', headers={'X-Profile': '1'})
+        self.assertEqual(response.get_json(), {'ok': True})
+
+        profile = self.profiler.get(response.headers['X-Profile-Id'])
+        self.assertGreater(profile['samples'], 0)
+        self.assertIn('busy_wait (tests/test_request_profiler.py', profile['folded'])
+        # Las pilas parten de full_dispatch_request
+        self.assertTrue(all(line.startswith('full_dispatch_request') or line.startswith('[esperando]')
+                            for line in profile['folded'].splitlines()))
+        self.assertEqual(profile['sql_count'], 2)
+        offsets = [item['offset_ms'] for item in profile['sql_timeline']]
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertIn('test_request_profiler.py', profile['sql_timeline'][0]['frame'])
+
+    def test_return_mode_and_authorization(self):
+        """Test perfil en la respuesta y peticiones sin permiso sin perfilar"""
+        response = self.client.get('/report?_profile=return')
+        self.assertEqual(response.get_json()['profile']['endpoint'], 'report')
+
+        self.allowed = False
+        response = self.client.get('/report', headers={'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(len(self.profiler.list()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests del registro de consultas lentas
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+from flask import Flask
+
+# Añadir el directorio backend al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import db, Team
+import services.slow_query_log as slow_query_module
+from services.slow_query_log import (
+    SlowQueryLog, fingerprint, init_slow_query_log, is_read_only_select, normalize_sql
+)
+
+
+class _RecordingConnection:
+    """Conexión PostgreSQL simulada que anota las sentencias y el rollback"""
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    def rollback(self):
+        self.executed.append('ROLLBACK')
+
+    def exec_driver_sql(self, statement, parameters=()):
+        self.executed.append(statement)
+        return self
+
+    def fetchall(self):
+        return [('Seq Scan on team',)]
+
+
+class _RecordingEngine:
+    def __init__(self):
+        self.dialect = type('Dialect', (), {'name': 'postgresql'})()
+        self.executed = []
+
+    def connect(self):
+        return _RecordingConnection(self.executed)
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    """Tests para SlowQueryLog"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        # Fichero temporal: el hilo de EXPLAIN abre su propia conexión
+        handle, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{self.db_path}'
+        # Umbral 0 y muestreo completo: toda sentencia se registra y se explica
+        self.app.config['SLOW_QUERY_THRESHOLD_MS'] = 0
+        self.app.config['SLOW_QUERY_EXPLAIN_SAMPLE_RATE'] = 1.0
+        db.init_app(self.app)
+        self.log = SlowQueryLog()
+        init_slow_query_log(self.app, self.log)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+        # Los listeners vuelven a alimentar el registro del proceso
+        slow_query_module._active_log = slow_query_module.slow_query_log
+        os.unlink(self.db_path)
+
+    def test_normalized_fingerprint(self):
+        """Test misma huella para la misma forma con distintos literales"""
+        first = normalize_sql("SELECT * FROM team WHERE id IN (1, 2, 3) AND name = 'A'")
+        second = normalize_sql("SELECT *  FROM team\n WHERE id IN (7) AND name = 'O''Brien'")
+        self.assertEqual(first, 'SELECT * FROM team WHERE id IN (...) AND name = ?')
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertEqual(
+            normalize_sql('SELECT * FROM team WHERE id = %(id_1)s LIMIT %(param_1)s'),
+            'SELECT * FROM team WHERE id = ? LIMIT ?'
+        )
+
+    def test_records_frame_and_sampled_plan(self):
+        """Test endpoint, línea de la aplicación y plan capturado fuera de la consulta"""
+        with self.app.test_request_context('/api/teams'):
+            Team.query.filter(Team.id == 5).all()
+            Team.query.filter(Team.id == 6).all()
+        self.assertTrue(self.log.wait_for_explains())
+
+        entry = next(item for item in self.log.top(limit=50)
+                     if item['sql'].startswith('SELECT team.id'))
+        self.assertEqual(entry['count'], 2)
+        self.assertIn('tests/test_slow_query_log.py', entry['slowest_frame'])
+
+        detail = self.log.get(entry['fingerprint'])
+        self.assertTrue(detail['has_plan'])
+        self.assertIn('team', detail['plan'].lower())
+        # Las sentencias del propio EXPLAIN no se registran
+        self.assertFalse(any('EXPLAIN' in item['sql'] for item in self.log.top(limit=50)))
+
+    def test_read_only_select_detection(self):
+        """Test solo los SELECT sin efectos son candidatos a EXPLAIN ANALYZE"""
+        self.assertTrue(is_read_only_select('SELECT * FROM team WHERE name = %(name)s'))
+        self.assertTrue(is_read_only_select("SELECT * FROM team WHERE name = 'for update'"))
+        self.assertFalse(is_read_only_select('SELECT * FROM team FOR UPDATE'))
+        self.assertFalse(is_read_only_select('SELECT * FROM team FOR NO KEY UPDATE SKIP LOCKED'))
+        self.assertFalse(is_read_only_select("SELECT nextval('team_id_seq')"))
+        self.assertFalse(is_read_only_select('SELECT pg_advisory_lock(1)'))
+        self.assertFalse(is_read_only_select('SELECT * INTO copia FROM team'))
+        self.assertFalse(is_read_only_select('SELECT 1; DELETE FROM team'))
+        self.assertFalse(is_read_only_select('UPDATE team SET name = name'))
+
+    def test_explain_does_not_execute_unless_opted_in(self):
+        """Test EXPLAIN simple por defecto; ANALYZE solo con opt-in y en transacción READ ONLY"""
+        statement = 'SELECT * FROM team WHERE id = %(id)s'
+        engine = _RecordingEngine()
+        log = SlowQueryLog()
+
+        self.assertFalse(log.should_analyze('postgresql', statement))
+        log.explain(engine, statement, {'id': 1}, log.should_analyze('postgresql', statement))
+        self.assertEqual(engine.executed[-2:], ['EXPLAIN (FORMAT TEXT) ' + statement, 'ROLLBACK'])
+        self.assertNotIn('SET TRANSACTION READ ONLY', engine.executed)
+
+        log.explain_analyze = True
+        self.assertFalse(log.should_analyze('postgresql', "SELECT nextval('team_id_seq')"))
+        self.assertFalse(log.should_analyze('sqlite', statement))
+        self.assertTrue(log.should_analyze('postgresql', statement))
+
+        engine.executed.clear()
+        log.explain(engine, statement, {'id': 1}, analyze=True)
+        self.assertEqual(engine.executed[0], 'SET TRANSACTION READ ONLY')
+        self.assertEqual(engine.executed[-2:], ['EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) ' + statement, 'ROLLBACK'])
+
+
+if __name__ == '__main__':
+    unittest.main()
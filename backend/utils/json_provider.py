@@ -0,0 +1,94 @@
+"""
+Proveedor JSON rápido para la aplicación (``app.json``)
+
+``jsonify`` y ``request.get_json`` pasan por ``app.json``. El proveedor por
+defecto de Flask usa el módulo ``json`` de la biblioteca estándar, ordena
+las claves y llama a ``default`` para cada fecha; en respuestas grandes
+(calendario anual, informes) la serialización es una parte apreciable de la
+CPU de la petición.
+
+``FastJSONProvider`` usa orjson cuando está instalado:
+
+- Serializa en C y devuelve bytes que van directos al cuerpo de la
+  respuesta (sin pasar por ``str``).
+- ``date``, ``datetime`` y ``time`` se codifican de forma nativa en ISO 8601
+  (igual que los ``to_dict``); el proveedor de Flask las convertía en fechas
+  HTTP (RFC 822).
+- ``Decimal`` sale como cadena, igual que con Flask, para no perder precisión.
+- Claves no textuales (enteros, fechas) se convierten como en ``json``.
+- No ordena las claves salvo que se pida con ``app.json.sort_keys = True``.
+
+Sin orjson (o con ``JSON_FAST_PROVIDER=false``) se mantiene el proveedor de
+Flask. Las llamadas a ``dumps`` con argumentos propios de ``json`` (``cls``,
+``separators``...) se delegan en la biblioteca estándar.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _default(value):
+    """Tipos que ni orjson ni ``json`` serializan por sí solos"""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de la aplicación basado en orjson"""
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Instala ``FastJSONProvider`` como ``app.json`` si está activado y hay orjson"""
+    if not app.config.get('JSON_FAST_PROVIDER', True) or orjson is None:
+        return
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,244 @@
+"""
+Paginación por cursor (keyset) para los listados de la API
+
+Con ``?cursor=`` (vacío en la primera página) los listados dejan de usar
+``paginate()``: en vez de ``OFFSET`` filtran por la clave de ordenación de
+la última fila devuelta, y piden ``per_page + 1`` filas para saber si hay
+más. El coste de una página no depende de lo profunda que sea.
+
+La ordenación siempre termina en la clave primaria para que sea estable
+(sin filas repetidas ni saltadas entre páginas). El cursor es opaco
+(base64 de los valores de la clave) y no da acceso a nada: solo se aplica
+sobre la consulta ya filtrada por permisos. Lleva la firma de la ordenación
+que lo generó, y cada valor se comprueba contra el tipo de su columna: un
+cursor de otro listado o manipulado es ``InvalidCursor`` (400), no un 500.
+
+El total no se recalcula en cada página: ``CountCache`` guarda el
+``COUNT(*)`` de cada combinación de filtros durante ``PAGINATION_COUNT_TTL``
+segundos, así que es aproximado (``total_approximate``). Con
+``include_total=false`` no se cuenta nada.
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Cursor mal formado o de otra ordenación"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'$d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        try:
+            if '$dt' in value:
+                return datetime.fromisoformat(value['$dt'])
+            if '$d' in value:
+                return date.fromisoformat(value['$d'])
+        except (TypeError, ValueError) as e:
+            raise InvalidCursor('Cursor no válido') from e
+        raise InvalidCursor('Cursor no válido')
+    return value
+
+
+def order_signature(order: Sequence[Tuple[Any, bool]]) -> str:
+    """Firma corta de una ordenación (expresiones y sentidos)"""
+    spec = '|'.join(f"{expression}:{'desc' if descending else 'asc'}" for expression, descending in order)
+    return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(values: Sequence, signature: str = '') -> str:
+    raw = json.dumps({'o': signature, 'v': [_encode_value(value) for value in values]},
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int, signature: str = '') -> List:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except ValueError as e:
+        raise InvalidCursor('Cursor no válido') from e
+    if not isinstance(payload, dict) or payload.get('o') != signature:
+        raise InvalidCursor('Cursor no válido')
+    values = payload.get('v')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Cursor no válido')
+    return [_decode_value(value) for value in values]
+
+
+def _matches_column_type(expression, value) -> bool:
+    """Indica si un valor del cursor es del tipo de su expresión de ordenación"""
+    if value is None:
+        return True
+    try:
+        expected = expression.type.python_type
+    except (AttributeError, NotImplementedError):
+        # Expresiones sin tipo Python conocido: se deja validar a la base de datos
+        return True
+    if expected is datetime:
+        return isinstance(value, datetime)
+    if expected is date:
+        return isinstance(value, date) and not isinstance(value, datetime)
+    if expected is bool:
+        return isinstance(value, bool)
+    if expected in (int, float, Decimal):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+
+def check_cursor_values(order: Sequence[Tuple[Any, bool]], values: Sequence):
+    """Lanza ``InvalidCursor`` si algún valor no corresponde al tipo de su columna"""
+    for (expression, _), value in zip(order, values):
+        if not _matches_column_type(expression, value):
+            raise InvalidCursor('Cursor no válido')
+
+
+class KeysetPage:
+    """Página de resultados con el cursor de la siguiente"""
+
+    def __init__(self, items: List, next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def keyset_paginate(query, order: Sequence[Tuple[Any, bool]], cursor: Optional[str], per_page: int) -> KeysetPage:
+    """
+    Devuelve la página que sigue a ``cursor`` en el orden ``order``.
+
+    Args:
+        query: Consulta ORM de una entidad (filtros y opciones de carga ya aplicados)
+        order: Pares (expresión, descendente); el último debe ser la clave primaria
+        cursor: ``next_cursor`` de la página anterior ('' o None para la primera)
+        per_page: Filas por página
+
+    Raises:
+        InvalidCursor: Si el cursor no corresponde a esta ordenación
+    """
+    expressions = [expression for expression, _ in order]
+    signature = order_signature(order)
+
+    if cursor:
+        values = decode_cursor(cursor, len(order), signature)
+        check_cursor_values(order, values)
+        # (a, b, id) > (va, vb, vid) desarrollado para poder mezclar ASC y DESC
+        conditions = []
+        for position, (expression, descending) in enumerate(order):
+            equal_prefix = [expressions[i] == values[i] for i in range(position)]
+            after = expression < values[position] if descending else expression > values[position]
+            conditions.append(and_(*equal_prefix, after))
+        query = query.filter(or_(*conditions))
+
+    query = query.order_by(None).order_by(*[
+        expression.desc() if descending else expression.asc() for expression, descending in order
+    ])
+    # Las claves se leen en la misma consulta (las de tipo expresión no son atributos del modelo)
+    rows = query.add_columns(*[
+        expression.label(f'_keyset_{position}') for position, expression in enumerate(expressions)
+    ]).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(list(rows[-1][1:]), signature)
+    return KeysetPage([row[0] for row in rows], next_cursor)
+
+
+class CountCache:
+    """Totales por combinación de filtros, cacheados en el proceso con TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[float, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_count(self, key: Hashable, count: Callable[[], int], ttl: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        total = count()
+        with self._lock:
+            self._entries[key] = (now, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def cached_total(query, ttl: float) -> int:
+    """
+    ``COUNT(*)`` de la consulta (sin ORDER BY), reutilizado durante ``ttl`` segundos.
+
+    La clave es el SQL con sus parámetros, así que cada combinación de filtros
+    y de alcance por permisos tiene su propio total.
+    """
+    query = query.order_by(None)
+    compiled = query.statement.compile()
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    return count_cache.get_or_count(key, query.count, ttl)
+
+
+def keyset_pagination_info(page: KeysetPage, per_page: int, total: Optional[int],
+                           approximate: bool = True) -> dict:
+    """Bloque ``pagination`` de la respuesta en modo cursor"""
+    return {
+        'mode': 'cursor',
+        'per_page': per_page,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next,
+        'total': total,
+        'total_approximate': approximate
+    }
+
+
+def requested_cursor() -> Optional[str]:
+    """Cursor de la petición: None en modo clásico (page/per_page), '' en la primera página"""
+    return request.args.get('cursor')
+
+
+def paginate_by_cursor(query, order: Sequence[Tuple[Any, bool]], cursor: str, per_page: int,
+                       total: Optional[int] = None) -> Tuple[KeysetPage, dict]:
+    """
+    Página en modo cursor y su bloque ``pagination``.
+
+    Si no se pasa ``total`` se usa el total cacheado de la consulta, salvo con
+    ``?include_total=false``. Un total pasado (p. ej. de un contador
+    desnormalizado) se considera exacto.
+    """
+    page = keyset_paginate(query, order, cursor, per_page)
+    if total is not None:
+        return page, keyset_pagination_info(page, per_page, total, approximate=False)
+    if request.args.get('include_total', 'true').lower() == 'true':
+        total = cached_total(query, current_app.config.get('PAGINATION_COUNT_TTL', 60))
+    return page, keyset_pagination_info(page, per_page, total)
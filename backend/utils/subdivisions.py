@@ -0,0 +1,541 @@
+"""
+Nombres de subdivisiones (ISO 3166-2) de los países con festivos regionales
+
+El paquete ``holidays`` identifica las regiones por código (``PT-11``,
+``DE-BY``). Los festivos regionales se guardan con el nombre de la región,
+que es lo que escriben los empleados y lo que cruza ``LocationResolver``
+(por catálogo o por texto). Nombres oficiales ISO 3166-2 en el idioma del
+país; para España, los del registro de empleados y los parsers de boletines.
+
+La tabla es estática: no hay dependencia de ``pycountry`` en tiempo de
+ejecución. Para regenerarla (p. ej. al añadir un país), en un entorno aparte:
+
+    pip install pycountry
+    python -c "import pycountry; print({s.code: s.name for s in pycountry.subdivisions.get(country_code='PT')})"
+
+y pegar el resultado bajo su código de país quitando el prefijo ``PT-`` de
+cada clave; los nombres de España se mantienen a mano.
+"""
+import re
+from typing import Optional
+
+# Código de subdivisión completo (p. ej. 'ES-MD' de Nager.Date o 'PT-11')
+SUBDIVISION_CODE = re.compile(r'^([A-Z]{2})-([A-Za-z0-9]{1,8})$')
+
+# Formato: {código_país: {código_subdivisión: nombre}}
+SUBDIVISION_NAMES = {
+    'AD': {
+        '02': 'Canillo',
+        '03': 'Encamp',
+        '04': 'La Massana',
+        '05': 'Ordino',
+        '06': 'Sant Julià de Lòria',
+        '07': 'Andorra la Vella',
+        '08': 'Escaldes-Engordany'
+    },
+    'AT': {
+        '1': 'Burgenland',
+        '2': 'Kärnten',
+        '3': 'Niederösterreich',
+        '4': 'Oberösterreich',
+        '5': 'Salzburg',
+        '6': 'Steiermark',
+        '7': 'Tirol',
+        '8': 'Vorarlberg',
+        '9': 'Wien'
+    },
+    'AU': {
+        'ACT': 'Australian Capital Territory',
+        'NSW': 'New South Wales',
+        'NT': 'Northern Territory',
+        'QLD': 'Queensland',
+        'SA': 'South Australia',
+        'TAS': 'Tasmania',
+        'VIC': 'Victoria',
+        'WA': 'Western Australia'
+    },
+    'BA': {
+        'BIH': 'Federacija Bosne i Hercegovine',
+        'BRC': 'Brčko distrikt',
+        'SRP': 'Republika Srpska'
+    },
+    'BO': {
+        'B': 'El Beni',
+        'C': 'Cochabamba',
+        'H': 'Chuquisaca',
+        'L': 'La Paz',
+        'N': 'Pando',
+        'O': 'Oruro',
+        'P': 'Potosí',
+        'S': 'Santa Cruz',
+        'T': 'Tarija'
+    },
+    'BR': {
+        'AC': 'Acre',
+        'AL': 'Alagoas',
+        'AM': 'Amazonas',
+        'AP': 'Amapá',
+        'BA': 'Bahia',
+        'CE': 'Ceará',
+        'DF': 'Distrito Federal',
+        'ES': 'Espírito Santo',
+        'GO': 'Goiás',
+        'MA': 'Maranhão',
+        'MG': 'Minas Gerais',
+        'MS': 'Mato Grosso do Sul',
+        'MT': 'Mato Grosso',
+        'PA': 'Pará',
+        'PB': 'Paraíba',
+        'PE': 'Pernambuco',
+        'PI': 'Piauí',
+        'PR': 'Paraná',
+        'RJ': 'Rio de Janeiro',
+        'RN': 'Rio Grande do Norte',
+        'RO': 'Rondônia',
+        'RR': 'Roraima',
+        'RS': 'Rio Grande do Sul',
+        'SC': 'Santa Catarina',
+        'SE': 'Sergipe',
+        'SP': 'São Paulo',
+        'TO': 'Tocantins'
+    },
+    'CA': {
+        'AB': 'Alberta',
+        'BC': 'British Columbia',
+        'MB': 'Manitoba',
+        'NB': 'New Brunswick',
+        'NL': 'Newfoundland and Labrador',
+        'NS': 'Nova Scotia',
+        'NT': 'Northwest Territories',
+        'NU': 'Nunavut',
+        'ON': 'Ontario',
+        'PE': 'Prince Edward Island',
+        'QC': 'Quebec',
+        'SK': 'Saskatchewan',
+        'YT': 'Yukon'
+    },
+    'CH': {
+        'AG': 'Aargau',
+        'AR': 'Appenzell Ausserrhoden',
+        'AI': 'Appenzell Innerrhoden',
+        'BL': 'Basel-Landschaft',
+        'BS': 'Basel-Stadt',
+        'BE': 'Berne',
+        'FR': 'Fribourg',
+        'GE': 'Genève',
+        'GL': 'Glarus',
+        'GR': 'Graubünden',
+        'JU': 'Jura',
+        'LU': 'Luzern',
+        'NE': 'Neuchâtel',
+        'NW': 'Nidwalden',
+        'OW': 'Obwalden',
+        'SG': 'Sankt Gallen',
+        'SH': 'Schaffhausen',
+        'SZ': 'Schwyz',
+        'SO': 'Solothurn',
+        'TG': 'Thurgau',
+        'TI': 'Ticino',
+        'UR': 'Uri',
+        'VD': 'Vaud',
+        'VS': 'Valais',
+        'ZG': 'Zug',
+        'ZH': 'Zürich'
+    },
+    'CL': {
+        'AI': 'Aisén del General Carlos Ibañez del Campo',
+        'AN': 'Antofagasta',
+        'AP': 'Arica y Parinacota',
+        'AR': 'La Araucanía',
+        'AT': 'Atacama',
+        'BI': 'Biobío',
+        'CO': 'Coquimbo',
+        'LI': "Libertador General Bernardo O'Higgins",
+        'LL': 'Los Lagos',
+        'LR': 'Los Ríos',
+        'MA': 'Magallanes',
+        'ML': 'Maule',
+        'NB': 'Ñuble',
+        'RM': 'Región Metropolitana de Santiago',
+        'TA': 'Tarapacá',
+        'VS': 'Valparaíso'
+    },
+    'DE': {
+        'BB': 'Brandenburg',
+        'BE': 'Berlin',
+        'BW': 'Baden-Württemberg',
+        'BY': 'Bayern',
+        'HB': 'Bremen',
+        'HE': 'Hessen',
+        'HH': 'Hamburg',
+        'MV': 'Mecklenburg-Vorpommern',
+        'NI': 'Niedersachsen',
+        'NW': 'Nordrhein-Westfalen',
+        'RP': 'Rheinland-Pfalz',
+        'SH': 'Schleswig-Holstein',
+        'SL': 'Saarland',
+        'SN': 'Sachsen',
+        'ST': 'Sachsen-Anhalt',
+        'TH': 'Thüringen'
+    },
+    'ES': {
+        'AN': 'Andalucía',
+        'AR': 'Aragón',
+        'AS': 'Asturias',
+        'CB': 'Cantabria',
+        'CE': 'Ceuta',
+        'CL': 'Castilla y León',
+        'CM': 'Castilla-La Mancha',
+        'CN': 'Canarias',
+        'CT': 'Cataluña',
+        'EX': 'Extremadura',
+        'GA': 'Galicia',
+        'IB': 'Baleares',
+        'MC': 'Murcia',
+        'MD': 'Madrid',
+        'ML': 'Melilla',
+        'NC': 'Navarra',
+        'PV': 'País Vasco',
+        'RI': 'La Rioja',
+        'VC': 'Comunidad Valenciana'
+    },
+    'FR': {
+        'BL': 'Saint-Barthélemy',
+        'GES': 'Grand-Est',
+        'GP': 'Guadeloupe',
+        'GY': 'Guyane',
+        'MF': 'Saint-Martin',
+        'MQ': 'Martinique',
+        'NC': 'Nouvelle-Calédonie',
+        'PF': 'Polynésie française',
+        'RE': 'La Réunion',
+        'WF': 'Wallis-et-Futuna',
+        'YT': 'Mayotte'
+    },
+    'GB': {
+        'ENG': 'England',
+        'NIR': 'Northern Ireland',
+        'SCT': 'Scotland',
+        'WLS': 'Wales [Cymru GB-CYM]'
+    },
+    'IN': {
+        'AN': 'Andaman and Nicobar Islands',
+        'AP': 'Andhra Pradesh',
+        'AR': 'Arunāchal Pradesh',
+        'AS': 'Assam',
+        'BR': 'Bihār',
+        'CG': 'Chhattīsgarh',
+        'CH': 'Chandīgarh',
+        'DD': 'Daman and Diu',
+        'DH': 'Dādra and Nagar Haveli and Damān and Diu',
+        'DL': 'Delhi',
+        'GA': 'Goa',
+        'GJ': 'Gujarāt',
+        'HP': 'Himāchal Pradesh',
+        'HR': 'Haryāna',
+        'JH': 'Jhārkhand',
+        'JK': 'Jammu and Kashmīr',
+        'KA': 'Karnātaka',
+        'KL': 'Kerala',
+        'LA': 'Ladākh',
+        'LD': 'Lakshadweep',
+        'MH': 'Mahārāshtra',
+        'ML': 'Meghālaya',
+        'MN': 'Manipur',
+        'MP': 'Madhya Pradesh',
+        'MZ': 'Mizoram',
+        'NL': 'Nāgāland',
+        'OR': 'Odisha',
+        'PB': 'Punjab',
+        'PY': 'Puducherry',
+        'RJ': 'Rājasthān',
+        'SK': 'Sikkim',
+        'TN': 'Tamil Nādu',
+        'TR': 'Tripura',
+        'TS': 'Telangāna',
+        'UK': 'Uttarākhand',
+        'UP': 'Uttar Pradesh',
+        'WB': 'West Bengal'
+    },
+    'IT': {
+        'AG': 'Agrigento',
+        'AL': 'Alessandria',
+        'AN': 'Ancona',
+        'AO': "Valle d'Aosta",
+        'AP': 'Ascoli Piceno',
+        'AQ': "L'Aquila",
+        'AR': 'Arezzo',
+        'AT': 'Asti',
+        'AV': 'Avellino',
+        'BA': 'Bari',
+        'BG': 'Bergamo',
+        'BI': 'Biella',
+        'BL': 'Belluno',
+        'BN': 'Benevento',
+        'BO': 'Bologna',
+        'BR': 'Brindisi',
+        'BS': 'Brescia',
+        'BT': 'Barletta-Andria-Trani',
+        'BZ': 'Bolzano',
+        'CA': 'Cagliari',
+        'CB': 'Campobasso',
+        'CE': 'Caserta',
+        'CH': 'Chieti',
+        'CL': 'Caltanissetta',
+        'CN': 'Cuneo',
+        'CO': 'Como',
+        'CR': 'Cremona',
+        'CS': 'Cosenza',
+        'CT': 'Catania',
+        'CZ': 'Catanzaro',
+        'EN': 'Enna',
+        'FC': 'Forlì-Cesena',
+        'FE': 'Ferrara',
+        'FG': 'Foggia',
+        'FI': 'Firenze',
+        'FM': 'Fermo',
+        'FR': 'Frosinone',
+        'GE': 'Genova',
+        'GO': 'Gorizia',
+        'GR': 'Grosseto',
+        'IM': 'Imperia',
+        'IS': 'Isernia',
+        'KR': 'Crotone',
+        'LC': 'Lecco',
+        'LE': 'Lecce',
+        'LI': 'Livorno',
+        'LO': 'Lodi',
+        'LT': 'Latina',
+        'LU': 'Lucca',
+        'MB': 'Monza e Brianza',
+        'MC': 'Macerata',
+        'ME': 'Messina',
+        'MI': 'Milano',
+        'MN': 'Mantova',
+        'MO': 'Modena',
+        'MS': 'Massa-Carrara',
+        'MT': 'Matera',
+        'NA': 'Napoli',
+        'NO': 'Novara',
+        'NU': 'Nuoro',
+        'OR': 'Oristano',
+        'PA': 'Palermo',
+        'PC': 'Piacenza',
+        'PD': 'Padova',
+        'PE': 'Pescara',
+        'PG': 'Perugia',
+        'PI': 'Pisa',
+        'PN': 'Pordenone',
+        'PO': 'Prato',
+        'PR': 'Parma',
+        'PT': 'Pistoia',
+        'PU': 'Pesaro e Urbino',
+        'PV': 'Pavia',
+        'PZ': 'Potenza',
+        'RA': 'Ravenna',
+        'RC': 'Reggio Calabria',
+        'RE': 'Reggio Emilia',
+        'RG': 'Ragusa',
+        'RI': 'Rieti',
+        'RM': 'Roma',
+        'RN': 'Rimini',
+        'RO': 'Rovigo',
+        'SA': 'Salerno',
+        'SI': 'Siena',
+        'SO': 'Sondrio',
+        'SP': 'La Spezia',
+        'SR': 'Siracusa',
+        'SS': 'Sassari',
+        'SU': 'Sud Sardegna',
+        'SV': 'Savona',
+        'TA': 'Taranto',
+        'TE': 'Teramo',
+        'TN': 'Trento',
+        'TO': 'Torino',
+        'TP': 'Trapani',
+        'TR': 'Terni',
+        'TS': 'Trieste',
+        'TV': 'Treviso',
+        'UD': 'Udine',
+        'VA': 'Varese',
+        'VB': 'Verbano-Cusio-Ossola',
+        'VC': 'Vercelli',
+        'VE': 'Venezia',
+        'VI': 'Vicenza',
+        'VR': 'Verona',
+        'VT': 'Viterbo',
+        'VV': 'Vibo Valentia',
+        'Andria': 'Andria',
+        'Barletta': 'Barletta',
+        'Cesena': 'Cesena',
+        'Forli': 'Forlì',
+        'Pesaro': 'Pesaro',
+        'Trani': 'Trani',
+        'Urbino': 'Urbino'
+    },
+    'MY': {
+        'JHR': 'Johor',
+        'KDH': 'Kedah',
+        'KTN': 'Kelantan',
+        'KUL': 'Kuala Lumpur',
+        'LBN': 'Labuan',
+        'MLK': 'Melaka',
+        'NSN': 'Negeri Sembilan',
+        'PHG': 'Pahang',
+        'PJY': 'Putrajaya',
+        'PLS': 'Perlis',
+        'PNG': 'Pulau Pinang',
+        'PRK': 'Perak',
+        'SBH': 'Sabah',
+        'SGR': 'Selangor',
+        'SWK': 'Sarawak',
+        'TRG': 'Terengganu'
+    },
+    'NI': {
+        'AN': 'Costa Caribe Norte',
+        'AS': 'Costa Caribe Sur',
+        'BO': 'Boaco',
+        'CA': 'Carazo',
+        'CI': 'Chinandega',
+        'CO': 'Chontales',
+        'ES': 'Estelí',
+        'GR': 'Granada',
+        'JI': 'Jinotega',
+        'LE': 'León',
+        'MD': 'Madriz',
+        'MN': 'Managua',
+        'MS': 'Masaya',
+        'MT': 'Matagalpa',
+        'NS': 'Nueva Segovia',
+        'RI': 'Rivas',
+        'SJ': 'Río San Juan'
+    },
+    'NZ': {
+        'AUK': 'Auckland',
+        'BOP': 'Bay of Plenty',
+        'CAN': 'Canterbury',
+        'CIT': 'Chatham Islands Territory',
+        'GIS': 'Gisborne',
+        'HKB': "Hawke's Bay",
+        'MBH': 'Marlborough',
+        'MWT': 'Manawatū-Whanganui',
+        'NSN': 'Nelson',
+        'NTL': 'Northland',
+        'OTA': 'Otago',
+        'STL': 'Southland',
+        'TAS': 'Tasman',
+        'TKI': 'Taranaki',
+        'WGN': 'Greater Wellington',
+        'WKO': 'Waikato',
+        'WTC': 'West Coast'
+    },
+    'PT': {
+        '01': 'Aveiro',
+        '02': 'Beja',
+        '03': 'Braga',
+        '04': 'Bragança',
+        '05': 'Castelo Branco',
+        '06': 'Coimbra',
+        '07': 'Évora',
+        '08': 'Faro',
+        '09': 'Guarda',
+        '10': 'Leiria',
+        '11': 'Lisboa',
+        '12': 'Portalegre',
+        '13': 'Porto',
+        '14': 'Santarém',
+        '15': 'Setúbal',
+        '16': 'Viana do Castelo',
+        '17': 'Vila Real',
+        '18': 'Viseu',
+        '20': 'Região Autónoma dos Açores',
+        '30': 'Região Autónoma da Madeira'
+    },
+    'SV': {
+        'AH': 'Ahuachapán',
+        'CA': 'Cabañas',
+        'CH': 'Chalatenango',
+        'CU': 'Cuscatlán',
+        'LI': 'La Libertad',
+        'MO': 'Morazán',
+        'PA': 'La Paz',
+        'SA': 'Santa Ana',
+        'SM': 'San Miguel',
+        'SO': 'Sonsonate',
+        'SS': 'San Salvador',
+        'SV': 'San Vicente',
+        'UN': 'La Unión',
+        'US': 'Usulután'
+    },
+    'US': {
+        'AK': 'Alaska',
+        'AL': 'Alabama',
+        'AR': 'Arkansas',
+        'AS': 'American Samoa',
+        'AZ': 'Arizona',
+        'CA': 'California',
+        'CO': 'Colorado',
+        'CT': 'Connecticut',
+        'DC': 'District of Columbia',
+        'DE': 'Delaware',
+        'FL': 'Florida',
+        'GA': 'Georgia',
+        'GU': 'Guam',
+        'HI': 'Hawaii',
+        'IA': 'Iowa',
+        'ID': 'Idaho',
+        'IL': 'Illinois',
+        'IN': 'Indiana',
+        'KS': 'Kansas',
+        'KY': 'Kentucky',
+        'LA': 'Louisiana',
+        'MA': 'Massachusetts',
+        'MD': 'Maryland',
+        'ME': 'Maine',
+        'MI': 'Michigan',
+        'MN': 'Minnesota',
+        'MO': 'Missouri',
+        'MP': 'Northern Mariana Islands',
+        'MS': 'Mississippi',
+        'MT': 'Montana',
+        'NC': 'North Carolina',
+        'ND': 'North Dakota',
+        'NE': 'Nebraska',
+        'NH': 'New Hampshire',
+        'NJ': 'New Jersey',
+        'NM': 'New Mexico',
+        'NV': 'Nevada',
+        'NY': 'New York',
+        'OH': 'Ohio',
+        'OK': 'Oklahoma',
+        'OR': 'Oregon',
+        'PA': 'Pennsylvania',
+        'PR': 'Puerto Rico',
+        'RI': 'Rhode Island',
+        'SC': 'South Carolina',
+        'SD': 'South Dakota',
+        'TN': 'Tennessee',
+        'TX': 'Texas',
+        'UM': 'United States Minor Outlying Islands',
+        'UT': 'Utah',
+        'VA': 'Virginia',
+        'VI': 'Virgin Islands, U.S.',
+        'VT': 'Vermont',
+        'WA': 'Washington',
+        'WI': 'Wisconsin',
+        'WV': 'West Virginia',
+        'WY': 'Wyoming'
+    }
+}
+
+
+def subdivision_name(country_code: str, subdivision: str) -> Optional[str]:
+    """Nombre de una subdivisión por país y código (sin prefijo), o None"""
+    country_code = 'GB' if country_code == 'UK' else country_code
+    return SUBDIVISION_NAMES.get(country_code, {}).get(subdivision)
+
+
+def name_for_code(value: str) -> Optional[str]:
+    """Nombre de la subdivisión si ``value`` es un código ISO 3166-2 conocido ('PT-11')"""
+    match = SUBDIVISION_CODE.match((value or '').strip())
+    return subdivision_name(match.group(1), match.group(2)) if match else None
@@ -14,6 +14,7 @@ const HolidayManagement = () => {
   const [loading, setLoading] = useState(false)
   const [year, setYear] = useState(new Date().getFullYear())
   const [statistics, setStatistics] = useState(null)
+  const [comparison, setComparison] = useState(null)
   const [loadingStats, setLoadingStats] = useState(true)
   const [lastRefresh, setLastRefresh] = useState(null)
   const [showConfirmDialog, setShowConfirmDialog] = useState(false)
@@ -26,7 +27,7 @@ const HolidayManagement = () => {
     try {
       setLoadingStats(true)
       const token = localStorage.getItem('auth_token') || localStorage.getItem('token')
-      const response = await fetch(`${import.meta.env.VITE_API_BASE_URL || import.meta.env.VITE_API_URL}/holidays/statistics?year=${year}`, {
+      const response = await fetch(`${import.meta.env.VITE_API_BASE_URL || import.meta.env.VITE_API_URL}/holidays/statistics?years=${year - 1},${year}`, {
         credentials: 'include',
         headers: {
           'Authorization': token ? `Bearer ${token}` : undefined,
@@ -38,6 +39,7 @@ const HolidayManagement = () => {
         const data = await response.json()
         if (data.success) {
           setStatistics(data.statistics)
+          setComparison(data.comparison?.[0] || null)
         }
       }
     } catch (error) {
@@ -68,7 +70,7 @@ const HolidayManagement = () => {
         headers,
         body: JSON.stringify({ 
           year,
-          clean_before_load: true  // Siempre limpiar antes de cargar para evitar festivos obsoletos
+          mode: 'diff'  // Solo altas, cambios y desactivaciones: el año nunca queda vacío
         })
       })
 
@@ -77,7 +79,9 @@ const HolidayManagement = () => {
       if (response.ok && data.success) {
         toast({
           title: "✅ Festivos recargados",
-          description: `Se han cargado ${data.results.total_loaded} festivos para ${year}`,
+          description: data.results.mode === 'diff'
+            ? `${year}: ${data.results.inserted} nuevos, ${data.results.updated + data.results.reactivated} actualizados, ${data.results.deactivated} desactivados`
+            : `Se han cargado ${data.results.total_loaded} festivos para ${year}`,
         })
         
         setLastRefresh({
@@ -144,18 +148,38 @@ const HolidayManagement = () => {
               <div className="p-4 border rounded-lg">
                 <div className="text-sm text-muted-foreground">Total</div>
                 <div className="text-2xl font-bold">{statistics.total}</div>
+                {comparison && (
+                  <div className="text-xs text-muted-foreground">
+                    {comparison.total_delta >= 0 ? '+' : ''}{comparison.total_delta} vs {comparison.from}
+                  </div>
+                )}
               </div>
               <div className="p-4 border rounded-lg">
                 <div className="text-sm text-muted-foreground">Nacionales</div>
                 <div className="text-2xl font-bold">{statistics.national}</div>
+                {comparison && (
+                  <div className="text-xs text-muted-foreground">
+                    {comparison.national_delta >= 0 ? '+' : ''}{comparison.national_delta} vs {comparison.from}
+                  </div>
+                )}
               </div>
               <div className="p-4 border rounded-lg">
                 <div className="text-sm text-muted-foreground">Autonómicos</div>
                 <div className="text-2xl font-bold">{statistics.regional}</div>
+                {comparison && (
+                  <div className="text-xs text-muted-foreground">
+                    {comparison.regional_delta >= 0 ? '+' : ''}{comparison.regional_delta} vs {comparison.from}
+                  </div>
+                )}
               </div>
               <div className="p-4 border rounded-lg">
                 <div className="text-sm text-muted-foreground">Locales</div>
                 <div className="text-2xl font-bold">{statistics.local}</div>
+                {comparison && (
+                  <div className="text-xs text-muted-foreground">
+                    {comparison.local_delta >= 0 ? '+' : ''}{comparison.local_delta} vs {comparison.from}
+                  </div>
+                )}
               </div>
             </div>
           ) : null}
@@ -166,10 +190,10 @@ const HolidayManagement = () => {
             <AlertDescription>
               La recarga cargará festivos desde:
               <ul className="list-disc list-inside mt-2 space-y-1">
-                <li><strong>Nacionales y Autonómicos:</strong> API Nager.Date</li>
+                <li><strong>Nacionales y Autonómicos:</strong> generados localmente (paquete holidays)</li>
                 <li><strong>Locales:</strong> Boletín Oficial del Estado (BOE)</li>
               </ul>
-              Los duplicados se evitarán automáticamente.
+              Solo se aplican las diferencias: altas, cambios y desactivaciones.
             </AlertDescription>
           </Alert>
 
@@ -0,0 +1,155 @@
+import { useState, useEffect } from 'react'
+import { Activity, RefreshCw, RotateCcw } from 'lucide-react'
+import { Button } from '../ui/button'
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../ui/card'
+import { Badge } from '../ui/badge'
+import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '../ui/table'
+import { useToast } from '../ui/use-toast'
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || import.meta.env.VITE_API_URL
+
+const SORT_OPTIONS = [
+  { value: 'total_ms', label: 'Tiempo total' },
+  { value: 'p95_ms', label: 'p95' },
+  { value: 'avg_sql_queries', label: 'Consultas SQL' },
+  { value: 'count', label: 'Peticiones' }
+]
+
+const formatBytes = (bytes) => {
+  if (bytes >= 1024 * 1024) return `${(bytes / 1024 / 1024).toFixed(1)} MB`
+  if (bytes >= 1024) return `${(bytes / 1024).toFixed(1)} KB`
+  return `${bytes} B`
+}
+
+const RequestMetrics = () => {
+  const { toast } = useToast()
+  const [metrics, setMetrics] = useState(null)
+  const [loading, setLoading] = useState(true)
+  const [sortBy, setSortBy] = useState('total_ms')
+
+  useEffect(() => {
+    loadMetrics()
+  }, [sortBy])
+
+  const loadMetrics = async () => {
+    try {
+      setLoading(true)
+      const response = await fetch(`${API_BASE_URL}/admin/metrics/requests?sort=${sortBy}&limit=25`, {
+        credentials: 'include'
+      })
+
+      if (response.ok) {
+        const data = await response.json()
+        if (data.success) {
+          setMetrics(data.metrics)
+        }
+      }
+    } catch (error) {
+      console.error('Error cargando métricas por endpoint:', error)
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  const resetMetrics = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/admin/metrics/requests/reset`, {
+        method: 'POST',
+        credentials: 'include'
+      })
+      if (!response.ok) {
+        throw new Error('Error reiniciando métricas')
+      }
+      toast({ title: 'Métricas reiniciadas', description: 'Los contadores de este worker empiezan de cero' })
+      loadMetrics()
+    } catch (error) {
+      console.error('Error reiniciando métricas:', error)
+      toast({ title: 'Error', description: 'No se pudieron reiniciar las métricas', variant: 'destructive' })
+    }
+  }
+
+  return (
+    <Card>
+      <CardHeader>
+        <div className="flex items-center justify-between">
+          <div>
+            <CardTitle className="flex items-center">
+              <Activity className="w-5 h-5 mr-2" />
+              Rendimiento por Endpoint
+            </CardTitle>
+            <CardDescription>
+              {metrics
+                ? `${metrics.requests} peticiones en ${Math.round(metrics.uptime_seconds / 60)} min (worker ${metrics.pid})`
+                : 'Latencia, consultas SQL y tamaño de respuesta'}
+            </CardDescription>
+          </div>
+          <div className="flex gap-2">
+            {SORT_OPTIONS.map(option => (
+              <Button
+                key={option.value}
+                size="sm"
+                variant={sortBy === option.value ? 'default' : 'outline'}
+                onClick={() => setSortBy(option.value)}
+              >
+                {option.label}
+              </Button>
+            ))}
+            <Button size="sm" variant="outline" onClick={loadMetrics} disabled={loading}>
+              <RefreshCw className={`w-4 h-4 ${loading ? 'animate-spin' : ''}`} />
+            </Button>
+            <Button size="sm" variant="outline" onClick={resetMetrics}>
+              <RotateCcw className="w-4 h-4" />
+            </Button>
+          </div>
+        </div>
+      </CardHeader>
+      <CardContent>
+        {metrics?.endpoints?.length ? (
+          <Table>
+            <TableHeader>
+              <TableRow>
+                <TableHead>Endpoint</TableHead>
+                <TableHead className="text-right">Peticiones</TableHead>
+                <TableHead className="text-right">Media</TableHead>
+                <TableHead className="text-right">p95</TableHead>
+                <TableHead className="text-right">p99</TableHead>
+                <TableHead className="text-right">SQL</TableHead>
+                <TableHead className="text-right">SQL ms</TableHead>
+                <TableHead className="text-right">Tamaño</TableHead>
+                <TableHead className="text-right">Errores</TableHead>
+              </TableRow>
+            </TableHeader>
+            <TableBody>
+              {metrics.endpoints.map(item => (
+                <TableRow key={`${item.method} ${item.endpoint}`}>
+                  <TableCell className="font-mono text-xs">
+                    <Badge variant="outline" className="mr-2">{item.method}</Badge>
+                    {item.endpoint}
+                  </TableCell>
+                  <TableCell className="text-right">{item.count}</TableCell>
+                  <TableCell className="text-right">{item.avg_ms} ms</TableCell>
+                  <TableCell className="text-right">{item.p95_ms} ms</TableCell>
+                  <TableCell className="text-right">{item.p99_ms} ms</TableCell>
+                  <TableCell className="text-right">{item.avg_sql_queries}</TableCell>
+                  <TableCell className="text-right">{item.avg_sql_ms}</TableCell>
+                  <TableCell className="text-right">{formatBytes(item.avg_response_bytes)}</TableCell>
+                  <TableCell className="text-right">
+                    {item.error_rate > 0
+                      ? <Badge variant="destructive">{(item.error_rate * 100).toFixed(1)}%</Badge>
+                      : '0%'}
+                  </TableCell>
+                </TableRow>
+              ))}
+            </TableBody>
+          </Table>
+        ) : (
+          <p className="text-sm text-gray-500">
+            {loading ? 'Cargando métricas...' : 'Sin peticiones registradas todavía'}
+          </p>
+        )}
+      </CardContent>
+    </Card>
+  )
+}
+
+export default RequestMetrics
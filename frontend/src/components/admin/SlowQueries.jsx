@@ -0,0 +1,142 @@
+import { useState, useEffect } from 'react'
+import { Database, RefreshCw, RotateCcw } from 'lucide-react'
+import { Button } from '../ui/button'
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../ui/card'
+import { Badge } from '../ui/badge'
+import { useToast } from '../ui/use-toast'
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || import.meta.env.VITE_API_URL
+
+const SlowQueries = () => {
+  const { toast } = useToast()
+  const [queries, setQueries] = useState([])
+  const [thresholdMs, setThresholdMs] = useState(null)
+  const [loading, setLoading] = useState(true)
+  const [expanded, setExpanded] = useState(null)
+  const [plans, setPlans] = useState({})
+
+  useEffect(() => {
+    loadQueries()
+  }, [])
+
+  const loadQueries = async () => {
+    try {
+      setLoading(true)
+      const response = await fetch(`${API_BASE_URL}/admin/slow-queries?limit=20`, {
+        credentials: 'include'
+      })
+
+      if (response.ok) {
+        const data = await response.json()
+        if (data.success) {
+          setQueries(data.queries)
+          setThresholdMs(data.threshold_ms)
+        }
+      }
+    } catch (error) {
+      console.error('Error cargando consultas lentas:', error)
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  const togglePlan = async (fingerprint) => {
+    if (expanded === fingerprint) {
+      setExpanded(null)
+      return
+    }
+    setExpanded(fingerprint)
+    try {
+      const response = await fetch(`${API_BASE_URL}/admin/slow-queries/${fingerprint}`, {
+        credentials: 'include'
+      })
+      if (response.ok) {
+        const data = await response.json()
+        if (data.success) {
+          setPlans(prev => ({ ...prev, [fingerprint]: data.query }))
+        }
+      }
+    } catch (error) {
+      console.error('Error cargando plan de ejecución:', error)
+    }
+  }
+
+  const resetQueries = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/admin/slow-queries/reset`, {
+        method: 'POST',
+        credentials: 'include'
+      })
+      if (!response.ok) {
+        throw new Error('Error reiniciando registro')
+      }
+      setPlans({})
+      setExpanded(null)
+      loadQueries()
+    } catch (error) {
+      console.error('Error reiniciando consultas lentas:', error)
+      toast({ title: 'Error', description: 'No se pudo reiniciar el registro', variant: 'destructive' })
+    }
+  }
+
+  return (
+    <Card>
+      <CardHeader>
+        <div className="flex items-center justify-between">
+          <div>
+            <CardTitle className="flex items-center">
+              <Database className="w-5 h-5 mr-2" />
+              Consultas Lentas
+            </CardTitle>
+            <CardDescription>
+              {thresholdMs !== null
+                ? `Sentencias por encima de ${thresholdMs} ms, agrupadas por huella`
+                : 'Sentencias SQL lentas con su plan de ejecución'}
+            </CardDescription>
+          </div>
+          <div className="flex gap-2">
+            <Button size="sm" variant="outline" onClick={loadQueries} disabled={loading}>
+              <RefreshCw className={`w-4 h-4 ${loading ? 'animate-spin' : ''}`} />
+            </Button>
+            <Button size="sm" variant="outline" onClick={resetQueries}>
+              <RotateCcw className="w-4 h-4" />
+            </Button>
+          </div>
+        </div>
+      </CardHeader>
+      <CardContent className="space-y-3">
+        {queries.length === 0 && (
+          <p className="text-sm text-gray-500">
+            {loading ? 'Cargando consultas...' : 'No se han registrado consultas lentas'}
+          </p>
+        )}
+        {queries.map(query => (
+          <div key={query.fingerprint} className="border rounded-md p-3 space-y-2">
+            <div className="flex flex-wrap items-center gap-2 text-xs">
+              <Badge variant="outline">{query.count}×</Badge>
+              <Badge variant="outline">total {query.total_ms} ms</Badge>
+              <Badge variant="outline">máx {query.max_ms} ms</Badge>
+              {Object.keys(query.endpoints).map(endpoint => (
+                <Badge key={endpoint} variant="secondary">{endpoint}</Badge>
+              ))}
+              {query.slowest_frame && (
+                <span className="font-mono text-gray-500">{query.slowest_frame}</span>
+              )}
+            </div>
+            <pre className="text-xs bg-gray-50 p-2 rounded whitespace-pre-wrap break-all">{query.sql}</pre>
+            <Button size="sm" variant="ghost" onClick={() => togglePlan(query.fingerprint)}>
+              {expanded === query.fingerprint ? 'Ocultar plan' : query.has_plan ? 'Ver plan' : 'Plan pendiente'}
+            </Button>
+            {expanded === query.fingerprint && (
+              <pre className="text-xs bg-gray-900 text-gray-100 p-2 rounded overflow-x-auto">
+                {plans[query.fingerprint]?.plan || plans[query.fingerprint]?.plan_error || 'Plan aún no capturado (se muestrea en segundo plano)'}
+              </pre>
+            )}
+          </div>
+        ))}
+      </CardContent>
+    </Card>
+  )
+}
+
+export default SlowQueries
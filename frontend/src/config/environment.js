@@ -5,6 +5,10 @@ export const config = {
     ? 'https://team-time-management.onrender.com/api'
     : 'http://localhost:5001/api', // Puerto unificado 5001
   
+  // Proceso de eventos SSE (events en el Procfile); por defecto el mismo API.
+  // Debe compartir dominio de cookie con el API para enviar la sesión
+  EVENTS_BASE_URL: import.meta.env.VITE_EVENTS_URL || null,
+  
   // Configuración de la aplicación
   APP_NAME: 'Team Time Management',
   APP_VERSION: '1.0.0',
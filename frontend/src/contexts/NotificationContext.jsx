@@ -39,8 +39,12 @@ export const NotificationProvider = ({ children }) => {
       loadNotifications()
       loadSummary()
       
-      // OPTIMIZACIÓN: Configurar polling solo cuando la página está visible
+      // Canal en tiempo real (SSE). El polling queda solo como respaldo si el
+      // navegador no soporta EventSource o el stream falla repetidamente.
       let interval = null
+      let eventSource = null
+      let streamErrors = 0
+      const MAX_STREAM_ERRORS = 5
       
       const startPolling = () => {
         // Limpiar intervalo anterior si existe
@@ -64,17 +68,62 @@ export const NotificationProvider = ({ children }) => {
         }
       }
       
-      // Iniciar polling solo si la página está visible
+      const closeStream = () => {
+        if (eventSource) {
+          eventSource.close()
+          eventSource = null
+        }
+      }
+      
+      const openStream = () => {
+        closeStream()
+        eventSource = notificationService.openEventStream({
+          ready: () => {
+            streamErrors = 0
+            stopPolling()
+          },
+          notification: () => loadSummary(),
+          notifications_read: () => loadSummary(),
+          resync: () => loadSummary(),
+          calendar_change: (data) => {
+            // Los componentes de calendario escuchan este evento para recargar
+            window.dispatchEvent(new CustomEvent('calendar-change', { detail: data }))
+          },
+          holidays_changed: (data) => {
+            window.dispatchEvent(new CustomEvent('calendar-change', { detail: data }))
+          }
+        })
+        
+        if (!eventSource) {
+          startPolling()
+          return
+        }
+        
+        eventSource.onerror = () => {
+          // EventSource reconecta solo; tras varios fallos seguidos, volver a polling.
+          // Una respuesta no 200 (503 con el canal lleno) lo cierra sin reintentar
+          streamErrors += 1
+          if (streamErrors >= MAX_STREAM_ERRORS || eventSource.readyState === window.EventSource.CLOSED) {
+            console.warn('[NotificationContext] Stream SSE no disponible, usando polling')
+            closeStream()
+            startPolling()
+          }
+        }
+      }
+      
       if (!document.hidden) {
-        startPolling()
+        openStream()
       }
       
       // Manejar cambios de visibilidad de la página
       const handleVisibilityChange = () => {
         if (document.hidden) {
+          // Pestañas ocultas no mantienen conexiones abiertas
           stopPolling()
+          closeStream()
         } else {
-          startPolling()
+          streamErrors = 0
+          openStream()
           // Cargar resumen inmediatamente cuando la página vuelve a ser visible
           loadSummary()
         }
@@ -83,8 +132,9 @@ export const NotificationProvider = ({ children }) => {
       document.addEventListener('visibilitychange', handleVisibilityChange)
       
       return () => {
-        console.log('[NotificationContext] Cleaning up interval and listeners')
+        console.log('[NotificationContext] Cleaning up stream, interval and listeners')
         stopPolling()
+        closeStream()
         document.removeEventListener('visibilitychange', handleVisibilityChange)
       }
     } else {
@@ -1,4 +1,5 @@
 import { useQuery } from '@tanstack/react-query'
+import { compactYearActivities } from '../lib/calendarCompact'
 
 /**
  * Hook personalizado para obtener datos del calendario con React Query
@@ -59,7 +60,7 @@ export const useYearActivities = (options = {}) => {
   return useQuery({
     queryKey: ['year-activities', employeeId, teamId, year],
     queryFn: async () => {
-      const endpoint = `/calendar/annual?year=${year}${employeeId ? `&employee_id=${employeeId}` : ''}${teamId ? `&team_id=${teamId}` : ''}`
+      const endpoint = `/calendar/annual?year=${year}&format=compact${employeeId ? `&employee_id=${employeeId}` : ''}${teamId ? `&team_id=${teamId}` : ''}`
       
       const response = await fetch(
         `${import.meta.env.VITE_API_BASE_URL}${endpoint}`,
@@ -76,27 +77,8 @@ export const useYearActivities = (options = {}) => {
         throw new Error(data.message || 'Error cargando actividades')
       }
       
-      // Aplanar actividades de todos los meses
-      const allActivities = []
-      if (data.calendar?.months) {
-        data.calendar.months.forEach(monthData => {
-          if (monthData.employees) {
-            monthData.employees.forEach(emp => {
-              const empData = emp.employee || emp
-              if (emp.activities) {
-                Object.values(emp.activities).forEach(activity => {
-                  allActivities.push({
-                    ...activity,
-                    employee_id: empData.id
-                  })
-                })
-              }
-            })
-          }
-        })
-      }
-      
-      return allActivities
+      // Aplanar actividades de todos los meses (filas compactas)
+      return compactYearActivities(data.calendar)
     },
     enabled,
     staleTime: 5 * 60 * 1000, // 5 minutos
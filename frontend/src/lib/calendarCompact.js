@@ -0,0 +1,33 @@
+/**
+ * Lectura del calendario anual en formato compacto (?format=compact)
+ *
+ * El backend envía días y actividades como filas (arrays) con los nombres
+ * de columna en `day_columns` / `activity_columns`, y cada empleado una sola
+ * vez en `calendar.employees`.
+ */
+
+const rowToObject = (columns, row) => {
+  const item = {}
+  columns.forEach((column, index) => {
+    item[column] = row[index]
+  })
+  return item
+}
+
+/**
+ * Todas las actividades del año como objetos, con su employee_id
+ * @param {Object} calendar - `calendar` de /calendar/annual?format=compact
+ * @returns {Array<Object>}
+ */
+export function compactYearActivities(calendar) {
+  const activities = []
+  const columns = calendar?.activity_columns || []
+  ;(calendar?.months || []).forEach(monthData => {
+    (monthData.employees || []).forEach(emp => {
+      (emp.activities || []).forEach(row => {
+        activities.push({ ...rowToObject(columns, row), employee_id: emp.employee_id })
+      })
+    })
+  })
+  return activities
+}
@@ -42,6 +42,8 @@ import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuLabel,
 import LoadingSpinner from '../components/ui/LoadingSpinner'
 import { useToast } from '../components/ui/use-toast'
 import HolidayManagement from '../components/admin/HolidayManagement'
+import RequestMetrics from '../components/admin/RequestMetrics'
+import SlowQueries from '../components/admin/SlowQueries'
 
 const AdminPage = () => {
   const { user, isAdmin } = useAuth()
@@ -1156,6 +1158,12 @@ const AdminPage = () => {
           {/* Gestión de Festivos */}
           <HolidayManagement />
           
+          {/* Rendimiento por endpoint */}
+          <RequestMetrics />
+          
+          {/* Consultas lentas con planes de ejecución */}
+          <SlowQueries />
+          
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
             <Card>
               <CardHeader>
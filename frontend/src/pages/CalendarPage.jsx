@@ -14,6 +14,7 @@ import {
   X
 } from 'lucide-react'
 import { useAuth } from '../contexts/AuthContext'
+import { compactYearActivities } from '../lib/calendarCompact'
 import { Button } from '../components/ui/button'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card'
 import { Badge } from '../components/ui/badge'
@@ -49,6 +50,19 @@ const CalendarPage = () => {
     loadCalendarData()
   }, [currentMonth, activityFilter, calendarViewMode, employee])
 
+  // Recargar cuando llegan cambios de calendario por el canal en tiempo real (SSE)
+  useEffect(() => {
+    const handleCalendarChange = (event) => {
+      const changedDate = event.detail?.date ? new Date(event.detail.date) : null
+      if (!changedDate || changedDate.getFullYear() === currentMonth.getFullYear()) {
+        loadCalendarData()
+      }
+    }
+
+    window.addEventListener('calendar-change', handleCalendarChange)
+    return () => window.removeEventListener('calendar-change', handleCalendarChange)
+  }, [currentMonth, activityFilter, calendarViewMode, employee])
+
   // Cargar todas las actividades del año para estadísticas globales (solo cuando cambia el empleado o el año)
   useEffect(() => {
     const year = currentMonth.getFullYear()
@@ -72,10 +86,9 @@ const CalendarPage = () => {
 
     try {
       const year = currentMonth.getFullYear()
-      const allActivities = []
 
-      // Usar endpoint optimizado para cargar todo el año de una vez
-      let url = `${import.meta.env.VITE_API_BASE_URL}/calendar/annual?year=${year}`
+      // Usar endpoint optimizado para cargar todo el año de una vez (en filas compactas)
+      let url = `${import.meta.env.VITE_API_BASE_URL}/calendar/annual?year=${year}&format=compact`
       
       // Solo agregar filtros si no es admin
       if (!isAdmin()) {
@@ -95,26 +108,7 @@ const CalendarPage = () => {
       }
       
       const data = await response.json()
-      
-      if (data.success && data.calendar?.months) {
-        // Procesar todos los meses y recopilar actividades
-        data.calendar.months.forEach((monthData) => {
-          if (monthData.employees) {
-            monthData.employees.forEach(emp => {
-              const empData = emp.employee || emp
-              
-              if (emp.activities) {
-                Object.values(emp.activities).forEach(activity => {
-                  allActivities.push({
-                    ...activity,
-                    employee_id: empData.id
-                  })
-                })
-              }
-            })
-          }
-        })
-      }
+      const allActivities = data.success ? compactYearActivities(data.calendar) : []
 
       console.log('📊 Actividades del año cargadas para estadísticas (optimizado):', allActivities.length)
       setAllYearActivities(allActivities)
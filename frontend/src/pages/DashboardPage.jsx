@@ -42,34 +42,31 @@ const DashboardPage = () => {
   const loadDashboardData = async () => {
     setLoading(true)
     try {
-      // Obtener datos reales del backend
-      const response = await fetch(`${import.meta.env.VITE_API_BASE_URL}/reports/dashboard`, {
+      // Todos los widgets del dashboard en una sola petición (las notificaciones
+      // ya las mantiene NotificationContext)
+      const response = await fetch(`${import.meta.env.VITE_API_BASE_URL}/dashboard/overview?widgets=stats,team_performance`, {
         credentials: 'include'
       })
       
       if (response.ok) {
         const data = await response.json()
-        if (data.success && data.report) {
+        if (data.success && data.widgets?.stats) {
           // Transformar datos del backend al formato esperado por el frontend
-          const report = data.report
-          console.log('📊 Dashboard data recibida:', report) // Debug
+          const stats = data.widgets.stats
+          console.log('📊 Dashboard data recibida:', data) // Debug
           const transformedData = {
-            type: report.dashboard_type || report.type || (isAdmin() ? 'admin' : 'manager'),
-            statistics: report.statistics || {},
-            team_performance: report.team_performance || (report.team_summaries || []).map(ts => ({
-              team_name: ts.team?.name || 'Sin nombre',
-              team_id: ts.team?.id,
-              members_count: ts.summary?.employee_count || ts.team?.employee_count || 0,
-              efficiency: ts.summary?.efficiency || 0
-            })),
-            pending_requests: report.pending_requests || [],
-            recent_activity: report.recent_activity || [],
-            alerts: report.alerts || []
+            ...stats,
+            type: stats.type || data.user_role || (isAdmin() ? 'admin' : 'manager'),
+            statistics: stats.statistics || {},
+            team_performance: data.widgets.team_performance || stats.team_performance || [],
+            pending_requests: stats.pending_requests || [],
+            recent_activity: stats.recent_activity || [],
+            alerts: stats.alerts || []
           }
           console.log('📊 Dashboard data transformada:', transformedData) // Debug
           setDashboardData(transformedData)
         } else {
-          console.warn('⚠️ Dashboard: respuesta sin report o success=false', data)
+          console.warn('⚠️ Dashboard: respuesta sin widgets o success=false', data)
           setDashboardData(getEmptyDashboardData())
         }
       } else {
@@ -135,7 +135,7 @@ const EmployeesPage = () => {
 
   const loadAvailableTeams = async () => {
     try {
-      const response = await teamService.getAllTeams()
+      const response = await teamService.getTeamOptions()
       if (response.success && response.teams) {
         setAvailableTeams(response.teams)
       }
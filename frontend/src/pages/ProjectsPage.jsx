@@ -118,7 +118,7 @@ const ProjectsPage = () => {
 
   const loadTeams = async () => {
     try {
-      const response = await teamService.getAllTeams()
+      const response = await teamService.getTeamOptions()
       if (response.success && response.teams) {
         setAvailableTeams(response.teams)
       }
@@ -129,7 +129,7 @@ const ProjectsPage = () => {
 
   const loadEmployeesOptions = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/employees?approved_only=false&per_page=200`, {
+      const response = await fetch(`${API_BASE_URL}/employees?approved_only=false&per_page=200&fields=full_name,approved,active`, {
         credentials: 'include'
       })
       if (response.ok) {
@@ -231,7 +231,7 @@ const EmployeeRegisterPage = () => {
     const loadTeams = async () => {
       try {
         setLoadingTeams(true)
-        const response = await teamService.getAllTeams()
+        const response = await teamService.getTeamOptions()
         if (response.success && response.teams) {
           setTeams(response.teams)
         }
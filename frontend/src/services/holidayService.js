@@ -0,0 +1,51 @@
+import { apiClient } from './apiClient'
+
+/**
+ * Servicio para consultar festivos
+ */
+class HolidayService {
+  /**
+   * Verificar festivos de muchos días en una sola llamada
+   * @param {Array<Object>} items - Pares { employee_id | country/region/city, start_date, end_date }
+   * @returns {Promise<Array<Object>>} Resultados por elemento con marcas por día
+   */
+  async checkHolidaysBatch(items) {
+    try {
+      const response = await apiClient.post('/holidays/check-dates', { items })
+      return response.data.results
+    } catch (error) {
+      console.error('Error verificando festivos por lotes:', error)
+      throw error
+    }
+  }
+
+  /**
+   * Días no marcables (festivos y fines de semana) de varios empleados en un rango
+   * @param {Array<number>} employeeIds - IDs de los empleados (p. ej. un equipo)
+   * @param {string} startDate - Fecha de inicio (YYYY-MM-DD)
+   * @param {string} endDate - Fecha de fin (YYYY-MM-DD)
+   * @returns {Promise<Object>} { [employeeId]: { [fecha]: día } }
+   */
+  async getTeamHolidayDays(employeeIds, startDate, endDate) {
+    try {
+      const response = await apiClient.post('/holidays/check-dates', {
+        employee_ids: employeeIds,
+        start_date: startDate,
+        end_date: endDate
+      })
+      const byEmployee = {}
+      for (const result of response.data.results) {
+        byEmployee[result.employee_id] = Object.fromEntries(
+          result.days.map(day => [day.date, day])
+        )
+      }
+      return byEmployee
+    } catch (error) {
+      console.error('Error obteniendo festivos del equipo:', error)
+      throw error
+    }
+  }
+}
+
+const holidayService = new HolidayService()
+export default holidayService
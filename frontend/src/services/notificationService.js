@@ -1,4 +1,5 @@
 import { apiClient } from './apiClient'
+import config from '../config/environment.js'
 
 export const notificationService = {
   // Obtener notificaciones del usuario
@@ -71,6 +72,32 @@ export const notificationService = {
     return response.data
   },
 
+  // Abrir canal de eventos en tiempo real (Server-Sent Events)
+  // Devuelve null si el navegador no soporta EventSource
+  openEventStream(handlers = {}) {
+    if (typeof window === 'undefined' || typeof window.EventSource === 'undefined') {
+      return null
+    }
+
+    const source = new window.EventSource(`${config.EVENTS_BASE_URL || config.API_BASE_URL}/events/stream`, {
+      withCredentials: true
+    })
+
+    Object.entries(handlers).forEach(([eventType, handler]) => {
+      source.addEventListener(eventType, (event) => {
+        let data = {}
+        try {
+          data = event.data ? JSON.parse(event.data) : {}
+        } catch (error) {
+          console.error('Evento SSE inválido:', error)
+        }
+        handler(data)
+      })
+    })
+
+    return source
+  },
+
   // Procesar cola de notificaciones (solo admins)
   async processNotificationQueue() {
     const response = await apiClient.post('/notifications/process-queue')
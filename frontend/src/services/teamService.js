@@ -18,6 +18,20 @@ class TeamService {
     }
   }
 
+  /**
+   * Obtener equipos para selectores (solo id y nombre)
+   * @returns {Promise<Object>} Lista de equipos con id y name
+   */
+  async getTeamOptions() {
+    try {
+      const response = await apiClient.get('/teams?per_page=200&fields=name')
+      return response.data
+    } catch (error) {
+      console.error('Error obteniendo equipos:', error)
+      throw error
+    }
+  }
+
   /**
    * Obtener un equipo por ID
    * @param {number} teamId - ID del equipo